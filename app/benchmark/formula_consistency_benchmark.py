@@ -0,0 +1,261 @@
+"""
+Compares the interval based formula consistency check with the per device dictionaries of ranges
+that it replaced, on formulas in disjunctive normal form with 2 to 200 literals.
+"""
+import timeit
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Sequence
+from typing import Tuple
+
+from pyeda.boolalg.expr import AndOp
+from pyeda.boolalg.expr import Complement
+from pyeda.boolalg.expr import OrOp
+from pyeda.inter import expr
+
+from app.main.service.formula_service import FormulaService
+from app.main.util.formula_consistency import is_conjunction_consistent
+
+DEFAULT_LITERAL_COUNTS = (2, 5, 10, 20, 50, 100, 200)
+DEFAULT_CONJUNCT_SIZE = 10
+DEFAULT_REPEATS = 200
+DECIMAL_DEVICE_KEYS = ['temperature', 'humidity', 'pressure', 'light']
+
+
+def run_formula_consistency_benchmark(
+        literal_counts: Sequence[int] = DEFAULT_LITERAL_COUNTS,
+        conjunct_size: int = DEFAULT_CONJUNCT_SIZE,
+        repeats: int = DEFAULT_REPEATS) -> List[Dict[str, Any]]:
+    """
+    Returns mean times of both checks of the whole normal form per number of literals,
+    along with the time pyeda takes to convert the rule to disjunctive normal form, which both checks share.
+    """
+    results = []
+
+    for literal_count in literal_counts:
+        rule, lookup_table = get_benchmark_formula(literal_count, conjunct_size)
+
+        normal_form_seconds = timeit.timeit(lambda: _get_conjuncts(rule), number=max(1, repeats // 10))
+        conjuncts = _get_conjuncts(rule)
+
+        ranges_verdict = _check_with_ranges(conjuncts, lookup_table)
+        intervals_verdict = _check_with_intervals(conjuncts, lookup_table)
+
+        ranges_seconds = timeit.timeit(lambda: _check_with_ranges(conjuncts, lookup_table), number=repeats)
+        intervals_seconds = timeit.timeit(lambda: _check_with_intervals(conjuncts, lookup_table), number=repeats)
+
+        results.append({
+            'literals': literal_count,
+            'conjuncts': len(conjuncts),
+            'normal_form_ms': normal_form_seconds * 1000 / max(1, repeats // 10),
+            'ranges_us': ranges_seconds * 1000000 / repeats,
+            'intervals_us': intervals_seconds * 1000000 / repeats,
+            'speedup': ranges_seconds / intervals_seconds if intervals_seconds else None,
+            'verdicts_match': ranges_verdict == intervals_verdict
+        })
+
+    return results
+
+
+def get_benchmark_formula(literal_count: int, conjunct_size: int) -> Tuple[str, Dict[str, Any]]:
+    """
+    Builds a satisfiable disjunction of conjunctions, so that no check stops early. Every conjunction
+    narrows ranges of decimal sensors, excludes single readings and requires a state of a switch.
+    """
+    lookup_table = {}
+    conjunctions = []
+
+    for conjunct_start in range(0, literal_count, conjunct_size):
+        literals = []
+
+        for index in range(conjunct_start, min(literal_count, conjunct_start + conjunct_size)):
+            lookup_key = 'c{}'.format(index)
+            step = (index - conjunct_start) // len(DECIMAL_DEVICE_KEYS)
+            is_negated = False
+
+            if (index - conjunct_start) % 5 == 4:
+                condition = {'deviceKey': 'switch', 'functor': '==', 'value': True, 'type': 'Boolean'}
+            elif step % 3 == 0:
+                condition = {'functor': '=>', 'value': step}
+            elif step % 3 == 1:
+                condition = {'functor': '<=', 'value': 1000 - step}
+            else:
+                condition = {'functor': '==', 'value': 500 + step}
+                is_negated = True
+
+            if 'deviceKey' not in condition:
+                condition['deviceKey'] = DECIMAL_DEVICE_KEYS[index % len(DECIMAL_DEVICE_KEYS)]
+                condition['type'] = 'Decimal'
+
+            lookup_table[lookup_key] = condition
+            literals.append('~' + lookup_key if is_negated else lookup_key)
+
+        conjunctions.append('(' + ' & '.join(literals) + ')')
+
+    return ' | '.join(conjunctions), lookup_table
+
+
+def format_benchmark_results(results: List[Dict[str, Any]]) -> str:
+    lines = ['{:>8} {:>9} {:>14} {:>11} {:>14} {:>8} {:>6}'.format(
+        'literals', 'conjuncts', 'normal form ms', 'ranges us', 'intervals us', 'speedup', 'match'
+    )]
+
+    for result in results:
+        lines.append('{:>8} {:>9} {:>14.3f} {:>11.1f} {:>14.1f} {:>8.2f} {:>6}'.format(
+            result['literals'],
+            result['conjuncts'],
+            result['normal_form_ms'],
+            result['ranges_us'],
+            result['intervals_us'],
+            result['speedup'] or 0,
+            'yes' if result['verdicts_match'] else 'no'
+        ))
+
+    return '\n'.join(lines)
+
+
+def _get_conjuncts(rule: str) -> list:
+    # Conversion to conjunctive normal form is left out, it grows exponentially with the number of conjunctions
+    expression_dnf = expr(rule).to_dnf()
+
+    return list(expression_dnf._lits) if isinstance(expression_dnf, OrOp) else [expression_dnf]
+
+
+def _check_with_intervals(conjuncts: list, lookup_table: Dict[str, Any]) -> bool:
+    formula_service_instance = FormulaService.get_instance()
+
+    return all(
+        is_conjunction_consistent(formula_service_instance._get_conjunct_conditions(conjunct, lookup_table))
+        for conjunct in conjuncts
+    )
+
+
+def _check_with_ranges(conjuncts: list, lookup_table: Dict[str, Any]) -> bool:
+    return all(
+        _check_and_expression_with_ranges(conjunct, lookup_table) if isinstance(conjunct, AndOp)
+        else _check_literal_expression_with_ranges(conjunct, lookup_table)
+        for conjunct in conjuncts
+    )
+
+
+# Checks used by FormulaService before the interval based check, kept as the benchmark baseline
+
+def _check_literal_expression_with_ranges(expression: Complement, values: dict) -> bool:
+    if (expression.uniqid < 0):
+        or_inner_expression_text = str(expression)[1:]
+    else:
+        or_inner_expression_text = str(expression)
+
+    if or_inner_expression_text not in values:
+        return False
+    return True
+
+def _check_and_expression_with_ranges(expression: AndOp, values: dict) -> bool:
+    functor_ranges = {}
+    for and_inner_expression in expression._lits:
+        and_inner_expression_text = str(and_inner_expression)
+        is_inner_expression_negative = False
+
+        if and_inner_expression.uniqid < 0:
+            is_inner_expression_negative = True
+            and_inner_expression_text = and_inner_expression_text[1:]
+
+        if and_inner_expression_text in values:
+            if values[and_inner_expression_text]['deviceKey'] not in functor_ranges:
+                functor_ranges[values[and_inner_expression_text]['deviceKey']] = {}
+
+            functor_range = functor_ranges[values[and_inner_expression_text]['deviceKey']]
+            value = values[and_inner_expression_text]['value']
+
+            if values[and_inner_expression_text]['functor'] == '==' and is_inner_expression_negative:
+                if 'exclude' in functor_range:
+                    functor_range['exclude'].add(value)
+                else:
+                    functor_range['exclude'] = {value}
+
+            if values[and_inner_expression_text]['type'] == 'Decimal':
+                if is_inner_expression_negative:
+                    if values[and_inner_expression_text]['functor'] == '=>' and 'valueMax' not in functor_range:
+                        functor_range['valueMax'] = value
+
+                    if values[and_inner_expression_text]['functor'] == '<=' and 'valueMin' not in functor_range:
+                        functor_range['valueMin'] = value
+
+                    if values[and_inner_expression_text]['functor'] == '=>' and functor_range['valueMax'] > value:
+                        functor_range['valueMax'] = value
+
+                    if values[and_inner_expression_text]['functor'] == '<=' and functor_range['valueMin'] < value:
+                        functor_range['valueMin'] = value
+                else:
+                    if values[and_inner_expression_text]['functor'] == '=>' and 'valueMin' not in functor_range:
+                        functor_range['valueMin'] = value
+
+                    if values[and_inner_expression_text]['functor'] == '<=' and 'valueMax' not in functor_range:
+                        functor_range['valueMax'] = value
+
+                    if values[and_inner_expression_text]['functor'] == '=>' and functor_range['valueMin'] < value:
+                        functor_range['valueMin'] = value
+
+                    if values[and_inner_expression_text]['functor'] == '<=' and functor_range['valueMax'] > value:
+                        functor_range['valueMax'] = value
+
+                    if (values[and_inner_expression_text]['functor'] == '=='
+                            and 'valueMin' not in functor_range
+                            and 'valueMax' not in functor_range):
+                        functor_range['valueMin'] = value
+                        functor_range['valueMax'] = value
+
+                    if (values[and_inner_expression_text]['functor'] == '=='
+                            and 'valueMin' in functor_range
+                            and 'valueMax' not in functor_range
+                            and functor_range['valueMin'] <= value):
+                        functor_range['valueMin'] = value
+                        functor_range['valueMax'] = value
+
+                    if (values[and_inner_expression_text]['functor'] == '=='
+                            and 'valueMax' in functor_range
+                            and 'valueMin' not in functor_range
+                            and value <= functor_range['valueMax']):
+                        functor_range['valueMin'] = value
+                        functor_range['valueMax'] = value
+
+                    if values[and_inner_expression_text]['functor'] == '==':
+                        if ('valueMin' in functor_range and 'valueMax' in functor_range
+                                and functor_range['valueMin'] <= value <= functor_range['valueMax']):
+                            functor_range['valueMin'] = value
+                            functor_range['valueMax'] = value
+                        else:
+                            return False
+
+                if ('exclude' in functor_range and 'valueMax' in functor_range and 'valueMin' in functor_range
+                        and functor_range['valueMax'] == functor_range['valueMin']
+                        and functor_range['valueMax'] in functor_range['exclude']):
+                    return False
+
+                if ('valueMax' in functor_range and 'valueMin' in functor_range
+                        and functor_range['valueMax'] < functor_range['valueMin']):
+                    return False
+            else:
+                if (values[and_inner_expression_text]['functor'] == '=='
+                        and not is_inner_expression_negative
+                        and 'value' not in functor_range):
+                    functor_range['value'] = value
+                elif (values[and_inner_expression_text]['functor'] == '=='
+                      and not is_inner_expression_negative
+                      and functor_range['value'] != value):
+                    return False
+
+                if 'exclude' in functor_range:
+                    if 'value' in functor_range and functor_range['value'] in functor_range['exclude']:
+                        return False
+
+                    if (values[and_inner_expression_text]['type'] in ['Boolean']
+                            and len(functor_range['exclude']) == len([True, False])):
+                        return False
+
+                    if (values[and_inner_expression_text]['type'] in ['Enum']
+                            and (len(functor_range['exclude'])
+                                 == len(values[and_inner_expression_text]['number_of_reading_values']))):
+                        return False
+    return True
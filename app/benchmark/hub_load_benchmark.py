@@ -0,0 +1,153 @@
+"""
+Load test of hub endpoints against a running server, used to size workers and threads of the production server.
+
+Every simulated hub keeps its connection alive and in a loop sends readings of its sensors, sends states of its
+executive devices and asks for changed states, as hubs do. Listeners hold long polling requests for changed states
+meanwhile, like hubs waiting for changes. Throughput and latency percentiles are reported per endpoint.
+"""
+import base64
+import threading
+import time
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Sequence
+
+import requests
+
+DEFAULT_HUBS = 16
+DEFAULT_LISTENERS = 0
+DEFAULT_DURATION_SECONDS = 30
+DEFAULT_WAIT_SECONDS = 25
+REQUEST_NAMES = ('readings', 'states', 'changes', 'long poll')
+
+
+def run_hub_load_test(
+        base_url: str,
+        product_key: str,
+        password: str,
+        sensor_keys: Sequence[str],
+        device_keys: Sequence[str],
+        hubs: int = DEFAULT_HUBS,
+        listeners: int = DEFAULT_LISTENERS,
+        duration_seconds: float = DEFAULT_DURATION_SECONDS,
+        wait_seconds: int = DEFAULT_WAIT_SECONDS,
+        reading_value: float = 1,
+        state: float = 1) -> List[Dict[str, Any]]:
+    """
+    Runs hubs and listeners in threads for the duration, returns numbers of requests, errors, requests per second
+    and latency percentiles in milliseconds per request name.
+    """
+    hub_url = '{}/api/hubs/{}'.format(base_url.rstrip('/'), product_key)
+    headers = {
+        'Authorization': 'Basic {}'.format(
+            base64.b64encode('{}:{}'.format(product_key, password).encode()).decode()
+        )
+    }
+    readings_payload = {
+        'sensors': [
+            {'deviceKey': device_key, 'readingValue': reading_value, 'isActive': True} for device_key in sensor_keys
+        ]
+    }
+    states_payload = {
+        'devices': [{'deviceKey': device_key, 'state': state, 'isActive': True} for device_key in device_keys]
+    }
+
+    latencies = {request_name: [] for request_name in REQUEST_NAMES}
+    errors = {request_name: 0 for request_name in REQUEST_NAMES}
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration_seconds
+
+    def _send(session: requests.Session, request_name: str, method: str, url: str, **kwargs) -> None:
+        start = time.monotonic()
+        try:
+            is_error = session.request(method, url, headers=headers, **kwargs).status_code >= 500
+        except requests.RequestException:
+            is_error = True
+        elapsed = time.monotonic() - start
+
+        with lock:
+            if is_error:
+                errors[request_name] += 1
+            else:
+                latencies[request_name].append(elapsed)
+
+    def _run_hub() -> None:
+        with requests.Session() as session:
+            while time.monotonic() < deadline:
+                if sensor_keys:
+                    _send(session, 'readings', 'POST', hub_url + '/readings', json=readings_payload)
+                if device_keys:
+                    _send(session, 'states', 'POST', hub_url + '/states', json=states_payload)
+                _send(session, 'changes', 'GET', hub_url + '/states')
+
+    def _run_listener() -> None:
+        with requests.Session() as session:
+            while time.monotonic() < deadline:
+                _send(
+                    session,
+                    'long poll',
+                    'GET',
+                    hub_url + '/states',
+                    params={'wait': wait_seconds},
+                    timeout=wait_seconds + 30
+                )
+
+    threads = [threading.Thread(target=_run_hub, daemon=True) for _ in range(hubs)]
+    threads += [threading.Thread(target=_run_listener, daemon=True) for _ in range(listeners)]
+
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed_seconds = time.monotonic() - start
+
+    return [
+        summarize_latencies(request_name, latencies[request_name], errors[request_name], elapsed_seconds)
+        for request_name in REQUEST_NAMES
+        if latencies[request_name] or errors[request_name]
+    ]
+
+
+def summarize_latencies(
+        request_name: str,
+        latencies: Sequence[float],
+        errors: int,
+        elapsed_seconds: float) -> Dict[str, Any]:
+    sorted_latencies = sorted(latencies)
+
+    def _percentile(percent: float) -> float:
+        if not sorted_latencies:
+            return 0
+        index = min(len(sorted_latencies) - 1, int(round(percent / 100 * (len(sorted_latencies) - 1))))
+        return sorted_latencies[index] * 1000
+
+    return {
+        'request': request_name,
+        'requests': len(sorted_latencies),
+        'errors': errors,
+        'per_second': len(sorted_latencies) / elapsed_seconds if elapsed_seconds else 0,
+        'p50_ms': _percentile(50),
+        'p95_ms': _percentile(95),
+        'p99_ms': _percentile(99)
+    }
+
+
+def format_load_test_results(results: List[Dict[str, Any]]) -> str:
+    lines = ['{:>10} {:>9} {:>7} {:>10} {:>9} {:>9} {:>9}'.format(
+        'request', 'requests', 'errors', 'per second', 'p50 ms', 'p95 ms', 'p99 ms'
+    )]
+
+    for result in results:
+        lines.append('{:>10} {:>9} {:>7} {:>10.1f} {:>9.1f} {:>9.1f} {:>9.1f}'.format(
+            result['request'],
+            result['requests'],
+            result['errors'],
+            result['per_second'],
+            result['p50_ms'],
+            result['p95_ms'],
+            result['p99_ms']
+        ))
+
+    return '\n'.join(lines)
@@ -1,11 +1,11 @@
 from flask_cors import CORS
 from flask import Flask
-from flask_sqlalchemy import SQLAlchemy
 
 from app.main.config import config_by_name
 from app.main.util.constants import Constants
+from app.main.util.routing_session import RoutingSQLAlchemy
 
-db = SQLAlchemy()
+db = RoutingSQLAlchemy()
 
 
 def create_app(config_name):
@@ -1,4 +1,28 @@
+from typing import Any
+from typing import Dict
+
 from app.main.util.constants import Constants
+from app.main.util.pool_metrics import InstrumentedQueuePool
+from app.main.util.routing_session import get_replica_binds
+
+
+def get_engine_options() -> Dict[str, Any]:
+    """ Options of the PostgreSQL engine, every process keeps its own pool of connections """
+    options = {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': Constants.DATABASE_POOL_SIZE,
+        'max_overflow': Constants.DATABASE_MAX_OVERFLOW,
+        'pool_timeout': Constants.DATABASE_POOL_TIMEOUT_SECONDS,
+        'pool_recycle': Constants.DATABASE_POOL_RECYCLE_SECONDS,
+        'pool_pre_ping': Constants.DATABASE_POOL_PRE_PING
+    }
+
+    if Constants.DATABASE_STATEMENT_TIMEOUT_MS > 0:
+        options['connect_args'] = {
+            'options': '-c statement_timeout={}'.format(Constants.DATABASE_STATEMENT_TIMEOUT_MS)
+        }
+
+    return options
 
 
 class Config:
@@ -24,6 +48,8 @@ class TestingConfig(Config):
 class ProductionConfig(Config):
     DEBUG = False
     SQLALCHEMY_DATABASE_URI = Constants.DATABASE_URL_PROD
+    SQLALCHEMY_BINDS = get_replica_binds(Constants.DATABASE_REPLICA_URLS)
+    SQLALCHEMY_ENGINE_OPTIONS = get_engine_options()
 
 
 config_by_name = dict(
@@ -2,6 +2,7 @@ import json
 
 from flask import Response
 from flask import request
+from flask import stream_with_context
 
 from app import api
 from app.main.service.hub_service import HubService
@@ -18,7 +19,13 @@ _logger = LogService.get_instance()
 def get_states(product_key):
     # TODO add hub device authentication
     authorization = request.headers.get("Authorization", None)
-    result, result_values = _hub_service_instance.get_changed_devices_for_device_group(product_key, authorization)
+    result, result_values = _hub_service_instance.get_changed_devices_for_device_group(
+        product_key,
+        authorization,
+        wait=request.args.get('wait'),
+        cursor=request.args.get('cursor'),
+        since=request.args.get('since')
+    )
 
     return ResponseUtils.create_response(
         result=result,
@@ -28,6 +35,29 @@ def get_states(product_key):
     )
 
 
+@api.route('/hubs/<product_key>/states/stream', methods=['GET'])
+def get_states_stream(product_key):
+    authorization = request.headers.get("Authorization", None)
+    result, events = _hub_service_instance.get_changed_devices_stream(
+        product_key,
+        authorization,
+        cursor=request.headers.get('Last-Event-ID', None)
+    )
+
+    if result != Constants.RESPONSE_MESSAGE_OK:
+        return ResponseUtils.create_response(
+            result=result,
+            product_key=product_key,
+            is_logged=True
+        )
+
+    return Response(
+        response=stream_with_context(events),
+        status=200,
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
 @api.route('/hubs/<product_key>/devices', methods=['POST'])
 def create_device(product_key: str):
     # TODO add hub device authentication
@@ -157,7 +157,39 @@ def get_sensor_readings(product_key: str, device_key: str):
         result, result_values = _sensor_service_instance.get_sensor_readings(
             device_key,
             product_key,
-            user_info['user_id']
+            user_info['user_id'],
+            date_from=request.args.get('from'),
+            date_to=request.args.get('to'),
+            cursor=request.args.get('cursor'),
+            limit=request.args.get('limit'),
+            mode=request.args.get('mode')
+        )
+    else:
+        result = error_message
+
+    return ResponseUtils.create_response(
+        result=result,
+        result_values=result_values,
+        product_key=product_key,
+        is_logged=True
+    )
+
+
+@api.route('/hubs/<product_key>/sensors/<device_key>/readings/aggregates', methods=['GET'])
+def get_sensor_reading_aggregates(product_key: str, device_key: str):
+    auth_header = request.headers.get('Authorization')
+
+    error_message, user_info = Auth.get_user_info_from_auth_header(auth_header)
+    result_values = None
+
+    if error_message is None:
+        result, result_values = _sensor_service_instance.get_sensor_reading_aggregates(
+            device_key,
+            product_key,
+            user_info['user_id'],
+            date_from=request.args.get('from'),
+            date_to=request.args.get('to'),
+            resolution=request.args.get('resolution')
         )
     else:
         result = error_message
@@ -1,13 +1,18 @@
 from app.main.model.admin import Admin
 from app.main.model.deleted_device import DeletedDevice
+from app.main.model.device_change import DeviceChange
 from app.main.model.device_group import DeviceGroup
 from app.main.model.executive_device import ExecutiveDevice
 from app.main.model.executive_type import ExecutiveType
 from app.main.model.formula import Formula
+from app.main.model.formula_sensor_dependency import FormulaSensorDependency
 from app.main.model.log import Log
 from app.main.model.reading_enumerator import ReadingEnumerator
 from app.main.model.sensor import Sensor
 from app.main.model.sensor_reading import SensorReading
+from app.main.model.sensor_reading_rollup import SensorReadingDayRollup
+from app.main.model.sensor_reading_rollup import SensorReadingHourRollup
+from app.main.model.sensor_reading_rollup import SensorReadingMinuteRollup
 from app.main.model.sensor_type import SensorType
 from app.main.model.state_enumerator import StateEnumerator
 from app.main.model.unconfigured_device import UnconfiguredDevice
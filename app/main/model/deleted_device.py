@@ -4,6 +4,9 @@ from app.main import db
 class DeletedDevice(db.Model):
     """ DeletedDevice Model for storing deleted device related details """
     __tablename__ = "deleted_device"
+    __table_args__ = (
+        db.Index('ix_deleted_device_device_group_id', 'device_group_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     device_key = db.Column(db.String(255), nullable=False, unique=True)
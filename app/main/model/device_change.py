@@ -0,0 +1,17 @@
+from datetime import datetime
+
+from app.main import db
+
+
+class DeviceChange(db.Model):
+    """ DeviceChange Model for storing changes of devices in a device group ordered by per group sequence """
+    __tablename__ = "device_change"
+    __table_args__ = (
+        db.Index('ix_device_change_device_group_id_device_key', 'device_group_id', 'device_key'),
+    )
+
+    device_group_id = db.Column(db.Integer, db.ForeignKey('device_group.id', ondelete="CASCADE"), primary_key=True)
+    sequence = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    device_key = db.Column(db.String(255), nullable=False)
+    is_deleted = db.Column(db.Boolean, nullable=False, default=False)
+    date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
@@ -4,11 +4,15 @@ from app.main import db
 class DeviceGroup(db.Model):
     """ DeviceGroup Model for storing device group related details """
     __tablename__ = "device_group"
+    __table_args__ = (
+        db.Index('ix_device_group_admin_id', 'admin_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     name = db.Column(db.String(255), nullable=False)
     password = db.Column(db.String(255), nullable=False)
     product_key = db.Column(db.String(255), nullable=False, unique=True)
+    change_sequence = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     admin_id = db.Column(db.Integer, db.ForeignKey('admin.id', ondelete="CASCADE"), nullable=True)
 
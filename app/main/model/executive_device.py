@@ -6,6 +6,18 @@ from app.main import db
 class ExecutiveDevice(db.Model):
     """ ExecutiveDevice Model for storing executive device related details """
     __tablename__ = "executive_device"
+    __table_args__ = (
+        db.Index('ix_executive_device_device_group_id_name', 'device_group_id', 'name'),
+        db.Index(
+            'ix_executive_device_device_group_id_is_updated',
+            'device_group_id',
+            postgresql_where=db.text('is_updated'),
+            sqlite_where=db.text('is_updated = 1')
+        ),
+        db.Index('ix_executive_device_user_group_id', 'user_group_id'),
+        db.Index('ix_executive_device_executive_type_id', 'executive_type_id'),
+        db.Index('ix_executive_device_formula_id', 'formula_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     name = db.Column(db.String(255), nullable=False)
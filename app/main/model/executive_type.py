@@ -7,6 +7,9 @@ from app.main import db
 class ExecutiveType(db.Model):
     """ ExecutiveType Model for storing executive type related details """
     __tablename__ = "executive_type"
+    __table_args__ = (
+        db.Index('ix_executive_type_device_group_id_name', 'device_group_id', 'name'),
+    )
 
     _types = ('Boolean', 'Enum', 'Decimal')
 
@@ -6,6 +6,9 @@ from app.main import db
 class Formula(db.Model):
     """ Formula Model for storing formula related details """
     __tablename__ = "formula"
+    __table_args__ = (
+        db.Index('ix_formula_user_group_id_name', 'user_group_id', 'name'),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     name = db.Column(db.String(255), nullable=False)
@@ -14,5 +17,7 @@ class Formula(db.Model):
     user_group_id = db.Column(db.Integer, db.ForeignKey('user_group.id', ondelete="CASCADE"), nullable=False)
 
     executive_devices = db.relationship('ExecutiveDevice', backref='formula', lazy=True, passive_deletes=True)
+    sensor_dependencies = db.relationship('FormulaSensorDependency', backref='formula', lazy=True,
+                                          cascade='all, delete-orphan')
 
     UniqueConstraint('user_group_id', 'name', name='unique_name_in_user_group')
@@ -0,0 +1,14 @@
+from app.main import db
+
+
+class FormulaSensorDependency(db.Model):
+    """ FormulaSensorDependency Model for storing device keys of sensors referenced by formulas """
+    __tablename__ = "formula_sensor_dependency"
+    __table_args__ = (
+        db.Index('ix_formula_sensor_dependency_device_group_id_device_key', 'device_group_id', 'device_key'),
+    )
+
+    formula_id = db.Column(db.Integer, db.ForeignKey('formula.id', ondelete="CASCADE"), primary_key=True)
+    device_key = db.Column(db.String(255), primary_key=True)
+
+    device_group_id = db.Column(db.Integer, db.ForeignKey('device_group.id', ondelete="CASCADE"), nullable=False)
@@ -6,6 +6,9 @@ from app.main import db
 class Log(db.Model):
     """ Log Model for storing log related details """
     __tablename__ = "log"
+    __table_args__ = (
+        db.Index('ix_log_device_group_id_creation_date', 'device_group_id', 'creation_date'),
+    )
 
     _types = ('Debug', 'Error', 'Info')
 
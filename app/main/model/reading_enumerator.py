@@ -6,6 +6,9 @@ from app.main import db
 class ReadingEnumerator(db.Model):
     """ ReadingEnumerator Model for storing reading enumerator related details """
     __tablename__ = "reading_enumerator"
+    __table_args__ = (
+        db.Index('ix_reading_enumerator_sensor_type_id_number', 'sensor_type_id', 'number'),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     number = db.Column(db.Integer, nullable=False)
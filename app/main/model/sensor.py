@@ -6,6 +6,17 @@ from app.main import db
 class Sensor(db.Model):
     """ Sensor Model for storing sensor related details """
     __tablename__ = "sensor"
+    __table_args__ = (
+        db.Index('ix_sensor_device_group_id_name', 'device_group_id', 'name'),
+        db.Index(
+            'ix_sensor_device_group_id_is_updated',
+            'device_group_id',
+            postgresql_where=db.text('is_updated'),
+            sqlite_where=db.text('is_updated = 1')
+        ),
+        db.Index('ix_sensor_user_group_id', 'user_group_id'),
+        db.Index('ix_sensor_sensor_type_id', 'sensor_type_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     name = db.Column(db.String(255), nullable=False)
@@ -13,6 +24,8 @@ class Sensor(db.Model):
     is_active = db.Column(db.Boolean, nullable=False)
     is_assigned = db.Column(db.Boolean, nullable=False)
     device_key = db.Column(db.String(255), nullable=False, unique=True)
+    last_reading_value = db.Column(db.Float, nullable=True)
+    last_reading_date = db.Column(db.DateTime, nullable=True)
 
     sensor_type_id = db.Column(db.Integer, db.ForeignKey('sensor_type.id', ondelete="CASCADE"), nullable=False)
     user_group_id = db.Column(db.Integer, db.ForeignKey('user_group.id', ondelete="SET NULL"), nullable=True)
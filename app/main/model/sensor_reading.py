@@ -6,8 +6,11 @@ from app.main import db
 class SensorReading(db.Model):
     """ SensorReading Model for storing sensor reading related details """
     __tablename__ = "sensor_reading"
+    __table_args__ = (
+        db.Index('ix_sensor_reading_sensor_id_date', 'sensor_id', 'date'),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     value = db.Column(db.Float, nullable=False)
-    date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow())
+    date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     sensor_id = db.Column(db.Integer, db.ForeignKey('sensor.id', ondelete="CASCADE"), nullable=False)
@@ -0,0 +1,48 @@
+from datetime import timedelta
+
+from sqlalchemy.ext.declarative import declared_attr
+
+from app.main import db
+
+
+class SensorReadingRollup:
+    """ Columns shared by tables storing aggregates of sensor readings in fixed time buckets """
+    resolution = None
+
+    date = db.Column(db.DateTime, nullable=False)
+    min_value = db.Column(db.Float, nullable=False)
+    max_value = db.Column(db.Float, nullable=False)
+    sum_value = db.Column(db.Float, nullable=False)
+    count = db.Column(db.Integer, nullable=False)
+
+    @declared_attr
+    def sensor_id(cls):
+        return db.Column(db.Integer, db.ForeignKey('sensor.id', ondelete="CASCADE"), nullable=False)
+
+    @declared_attr
+    def __table_args__(cls):
+        # Sensor first, so that the primary key serves date range queries of a sensor
+        return (
+            db.PrimaryKeyConstraint('sensor_id', 'date', name='{}_pkey'.format(cls.__tablename__)),
+        )
+
+
+class SensorReadingMinuteRollup(SensorReadingRollup, db.Model):
+    """ SensorReadingMinuteRollup Model for storing per minute aggregates of sensor readings """
+    __tablename__ = "sensor_reading_1m"
+
+    resolution = timedelta(minutes=1)
+
+
+class SensorReadingHourRollup(SensorReadingRollup, db.Model):
+    """ SensorReadingHourRollup Model for storing hourly aggregates of sensor readings """
+    __tablename__ = "sensor_reading_1h"
+
+    resolution = timedelta(hours=1)
+
+
+class SensorReadingDayRollup(SensorReadingRollup, db.Model):
+    """ SensorReadingDayRollup Model for storing daily aggregates of sensor readings """
+    __tablename__ = "sensor_reading_1d"
+
+    resolution = timedelta(days=1)
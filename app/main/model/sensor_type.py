@@ -7,6 +7,9 @@ from app.main import db
 class SensorType(db.Model):
     """ SensorType Model for storing sensor type related details """
     __tablename__ = "sensor_type"
+    __table_args__ = (
+        db.Index('ix_sensor_type_device_group_id_name', 'device_group_id', 'name'),
+    )
 
     _types = ('Boolean', 'Enum', 'Decimal')
 
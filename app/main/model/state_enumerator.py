@@ -6,6 +6,9 @@ from app.main import db
 class StateEnumerator(db.Model):
     """ StateEnumerator Model for storing state enumerator related details """
     __tablename__ = "state_enumerator"
+    __table_args__ = (
+        db.Index('ix_state_enumerator_executive_type_id_number', 'executive_type_id', 'number'),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     number = db.Column(db.Integer, nullable=False)
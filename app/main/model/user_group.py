@@ -7,6 +7,10 @@ from app.main.model.user_group_member import user_group_member
 class UserGroup(db.Model):
     """ UserGroup Model for storing user group related details """
     __tablename__ = "user_group"
+    __table_args__ = (
+        db.Index('ix_user_group_name_device_group_id', 'name', 'device_group_id'),
+        db.Index('ix_user_group_device_group_id', 'device_group_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     name = db.Column(db.String(255), nullable=False)
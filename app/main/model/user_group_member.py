@@ -4,5 +4,6 @@ user_group_member = db.Table('user_group_member',
                              db.Column('user_id', db.Integer, db.ForeignKey('user.id', ondelete="CASCADE"),
                                        primary_key=True),
                              db.Column('user_group_id', db.Integer, db.ForeignKey('user_group.id', ondelete="CASCADE"),
-                                       primary_key=True)
+                                       primary_key=True),
+                             db.Index('ix_user_group_member_user_group_id', 'user_group_id')
                              )
@@ -0,0 +1,82 @@
+# pylint: disable=no-self-use
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import and_
+from sqlalchemy import exists
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+
+from app.main import db
+from app.main.model.device_change import DeviceChange
+from app.main.model.device_group import DeviceGroup
+from app.main.repository.base_repository import BaseRepository
+
+
+class DeviceChangeRepository(BaseRepository):
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+
+        return cls._instance
+
+    def add_device_change_but_do_not_commit(
+            self,
+            device_group_id: int,
+            device_key: str,
+            is_deleted: bool = False) -> DeviceChange:
+        # Incrementing the counter locks the device group row until commit, so changes of a device group
+        # become visible in the order of their sequence numbers
+        device_group_table = DeviceGroup.__table__
+        db.session.execute(
+            device_group_table.update().where(
+                device_group_table.c.id == device_group_id
+            ).values(
+                change_sequence=device_group_table.c.change_sequence + 1
+            )
+        )
+        sequence = db.session.execute(
+            select([device_group_table.c.change_sequence]).where(device_group_table.c.id == device_group_id)
+        ).scalar()
+
+        device_change = DeviceChange(
+            device_group_id=device_group_id,
+            sequence=sequence,
+            device_key=device_key,
+            is_deleted=is_deleted
+        )
+        db.session.add(device_change)
+
+        return device_change
+
+    def get_device_changes_by_device_group_id(
+            self,
+            device_group_id: int,
+            since: int,
+            limit: int) -> List[DeviceChange]:
+        return DeviceChange.query.filter(
+            and_(
+                DeviceChange.device_group_id == device_group_id,
+                DeviceChange.sequence > since
+            )
+        ).order_by(DeviceChange.sequence).limit(limit).all()
+
+    def delete_superseded_device_changes_but_do_not_commit(self, older_than: datetime) -> int:
+        """ Deletes changes older than given date for which a later change of the same device exists """
+        newer_device_change = aliased(DeviceChange)
+
+        return DeviceChange.query.filter(
+            and_(
+                DeviceChange.date < older_than,
+                exists().where(
+                    and_(
+                        newer_device_change.device_group_id == DeviceChange.device_group_id,
+                        newer_device_change.device_key == DeviceChange.device_key,
+                        newer_device_change.sequence > DeviceChange.sequence
+                    )
+                )
+            )
+        ).delete(synchronize_session=False)
@@ -32,6 +32,9 @@ class DeviceGroupRepository(BaseRepository):
     def get_device_group_by_product_key(self, product_key: str) -> DeviceGroup:
         return DeviceGroup.query.filter(DeviceGroup.product_key == product_key).first()
 
+    def get_device_groups_by_ids(self, ids: List[int]) -> List[DeviceGroup]:
+        return DeviceGroup.query.filter(DeviceGroup.id.in_(ids)).all()
+
     def get_device_group_by_user_id_and_product_key(self, user_id: str, product_key: str) -> DeviceGroup:
         return DeviceGroup.query.filter(
             and_(
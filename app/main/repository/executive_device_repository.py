@@ -1,16 +1,26 @@
 # pylint: disable=no-self-use
 from typing import List
+from typing import Tuple
 
 from sqlalchemy import and_
+from sqlalchemy import bindparam
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm.attributes import set_committed_value
 
+from app.main import db
 from app.main.model.device_group import DeviceGroup
 from app.main.model.executive_device import ExecutiveDevice
 from app.main.repository.base_repository import BaseRepository
+from app.main.util.routing_session import read_only
 
 
 class ExecutiveDeviceRepository(BaseRepository):
     _instance = None
 
+    _update_batch_size = 300
+
     @classmethod
     def get_instance(cls):
         if cls._instance is None:
@@ -26,9 +36,28 @@ class ExecutiveDeviceRepository(BaseRepository):
             )
         ).all()
 
+    @read_only
     def get_executive_devices_by_device_group_id(self, device_group_id: str) -> List[ExecutiveDevice]:
         return ExecutiveDevice.query.filter(ExecutiveDevice.device_group_id == device_group_id).all()
 
+    def get_executive_devices_using_formulas_by_formula_ids(self, formula_ids: List[int]) -> List[ExecutiveDevice]:
+        return ExecutiveDevice.query.filter(
+            and_(
+                ExecutiveDevice.formula_id.in_(formula_ids),
+                ExecutiveDevice.is_formula_used == True  # equality operator required by SQLAlchemy
+            )
+        ).all()
+
+    def get_formula_ids_used_by_executive_devices(self) -> List[int]:
+        return [
+            formula_id for formula_id, in ExecutiveDevice.query.with_entities(ExecutiveDevice.formula_id).filter(
+                and_(
+                    ExecutiveDevice.formula_id.isnot(None),
+                    ExecutiveDevice.is_formula_used == True  # equality operator required by SQLAlchemy
+                )
+            ).distinct()
+        ]
+
     def get_executive_device_by_device_key_and_device_group_id(
             self,
             device_key: str,
@@ -40,6 +69,18 @@ class ExecutiveDeviceRepository(BaseRepository):
             )
         ).first()
 
+    def get_executive_devices_by_device_group_id_and_device_keys(
+            self,
+            device_group_id: int,
+            device_keys: List[str]) -> List[ExecutiveDevice]:
+        return ExecutiveDevice.query.filter(
+            and_(
+                ExecutiveDevice.device_group_id == device_group_id,
+                ExecutiveDevice.device_key.in_(device_keys)
+            )
+        ).all()
+
+    @read_only
     def get_executive_devices_by_user_group_id(self, user_group_id: str) -> List[ExecutiveDevice]:
         return ExecutiveDevice.query.filter(
             ExecutiveDevice.user_group_id == user_group_id
@@ -60,6 +101,22 @@ class ExecutiveDeviceRepository(BaseRepository):
             )
         ).all()
 
+    def get_executive_devices_with_types_and_formulas_by_device_group_id_and_device_keys(
+            self,
+            device_group_id: int,
+            device_keys: List[str]) -> List[ExecutiveDevice]:
+        """ Returns devices with their types, state enumerators and formulas loaded, in a constant number of queries """
+        return ExecutiveDevice.query.options(
+            joinedload('executive_type').selectinload('state_enumerators'),
+            joinedload('formula')
+        ).filter(
+            and_(
+                ExecutiveDevice.device_group_id == device_group_id,
+                ExecutiveDevice.device_key.in_(device_keys)
+            )
+        ).all()
+
+    @read_only
     def get_executive_devices_by_device_group_id_that_are_not_in_user_group(
             self, device_group_id: str) -> List[ExecutiveDevice]:
         return ExecutiveDevice.query.filter(
@@ -74,3 +131,64 @@ class ExecutiveDeviceRepository(BaseRepository):
             ExecutiveDevice.device_group_id == device_group_id,
             ExecutiveDevice.name == name,
         )).first()
+
+    def update_executive_devices_states_but_do_not_commit(
+            self,
+            executive_devices_states: List[Tuple[ExecutiveDevice, float, bool]]) -> bool:
+        """
+        Sets states and activity of devices with a single statement per batch. Loaded devices receive the new values
+        without being marked as modified, so that flushing the session does not update them row by row again.
+        The session is rolled back when an update fails.
+        """
+        if not executive_devices_states:
+            return True
+
+        states_values = [
+            {'device_id': executive_device.id, 'device_state': state, 'device_is_active': is_active}
+            for executive_device, state, is_active in executive_devices_states
+        ]
+
+        try:
+            if db.engine.dialect.name == 'postgresql':
+                for index in range(0, len(states_values), self._update_batch_size):
+                    self._update_states_from_values(states_values[index:index + self._update_batch_size])
+            else:
+                table = ExecutiveDevice.__table__
+                db.session.execute(
+                    table.update().where(table.c.id == bindparam('device_id')).values(
+                        state=bindparam('device_state'),
+                        is_active=bindparam('device_is_active')
+                    ),
+                    states_values
+                )
+        except SQLAlchemyError as e:
+            print(e)
+            self.rollback_session()
+            return False
+
+        for executive_device, state, is_active in executive_devices_states:
+            set_committed_value(executive_device, 'state', state)
+            set_committed_value(executive_device, 'is_active', is_active)
+
+        return True
+
+    def _update_states_from_values(self, states_values: List[dict]) -> None:
+        parameters = {}
+        rows = []
+
+        for index, values in enumerate(states_values):
+            rows.append(
+                '(:device_id_{0}, CAST(:device_state_{0} AS DOUBLE PRECISION), CAST(:device_is_active_{0} AS BOOLEAN))'
+                .format(index)
+            )
+            for name, value in values.items():
+                parameters['{}_{}'.format(name, index)] = value
+
+        db.session.execute(
+            text(
+                'UPDATE executive_device SET state = v.state, is_active = v.is_active '
+                'FROM (VALUES {}) AS v (id, state, is_active) '
+                'WHERE executive_device.id = v.id'.format(', '.join(rows))
+            ),
+            parameters
+        )
@@ -0,0 +1,23 @@
+# pylint: disable=no-self-use
+from typing import List
+
+from app.main.model.formula_sensor_dependency import FormulaSensorDependency
+from app.main.repository.base_repository import BaseRepository
+
+
+class FormulaSensorDependencyRepository(BaseRepository):
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+
+        return cls._instance
+
+    def get_formula_sensor_dependencies_by_device_group_id(
+            self,
+            device_group_id: int) -> List[FormulaSensorDependency]:
+        return FormulaSensorDependency.query.filter(
+            FormulaSensorDependency.device_group_id == device_group_id
+        ).all()
@@ -1,8 +1,12 @@
 # pylint: disable=no-self-use
 from typing import List
 
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.main import db
 from app.main.model import Log
 from app.main.repository.base_repository import BaseRepository
+from app.main.util.routing_session import read_only
 
 
 class LogRepository(BaseRepository):
@@ -15,5 +19,17 @@ class LogRepository(BaseRepository):
 
         return cls._instance
 
+    @read_only
     def get_logs_by_device_group_id(self, device_group_id: str) -> List[Log]:
         return Log.query.filter(Log.device_group_id == device_group_id).all()
+
+    def save_logs(self, log_values: List[dict]) -> bool:
+        try:
+            db.session.execute(Log.__table__.insert(), log_values)
+            db.session.commit()
+            result = True
+        except SQLAlchemyError:
+            result = False
+            self.rollback_session()
+
+        return result
@@ -22,6 +22,11 @@ class ReadingEnumeratorRepository(BaseRepository):
             ReadingEnumerator.sensor_type_id == sensor_type_id
         ).all()
 
+    def get_reading_enumerators_by_sensor_type_ids(self, sensor_type_ids: List[int]) -> List[ReadingEnumerator]:
+        return ReadingEnumerator.query.filter(
+            ReadingEnumerator.sensor_type_id.in_(sensor_type_ids)
+        ).all()
+
     def get_reading_enumerator_by_sensor_type_id_and_number(
             self, sensor_type_id: str, number: int) -> List[ReadingEnumerator]:
         return ReadingEnumerator.query.filter(
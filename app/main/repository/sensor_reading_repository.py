@@ -1,15 +1,29 @@
 # pylint: disable=no-self-use
+from datetime import date
+from datetime import datetime
+from typing import Dict
 from typing import List
+from typing import Optional
+from typing import Tuple
 
+from sqlalchemy import and_
 from sqlalchemy import desc
+from sqlalchemy import or_
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
 
+from app.main import db
 from app.main.model.sensor_reading import SensorReading
 from app.main.repository.base_repository import BaseRepository
+from app.main.util.routing_session import read_only
 
 
 class SensorReadingRepository(BaseRepository):
     _instance = None
 
+    # Keeps a single INSERT below the bound parameters limit of older SQLite builds
+    _insert_batch_size = 300
+
     @classmethod
     def get_instance(cls):
         if cls._instance is None:
@@ -17,12 +31,149 @@ class SensorReadingRepository(BaseRepository):
 
         return cls._instance
 
+    @read_only
     def get_sensor_readings_by_sensor_id(self, sensor_id: str) -> List[SensorReading]:
         return SensorReading.query.filter(
             SensorReading.sensor_id == sensor_id
         ).order_by(desc(SensorReading.date)).all()
 
+    @read_only
+    def get_sensor_readings_page_by_sensor_id(
+            self,
+            sensor_id: int,
+            date_from: Optional[datetime],
+            date_to: Optional[datetime],
+            cursor: Optional[Tuple[datetime, int]],
+            limit: int) -> List[SensorReading]:
+        query = self._get_sensor_readings_query(sensor_id, date_from, date_to)
+
+        if cursor is not None:
+            cursor_date, cursor_id = cursor
+            query = query.filter(
+                or_(
+                    SensorReading.date < cursor_date,
+                    and_(
+                        SensorReading.date == cursor_date,
+                        SensorReading.id < cursor_id
+                    )
+                )
+            )
+
+        return query.order_by(desc(SensorReading.date), desc(SensorReading.id)).limit(limit).all()
+
+    @read_only
+    def get_sensor_reading_dates_and_values_by_sensor_id(
+            self,
+            sensor_id: int,
+            date_from: Optional[datetime],
+            date_to: Optional[datetime]) -> List[Tuple[datetime, float]]:
+        return self._get_sensor_readings_query(sensor_id, date_from, date_to).with_entities(
+            SensorReading.date,
+            SensorReading.value
+        ).order_by(SensorReading.date, SensorReading.id).all()
+
+    def _get_sensor_readings_query(self, sensor_id: int, date_from: Optional[datetime], date_to: Optional[datetime]):
+        query = SensorReading.query.filter(SensorReading.sensor_id == sensor_id)
+
+        if date_from is not None:
+            query = query.filter(SensorReading.date >= date_from)
+
+        if date_to is not None:
+            query = query.filter(SensorReading.date < date_to)
+
+        return query
+
     def get_last_reading_for_sensor_by_sensor_id(self, sensor_id: str) -> SensorReading:
         return SensorReading.query.filter(
             SensorReading.sensor_id == sensor_id
         ).order_by(desc(SensorReading.date)).first()
+
+    def save_sensor_readings_but_do_not_commit(self, sensor_readings: List[Dict]) -> bool:
+        """ Inserts readings in batches right away, the session is rolled back when an insert fails """
+        try:
+            for index in range(0, len(sensor_readings), self._insert_batch_size):
+                db.session.execute(
+                    SensorReading.__table__.insert().values(
+                        sensor_readings[index:index + self._insert_batch_size]
+                    )
+                )
+            result = True
+        except SQLAlchemyError as e:
+            print(e)
+            result = False
+            self.rollback_session()
+
+        return result
+
+    def is_partitioned_storage_supported(self) -> bool:
+        return db.engine.dialect.name == 'postgresql'
+
+    def get_sensor_reading_partition_names(self) -> List[str]:
+        return [
+            row[0] for row in db.session.execute(
+                text(
+                    "SELECT child.relname FROM pg_inherits "
+                    "JOIN pg_class parent ON pg_inherits.inhparent = parent.oid "
+                    "JOIN pg_class child ON pg_inherits.inhrelid = child.oid "
+                    "WHERE parent.relname = :table_name"
+                ),
+                {'table_name': SensorReading.__tablename__}
+            )
+        ]
+
+    def create_sensor_reading_partition_but_do_not_commit(
+            self,
+            partition_name: str,
+            range_start: date,
+            range_end: date,
+            default_partition_name: Optional[str] = None) -> None:
+        """
+        Creates the partition for readings dated in the range. Readings of the range already stored in the default
+        partition would violate its constraint, so the default partition is detached while they are moved
+        to the new partition.
+        """
+        if default_partition_name is not None:
+            db.session.execute(
+                'ALTER TABLE {} DETACH PARTITION {}'.format(SensorReading.__tablename__, default_partition_name)
+            )
+
+        db.session.execute(
+            "CREATE TABLE IF NOT EXISTS {} PARTITION OF {} FOR VALUES FROM ('{}') TO ('{}')".format(
+                partition_name,
+                SensorReading.__tablename__,
+                range_start.isoformat(),
+                range_end.isoformat()
+            )
+        )
+
+        if default_partition_name is not None:
+            db.session.execute(
+                text(
+                    'WITH moved_reading AS ('
+                    'DELETE FROM {0} WHERE date >= :range_start AND date < :range_end '
+                    'RETURNING id, value, date, sensor_id) '
+                    'INSERT INTO {1} (id, value, date, sensor_id) '
+                    'SELECT id, value, date, sensor_id FROM moved_reading'.format(
+                        default_partition_name,
+                        partition_name
+                    )
+                ),
+                {'range_start': range_start, 'range_end': range_end}
+            )
+            db.session.execute(
+                'ALTER TABLE {} ATTACH PARTITION {} DEFAULT'.format(SensorReading.__tablename__, default_partition_name)
+            )
+
+    def drop_sensor_reading_partition_but_do_not_commit(self, partition_name: str) -> None:
+        db.session.execute('DROP TABLE IF EXISTS {}'.format(partition_name))
+
+    def delete_sensor_readings_older_than_but_do_not_commit(self, date_limit: datetime) -> int:
+        return SensorReading.query.filter(
+            SensorReading.date < date_limit
+        ).delete(synchronize_session=False)
+
+    def delete_partition_readings_older_than_but_do_not_commit(self, partition_name: str, date_limit: date) -> int:
+        return db.session.execute(
+            text('DELETE FROM {} WHERE date < :date_limit'.format(partition_name)),
+            {'date_limit': date_limit}
+        ).rowcount
@@ -0,0 +1,139 @@
+# pylint: disable=no-self-use
+from datetime import datetime
+from typing import Dict
+from typing import List
+from typing import Tuple
+from typing import Type
+
+from sqlalchemy import and_
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.main import db
+from app.main.model.sensor_reading_rollup import SensorReadingDayRollup
+from app.main.model.sensor_reading_rollup import SensorReadingHourRollup
+from app.main.model.sensor_reading_rollup import SensorReadingMinuteRollup
+from app.main.model.sensor_reading_rollup import SensorReadingRollup
+from app.main.repository.base_repository import BaseRepository
+from app.main.util.reading_downsampling import get_bucket_start
+from app.main.util.routing_session import read_only
+
+
+class SensorReadingRollupRepository(BaseRepository):
+    _instance = None
+
+    # Ordered from the finest to the coarsest resolution
+    rollup_models = (SensorReadingMinuteRollup, SensorReadingHourRollup, SensorReadingDayRollup)
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+
+        return cls._instance
+
+    def update_sensor_reading_rollups_but_do_not_commit(self, sensor_readings: List[Dict]) -> bool:
+        """ Adds readings to rollups of all resolutions, the session is rolled back when an update fails """
+        try:
+            for rollup_model in self.rollup_models:
+                rollup_values = self._get_rollup_values(sensor_readings, rollup_model)
+
+                if not rollup_values:
+                    continue
+
+                if db.engine.dialect.name == 'postgresql':
+                    self._upsert_rollup_values(rollup_model, rollup_values)
+                else:
+                    self._merge_rollup_values(rollup_model, rollup_values)
+            result = True
+        except SQLAlchemyError as e:
+            print(e)
+            result = False
+            self.rollback_session()
+
+        return result
+
+    @read_only
+    def get_sensor_reading_rollups_by_sensor_id(
+            self,
+            rollup_model: Type[SensorReadingRollup],
+            sensor_id: int,
+            date_from: datetime,
+            date_to: datetime) -> List[SensorReadingRollup]:
+        return rollup_model.query.filter(
+            and_(
+                rollup_model.sensor_id == sensor_id,
+                rollup_model.date >= date_from,
+                rollup_model.date < date_to
+            )
+        ).order_by(rollup_model.date).all()
+
+    def _get_rollup_values(
+            self,
+            sensor_readings: List[Dict],
+            rollup_model: Type[SensorReadingRollup]) -> Dict[Tuple[int, datetime], dict]:
+        rollup_values = {}
+
+        for sensor_reading in sensor_readings:
+            value = float(sensor_reading['value'])
+            key = (sensor_reading['sensor_id'], get_bucket_start(sensor_reading['date'], rollup_model.resolution))
+            values = rollup_values.get(key)
+
+            if values is None:
+                rollup_values[key] = {
+                    'sensor_id': key[0],
+                    'date': key[1],
+                    'min_value': value,
+                    'max_value': value,
+                    'sum_value': value,
+                    'count': 1
+                }
+            else:
+                values['min_value'] = min(values['min_value'], value)
+                values['max_value'] = max(values['max_value'], value)
+                values['sum_value'] += value
+                values['count'] += 1
+
+        return rollup_values
+
+    def _upsert_rollup_values(
+            self,
+            rollup_model: Type[SensorReadingRollup],
+            rollup_values: Dict[Tuple[int, datetime], dict]) -> None:
+        table = rollup_model.__table__
+        statement = insert(table).values(list(rollup_values.values()))
+        db.session.execute(
+            statement.on_conflict_do_update(
+                index_elements=[table.c.sensor_id, table.c.date],
+                set_={
+                    'min_value': func.least(table.c.min_value, statement.excluded.min_value),
+                    'max_value': func.greatest(table.c.max_value, statement.excluded.max_value),
+                    'sum_value': table.c.sum_value + statement.excluded.sum_value,
+                    'count': table.c.count + statement.excluded.count
+                }
+            )
+        )
+
+    def _merge_rollup_values(
+            self,
+            rollup_model: Type[SensorReadingRollup],
+            rollup_values: Dict[Tuple[int, datetime], dict]) -> None:
+        existing_rollups = rollup_model.query.filter(
+            and_(
+                rollup_model.sensor_id.in_({key[0] for key in rollup_values}),
+                rollup_model.date.in_({key[1] for key in rollup_values})
+            )
+        ).all()
+        rollup_by_key = {(rollup.sensor_id, rollup.date): rollup for rollup in existing_rollups}
+
+        for key, values in rollup_values.items():
+            rollup = rollup_by_key.get(key)
+
+            if rollup is None:
+                db.session.add(rollup_model(**values))
+            else:
+                rollup.min_value = min(rollup.min_value, values['min_value'])
+                rollup.max_value = max(rollup.max_value, values['max_value'])
+                rollup.sum_value += values['sum_value']
+                rollup.count += values['count']
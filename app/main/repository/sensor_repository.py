@@ -1,11 +1,18 @@
 # pylint: disable=no-self-use
 from typing import List
+from typing import Optional
+from typing import Tuple
 
 from sqlalchemy import and_
+from sqlalchemy.orm import joinedload
 
+from app.main import db
 from app.main.model.device_group import DeviceGroup
+from app.main.model.reading_enumerator import ReadingEnumerator
 from app.main.model.sensor import Sensor
+from app.main.model.sensor_type import SensorType
 from app.main.repository.base_repository import BaseRepository
+from app.main.util.routing_session import read_only
 
 
 class SensorRepository(BaseRepository):
@@ -26,6 +33,7 @@ class SensorRepository(BaseRepository):
             )
         ).all()
 
+    @read_only
     def get_sensors_by_device_group_id(self, device_group_id: str) -> List[Sensor]:
         return Sensor.query.filter(
             Sensor.device_group_id == device_group_id
@@ -39,10 +47,38 @@ class SensorRepository(BaseRepository):
             )
         ).first()
 
+    def get_sensors_by_device_group_id_and_device_keys(
+            self,
+            device_group_id: int,
+            device_keys: List[str]) -> List[Sensor]:
+        return Sensor.query.filter(
+            and_(
+                Sensor.device_group_id == device_group_id,
+                Sensor.device_key.in_(device_keys)
+            )
+        ).all()
+
     def get_sensors_by_user_group_id(self, user_group_id: str) -> List[Sensor]:
         return Sensor.query.filter(
             Sensor.user_group_id == user_group_id).all()
 
+    @read_only
+    def get_sensors_with_last_readings_by_user_group_id(
+            self,
+            user_group_id: int) -> List[Tuple[Sensor, SensorType, Optional[ReadingEnumerator]]]:
+        return db.session.query(Sensor, SensorType, ReadingEnumerator).join(
+            SensorType,
+            Sensor.sensor_type_id == SensorType.id
+        ).outerjoin(
+            ReadingEnumerator,
+            and_(
+                ReadingEnumerator.sensor_type_id == SensorType.id,
+                ReadingEnumerator.number == Sensor.last_reading_value
+            )
+        ).filter(
+            Sensor.user_group_id == user_group_id
+        ).all()
+
     def get_sensor_by_name_and_user_group_id(self, name: str, device_group_id: int) -> Sensor:
         return Sensor.query.filter(and_(
             Sensor.device_group_id == device_group_id,
@@ -77,6 +113,21 @@ class SensorRepository(BaseRepository):
             )
         ).all()
 
+    def get_sensors_with_types_by_device_group_id_and_device_keys(
+            self,
+            device_group_id: int,
+            device_keys: List[str]) -> List[Sensor]:
+        """ Returns sensors with their types and reading enumerators loaded, in a constant number of queries """
+        return Sensor.query.options(
+            joinedload('sensor_type').selectinload('reading_enumerators')
+        ).filter(
+            and_(
+                Sensor.device_group_id == device_group_id,
+                Sensor.device_key.in_(device_keys)
+            )
+        ).all()
+
+    @read_only
     def get_sensors_by_device_group_id_that_are_not_in_user_group(self, device_group_id: str) -> List[Sensor]:
         return Sensor.query.filter(
             and_(
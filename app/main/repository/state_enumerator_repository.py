@@ -22,6 +22,11 @@ class StateEnumeratorRepository(BaseRepository):
             StateEnumerator.executive_type_id == executive_type_id
         ).all()
 
+    def get_state_enumerators_by_executive_type_ids(self, executive_type_ids: List[int]) -> List[StateEnumerator]:
+        return StateEnumerator.query.filter(
+            StateEnumerator.executive_type_id.in_(executive_type_ids)
+        ).all()
+
     def get_state_enumerator_by_executive_type_id_and_number(
             self, executive_type_id: str, number: int) -> StateEnumerator:
         return StateEnumerator.query.filter(
@@ -1,9 +1,13 @@
 # pylint: disable=no-self-use
 from typing import List
+from typing import Tuple
 
 from sqlalchemy import and_
 
+from app.main.model.executive_device import ExecutiveDevice
+from app.main.model.sensor import Sensor
 from app.main.model.user_group import UserGroup
+from app.main.model.user_group_member import user_group_member
 from app.main.repository.base_repository import BaseRepository
 
 
@@ -18,18 +22,19 @@ class UserGroupRepository(BaseRepository):
         return cls._instance
 
     def get_user_group_by_user_id_and_executive_device_device_key(self, user_id: str, device_key: str) -> UserGroup:
-        return UserGroup.query.filter(
+        # Joining starts from the unique device key instead of probing every user group
+        return UserGroup.query.join(UserGroup.executive_devices).filter(
             and_(
-                UserGroup.users.any(id=user_id),
-                UserGroup.executive_devices.any(device_key=device_key)
+                ExecutiveDevice.device_key == device_key,
+                UserGroup.users.any(id=user_id)
             )
         ).first()
 
     def get_user_group_by_user_id_and_sensor_device_key(self, user_id: str, device_key: str) -> UserGroup:
-        return UserGroup.query.filter(
+        return UserGroup.query.join(UserGroup.sensors).filter(
             and_(
-                UserGroup.users.any(id=user_id),
-                UserGroup.sensors.any(device_key=device_key)
+                Sensor.device_key == device_key,
+                UserGroup.users.any(id=user_id)
             )
         ).first()
 
@@ -71,3 +76,12 @@ class UserGroupRepository(BaseRepository):
                 UserGroup.users.any(id=user_id)
             )
         ).first()
+
+    def get_user_group_memberships_by_user_id(self, user_id: str) -> List[Tuple[int, int, str]]:
+        """ Returns ids, device group ids and names of all user groups of the user """
+        return UserGroup.query.with_entities(UserGroup.id, UserGroup.device_group_id, UserGroup.name).join(
+            user_group_member,
+            user_group_member.c.user_group_id == UserGroup.id
+        ).filter(
+            user_group_member.c.user_id == user_id
+        ).all()
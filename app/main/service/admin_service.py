@@ -1,11 +1,10 @@
 from datetime import datetime
 
-import flask_bcrypt
-
 from app.main.model.admin import Admin
 from app.main.repository.admin_repository import AdminRepository
 from app.main.repository.device_group_repository import DeviceGroupRepository
 from app.main.repository.user_repository import UserRepository
+from app.main.service.password_service import PasswordService
 from app.main.util.constants import Constants
 from app.main.util.utils import is_password_hash_correct
 
@@ -16,6 +15,7 @@ class AdminService:
     _admin_repository_instance = None
     _device_group_repository_instance = None
     _user_repository_instance = None
+    _password_service_instance = None
 
     @classmethod
     def get_instance(cls):
@@ -28,6 +28,7 @@ class AdminService:
         self._admin_repository_instance = AdminRepository.get_instance()
         self._device_group_repository_instance = DeviceGroupRepository.get_instance()
         self._user_repository_instance = UserRepository.get_instance()
+        self._password_service_instance = PasswordService.get_instance()
 
     def create_admin(self, username: str, email: str, password: str, product_key: str, product_password: str) -> str:
         if not username or not email or not password or not product_key or not product_password:
@@ -47,7 +48,10 @@ class AdminService:
         if not is_password_hash_correct(product_password, device_group.password):
             return Constants.RESPONSE_MESSAGE_INVALID_CREDENTIALS
 
-        password_hash = flask_bcrypt.generate_password_hash(password).decode('utf-8')
+        password_hash = self._password_service_instance.generate_password_hash(password)
+
+        if password_hash is None:
+            return Constants.RESPONSE_MESSAGE_SERVICE_UNAVAILABLE
 
         admin = Admin(
             username=username,
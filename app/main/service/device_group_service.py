@@ -4,6 +4,9 @@ from typing import Tuple
 
 from app.main.repository.admin_repository import AdminRepository
 from app.main.repository.device_group_repository import DeviceGroupRepository
+from app.main.service.hub_service import HubService
+from app.main.service.log_service import LogService
+from app.main.service.type_registry_service import TypeRegistryService
 from app.main.util.constants import Constants
 
 
@@ -12,6 +15,9 @@ class DeviceGroupService:
 
     _device_group_repository_instance = None
     _admin_repository = None
+    _hub_service_instance = None
+    _log_service_instance = None
+    _type_registry_service_instance = None
 
     @classmethod
     def get_instance(cls):
@@ -23,6 +29,9 @@ class DeviceGroupService:
     def __init__(self):
         self._admin_repository = AdminRepository.get_instance()
         self._device_group_repository_instance = DeviceGroupRepository.get_instance()
+        self._hub_service_instance = HubService.get_instance()
+        self._log_service_instance = LogService.get_instance()
+        self._type_registry_service_instance = TypeRegistryService.get_instance()
 
     def get_device_groups_info(self, user_id: str, is_admin: bool) -> Tuple[str, Optional[List]]:
         if not user_id or is_admin is None:
@@ -66,6 +75,8 @@ class DeviceGroupService:
         if not self._device_group_repository_instance.update_database():
             return Constants.RESPONSE_MESSAGE_ERROR
 
+        self._hub_service_instance.invalidate_device_group_cache(product_key)
+
         return Constants.RESPONSE_MESSAGE_OK
 
     def delete_device_group(self, product_key: str, admin_id: str, is_admin: bool):
@@ -89,6 +100,9 @@ class DeviceGroupService:
         self._device_group_repository_instance.delete_but_do_not_commit(device_group)
 
         if self._device_group_repository_instance.update_database():
+            self._hub_service_instance.invalidate_device_group_cache(product_key)
+            self._log_service_instance.invalidate_device_group_cache(product_key)
+            self._type_registry_service_instance.invalidate(device_group.id)
             return Constants.RESPONSE_MESSAGE_OK
         else:
             return Constants.RESPONSE_MESSAGE_ERROR
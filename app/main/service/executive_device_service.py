@@ -11,16 +11,23 @@ from app.main.model.user import User
 from app.main.model.user_group import UserGroup
 from app.main.repository.admin_repository import AdminRepository
 from app.main.repository.deleted_device_repository import DeletedDeviceRepository
+from app.main.repository.device_change_repository import DeviceChangeRepository
 from app.main.repository.device_group_repository import DeviceGroupRepository
 from app.main.repository.executive_device_repository import ExecutiveDeviceRepository
 from app.main.repository.executive_type_repository import ExecutiveTypeRepository
 from app.main.repository.formula_repository import FormulaRepository
-from app.main.repository.state_enumerator_repository import StateEnumeratorRepository
 from app.main.repository.unconfigured_device_repository import UnconfiguredDeviceRepository
 from app.main.repository.user_group_repository import UserGroupRepository
 from app.main.repository.user_repository import UserRepository
+from app.main.service.permission_service import PermissionService
+from app.main.service.type_registry_service import ExecutiveTypeMetadata
+from app.main.service.type_registry_service import TypeRegistryService
+from app.main.util.change_notifier import ChangeNotifier
 from app.main.util.constants import Constants
 from app.main.util.utils import is_bool
+from app.main.util.value_validation import ValueRule
+from app.main.util.value_validation import get_validity_mask
+from app.main.util.value_validation import get_value_rule
 
 
 class ExecutiveDeviceService:
@@ -44,7 +51,6 @@ class ExecutiveDeviceService:
     def __init__(self):
         self._deleted_device_repository_instance = DeletedDeviceRepository.get_instance()
         self._unconfigured_device_repository = UnconfiguredDeviceRepository.get_instance()
-        self._state_enumerator_repository_instance = StateEnumeratorRepository.get_instance()
         self._device_group_repository_instance = DeviceGroupRepository.get_instance()
         self._executive_device_repository_instance = ExecutiveDeviceRepository.get_instance()
         self._formula_repository = FormulaRepository.get_instance()
@@ -52,6 +58,10 @@ class ExecutiveDeviceService:
         self._user_group_repository = UserGroupRepository.get_instance()
         self._user_repository = UserRepository.get_instance()
         self._admin_repository = AdminRepository.get_instance()
+        self._device_change_repository_instance = DeviceChangeRepository.get_instance()
+        self._change_notifier_instance = ChangeNotifier.get_instance()
+        self._type_registry_service_instance = TypeRegistryService.get_instance()
+        self._permission_service_instance = PermissionService.get_instance()
 
     def get_executive_device_info(self, device_key: str, product_key: str, user_id: str, is_admin: bool) -> Tuple[
         str, Optional[dict]]:
@@ -87,15 +97,12 @@ class ExecutiveDeviceService:
 
         if executive_device.user_group_id is not None:
             if is_admin is False:
-
-                user_group = self._user_group_repository.get_user_group_by_user_id_and_executive_device_device_key(
-                    user_id,
-                    device_key
-                )
-                if not user_group and executive_device.user_group_id is not None:
+                if not self._permission_service_instance.is_user_in_user_group(
+                        user_id,
+                        executive_device.user_group_id):
                     return Constants.RESPONSE_MESSAGE_USER_DOES_NOT_HAVE_PRIVILEGES, None
-            else:
-                user_group = self._user_group_repository.get_user_group_by_id(executive_device.user_group_id)
+
+            user_group = self._user_group_repository.get_user_group_by_id(executive_device.user_group_id)
 
         executive_device_info = {}
         executive_device_info['name'] = executive_device.name
@@ -113,7 +120,8 @@ class ExecutiveDeviceService:
             executive_device.negative_state)
         executive_device_info['deviceKey'] = executive_device.device_key
 
-        executive_device_type = self._executive_type_repository_instance.get_executive_type_by_id(
+        executive_device_type = self._type_registry_service_instance.get_executive_type(
+            executive_device.device_group_id,
             executive_device.executive_type_id
         )
         executive_device_info['deviceTypeName'] = executive_device_type.name
@@ -169,8 +177,14 @@ class ExecutiveDeviceService:
         )
 
         self._executive_device_repository_instance.delete_but_do_not_commit(executive_device)
+        self._device_change_repository_instance.add_device_change_but_do_not_commit(
+            device_group.id,
+            executive_device.device_key,
+            is_deleted=True
+        )
 
         if self._deleted_device_repository_instance.save(deleted_device):
+            self._change_notifier_instance.notify(product_key)
             return Constants.RESPONSE_MESSAGE_OK
         else:
             return Constants.RESPONSE_MESSAGE_ERROR
@@ -231,11 +245,7 @@ class ExecutiveDeviceService:
             if device_group.admin_id != user_id:
                 return Constants.RESPONSE_MESSAGE_USER_DOES_NOT_HAVE_PRIVILEGES, None
         else:
-            users_device_group = self._device_group_repository_instance.get_device_group_by_user_id_and_product_key(
-                user_id,
-                product_key)
-
-            if not users_device_group:
+            if not self._permission_service_instance.is_master_user_of_device_group(user_id, device_group.id):
                 return Constants.RESPONSE_MESSAGE_USER_DOES_NOT_HAVE_PRIVILEGES, None
         values = []
 
@@ -328,56 +338,117 @@ class ExecutiveDeviceService:
 
         return Constants.RESPONSE_MESSAGE_CREATED
 
-    def set_device_state(self, device_group_id, values: dict):
+    def set_devices_states(self, device_group_id, devices_states: List[dict]) -> Tuple[bool, List[dict]]:
+        """
+        Function returns:
+            success status of the database update,
+            list of values that were rejected
+        """
+        wrong_devices_states = []
+        correct_devices_states = []
+
+        for values in devices_states:
+            if (not isinstance(values, dict) or
+                    'deviceKey' not in values or
+                    'state' not in values or
+                    'isActive' not in values):
+                wrong_devices_states.append(values)
+            else:
+                correct_devices_states.append(values)
+
+        if not correct_devices_states:
+            return True, wrong_devices_states
+
+        executive_devices = \
+            self._executive_device_repository_instance.get_executive_devices_by_device_group_id_and_device_keys(
+                device_group_id,
+                list({values['deviceKey'] for values in correct_devices_states})
+            )
+        executive_device_by_device_key = {
+            executive_device.device_key: executive_device for executive_device in executive_devices
+        }
 
-        if (not isinstance(values, dict) or
-                'deviceKey' not in values or
-                'state' not in values or
-                'isActive' not in values):
-            return False
+        executive_types = [
+            self._type_registry_service_instance.get_executive_type(device_group_id, executive_type_id)
+            for executive_type_id in {executive_device.executive_type_id for executive_device in executive_devices}
+        ]
 
-        device_key = values['deviceKey']
-        state = values['state']
-        is_active = values['isActive']
+        rule_by_executive_type_id = {
+            executive_type.id: self._get_state_rule(
+                executive_type,
+                executive_type.text_by_number.keys()
+            ) for executive_type in executive_types if executive_type is not None
+        }
 
-        executive_device = self._executive_device_repository_instance \
-            .get_executive_device_by_device_key_and_device_group_id(
-            device_key,
-            device_group_id
+        executive_devices_of_states = [
+            executive_device_by_device_key.get(values['deviceKey']) for values in correct_devices_states
+        ]
+        validity_mask = get_validity_mask(
+            [values['state'] for values in correct_devices_states],
+            [
+                rule_by_executive_type_id.get(executive_device.executive_type_id) if executive_device else None
+                for executive_device in executive_devices_of_states
+            ]
         )
 
-        if not executive_device:
-            return False
+        states_by_executive_device_id = {}
+        for values, executive_device, is_valid in zip(correct_devices_states, executive_devices_of_states,
+                                                      validity_mask):
+            if executive_device is None or executive_device.executive_type_id not in rule_by_executive_type_id:
+                wrong_devices_states.append(values)
+                continue
 
-        executive_type = self._executive_type_repository_instance.get_executive_type_by_id(
-            executive_device.executive_type_id)
+            is_active = values['isActive']
 
-        if not executive_type:
-            return False
+            if is_active and not is_valid:
+                wrong_devices_states.append(values)
+                continue
 
-        if is_active:
-            if not self._state_in_range(state, executive_type):
-                return False
-            executive_device.state = state
+            states_by_executive_device_id[executive_device.id] = (
+                executive_device,
+                values['state'] if is_active else executive_device.state,
+                is_active
+            )
+
+        if not self._executive_device_repository_instance.update_executive_devices_states_but_do_not_commit(
+                [
+                    (executive_device, state, is_active)
+                    for executive_device, state, is_active in states_by_executive_device_id.values()
+                    if state != executive_device.state or is_active != executive_device.is_active
+                ]
+        ):
+            return False, wrong_devices_states
 
-        executive_device.is_active = is_active
-        return self._executive_device_repository_instance.update_database()
+        if not self._executive_device_repository_instance.update_database():
+            return False, wrong_devices_states
+
+        return True, wrong_devices_states
+
+    def _get_state_rule(self, executive_type: ExecutiveTypeMetadata, state_numbers) -> ValueRule:
+        if executive_type.state_type == 'Boolean':
+            # Hubs report boolean states as numbers
+            return get_value_rule('Enum', numbers=(0, 1))
+
+        return get_value_rule(
+            executive_type.state_type,
+            executive_type.state_range_min,
+            executive_type.state_range_max,
+            state_numbers
+        )
 
     def get_executive_device_state_value(self, executive_device: ExecutiveDevice, state: str):
         if state is None:
             return None
 
-        executive_device_type = self._executive_type_repository_instance.get_executive_type_by_id(
-            executive_device.executive_type_id)
+        executive_device_type = self._type_registry_service_instance.get_executive_type(
+            executive_device.device_group_id,
+            executive_device.executive_type_id
+        )
         state_type = executive_device_type.state_type
 
         state_value = None
         if state_type == 'Enum':
-            state_enumerator = self._state_enumerator_repository_instance.get_state_enumerator_by_executive_type_id_and_number(
-                executive_device_type.id,
-                int(state))
-            if state_enumerator is not None:
-                state_value = state_enumerator.text
+            state_value = executive_device_type.text_by_number.get(int(state))
         elif state_type == 'Decimal':
             state_value = float(state)
         elif state_type == 'Boolean':
@@ -424,11 +495,7 @@ class ExecutiveDeviceService:
             return Constants.RESPONSE_MESSAGE_PRODUCT_KEY_NOT_FOUND, None
 
         if is_admin is not True:
-            users_device_group = self._device_group_repository_instance.get_device_group_by_user_id_and_product_key(
-                user_id,
-                product_key)
-
-            if not users_device_group:
+            if not self._permission_service_instance.is_master_user_of_device_group(user_id, device_group.id):
                 return Constants.RESPONSE_MESSAGE_USER_DOES_NOT_HAVE_PRIVILEGES, None
 
             user = self._user_repository.get_user_by_id(user_id)
@@ -501,8 +568,13 @@ class ExecutiveDeviceService:
             return error_message, None
 
         executive_device.is_updated = True
+        self._device_change_repository_instance.add_device_change_but_do_not_commit(
+            device_group.id,
+            executive_device.device_key
+        )
 
         if self._executive_device_repository_instance.update_database():
+            self._change_notifier_instance.notify(product_key)
             executive_device_info = self._get_modified_device_info(
                 executive_device, new_executive_type, formula, new_user_group)
 
@@ -553,11 +625,14 @@ class ExecutiveDeviceService:
         error_message = None
         if is_admin is not True:
             if executive_device.user_group_id is not None:
-                old_user_group = self._user_group_repository.get_user_group_by_id(executive_device.user_group_id)
-                if old_user_group is not None and user not in old_user_group.users:
+                if user is None or not self._permission_service_instance.is_user_in_user_group(
+                        user.id,
+                        executive_device.user_group_id):
                     error_message = Constants.RESPONSE_MESSAGE_USER_DOES_NOT_HAVE_PRIVILEGES
 
-            if new_user_group is not None and user not in new_user_group.users:
+            if new_user_group is not None and (
+                    user is None or
+                    not self._permission_service_instance.is_user_in_user_group(user.id, new_user_group.id)):
                 error_message = Constants.RESPONSE_MESSAGE_USER_DOES_NOT_HAVE_PRIVILEGES
 
         if error_message is not None:
@@ -623,15 +698,16 @@ class ExecutiveDeviceService:
 
         return state_to_set
 
-    def _get_enum_state_to_set(self, state: str, executive_type):
-        state_enumerator = self._state_enumerator_repository_instance.get_state_enumerators_by_executive_type_id(
-            executive_type.id)
+    def _get_enum_state_to_set(self, state: str, executive_type: ExecutiveType):
+        executive_type_metadata = self._type_registry_service_instance.get_executive_type(
+            executive_type.device_group_id,
+            executive_type.id
+        )
 
-        for enum in state_enumerator:
-            if enum.text == state:
-                return enum.number
+        if executive_type_metadata is None:
+            return None
 
-        return None
+        return executive_type_metadata.number_by_text.get(state)
 
     def _get_boolean_state_to_set(self, state):
         if state is True:
@@ -721,11 +797,11 @@ class ExecutiveDeviceService:
     def _is_enum_state_right(self, state: int, executive_type: ExecutiveType) -> bool:
         if isinstance(state, str):
             return False
-        possible_states = self._state_enumerator_repository_instance.get_state_enumerators_by_executive_type_id(
-            executive_type.id)
-        if int(state) in [possible_state.number for possible_state in possible_states]:
-            return True
-        return False
+        executive_type_metadata = self._type_registry_service_instance.get_executive_type(
+            executive_type.device_group_id,
+            executive_type.id
+        )
+        return executive_type_metadata is not None and int(state) in executive_type_metadata.text_by_number
 
     def _is_decimal_state_in_range(self, state, executive_type: ExecutiveType) -> bool:
         if not isinstance(state, (float, int)):
@@ -11,9 +11,10 @@ from app.main.repository.executive_type_repository import ExecutiveTypeRepositor
 from app.main.repository.state_enumerator_repository import StateEnumeratorRepository
 from app.main.repository.user_group_repository import UserGroupRepository
 from app.main.repository.user_repository import UserRepository
+from app.main.service.permission_service import PermissionService
+from app.main.service.type_registry_service import TypeRegistryService
 from app.main.util.constants import Constants
 from app.main.util.utils import is_dict_with_keys
-from app.main.util.utils import is_user_in_one_of_user_groups_in_device_group
 
 
 class ExecutiveTypeService:
@@ -25,6 +26,7 @@ class ExecutiveTypeService:
     _user_repository = None
     _user_group_repository = None
     _admin_repository = None
+    _type_registry_service_instance = None
 
     @classmethod
     def get_instance(cls):
@@ -40,6 +42,8 @@ class ExecutiveTypeService:
         self._user_repository = UserRepository.get_instance()
         self._admin_repository = AdminRepository.get_instance()
         self._state_enumerator_repository = StateEnumeratorRepository.get_instance()
+        self._type_registry_service_instance = TypeRegistryService.get_instance()
+        self._permission_service_instance = PermissionService.get_instance()
 
     def create_executive_type_in_device_group(
             self,
@@ -119,8 +123,8 @@ class ExecutiveTypeService:
 
         executive_type.default_state = default_state
 
-        if not self._executive_type_repository.save(executive_type):
-            return Constants.RESPONSE_MESSAGE_ERROR
+        # The type is committed together with its enumerators, so that other processes never load it without them
+        self._executive_type_repository.save_but_do_not_commit(executive_type)
 
         if enumerator and state_type == 'Enum':
             for enum in enumerator:
@@ -128,12 +132,14 @@ class ExecutiveTypeService:
                     state_enum = StateEnumerator(
                         number=enum['number'],
                         text=enum['text'],
-                        executive_type_id=executive_type.id
+                        executive_type=executive_type
                     )
                     self._state_enumerator_repository.save_but_do_not_commit(state_enum)
 
-            if not self._state_enumerator_repository.update_database():
-                return Constants.RESPONSE_MESSAGE_ERROR
+        if not self._executive_type_repository.update_database():
+            return Constants.RESPONSE_MESSAGE_ERROR
+
+        self._type_registry_service_instance.invalidate(device_group.id)
 
         return Constants.RESPONSE_MESSAGE_CREATED
 
@@ -161,7 +167,7 @@ class ExecutiveTypeService:
             if not user:
                 return Constants.RESPONSE_MESSAGE_USER_NOT_DEFINED, None
 
-            if not is_user_in_one_of_user_groups_in_device_group(user, device_group):
+            if not self._permission_service_instance.is_user_in_device_group(user.id, device_group.id):
                 return Constants.RESPONSE_MESSAGE_USER_DOES_NOT_HAVE_PRIVILEGES, None
         else:
 
@@ -0,0 +1,238 @@
+# pylint: disable=no-self-use
+import datetime
+from json import loads
+from typing import Any
+from typing import Dict
+from typing import FrozenSet
+from typing import Iterable
+from typing import List
+from typing import Set
+
+from app.main.model.executive_device import ExecutiveDevice
+from app.main.repository.device_change_repository import DeviceChangeRepository
+from app.main.repository.device_group_repository import DeviceGroupRepository
+from app.main.repository.executive_device_repository import ExecutiveDeviceRepository
+from app.main.repository.formula_repository import FormulaRepository
+from app.main.repository.formula_sensor_dependency_repository import FormulaSensorDependencyRepository
+from app.main.repository.sensor_repository import SensorRepository
+from app.main.service.type_registry_service import TypeRegistryService
+from app.main.util.cache import TTLCache
+from app.main.util.change_notifier import ChangeNotifier
+from app.main.util.constants import Constants
+from app.main.util.formula_compiler import CompiledRule
+from app.main.util.formula_compiler import UNCOMPILED_RULE
+from app.main.util.formula_compiler import can_evaluate_rule
+from app.main.util.formula_compiler import compile_formula_rule
+
+
+class FormulaEvaluationService:
+    _instance = None
+
+    _executive_device_repository_instance = None
+    _formula_repository_instance = None
+    _sensor_repository_instance = None
+    _type_registry_service_instance = None
+
+    _compiled_rule_cache = TTLCache(Constants.FORMULA_CACHE_MAX_SIZE, Constants.FORMULA_CACHE_TTL_SECONDS)
+    # Mirror of formula sensor dependencies, formula ids by sensor device key per device group
+    _dependency_cache = TTLCache(
+        Constants.FORMULA_DEPENDENCY_CACHE_MAX_SIZE,
+        Constants.FORMULA_DEPENDENCY_CACHE_TTL_SECONDS
+    )
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+
+        return cls._instance
+
+    def __init__(self):
+        self._executive_device_repository_instance = ExecutiveDeviceRepository.get_instance()
+        self._formula_repository_instance = FormulaRepository.get_instance()
+        self._formula_sensor_dependency_repository_instance = FormulaSensorDependencyRepository.get_instance()
+        self._sensor_repository_instance = SensorRepository.get_instance()
+        self._type_registry_service_instance = TypeRegistryService.get_instance()
+        self._device_change_repository_instance = DeviceChangeRepository.get_instance()
+        self._device_group_repository_instance = DeviceGroupRepository.get_instance()
+        self._change_notifier_instance = ChangeNotifier.get_instance()
+
+    def evaluate_formulas(self, device_group_id: int, product_key: str, device_keys: Iterable[str]) -> bool:
+        """
+        Sets states of executive devices whose formulas reference any of given sensors
+        and marks devices with changed states as updated. Returns success status of the database update.
+        """
+        formula_ids = self.get_dependent_formula_ids(device_group_id, device_keys)
+
+        if not formula_ids:
+            return True
+
+        affected_executive_devices = \
+            self._executive_device_repository_instance.get_executive_devices_using_formulas_by_formula_ids(
+                list(formula_ids)
+            )
+
+        if not affected_executive_devices:
+            return True
+
+        if not self._set_states(affected_executive_devices, datetime.datetime.utcnow()):
+            return True
+
+        if not self._executive_device_repository_instance.update_database():
+            return False
+
+        self._change_notifier_instance.notify(product_key)
+        return True
+
+    def evaluate_scheduled_formulas(self, formula_ids: Iterable[int], moment: datetime.datetime) -> bool:
+        """
+        Sets states of executive devices using given formulas as evaluated at the moment, for all device groups
+        in a single database update. Returns success status of the database update.
+        """
+        formula_ids = list(formula_ids)
+
+        affected_executive_devices = \
+            self._executive_device_repository_instance.get_executive_devices_using_formulas_by_formula_ids(
+                formula_ids
+            ) if formula_ids else []
+
+        changed_device_group_ids = self._set_states(affected_executive_devices, moment)
+
+        if not changed_device_group_ids:
+            return True
+
+        if not self._executive_device_repository_instance.update_database():
+            return False
+
+        for device_group in self._device_group_repository_instance.get_device_groups_by_ids(
+                list(changed_device_group_ids)):
+            self._change_notifier_instance.notify(device_group.product_key)
+
+        return True
+
+    def get_dependent_formula_ids(self, device_group_id: int, device_keys: Iterable[str]) -> Set[int]:
+        formula_ids_by_device_key = self._get_formula_ids_by_device_key(device_group_id)
+
+        return set().union(*(formula_ids_by_device_key.get(device_key, ()) for device_key in device_keys))
+
+    def invalidate_formula_cache(self, formula_id: int) -> None:
+        self._compiled_rule_cache.invalidate(formula_id)
+
+    def invalidate_dependency_cache(self, device_group_id: int) -> None:
+        self._dependency_cache.invalidate(device_group_id)
+
+    def get_compiled_rules(self, formula_ids: Iterable[int]) -> Dict[int, CompiledRule]:
+        compiled_rules = {}
+        missing_formula_ids = []
+
+        for formula_id in formula_ids:
+            compiled_rule = self._compiled_rule_cache.get(formula_id)
+
+            if compiled_rule is None:
+                missing_formula_ids.append(formula_id)
+            else:
+                compiled_rules[formula_id] = compiled_rule
+
+        formulas = self._formula_repository_instance.get_formulas_by_ids(
+            missing_formula_ids
+        ) if missing_formula_ids else []
+
+        for formula in formulas:
+            compiled_rule = compile_formula_rule(loads(formula.rule))
+            self._compiled_rule_cache.set(formula.id, compiled_rule)
+            compiled_rules[formula.id] = compiled_rule
+
+        for formula_id in missing_formula_ids:
+            compiled_rules.setdefault(formula_id, UNCOMPILED_RULE)
+
+        return compiled_rules
+
+    def _get_formula_ids_by_device_key(self, device_group_id: int) -> Dict[str, FrozenSet[int]]:
+        formula_ids_by_device_key = self._dependency_cache.get(device_group_id)
+
+        if formula_ids_by_device_key is None:
+            formula_ids_by_device_key = {}
+            formula_sensor_dependencies = \
+                self._formula_sensor_dependency_repository_instance.get_formula_sensor_dependencies_by_device_group_id(
+                    device_group_id
+                )
+
+            for formula_sensor_dependency in formula_sensor_dependencies:
+                formula_ids_by_device_key.setdefault(
+                    formula_sensor_dependency.device_key, set()
+                ).add(formula_sensor_dependency.formula_id)
+
+            formula_ids_by_device_key = {
+                device_key: frozenset(formula_ids) for device_key, formula_ids in formula_ids_by_device_key.items()
+            }
+            self._dependency_cache.set(device_group_id, formula_ids_by_device_key)
+
+        return formula_ids_by_device_key
+
+    def _set_states(self, executive_devices: List[ExecutiveDevice], moment: datetime.datetime) -> Set[int]:
+        """ Sets states of devices resulting from their formulas, returns ids of device groups with changed states """
+        compiled_rules = self.get_compiled_rules(
+            {executive_device.formula_id for executive_device in executive_devices}
+        )
+
+        executive_devices_by_device_group_id = {}
+        for executive_device in executive_devices:
+            executive_devices_by_device_group_id.setdefault(executive_device.device_group_id, []).append(
+                executive_device
+            )
+
+        changed_device_group_ids = set()
+        for device_group_id, device_group_executive_devices in executive_devices_by_device_group_id.items():
+            device_keys = set().union(
+                *(compiled_rules[device.formula_id].device_keys for device in device_group_executive_devices)
+            )
+            readings = self._get_readings(device_group_id, device_keys) if device_keys else {}
+
+            for executive_device in device_group_executive_devices:
+                compiled_rule = compiled_rules[executive_device.formula_id]
+
+                if not can_evaluate_rule(compiled_rule, readings):
+                    continue
+
+                if compiled_rule.evaluate(readings, moment):
+                    state = executive_device.positive_state
+                else:
+                    state = executive_device.negative_state
+
+                if state is None or state == executive_device.state:
+                    continue
+
+                executive_device.state = state
+                executive_device.is_updated = True
+                self._device_change_repository_instance.add_device_change_but_do_not_commit(
+                    device_group_id,
+                    executive_device.device_key
+                )
+                changed_device_group_ids.add(device_group_id)
+
+        return changed_device_group_ids
+
+    def _get_readings(self, device_group_id: int, device_keys: Iterable[str]) -> Dict[str, Any]:
+        """ Returns last readings of active sensors as compared in formulas, enum readings by their text """
+        sensors = self._sensor_repository_instance.get_sensors_by_device_group_id_and_device_keys(
+            device_group_id,
+            list(device_keys)
+        )
+        sensors = [sensor for sensor in sensors if sensor.is_active and sensor.last_reading_value is not None]
+
+        readings = {}
+        for sensor in sensors:
+            sensor_type = self._type_registry_service_instance.get_sensor_type(device_group_id, sensor.sensor_type_id)
+            reading_type = sensor_type.reading_type if sensor_type is not None else None
+
+            if reading_type == 'Enum':
+                reading_text = sensor_type.text_by_number.get(int(sensor.last_reading_value))
+
+                if reading_text is not None:
+                    readings[sensor.device_key] = reading_text
+            elif reading_type == 'Boolean':
+                readings[sensor.device_key] = bool(sensor.last_reading_value)
+            elif reading_type == 'Decimal':
+                readings[sensor.device_key] = sensor.last_reading_value
+
+        return readings
@@ -0,0 +1,170 @@
+import datetime
+import heapq
+import threading
+from typing import Iterable
+from typing import Optional
+
+from flask import Flask
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.main.repository.executive_device_repository import ExecutiveDeviceRepository
+from app.main.service.formula_evaluation_service import FormulaEvaluationService
+from app.main.util.constants import Constants
+from app.main.util.datetime_rule import get_next_boundary
+
+
+class FormulaSchedulerService:
+    """
+    Sets states of executive devices using formulas with datetime rules when their time windows begin or end.
+
+    Next boundaries of all scheduled formulas are kept in a heap and the scheduler thread sleeps until the earliest
+    of them, so that formulas are evaluated only when a boundary is crossed. Formulas used by executive devices are
+    reloaded periodically, newly scheduled formulas are evaluated right away.
+    """
+    _instance = None
+
+    _executive_device_repository_instance = None
+    _formula_evaluation_service_instance = None
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+
+        return cls._instance
+
+    def __init__(self):
+        self._executive_device_repository_instance = ExecutiveDeviceRepository.get_instance()
+        self._formula_evaluation_service_instance = FormulaEvaluationService.get_instance()
+
+        self._boundaries = []
+        self._datetime_rules = {}
+        self._next_boundaries = {}
+
+        self._stop_event = threading.Event()
+        self._scheduler_thread = None
+        self._lock = threading.Lock()
+
+    def start_scheduler(self, app: Flask) -> None:
+        with self._lock:
+            if self._scheduler_thread is not None and self._scheduler_thread.is_alive():
+                return
+
+            self._stop_event.clear()
+            self._scheduler_thread = threading.Thread(target=self.run_scheduler, args=(app,), daemon=True)
+            self._scheduler_thread.start()
+
+    def stop_scheduler(self, timeout: float = None) -> None:
+        self._stop_event.set()
+
+        scheduler_thread = self._scheduler_thread
+        if scheduler_thread is not None and scheduler_thread.is_alive():
+            scheduler_thread.join(timeout)
+
+    def run_scheduler(self, app: Flask) -> None:
+        """ Runs the schedule in the calling thread until the scheduler is stopped """
+        with app.app_context():
+            reload_time = datetime.datetime.utcnow()
+
+            while not self._stop_event.is_set():
+                moment = datetime.datetime.utcnow()
+
+                try:
+                    if moment >= reload_time:
+                        self.load_schedule(moment)
+                        reload_time = moment + datetime.timedelta(seconds=Constants.FORMULA_SCHEDULER_RELOAD_SECONDS)
+
+                    self.run_due_formulas(moment)
+                except SQLAlchemyError:
+                    reload_time = moment + datetime.timedelta(seconds=Constants.FORMULA_SCHEDULER_RETRY_SECONDS)
+
+                # Ends the read transaction, so that the next wake up sees current devices and readings
+                self._executive_device_repository_instance.rollback_session()
+
+                wake_up_time = min(self.get_next_boundary() or reload_time, reload_time)
+                self._stop_event.wait(max((wake_up_time - datetime.datetime.utcnow()).total_seconds(), 0))
+
+    def load_schedule(self, moment: datetime.datetime) -> bool:
+        """
+        Schedules formulas with datetime rules used by executive devices and drops formulas no longer used.
+        Formulas which were not scheduled before are evaluated at the moment.
+        """
+        formula_ids = self._executive_device_repository_instance.get_formula_ids_used_by_executive_devices()
+        compiled_rules = self._formula_evaluation_service_instance.get_compiled_rules(formula_ids)
+
+        datetime_rules = {
+            formula_id: compiled_rule.datetime_rule
+            for formula_id, compiled_rule in compiled_rules.items()
+            if compiled_rule.datetime_rule is not None
+        }
+        new_formula_ids = [
+            formula_id for formula_id, datetime_rule in datetime_rules.items()
+            if self._datetime_rules.get(formula_id) != datetime_rule
+        ]
+
+        self._datetime_rules = datetime_rules
+        self._next_boundaries = {
+            formula_id: next_boundary for formula_id, next_boundary in self._next_boundaries.items()
+            if formula_id in datetime_rules and formula_id not in new_formula_ids
+        }
+        self._boundaries = [
+            (next_boundary, formula_id) for formula_id, next_boundary in self._next_boundaries.items()
+        ]
+        heapq.heapify(self._boundaries)
+
+        return self._evaluate_formulas(new_formula_ids, moment)
+
+    def run_due_formulas(self, moment: datetime.datetime) -> bool:
+        """ Evaluates in a single batch all formulas with boundaries crossed until the moment """
+        due_formula_ids = set()
+
+        while self._boundaries and self._boundaries[0][0] <= moment:
+            next_boundary, formula_id = heapq.heappop(self._boundaries)
+
+            if self._next_boundaries.get(formula_id) == next_boundary:
+                del self._next_boundaries[formula_id]
+                due_formula_ids.add(formula_id)
+
+        return self._evaluate_formulas(due_formula_ids, moment)
+
+    def get_next_boundary(self) -> Optional[datetime.datetime]:
+        return self._boundaries[0][0] if self._boundaries else None
+
+    def _evaluate_formulas(self, formula_ids: Iterable[int], moment: datetime.datetime) -> bool:
+        formula_ids = list(formula_ids)
+
+        if not formula_ids:
+            return True
+
+        try:
+            is_evaluated = self._formula_evaluation_service_instance.evaluate_scheduled_formulas(formula_ids, moment)
+        except SQLAlchemyError:
+            self._executive_device_repository_instance.rollback_session()
+            is_evaluated = False
+        except Exception as e:  # pylint: disable=broad-except
+            # A formula which cannot be evaluated must not stop the schedule of other formulas
+            self._executive_device_repository_instance.rollback_session()
+
+            if len(formula_ids) > 1:
+                return all([self._evaluate_formulas([formula_id], moment) for formula_id in formula_ids])
+
+            print('Formula {} could not be evaluated: {!r}'.format(formula_ids[0], e), flush=True)
+            is_evaluated = False
+
+        if is_evaluated:
+            for formula_id in formula_ids:
+                self._schedule(formula_id, get_next_boundary(self._datetime_rules[formula_id], moment))
+            return True
+
+        retry_time = moment + datetime.timedelta(seconds=Constants.FORMULA_SCHEDULER_RETRY_SECONDS)
+        for formula_id in formula_ids:
+            self._schedule(formula_id, retry_time)
+
+        return False
+
+    def _schedule(self, formula_id: int, next_boundary: datetime.datetime) -> None:
+        if next_boundary is None:
+            return
+
+        self._next_boundaries[formula_id] = next_boundary
+        heapq.heappush(self._boundaries, (next_boundary, formula_id))
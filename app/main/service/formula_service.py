@@ -1,28 +1,39 @@
 # pylint: disable=no-self-use
 import datetime
+import multiprocessing
+import os
+import threading
+from hashlib import sha256
 from json import dumps
 from json import loads
+from multiprocessing.pool import Pool
 from typing import Any
 from typing import Dict
+from typing import List
 from typing import Optional
 from typing import Tuple
 
 from pyeda.boolalg.expr import AndOp
 from pyeda.boolalg.expr import Complement
+from pyeda.boolalg.expr import Expression
 from pyeda.boolalg.expr import OrOp
 from pyeda.inter import *
 from pyeda.parsing.boolexpr import Error
 
 from app.main.model.formula import Formula
+from app.main.model.formula_sensor_dependency import FormulaSensorDependency
 from app.main.repository.device_group_repository import DeviceGroupRepository
 from app.main.repository.formula_repository import FormulaRepository
-from app.main.repository.reading_enumerator_repository import ReadingEnumeratorRepository
 from app.main.repository.sensor_repository import SensorRepository
 from app.main.repository.sensor_type_repository import SensorTypeRepository
 from app.main.repository.user_group_repository import UserGroupRepository
+from app.main.service.formula_evaluation_service import FormulaEvaluationService
+from app.main.service.permission_service import PermissionService
 from app.main.service.sensor_service import SensorService
+from app.main.service.type_registry_service import TypeRegistryService
+from app.main.util.cache import TTLCache
 from app.main.util.constants import Constants
-from app.main.util.utils import get_random_letters
+from app.main.util.formula_consistency import is_conjunction_consistent
 from app.main.util.utils import is_dict_with_keys
 
 
@@ -33,10 +44,13 @@ class FormulaService:
     _sensor_repository_instance = None
     _sensor_type_repository_instance = None
     _user_group_repository_instance = None
-    _reading_enumerator_repository_instance = None
     _formula_repository_instance = None
 
     _sensor_service_instance = None
+    _formula_evaluation_service_instance = None
+    _type_registry_service_instance = None
+
+    _rule_verdict_cache = TTLCache(Constants.FORMULA_CHECK_CACHE_MAX_SIZE, Constants.FORMULA_CHECK_CACHE_TTL_SECONDS)
 
     @classmethod
     def get_instance(cls):
@@ -50,10 +64,17 @@ class FormulaService:
         self._sensor_repository_instance = SensorRepository.get_instance()
         self._sensor_type_repository_instance = SensorTypeRepository.get_instance()
         self._user_group_repository_instance = UserGroupRepository.get_instance()
-        self._reading_enumerator_repository_instance = ReadingEnumeratorRepository.get_instance()
         self._formula_repository_instance = FormulaRepository.get_instance()
 
         self._sensor_service_instance = SensorService.get_instance()
+        self._formula_evaluation_service_instance = FormulaEvaluationService.get_instance()
+        self._type_registry_service_instance = TypeRegistryService.get_instance()
+        self._permission_service_instance = PermissionService.get_instance()
+
+        self._idle_rule_check_pools = []
+        self._rule_check_pools_pid = None
+        self._rule_check_slots = None
+        self._rule_check_pool_lock = threading.Lock()
 
     def delete_formula_from_user_group(
             self,
@@ -86,7 +107,7 @@ class FormulaService:
         if not user_group:
             return Constants.RESPONSE_MESSAGE_USER_GROUP_NAME_NOT_FOUND
 
-        if user_id not in [user.id for user in user_group.users]:
+        if not self._permission_service_instance.is_user_in_user_group(user_id, user_group.id):
             return Constants.RESPONSE_MESSAGE_USER_DOES_NOT_HAVE_PRIVILEGES
 
         formulas = [formula for formula in user_group.formulas if formula.name == formula_name]
@@ -98,6 +119,9 @@ class FormulaService:
         if not self._formula_repository_instance.delete(formula):
             return Constants.RESPONSE_MESSAGE_ERROR
 
+        self._formula_evaluation_service_instance.invalidate_formula_cache(formula.id)
+        self._formula_evaluation_service_instance.invalidate_dependency_cache(device_group.id)
+
         return Constants.RESPONSE_MESSAGE_OK
 
     def get_formula_info(
@@ -131,7 +155,7 @@ class FormulaService:
         if not user_group:
             return Constants.RESPONSE_MESSAGE_USER_GROUP_NAME_NOT_FOUND, None
 
-        if user_id not in [user.id for user in user_group.users]:
+        if not self._permission_service_instance.is_user_in_user_group(user_id, user_group.id):
             return Constants.RESPONSE_MESSAGE_USER_DOES_NOT_HAVE_PRIVILEGES, None
 
         formulas = [formula for formula in user_group.formulas if formula.name == formula_name]
@@ -175,7 +199,7 @@ class FormulaService:
             return Constants.RESPONSE_MESSAGE_USER_GROUP_NAME_NOT_FOUND, None
 
         if is_admin is not True:
-            if user_id not in [user.id for user in user_group.users]:
+            if not self._permission_service_instance.is_user_in_user_group(user_id, user_group.id):
                 return Constants.RESPONSE_MESSAGE_USER_DOES_NOT_HAVE_PRIVILEGES, None
         else:
             if user_id != device_group.admin_id:
@@ -193,10 +217,7 @@ class FormulaService:
         if not product_key or not user_group_name or not user_id or not formula_data:
             return Constants.RESPONSE_MESSAGE_BAD_REQUEST
 
-        device_group = self._device_group_repository_instance.get_device_group_by_user_id_and_product_key(
-            user_id,
-            product_key
-        )
+        device_group = self._permission_service_instance.get_master_user_device_group(user_id, product_key)
 
         if not device_group:
             return Constants.RESPONSE_MESSAGE_PRODUCT_KEY_NOT_FOUND
@@ -221,6 +242,7 @@ class FormulaService:
         if existing_formula:
             return Constants.RESPONSE_MESSAGE_DUPLICATE_FORMULA_NAME
 
+        sensor_keys = []
         if formula_data['rule']['sensorRule']:
             sensor_data = self._get_sensor_data_from_formula_data(formula_data['rule']['sensorRule'])
             sensor_keys = sensor_data.keys()
@@ -253,7 +275,7 @@ class FormulaService:
                             value,
                             sensor_type))
                         or ((sensor_type.reading_type == 'Enum')
-                            and not self._sensor_service_instance.is_enum_reading_text_right(value, sensor_type.id))
+                            and not self._sensor_service_instance.is_enum_reading_text_right(value, sensor_type))
                         or (sensor_type.reading_type == 'Boolean'
                             and not isinstance(value, bool))):
                     return Constants.RESPONSE_MESSAGE_INVALID_FORMULA
@@ -268,36 +290,20 @@ class FormulaService:
                 value['type'] = reading_type
 
                 if reading_type == 'Enum':
-                    possible_readings = \
-                        self._reading_enumerator_repository_instance.get_reading_enumerators_by_sensor_type_id(
-                            sensor_type_by_sensor_key[value['deviceKey']].id
-                        )
-                    value['number_of_reading_values'] = len(possible_readings)
-
-            try:
-                expression = expr(rule)
-                if expression.to_cnf().satisfy_one():
-                    expression_dnf = expression.to_dnf()
-
-                    if isinstance(expression_dnf, OrOp):
-
-                        for or_inner_expression in expression_dnf._lits:
-                            if isinstance(or_inner_expression, AndOp):
-                                if not self._check_and_expression(or_inner_expression, lookup_table):
-                                    return Constants.RESPONSE_MESSAGE_INVALID_FORMULA
-                            elif not self._check_literal_expression(or_inner_expression, lookup_table):
-                                return Constants.RESPONSE_MESSAGE_INVALID_FORMULA
-
-                    elif isinstance(expression_dnf, AndOp):
-                        if not self._check_and_expression(expression_dnf, lookup_table):
-                            return Constants.RESPONSE_MESSAGE_INVALID_FORMULA
-                    else:
-                        if not self._check_literal_expression(expression_dnf, lookup_table):
-                            return Constants.RESPONSE_MESSAGE_INVALID_FORMULA
-                else:
-                    return Constants.RESPONSE_MESSAGE_INVALID_FORMULA
-            except (Error, TypeError, ValueError):
-                return Constants.RESPONSE_MESSAGE_ERROR
+                    sensor_type = self._type_registry_service_instance.get_sensor_type(
+                        device_group.id,
+                        sensor_type_by_sensor_key[value['deviceKey']].id
+                    )
+                    value['number_of_reading_values'] = len(sensor_type.text_by_number)
+
+            normal_form_sizes = self._get_normal_form_sizes(formula_data['rule']['sensorRule'])
+            if (len(lookup_table) > Constants.FORMULA_MAX_CONDITIONS
+                    or max(normal_form_sizes) > Constants.FORMULA_MAX_NORMAL_FORM_TERMS):
+                return Constants.RESPONSE_MESSAGE_FORMULA_TOO_COMPLEX
+
+            rule_verdict = self._get_cached_rule_verdict(rule, lookup_table)
+            if rule_verdict != Constants.RESPONSE_MESSAGE_OK:
+                return rule_verdict
 
         if not formula_data['rule']['datetimeRule'] and not formula_data['rule']['sensorRule']:
             return Constants.RESPONSE_MESSAGE_ERROR
@@ -305,132 +311,151 @@ class FormulaService:
         formula = Formula(
             name=formula_data['name'],
             rule=dumps(formula_data['rule']),
-            user_group_id=user_group.id
+            user_group_id=user_group.id,
+            sensor_dependencies=[
+                FormulaSensorDependency(device_key=sensor_key, device_group_id=device_group.id)
+                for sensor_key in sensor_keys
+            ]
         )
 
         if not self._formula_repository_instance.save(formula):
             return Constants.RESPONSE_MESSAGE_ERROR
 
+        self._formula_evaluation_service_instance.invalidate_dependency_cache(device_group.id)
         return Constants.RESPONSE_MESSAGE_CREATED
 
-    def _check_literal_expression(self, expression: Complement, values: dict) -> bool:
-        if (expression.uniqid < 0):
-            or_inner_expression_text = str(expression)[1:]
-        else:
-            or_inner_expression_text = str(expression)
-
-        if or_inner_expression_text not in values:
-            return False
-        return True
-
-    def _check_and_expression(self, expression: AndOp, values: dict) -> bool:
-        functor_ranges = {}
-        for and_inner_expression in expression._lits:
-            and_inner_expression_text = str(and_inner_expression)
-            is_inner_expression_negative = False
-
-            if and_inner_expression.uniqid < 0:
-                is_inner_expression_negative = True
-                and_inner_expression_text = and_inner_expression_text[1:]
-
-            if and_inner_expression_text in values:
-                if values[and_inner_expression_text]['deviceKey'] not in functor_ranges:
-                    functor_ranges[values[and_inner_expression_text]['deviceKey']] = {}
-
-                functor_range = functor_ranges[values[and_inner_expression_text]['deviceKey']]
-                value = values[and_inner_expression_text]['value']
-
-                if values[and_inner_expression_text]['functor'] == '==' and is_inner_expression_negative:
-                    if 'exclude' in functor_range:
-                        functor_range['exclude'].add(value)
-                    else:
-                        functor_range['exclude'] = {value}
-
-                if values[and_inner_expression_text]['type'] == 'Decimal':
-                    if is_inner_expression_negative:
-                        if values[and_inner_expression_text]['functor'] == '=>' and 'valueMax' not in functor_range:
-                            functor_range['valueMax'] = value
-
-                        if values[and_inner_expression_text]['functor'] == '<=' and 'valueMin' not in functor_range:
-                            functor_range['valueMin'] = value
-
-                        if values[and_inner_expression_text]['functor'] == '=>' and functor_range['valueMax'] > value:
-                            functor_range['valueMax'] = value
-
-                        if values[and_inner_expression_text]['functor'] == '<=' and functor_range['valueMin'] < value:
-                            functor_range['valueMin'] = value
-                    else:
-                        if values[and_inner_expression_text]['functor'] == '=>' and 'valueMin' not in functor_range:
-                            functor_range['valueMin'] = value
-
-                        if values[and_inner_expression_text]['functor'] == '<=' and 'valueMax' not in functor_range:
-                            functor_range['valueMax'] = value
-
-                        if values[and_inner_expression_text]['functor'] == '=>' and functor_range['valueMin'] < value:
-                            functor_range['valueMin'] = value
-
-                        if values[and_inner_expression_text]['functor'] == '<=' and functor_range['valueMax'] > value:
-                            functor_range['valueMax'] = value
-
-                        if (values[and_inner_expression_text]['functor'] == '=='
-                                and 'valueMin' not in functor_range
-                                and 'valueMax' not in functor_range):
-                            functor_range['valueMin'] = value
-                            functor_range['valueMax'] = value
-
-                        if (values[and_inner_expression_text]['functor'] == '=='
-                                and 'valueMin' in functor_range
-                                and 'valueMax' not in functor_range
-                                and functor_range['valueMin'] <= value):
-                            functor_range['valueMin'] = value
-                            functor_range['valueMax'] = value
-
-                        if (values[and_inner_expression_text]['functor'] == '=='
-                                and 'valueMax' in functor_range
-                                and 'valueMin' not in functor_range
-                                and value <= functor_range['valueMax']):
-                            functor_range['valueMin'] = value
-                            functor_range['valueMax'] = value
-
-                        if values[and_inner_expression_text]['functor'] == '==':
-                            if ('valueMin' in functor_range and 'valueMax' in functor_range
-                                    and functor_range['valueMin'] <= value <= functor_range['valueMax']):
-                                functor_range['valueMin'] = value
-                                functor_range['valueMax'] = value
-                            else:
-                                return False
-
-                    if ('exclude' in functor_range and 'valueMax' in functor_range and 'valueMin' in functor_range
-                            and functor_range['valueMax'] == functor_range['valueMin']
-                            and functor_range['valueMax'] in functor_range['exclude']):
-                        return False
-
-                    if ('valueMax' in functor_range and 'valueMin' in functor_range
-                            and functor_range['valueMax'] < functor_range['valueMin']):
-                        return False
-                else:
-                    if (values[and_inner_expression_text]['functor'] == '=='
-                            and not is_inner_expression_negative
-                            and 'value' not in functor_range):
-                        functor_range['value'] = value
-                    elif (values[and_inner_expression_text]['functor'] == '=='
-                          and not is_inner_expression_negative
-                          and functor_range['value'] != value):
-                        return False
-
-                    if 'exclude' in functor_range:
-                        if 'value' in functor_range and functor_range['value'] in functor_range['exclude']:
-                            return False
-
-                        if (values[and_inner_expression_text]['type'] in ['Boolean']
-                                and len(functor_range['exclude']) == len([True, False])):
-                            return False
-
-                        if (values[and_inner_expression_text]['type'] in ['Enum']
-                                and (len(functor_range['exclude'])
-                                     == len(values[and_inner_expression_text]['number_of_reading_values']))):
-                            return False
-        return True
+    def _get_cached_rule_verdict(self, rule: str, lookup_table: Dict[str, Any]) -> str:
+        """
+        Returns verdict of the rule check, reused for rules with equal expressions and conditions.
+        Only verdicts of finished checks are cached, a timed out or failed check is repeated by the next request.
+        """
+        rule_hash = sha256(dumps([rule, lookup_table], sort_keys=True).encode()).hexdigest()
+        rule_verdict = self._rule_verdict_cache.get(rule_hash)
+
+        if rule_verdict is None:
+            rule_verdict = self._get_rule_verdict_with_timeout(rule, lookup_table)
+
+            if rule_verdict in (Constants.RESPONSE_MESSAGE_OK, Constants.RESPONSE_MESSAGE_INVALID_FORMULA):
+                self._rule_verdict_cache.set(rule_hash, rule_verdict)
+
+        return rule_verdict
+
+    def _get_rule_verdict_with_timeout(self, rule: str, lookup_table: Dict[str, Any]) -> str:
+        """
+        Checks the rule in one of FORMULA_CHECK_WORKERS processes of the worker reserved for the check, so that the
+        timeout only counts the time of the check. Only the process of a check that times out is terminated.
+        The check runs in the current thread when the timeout is disabled or FORMULA_CHECK_WORKERS is 0.
+        """
+        if Constants.FORMULA_CHECK_TIMEOUT_SECONDS <= 0 or Constants.FORMULA_CHECK_WORKERS <= 0:
+            return self._get_rule_verdict(rule, lookup_table)
+
+        if not self._acquire_rule_check_slot():
+            return Constants.RESPONSE_MESSAGE_SERVICE_UNAVAILABLE
+
+        rule_check_pool = None
+
+        try:
+            rule_check_pool = self._get_idle_rule_check_pool()
+            return rule_check_pool.apply_async(_get_rule_verdict, (rule, lookup_table)).get(
+                Constants.FORMULA_CHECK_TIMEOUT_SECONDS
+            )
+        except multiprocessing.TimeoutError:
+            # A pathological check would keep its process busy, the process is replaced on the next check
+            rule_check_pool.terminate()
+            rule_check_pool = None
+            return Constants.RESPONSE_MESSAGE_FORMULA_TOO_COMPLEX
+        except (OSError, ValueError):
+            if rule_check_pool is not None:
+                rule_check_pool.terminate()
+                rule_check_pool = None
+
+            return Constants.RESPONSE_MESSAGE_ERROR
+        finally:
+            self._release_rule_check_slot(rule_check_pool)
+
+    def shutdown_rule_check_pool(self) -> None:
+        """ Terminates the idle processes of rule checks of the worker """
+        with self._rule_check_pool_lock:
+            if self._rule_check_pools_pid == os.getpid():
+                for rule_check_pool in self._idle_rule_check_pools:
+                    rule_check_pool.terminate()
+
+            self._idle_rule_check_pools = []
+
+    def _acquire_rule_check_slot(self) -> bool:
+        """
+        Waits at most FORMULA_CHECK_TIMEOUT_SECONDS for one of FORMULA_CHECK_WORKERS processes of the worker,
+        so that a check never waits for another check in the queue of a process.
+        """
+        with self._rule_check_pool_lock:
+            if self._rule_check_pools_pid != os.getpid():
+                # Processes and reservations of the parent process are not usable in a forked process
+                self._idle_rule_check_pools = []
+                self._rule_check_slots = threading.BoundedSemaphore(Constants.FORMULA_CHECK_WORKERS)
+                self._rule_check_pools_pid = os.getpid()
+
+            rule_check_slots = self._rule_check_slots
+
+        return rule_check_slots.acquire(timeout=Constants.FORMULA_CHECK_TIMEOUT_SECONDS)
+
+    def _release_rule_check_slot(self, rule_check_pool: Optional[Pool]) -> None:
+        """ Returns the process of the finished check to the idle processes, or drops it when it was terminated """
+        with self._rule_check_pool_lock:
+            if rule_check_pool is not None:
+                self._idle_rule_check_pools.append(rule_check_pool)
+
+            self._rule_check_slots.release()
+
+    def _get_idle_rule_check_pool(self) -> Pool:
+        """
+        Returns an idle single process pool or starts a new one. Processes are started by a fork server when possible,
+        so that they are not forked from threads of the server worker holding database connections. A new process
+        imports this module before the check, so that the start of the process is not counted by the timeout.
+        """
+        with self._rule_check_pool_lock:
+            if self._idle_rule_check_pools:
+                return self._idle_rule_check_pools.pop()
+
+        start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        rule_check_pool = multiprocessing.get_context(start_method).Pool(1)
+
+        try:
+            rule_check_pool.apply(_prepare_rule_check_process)
+        except (OSError, ValueError):
+            rule_check_pool.terminate()
+            raise
+
+        return rule_check_pool
+
+    def _get_rule_verdict(self, rule: str, lookup_table: Dict[str, Any]) -> str:
+        try:
+            expression = expr(rule)
+            if not expression.to_cnf().satisfy_one():
+                return Constants.RESPONSE_MESSAGE_INVALID_FORMULA
+
+            expression_dnf = expression.to_dnf()
+            conjuncts = expression_dnf._lits if isinstance(expression_dnf, OrOp) else [expression_dnf]
+
+            for conjunct in conjuncts:
+                if not is_conjunction_consistent(self._get_conjunct_conditions(conjunct, lookup_table)):
+                    return Constants.RESPONSE_MESSAGE_INVALID_FORMULA
+        except (Error, TypeError, ValueError):
+            return Constants.RESPONSE_MESSAGE_ERROR
+
+        return Constants.RESPONSE_MESSAGE_OK
+
+    def _get_conjunct_conditions(
+            self,
+            conjunct: Expression,
+            lookup_table: Dict[str, Any]) -> List[Tuple[Optional[dict], bool]]:
+        """ Returns conditions of the conjunct literals with their negation flags """
+        literals = conjunct._lits if isinstance(conjunct, AndOp) else [conjunct]
+
+        return [
+            (lookup_table.get((~literal).name), True) if isinstance(literal, Complement)
+            else (lookup_table.get(getattr(literal, 'name', None)), False)
+            for literal in literals
+        ]
 
     def _get_sensor_data_from_formula_data(self, formula_data: dict) -> dict:
         sensor_data = {}
@@ -449,23 +474,53 @@ class FormulaService:
             self._get_sensor_data_from_formula_data_recursive(formula_data['complexLeft'], sensor_data)
             self._get_sensor_data_from_formula_data_recursive(formula_data['complexRight'], sensor_data)
 
+    def _get_normal_form_sizes(self, formula_data: dict) -> Tuple[int, int]:
+        """ Returns numbers of terms in disjunctive and conjunctive normal forms of the rule, without expanding it """
+        if (is_dict_with_keys(formula_data, ['isNegated', 'complexLeft', 'complexRight', 'operator'])
+                and formula_data['complexLeft']
+                and formula_data['complexRight']
+                and formula_data['operator']):
+            left_dnf_size, left_cnf_size = self._get_normal_form_sizes(formula_data['complexLeft'])
+            right_dnf_size, right_cnf_size = self._get_normal_form_sizes(formula_data['complexRight'])
+
+            if formula_data['operator'] == 'and':
+                dnf_size, cnf_size = left_dnf_size * right_dnf_size, left_cnf_size + right_cnf_size
+            else:
+                dnf_size, cnf_size = left_dnf_size + right_dnf_size, left_cnf_size * right_cnf_size
+
+            if formula_data['isNegated'] is True:
+                return cnf_size, dnf_size
+            return dnf_size, cnf_size
+
+        return 1, 1
+
     def _create_expresion(self, formula_data: dict) -> Tuple[str, Dict[str, Any]]:
         lookup_table = {}
-        rule = self._create_expresion_recursive(formula_data, lookup_table)
+        rule = self._create_expresion_recursive(formula_data, lookup_table, {})
         return rule, lookup_table
 
-    def _create_expresion_recursive(self, formula_data: dict, lookup_table: Dict[str, Any]) -> str:
+    def _create_expresion_recursive(
+            self,
+            formula_data: dict,
+            lookup_table: Dict[str, Any],
+            lookup_keys: Dict[str, str]) -> str:
         if is_dict_with_keys(formula_data, ['isNegated', 'value', 'functor', 'deviceKey']):
             if (formula_data['value'] is not None
                     and formula_data['isNegated'] is not None
                     and formula_data['functor']
                     and formula_data['deviceKey']):
-                lookup_key = get_random_letters(16)
-                lookup_table[lookup_key] = {
-                    'deviceKey': formula_data['deviceKey'],
-                    'functor': formula_data['functor'],
-                    'value': formula_data['value']
-                }
+                # Variables are named by order of first occurrence, equal conditions share a variable
+                condition = dumps([formula_data['deviceKey'], formula_data['functor'], formula_data['value']])
+                lookup_key = lookup_keys.get(condition)
+
+                if lookup_key is None:
+                    lookup_key = 'c{}'.format(len(lookup_keys))
+                    lookup_keys[condition] = lookup_key
+                    lookup_table[lookup_key] = {
+                        'deviceKey': formula_data['deviceKey'],
+                        'functor': formula_data['functor'],
+                        'value': formula_data['value']
+                    }
                 return '~' + lookup_key if formula_data['isNegated'] is True else lookup_key
 
         if (is_dict_with_keys(formula_data, ['isNegated', 'complexLeft', 'complexRight', 'operator'])
@@ -473,14 +528,22 @@ class FormulaService:
                 and formula_data['complexRight']
                 and formula_data['operator']):
             rule = '~(' if formula_data['isNegated'] is True else '('
-            rule += self._create_expresion_recursive(formula_data['complexLeft'], lookup_table)
+            rule += self._create_expresion_recursive(formula_data['complexLeft'], lookup_table, lookup_keys)
 
             if formula_data['operator'] == 'and':
                 rule += ' & '
             elif formula_data['operator'] == 'or':
                 rule += ' | '
 
-            rule += self._create_expresion_recursive(formula_data['complexRight'], lookup_table)
+            rule += self._create_expresion_recursive(formula_data['complexRight'], lookup_table, lookup_keys)
             rule += ')'
             return rule
         return 'False'
+
+
+def _get_rule_verdict(rule: str, lookup_table: Dict[str, Any]) -> str:
+    return FormulaService.get_instance()._get_rule_verdict(rule, lookup_table)
+
+
+def _prepare_rule_check_process() -> None:
+    """ Runs first in every process of rule checks, the module is already imported when the task is unpickled """
@@ -1,11 +1,16 @@
 # pylint: disable=no-self-use
 import base64
 import hashlib
+import hmac
 import json
+import time
 from datetime import datetime
+from datetime import timedelta
+from functools import partial
 from json import loads
 from typing import Any
 from typing import Dict
+from typing import Iterator
 from typing import List
 from typing import Optional
 from typing import Tuple
@@ -13,16 +18,17 @@ from typing import Union
 
 from app.main.model import DeviceGroup
 from app.main.repository.deleted_device_repository import DeletedDeviceRepository
+from app.main.repository.device_change_repository import DeviceChangeRepository
 from app.main.repository.device_group_repository import DeviceGroupRepository
 from app.main.repository.executive_device_repository import ExecutiveDeviceRepository
-from app.main.repository.executive_type_repository import ExecutiveTypeRepository
-from app.main.repository.formula_repository import FormulaRepository
 from app.main.repository.sensor_repository import SensorRepository
-from app.main.repository.sensor_type_repository import SensorTypeRepository
 from app.main.repository.unconfigured_device_repository import UnconfiguredDeviceRepository
 from app.main.service.executive_device_service import ExecutiveDeviceService
+from app.main.service.formula_evaluation_service import FormulaEvaluationService
 from app.main.service.log_service import LogService
 from app.main.service.sensor_service import SensorService
+from app.main.util.cache import TTLCache
+from app.main.util.change_notifier import ChangeNotifier
 from app.main.util.constants import Constants
 
 _logger = LogService.get_instance()
@@ -32,15 +38,14 @@ class HubService:
     _instance = None
 
     _device_group_repository_instance = None
-    _formula_repository_instance = None
     _deleted_device_repository_instance = None
     _executive_device_repository_instance = None
     _sensor_repository_instance = None
-    _sensor_type_repository_instance = None
     _sensor_reading_repository_instance = None
-    _executive_type_repository = None
     _state_enumerator_repository = None
 
+    _device_group_cache = TTLCache(Constants.DEVICE_GROUP_CACHE_MAX_SIZE, Constants.DEVICE_GROUP_CACHE_TTL_SECONDS)
+
     @classmethod
     def get_instance(cls):
         if cls._instance is None:
@@ -51,40 +56,141 @@ class HubService:
     def __init__(self):
         self._executive_device_service_instance = ExecutiveDeviceService.get_instance()
         self._executive_device_repository_instance = ExecutiveDeviceRepository.get_instance()
-        self._executive_type_repository = ExecutiveTypeRepository.get_instance()
 
         self._sensor_service_instance = SensorService.get_instance()
+        self._formula_evaluation_service_instance = FormulaEvaluationService.get_instance()
         self._sensor_repository_instance = SensorRepository.get_instance()
-        self._sensor_type_repository_instance = SensorTypeRepository.get_instance()
 
         self._device_group_repository_instance = DeviceGroupRepository.get_instance()
         self._deleted_device_repository_instance = DeletedDeviceRepository.get_instance()
+        self._device_change_repository_instance = DeviceChangeRepository.get_instance()
         self._unconfigured_device_repository_instance = UnconfiguredDeviceRepository.get_instance()
-        self._formula_repository_instance = FormulaRepository.get_instance()
+
+        self._change_notifier_instance = ChangeNotifier.get_instance()
 
     def get_changed_devices_for_device_group(
             self,
             product_key: str,
-            authorization: str
-    ) -> Tuple[str, Optional[Dict[str, Union[bool, List[str]]]]]:
-
+            authorization: str,
+            wait: Optional[str] = None,
+            cursor: Optional[str] = None,
+            since: Optional[str] = None
+    ) -> Tuple[str, Optional[Dict[str, Union[bool, int, str, List[str]]]]]:
+        """
+        Without since returns devices flagged as updated or deleted, with since returns changes recorded in the
+        device group change log after given sequence number. When wait is given the call blocks for at most wait
+        seconds until there is something new for the hub.
+        """
         if product_key is None:
             return Constants.RESPONSE_MESSAGE_PRODUCT_KEY_NOT_FOUND, None
 
-        device_group = self._device_group_repository_instance.get_device_group_by_product_key(product_key)
+        error_message, device_group_id = self._get_authorized_device_group_id(product_key, authorization)
 
-        if device_group is None:
+        if error_message is not None:
+            return error_message, None
+
+        wait_seconds = self._get_wait_value(wait)
+
+        if wait_seconds is None:
+            return Constants.RESPONSE_MESSAGE_BAD_REQUEST, None
+
+        if since is None:
+            get_changes = partial(self._get_changed_devices, device_group_id)
+        else:
+            since_value = self._get_since_value(since)
+
+            if since_value is None:
+                return Constants.RESPONSE_MESSAGE_BAD_REQUEST, None
+
+            get_changes = partial(self._get_device_changes, device_group_id, since_value)
+
+        current_cursor = self._change_notifier_instance.get_cursor(product_key)
+
+        if wait_seconds and cursor != current_cursor:
+            # The hub has not seen the current state yet, it is only worth waiting when nothing is pending
+            error_message, devices = get_changes()
+
+            if error_message is not None or devices['isUpdated'] or devices['isDeleted']:
+                return self._get_changed_devices_result(error_message, devices, current_cursor)
+
+            cursor = current_cursor
+
+        if wait_seconds:
+            # Do not hold a database connection while waiting
+            self._deleted_device_repository_instance.rollback_session()
+            self._change_notifier_instance.wait_for_change(product_key, cursor, wait_seconds)
+            current_cursor = self._change_notifier_instance.get_cursor(product_key)
+
+        error_message, devices = get_changes()
+
+        return self._get_changed_devices_result(error_message, devices, current_cursor)
+
+    def get_changed_devices_stream(
+            self,
+            product_key: str,
+            authorization: str,
+            cursor: Optional[str] = None
+    ) -> Tuple[str, Optional[Iterator[str]]]:
+
+        if product_key is None:
             return Constants.RESPONSE_MESSAGE_PRODUCT_KEY_NOT_FOUND, None
 
-        if not self.is_authorization_correct(device_group, authorization):
-            return Constants.RESPONSE_MESSAGE_WRONG_PASSWORD, None
+        error_message, device_group_id = self._get_authorized_device_group_id(product_key, authorization)
+
+        if error_message is not None:
+            return error_message, None
+
+        return Constants.RESPONSE_MESSAGE_OK, self._get_changed_devices_events(product_key, device_group_id, cursor)
+
+    def _get_changed_devices_events(
+            self,
+            product_key: str,
+            device_group_id: int,
+            cursor: Optional[str]) -> Iterator[str]:
+        stream_end = time.monotonic() + Constants.HUB_STATES_STREAM_MAX_SECONDS
+        yield 'retry: {}\n\n'.format(Constants.HUB_STATES_STREAM_KEEP_ALIVE_SECONDS * 1000)
+
+        while time.monotonic() < stream_end:
+            current_cursor = self._change_notifier_instance.get_cursor(product_key)
+
+            if cursor != current_cursor:
+                error_message, devices = self._get_changed_devices(device_group_id)
 
+                if error_message is not None:
+                    return
+
+                cursor = current_cursor
+                yield 'id: {}\nevent: states\ndata: {}\n\n'.format(cursor, json.dumps(devices))
+
+            self._deleted_device_repository_instance.rollback_session()
+
+            if not self._change_notifier_instance.wait_for_change(
+                    product_key,
+                    cursor,
+                    min(Constants.HUB_STATES_STREAM_KEEP_ALIVE_SECONDS, max(stream_end - time.monotonic(), 0))):
+                yield ': keep-alive\n\n'
+
+    def _get_changed_devices_result(
+            self,
+            error_message: Optional[str],
+            devices: Optional[Dict[str, Union[bool, List[str]]]],
+            cursor: str) -> Tuple[str, Optional[Dict[str, Union[bool, str, List[str]]]]]:
+        if error_message is not None:
+            return error_message, None
+
+        devices['cursor'] = cursor
+
+        return Constants.RESPONSE_MESSAGE_OK, devices
+
+    def _get_changed_devices(
+            self,
+            device_group_id: int) -> Tuple[Optional[str], Optional[Dict[str, Union[bool, List[str]]]]]:
         executive_devices = self._executive_device_repository_instance.get_updated_executive_devices_by_device_group_id(
-            device_group.id
+            device_group_id
         )
 
         sensors = self._sensor_repository_instance.get_sensors_by_device_group_id_and_update_status(
-            device_group.id
+            device_group_id
         )
 
         device_keys = []
@@ -95,7 +201,7 @@ class HubService:
             device_keys.append(sensor.device_key)
 
         deleted_devices = self._deleted_device_repository_instance.get_deleted_devices_by_device_group_id(
-            device_group.id
+            device_group_id
         )
 
         deleted_device_keys = []
@@ -122,19 +228,74 @@ class HubService:
             devices['isDeleted'] = False
             devices['deletedDevices'] = []
 
-        return Constants.RESPONSE_MESSAGE_OK, devices
+        return None, devices
+
+    def _get_device_changes(
+            self,
+            device_group_id: int,
+            since: int) -> Tuple[Optional[str], Dict[str, Union[bool, int, List[str]]]]:
+        device_changes = self._device_change_repository_instance.get_device_changes_by_device_group_id(
+            device_group_id,
+            since,
+            Constants.DEVICE_CHANGES_PAGE_SIZE + 1
+        )
+
+        has_more = len(device_changes) > Constants.DEVICE_CHANGES_PAGE_SIZE
+        device_changes = device_changes[:Constants.DEVICE_CHANGES_PAGE_SIZE]
+
+        # Only the latest change of every device matters, so that replaying the same range gives the same result
+        is_deleted_by_device_key = {}
+        for device_change in device_changes:
+            is_deleted_by_device_key.pop(device_change.device_key, None)
+            is_deleted_by_device_key[device_change.device_key] = device_change.is_deleted
+
+        changed_device_keys = [key for key, is_deleted in is_deleted_by_device_key.items() if not is_deleted]
+        deleted_device_keys = [key for key, is_deleted in is_deleted_by_device_key.items() if is_deleted]
+
+        devices = {
+            'isUpdated': bool(changed_device_keys),
+            'changedDevices': changed_device_keys,
+            'isDeleted': bool(deleted_device_keys),
+            'deletedDevices': deleted_device_keys,
+            'sequence': device_changes[-1].sequence if device_changes else since,
+            'hasMore': has_more
+        }
+
+        return None, devices
+
+    def _get_since_value(self, since: str) -> Optional[int]:
+        try:
+            since_value = int(since)
+        except (TypeError, ValueError):
+            return None
+
+        if since_value < 0:
+            return None
+
+        return since_value
+
+    def _get_wait_value(self, wait: Optional[str]) -> Optional[int]:
+        if wait is None:
+            return 0
+
+        try:
+            wait_value = int(wait)
+        except (TypeError, ValueError):
+            return None
+
+        if wait_value < 0 or wait_value > Constants.HUB_STATES_MAX_WAIT_SECONDS:
+            return None
+
+        return wait_value
 
     def add_device_to_device_group(self, product_key: str, authorization: str, device_key: str) -> bool:
         if product_key is None or device_key is None:
             return Constants.RESPONSE_MESSAGE_BAD_REQUEST
 
-        device_group = self._device_group_repository_instance.get_device_group_by_product_key(product_key)
+        error_message, device_group_id = self._get_authorized_device_group_id(product_key, authorization)
 
-        if device_group is None:
-            return Constants.RESPONSE_MESSAGE_PRODUCT_KEY_NOT_FOUND
-
-        if not self.is_authorization_correct(device_group, authorization):
-            return Constants.RESPONSE_MESSAGE_WRONG_PASSWORD
+        if error_message is not None:
+            return error_message
 
         unconfigured_device = self._unconfigured_device_repository_instance.get_unconfigured_device_by_device_key(
             device_key
@@ -143,7 +304,7 @@ class HubService:
         if unconfigured_device is None:
             return Constants.RESPONSE_MESSAGE_DEVICE_KEY_NOT_FOUND
 
-        unconfigured_device.device_group_id = device_group.id
+        unconfigured_device.device_group_id = device_group_id
 
         if not self._unconfigured_device_repository_instance.update_database():
             return Constants.RESPONSE_MESSAGE_ERROR
@@ -157,24 +318,20 @@ class HubService:
         if not isinstance(device_keys, List) or not all(isinstance(value, str) for value in device_keys):
             return Constants.RESPONSE_MESSAGE_DEVICE_KEYS_NOT_LIST
 
-        device_group = self._device_group_repository_instance.get_device_group_by_product_key(product_key)
-
-        if device_group is None:
-            return Constants.RESPONSE_MESSAGE_PRODUCT_KEY_NOT_FOUND
+        error_message, device_group_id = self._get_authorized_device_group_id(product_key, authorization)
 
-        if not self.is_authorization_correct(device_group, authorization):
-            return Constants.RESPONSE_MESSAGE_WRONG_PASSWORD
+        if error_message is not None:
+            return error_message
 
-        device_group_product_key = device_group.product_key
         all_devices_added = True
 
         for device_key in device_keys:
-            result = self.add_device_to_device_group(device_group_product_key, authorization, device_key)
+            result = self.add_device_to_device_group(product_key, authorization, device_key)
             if result != Constants.RESPONSE_MESSAGE_CREATED:
                 _logger.log_exception(
                     dict(
                         type='Error',
-                        creationDate=datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S.%fZ'),
+                        creationDate=datetime.utcnow(),
                         errorMessage='Wrong values passed to add devices to device group: ' + result,
                         payload=json.dumps(device_keys)
                     ),
@@ -200,31 +357,31 @@ class HubService:
         if not isinstance(devices_states, List) or not all(isinstance(values, dict) for values in devices_states):
             return Constants.RESPONSE_MESSAGE_DEVICE_STATES_NOT_LIST
 
-        device_group = self._device_group_repository_instance.get_device_group_by_product_key(product_key)
+        error_message, device_group_id = self._get_authorized_device_group_id(product_key, authorization)
 
-        if not device_group:
-            return Constants.RESPONSE_MESSAGE_PRODUCT_KEY_NOT_FOUND
+        if error_message is not None:
+            return error_message
 
-        if not self.is_authorization_correct(device_group, authorization):
-            return Constants.RESPONSE_MESSAGE_WRONG_PASSWORD
+        is_saved, wrong_devices_states = self._executive_device_service_instance.set_devices_states(
+            device_group_id,
+            devices_states
+        )
 
-        device_group_id = device_group.id
-        all_devices_values_ok = True
+        if not is_saved:
+            return Constants.RESPONSE_MESSAGE_ERROR
 
-        for values in devices_states:
-            if not self._executive_device_service_instance.set_device_state(device_group_id, values):
-                _logger.log_exception(
-                    dict(
-                        type='Error',
-                        creationDate=datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S.%fZ'),
-                        errorMessage='Wrong values passed to set device state',
-                        payload=json.dumps(values)
-                    ),
-                    product_key
-                )
-                all_devices_values_ok = False
+        for values in wrong_devices_states:
+            _logger.log_exception(
+                dict(
+                    type='Error',
+                    creationDate=datetime.utcnow(),
+                    errorMessage='Wrong values passed to set device state',
+                    payload=json.dumps(values)
+                ),
+                product_key
+            )
 
-        if all_devices_values_ok:
+        if not wrong_devices_states:
             return Constants.RESPONSE_MESSAGE_UPDATED_SENSORS_AND_DEVICES
         else:
             return Constants.RESPONSE_MESSAGE_PARTIALLY_WRONG_DATA
@@ -242,32 +399,45 @@ class HubService:
         if not isinstance(sensors_readings, List) or not all(isinstance(values, dict) for values in sensors_readings):
             return Constants.RESPONSE_MESSAGE_SENSORS_READINGS_NOT_LIST
 
-        device_group = self._device_group_repository_instance.get_device_group_by_product_key(product_key)
+        error_message, device_group_id = self._get_authorized_device_group_id(product_key, authorization)
 
-        if not device_group:
-            return Constants.RESPONSE_MESSAGE_PRODUCT_KEY_NOT_FOUND
+        if error_message is not None:
+            return error_message
 
-        if not self.is_authorization_correct(device_group, authorization):
-            return Constants.RESPONSE_MESSAGE_WRONG_PASSWORD
+        is_saved, wrong_sensors_readings = self._sensor_service_instance.set_sensors_readings(
+            device_group_id,
+            sensors_readings
+        )
 
-        device_group_id = device_group.id
+        if not is_saved:
+            return Constants.RESPONSE_MESSAGE_ERROR
 
-        all_sensor_values_ok = True
+        if not self._formula_evaluation_service_instance.evaluate_formulas(
+                device_group_id,
+                product_key,
+                {values['deviceKey'] for values in sensors_readings if isinstance(values.get('deviceKey'), str)}):
+            _logger.log_exception(
+                dict(
+                    type='Error',
+                    creationDate=datetime.utcnow(),
+                    errorMessage='Executive devices states could not be updated from formulas',
+                    payload=json.dumps(sensors_readings)
+                ),
+                product_key
+            )
 
-        for values in sensors_readings:
-            if not self._sensor_service_instance.set_sensor_reading(device_group_id, values):
-                _logger.log_exception(
-                    dict(
-                        type='Info',
-                        creationDate=datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S.%fZ'),
-                        errorMessage='Wrong values passed to set sensor readings',
-                        payload=json.dumps(values)
-                    ),
-                    product_key
-                )
-                all_sensor_values_ok = False
+        for values in wrong_sensors_readings:
+            _logger.log_exception(
+                dict(
+                    type='Info',
+                    creationDate=datetime.utcnow(),
+                    errorMessage='Wrong values passed to set sensor readings',
+                    payload=json.dumps(values)
+                ),
+                product_key
+            )
 
-        if all_sensor_values_ok:
+        if not wrong_sensors_readings:
             return Constants.RESPONSE_MESSAGE_UPDATED_SENSORS_AND_DEVICES
         else:
             return Constants.RESPONSE_MESSAGE_PARTIALLY_WRONG_DATA
@@ -281,129 +451,91 @@ class HubService:
         if not product_key:
             return Constants.RESPONSE_MESSAGE_PRODUCT_KEY_NOT_FOUND, None
 
-        device_group = self._device_group_repository_instance.get_device_group_by_product_key(product_key)
+        error_message, device_group_id = self._get_authorized_device_group_id(product_key, authorization)
 
-        if not device_group:
-            return Constants.RESPONSE_MESSAGE_PRODUCT_KEY_NOT_FOUND, None
-
-        if not self.is_authorization_correct(device_group, authorization):
-            return Constants.RESPONSE_MESSAGE_WRONG_PASSWORD, None
+        if error_message is not None:
+            return error_message, None
 
         if not devices:
             return Constants.RESPONSE_MESSAGE_DEVICE_KEYS_NOT_LIST, None
 
-        sensors = self._sensor_repository_instance.get_sensors_by_product_key_and_device_keys(
-            product_key,
+        sensors = self._sensor_repository_instance.get_sensors_with_types_by_device_group_id_and_device_keys(
+            device_group_id,
             devices
         )
 
         sensor_infos = []
-        if sensors:
-            sensor_types = self._sensor_type_repository_instance.get_sensor_types_by_ids(
-                list(map(lambda x: x.sensor_type_id, sensors))
-            )
-
-            sensor_type_by_sensor_ids = dict(
-                [
-                    (sensor.id, sensor_type)
-                    for sensor_type in sensor_types
-                    for sensor in sensors
-                    if sensor_type.id == sensor.sensor_type_id
-                ]
+        for sensor in sensors:
+            sensor_type = sensor.sensor_type
+
+            enumerators = []
+            if sensor_type and sensor_type.reading_type == 'Enum':
+                for reading_enumerator in sensor_type.reading_enumerators:
+                    enumerators.append(
+                        {
+                            'number': reading_enumerator.number,
+                            'text': reading_enumerator.text,
+                        }
+                    )
+
+            sensor_infos.append(
+                {
+                    'deviceKey': sensor.device_key,
+                    'readingType': sensor_type.reading_type if sensor_type else None,
+                    'rangeMin': sensor_type.range_min if sensor_type else None,
+                    'rangeMax': sensor_type.range_max if sensor_type else None,
+                    'enumerator': enumerators
+                }
             )
+            sensor.is_updated = False
 
-            for sensor in sensors:
-                sensor_type = sensor_type_by_sensor_ids.get(sensor.id)
-
-                enumerators = []
-                if sensor_type and sensor_type.reading_type == 'Enum':
-                    for reading_enumerator in sensor_type.reading_enumerators:
-                        enumerators.append(
-                            {
-                                'number': reading_enumerator.number,
-                                'text': reading_enumerator.text,
-                            }
-                        )
-
-                sensor_infos.append(
-                    {
-                        'deviceKey': sensor.device_key,
-                        'readingType': sensor_type.reading_type if sensor_type else None,
-                        'rangeMin': sensor_type.range_min if sensor_type else None,
-                        'rangeMax': sensor_type.range_max if sensor_type else None,
-                        'enumerator': enumerators
-                    }
-                )
-                sensor.is_updated = False
-
-        executive_devices = \
-            self._executive_device_repository_instance.get_executive_devices_by_product_key_and_device_keys(
-                product_key,
+        executive_devices = self._executive_device_repository_instance. \
+            get_executive_devices_with_types_and_formulas_by_device_group_id_and_device_keys(
+                device_group_id,
                 devices
             )
 
+        # Devices sharing a formula share its parsed rule
+        rules_by_formula_id = {}
         device_infos = []
-        if executive_devices:
-            executive_types = self._executive_type_repository.get_executive_types_by_ids(
-                list(map(lambda x: x.executive_type_id, executive_devices))
-            )
-
-            executive_type_by_device_ids = dict(
-                [
-                    (executive_device.id, executive_type)
-                    for executive_type in executive_types
-                    for executive_device in executive_devices
-                    if executive_type.id == executive_device.executive_type_id
-                ]
-            )
-
-            formulas = self._formula_repository_instance.get_formulas_by_ids(
-                list(map(lambda x: x.formula_id, executive_devices))
+        for executive_device in executive_devices:
+            executive_type = executive_device.executive_type
+
+            enumerators = []
+            if executive_type and executive_type.state_type == 'Enum':
+                for state_enumerator in executive_type.state_enumerators:
+                    enumerators.append(
+                        {
+                            'number': state_enumerator.number,
+                            'text': state_enumerator.text,
+                        }
+                    )
+
+            rule = None
+            formula = executive_device.formula
+            if executive_device.is_formula_used and formula:
+                if formula.id not in rules_by_formula_id:
+                    rules_by_formula_id[formula.id] = loads(formula.rule)
+
+                rule = rules_by_formula_id[formula.id]
+
+            device_infos.append(
+                {
+                    'deviceKey': executive_device.device_key,
+                    'state': executive_device.state,
+                    'defaultState': executive_type.default_state,
+                    'positiveState': executive_device.positive_state,
+                    'negativeState': executive_device.negative_state,
+                    'rule': rule,
+                    'isFormulaUsed': executive_device.is_formula_used,
+                    'stateType': executive_type.state_type if executive_type else None,
+                    'rangeMin': executive_type.state_range_min if executive_type else None,
+                    'rangeMax': executive_type.state_range_max if executive_type else None,
+                    'enumerator': enumerators
+                }
             )
 
-            formulas_by_device_ids = dict(
-                [
-                    (executive_device.id, formula)
-                    for formula in formulas
-                    for executive_device in executive_devices
-                    if formula.id == executive_device.formula_id
-                ]
-            )
-
-            for executive_device in executive_devices:
-                executive_type = executive_type_by_device_ids.get(executive_device.id)
-
-                enumerators = []
-                if executive_type and executive_type.state_type == 'Enum':
-                    for state_enumerator in executive_type.state_enumerators:
-                        enumerators.append(
-                            {
-                                'number': state_enumerator.number,
-                                'text': state_enumerator.text,
-                            }
-                        )
-
-                formula = None
-                if executive_device.is_formula_used:
-                    formula = formulas_by_device_ids.get(executive_device.id)
-
-                device_infos.append(
-                    {
-                        'deviceKey': executive_device.device_key,
-                        'state': executive_device.state,
-                        'defaultState': executive_type.default_state,
-                        'positiveState': executive_device.positive_state,
-                        'negativeState': executive_device.negative_state,
-                        'rule': loads(formula.rule) if formula else None,
-                        'isFormulaUsed': executive_device.is_formula_used,
-                        'stateType': executive_type.state_type if executive_type else None,
-                        'rangeMin': executive_type.state_range_min if executive_type else None,
-                        'rangeMax': executive_type.state_range_max if executive_type else None,
-                        'enumerator': enumerators
-                    }
-                )
-
-                executive_device.is_updated = False
+            executive_device.is_updated = False
 
         if not self._executive_device_repository_instance.update_database():
             return Constants.RESPONSE_MESSAGE_ERROR, None
@@ -415,6 +547,68 @@ class HubService:
 
         return Constants.RESPONSE_MESSAGE_OK, result_values
 
+    def compact_device_changes(self, retention_days: int, now: Optional[datetime] = None) -> Tuple[str, Optional[dict]]:
+        """
+        Removes changes older than retention period which are superseded by a later change of the same device.
+        The latest change of every device is kept, so hubs asking for changes since any sequence still get
+        the current state of every device changed after it.
+        """
+        if retention_days is None or retention_days < 1:
+            return Constants.RESPONSE_MESSAGE_BAD_REQUEST, None
+
+        if now is None:
+            now = datetime.utcnow()
+
+        deleted_changes = self._device_change_repository_instance.delete_superseded_device_changes_but_do_not_commit(
+            now - timedelta(days=retention_days)
+        )
+
+        if not self._device_change_repository_instance.update_database():
+            return Constants.RESPONSE_MESSAGE_ERROR, None
+
+        return Constants.RESPONSE_MESSAGE_OK, {'deletedChanges': deleted_changes}
+
+    def invalidate_device_group_cache(self, product_key: str) -> None:
+        self._device_group_cache.invalidate(product_key)
+        # Hubs waiting for changes have to authorize again
+        self._change_notifier_instance.notify(product_key)
+
+    def get_device_group_cache_stats(self) -> Dict[str, int]:
+        return self._device_group_cache.get_stats()
+
+    def _get_authorized_device_group_id(
+            self,
+            product_key: str,
+            authorization: str) -> Tuple[Optional[str], Optional[int]]:
+        """
+        Function returns:
+            optional: error message,
+            optional: id of the device group the hub is authorized for
+        """
+        authorization_fingerprint = None
+        if isinstance(authorization, str):
+            authorization_fingerprint = hashlib.sha256(authorization.encode()).hexdigest()
+
+        cached_values = self._device_group_cache.get(product_key)
+
+        if (cached_values is not None and
+                authorization_fingerprint is not None and
+                hmac.compare_digest(cached_values[1], authorization_fingerprint)):
+            return None, cached_values[0]
+
+        device_group = self._device_group_repository_instance.get_device_group_by_product_key(product_key)
+
+        if device_group is None:
+            return Constants.RESPONSE_MESSAGE_PRODUCT_KEY_NOT_FOUND, None
+
+        if not self.is_authorization_correct(device_group, authorization):
+            return Constants.RESPONSE_MESSAGE_WRONG_PASSWORD, None
+
+        if authorization_fingerprint is not None:
+            self._device_group_cache.set(product_key, (device_group.id, authorization_fingerprint))
+
+        return None, device_group.id
+
     def is_authorization_correct(self, device_group: DeviceGroup, authorization: str):
         product_key_and_password = base64.b64decode(authorization.split()[-1].encode()).decode()
         product_key, password = product_key_and_password.split(":")
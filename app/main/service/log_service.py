@@ -1,13 +1,18 @@
+import atexit
 import datetime
 from typing import Dict
 from typing import List
 from typing import Optional
 from typing import Tuple
+from typing import Union
+
+from flask import Flask
 
-from app.main.model.log import Log
 from app.main.repository.device_group_repository import DeviceGroupRepository
 from app.main.repository.log_repository import LogRepository
+from app.main.util.cache import TTLCache
 from app.main.util.constants import Constants
+from app.main.util.log_buffer import LogBuffer
 
 
 class LogService:
@@ -27,7 +32,19 @@ class LogService:
         self._device_group_repository_instance = DeviceGroupRepository.get_instance()
         self._log_repository_instance = LogRepository.get_instance()
 
-    def log_exception(self, log_values: Dict[str, str], product_key: str) -> bool:
+        self._device_group_id_cache = TTLCache(
+            Constants.DEVICE_GROUP_CACHE_MAX_SIZE,
+            Constants.DEVICE_GROUP_CACHE_TTL_SECONDS
+        )
+        self._log_buffer = LogBuffer(
+            self._write_logs,
+            Constants.LOG_QUEUE_MAX_SIZE,
+            Constants.LOG_QUEUE_BATCH_SIZE,
+            Constants.LOG_QUEUE_FLUSH_INTERVAL_MS / 1000,
+            Constants.LOG_QUEUE_PUT_TIMEOUT_SECONDS
+        )
+
+    def log_exception(self, log_values: Dict[str, Union[str, datetime.datetime]], product_key: str) -> bool:
         if Constants.LOGGER_LEVEL_OFF == 'ALL':
             return Constants.RESPONSE_MESSAGE_LOGGER_LEVEL_OFF
 
@@ -44,43 +61,80 @@ class LogService:
                  log_values['type'] in Constants.LOGGER_LEVEL_OFF):
             return Constants.RESPONSE_MESSAGE_LOGGER_LEVEL_OFF
 
-        try:
-            creation_date = datetime.datetime.strptime(
-                log_values['creationDate'],
-                '%Y-%m-%dT%H:%M:%S.%fZ')
-        except ValueError:
-            print(log_values)
-            return Constants.RESPONSE_MESSAGE_ERROR
+        creation_date = log_values['creationDate']
 
-        device_group = self._device_group_repository_instance.get_device_group_by_product_key(product_key)
+        if not isinstance(creation_date, datetime.datetime):
+            try:
+                creation_date = datetime.datetime.strptime(
+                    creation_date,
+                    '%Y-%m-%dT%H:%M:%S.%fZ')
+            except (TypeError, ValueError):
+                print(log_values)
+                return Constants.RESPONSE_MESSAGE_ERROR
 
-        if device_group is None:
+        device_group_id = self._get_device_group_id(product_key)
+
+        if device_group_id is None:
             print(log_values)
             return Constants.RESPONSE_MESSAGE_PRODUCT_KEY_NOT_FOUND
 
-        log = Log(
-            type=log_values['type'],
-            creation_date=creation_date,
-            device_group=device_group
-        )
+        log = {
+            'type': log_values['type'],
+            'error_message': log_values.get('errorMessage'),
+            'stack_trace': log_values.get('stackTrace'),
+            'payload': log_values.get('payload'),
+            'time': log_values.get('time'),
+            'creation_date': creation_date,
+            'device_group_id': device_group_id
+        }
+
+        if not self._log_buffer.put(log):
+            print(log_values)
+            return Constants.RESPONSE_MESSAGE_ERROR
 
-        if 'errorMessage' in log_values:
-            log.error_message = log_values['errorMessage']
+        return Constants.RESPONSE_MESSAGE_CREATED
 
-        if 'stackTrace' in log_values:
-            log.stack_trace = log_values['stackTrace']
+    def start_log_flusher(self, app: Flask) -> None:
+        """ Makes logs written in batches by a background thread, queued logs are written on exit """
+        self._log_buffer.start_flusher(app)
+        atexit.register(self._log_buffer.stop_flusher, Constants.LOG_QUEUE_SHUTDOWN_TIMEOUT_SECONDS)
 
-        if 'payload' in log_values:
-            log.payload = log_values['payload']
+    def flush_logs(self) -> None:
+        self._log_buffer.flush()
 
-        if 'time' in log_values:
-            log.time = log_values['time']
+    def get_log_buffer_stats(self) -> Dict[str, int]:
+        return self._log_buffer.get_stats()
 
-        if not self._log_repository_instance.save(log):
-            print(log_values)
-            return Constants.RESPONSE_MESSAGE_ERROR
+    def invalidate_device_group_cache(self, product_key: str) -> None:
+        self._device_group_id_cache.invalidate(product_key)
 
-        return Constants.RESPONSE_MESSAGE_CREATED
+    def _get_device_group_id(self, product_key: str) -> Optional[int]:
+        device_group_id = self._device_group_id_cache.get(product_key)
+
+        if device_group_id is None:
+            device_group = self._device_group_repository_instance.get_device_group_by_product_key(product_key)
+
+            if device_group is None:
+                return None
+
+            device_group_id = device_group.id
+            self._device_group_id_cache.set(product_key, device_group_id)
+
+        return device_group_id
+
+    def _write_logs(self, logs: List[dict]) -> int:
+        if self._log_repository_instance.save_logs(logs):
+            return len(logs)
+
+        # A single invalid log, e.g. of a device group deleted in the meantime, must not discard the whole batch
+        written_logs = 0
+        for log in logs:
+            if len(logs) > 1 and self._log_repository_instance.save_logs([log]):
+                written_logs += 1
+            else:
+                print(log)
+
+        return written_logs
 
     def get_log_values_for_device_group(
             self,
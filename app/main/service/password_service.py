@@ -0,0 +1,112 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any
+from typing import Callable
+from typing import Optional
+
+import flask_bcrypt
+
+from app.main.util.constants import Constants
+
+
+def _generate_password_hash(password: str, rounds: int) -> str:
+    return flask_bcrypt.generate_password_hash(password, rounds).decode('utf-8')
+
+
+def _check_password_hash(password_hash: str, password: str) -> bool:
+    try:
+        return flask_bcrypt.check_password_hash(password_hash, password)
+    except ValueError:
+        return False
+
+
+class PasswordService:
+    """
+    Hashes and checks passwords with bcrypt in a pool of processes, so that request threads only wait for results.
+
+    At most PASSWORD_HASHING_QUEUE_MAX_SIZE hashes are queued or running at once, calls over the limit and calls
+    which time out return None instead of stalling the worker. Passwords are hashed in the request thread
+    when PASSWORD_HASHING_WORKERS is 0.
+    """
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+
+        return cls._instance
+
+    def __init__(self):
+        self._executor = None
+        self._executor_pid = None
+        self._executor_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(Constants.PASSWORD_HASHING_QUEUE_MAX_SIZE)
+
+    def generate_password_hash(self, password: str) -> Optional[str]:
+        return self._run(_generate_password_hash, password, Constants.PASSWORD_HASHING_ROUNDS)
+
+    def check_password_hash(self, password_hash: str, password: str) -> Optional[bool]:
+        return self._run(_check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """ Returns True if the bcrypt hash was generated with a cost factor different than the configured one """
+        try:
+            rounds = int(password_hash.split('$')[2])
+        except (AttributeError, IndexError, ValueError):
+            return False
+
+        return rounds != Constants.PASSWORD_HASHING_ROUNDS
+
+    def shutdown(self) -> None:
+        with self._executor_lock:
+            if self._executor is not None and self._executor_pid == os.getpid():
+                self._executor.shutdown()
+
+            self._executor = None
+            self._executor_pid = None
+
+    def _run(self, function: Callable[..., Any], *args) -> Optional[Any]:
+        if Constants.PASSWORD_HASHING_WORKERS <= 0:
+            return function(*args)
+
+        if not self._slots.acquire(blocking=False):
+            return None
+
+        try:
+            future = self._get_executor().submit(function, *args)
+        except (BrokenProcessPool, RuntimeError):
+            self._slots.release()
+            self.shutdown()
+            return None
+
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            return future.result(timeout=Constants.PASSWORD_HASHING_TIMEOUT_SECONDS)
+        except TimeoutError:
+            return None
+        except BrokenProcessPool:
+            self.shutdown()
+            return None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """
+        Creates the pool on first use in every process, pools are not inherited by forked server workers.
+        Processes of the pool are started by a fork server when possible, so that they are not forked from threads
+        of the server worker holding database connections.
+        """
+        with self._executor_lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+                self._executor = ProcessPoolExecutor(
+                    max_workers=Constants.PASSWORD_HASHING_WORKERS,
+                    mp_context=multiprocessing.get_context(start_method)
+                )
+                self._executor_pid = os.getpid()
+
+            return self._executor
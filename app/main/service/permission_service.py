@@ -0,0 +1,99 @@
+from collections import namedtuple
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import Optional
+
+from app.main.model.device_group import DeviceGroup
+from app.main.repository.device_group_repository import DeviceGroupRepository
+from app.main.repository.user_group_repository import UserGroupRepository
+from app.main.util.cache import TTLCache
+from app.main.util.constants import Constants
+
+UserAccess = namedtuple('UserAccess', ['device_group_ids', 'master_device_group_ids', 'user_group_ids'])
+
+
+class PermissionService:
+    """
+    Process-wide cache of device groups and user groups which users belong to.
+
+    All memberships of a user are loaded with a single query into sets, so that permission checks are set lookups.
+    Entries are invalidated when users join user groups and when user groups are deleted. Memberships created
+    in other processes are picked up by loading memberships of the user again when a check fails.
+    """
+    _instance = None
+
+    _device_group_repository_instance = None
+    _user_group_repository_instance = None
+
+    _user_access_cache = TTLCache(Constants.USER_ACCESS_CACHE_MAX_SIZE, Constants.USER_ACCESS_CACHE_TTL_SECONDS)
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+
+        return cls._instance
+
+    def __init__(self):
+        self._device_group_repository_instance = DeviceGroupRepository.get_instance()
+        self._user_group_repository_instance = UserGroupRepository.get_instance()
+
+    def get_user_access(self, user_id: str) -> UserAccess:
+        user_access = self._user_access_cache.get(user_id)
+
+        if user_access is None:
+            user_access = self.load_user_access(user_id)
+
+        return user_access
+
+    def load_user_access(self, user_id: str) -> UserAccess:
+        memberships = self._user_group_repository_instance.get_user_group_memberships_by_user_id(user_id)
+
+        user_access = UserAccess(
+            frozenset(device_group_id for _, device_group_id, _ in memberships),
+            frozenset(device_group_id for _, device_group_id, name in memberships if name == 'Master'),
+            frozenset(user_group_id for user_group_id, _, _ in memberships)
+        )
+        self._user_access_cache.set(user_id, user_access)
+
+        return user_access
+
+    def get_master_user_device_group(self, user_id: str, product_key: str) -> Optional[DeviceGroup]:
+        """ Returns the device group if the user belongs to its master user group """
+        device_group = self._device_group_repository_instance.get_device_group_by_product_key(product_key)
+
+        if device_group is None or not self.is_master_user_of_device_group(user_id, device_group.id):
+            return None
+
+        return device_group
+
+    def is_master_user_of_device_group(self, user_id: str, device_group_id: int) -> bool:
+        return self._has_access(user_id, lambda user_access: device_group_id in user_access.master_device_group_ids)
+
+    def is_user_in_device_group(self, user_id: str, device_group_id: int) -> bool:
+        return self._has_access(user_id, lambda user_access: device_group_id in user_access.device_group_ids)
+
+    def is_user_in_user_group(self, user_id: str, user_group_id: int) -> bool:
+        return self._has_access(user_id, lambda user_access: user_group_id in user_access.user_group_ids)
+
+    def invalidate_user_access(self, user_id: str) -> None:
+        self._user_access_cache.invalidate(user_id)
+
+    def invalidate_users_access(self, user_ids: Iterable[str]) -> None:
+        for user_id in user_ids:
+            self.invalidate_user_access(user_id)
+
+    def get_user_access_cache_stats(self) -> Dict[str, int]:
+        return self._user_access_cache.get_stats()
+
+    def _has_access(self, user_id: str, is_allowed: Callable[[UserAccess], bool]) -> bool:
+        if user_id is None:
+            return False
+
+        user_access = self._user_access_cache.get(user_id)
+
+        if user_access is not None and is_allowed(user_access):
+            return True
+
+        return is_allowed(self.load_user_access(user_id))
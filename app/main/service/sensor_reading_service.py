@@ -0,0 +1,117 @@
+# pylint: disable=no-self-use
+import re
+from datetime import date
+from typing import Optional
+from typing import Tuple
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.main.repository.sensor_reading_repository import SensorReadingRepository
+from app.main.util.constants import Constants
+
+
+class SensorReadingService:
+    _instance = None
+
+    _sensor_reading_repository_instance = None
+
+    _partition_name_pattern = re.compile(r'^sensor_reading_y(\d{4})m(\d{2})$')
+    _default_partition_name = 'sensor_reading_default'
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+
+        return cls._instance
+
+    def __init__(self):
+        self._sensor_reading_repository_instance = SensorReadingRepository.get_instance()
+
+    def maintain_sensor_readings_storage(
+            self,
+            retention_months: int,
+            partitions_ahead: int,
+            today: Optional[date] = None) -> Tuple[str, Optional[dict]]:
+        """
+        Creates monthly partitions for upcoming readings and removes readings older than retention period.
+        Expired readings are removed by dropping whole partitions and deleting rows of the default partition,
+        databases without partitioning support fall back to deleting rows.
+        """
+        if retention_months is None or retention_months < 1 or partitions_ahead is None or partitions_ahead < 0:
+            return Constants.RESPONSE_MESSAGE_BAD_REQUEST, None
+
+        if today is None:
+            today = date.today()
+
+        current_month_start = date(today.year, today.month, 1)
+        retention_start = self._add_months(current_month_start, -retention_months)
+
+        created_partitions = []
+        dropped_partitions = []
+        deleted_readings = 0
+
+        if self._sensor_reading_repository_instance.is_partitioned_storage_supported():
+            try:
+                partition_names = set(self._sensor_reading_repository_instance.get_sensor_reading_partition_names())
+                default_partition_name = \
+                    self._default_partition_name if self._default_partition_name in partition_names else None
+
+                for month_offset in range(partitions_ahead + 1):
+                    month_start = self._add_months(current_month_start, month_offset)
+                    partition_name = self.get_partition_name(month_start)
+
+                    if partition_name not in partition_names:
+                        self._sensor_reading_repository_instance.create_sensor_reading_partition_but_do_not_commit(
+                            partition_name,
+                            month_start,
+                            self._add_months(month_start, 1),
+                            default_partition_name
+                        )
+                        created_partitions.append(partition_name)
+
+                for partition_name in sorted(partition_names):
+                    month_start = self._get_partition_month_start(partition_name)
+
+                    if month_start is not None and self._add_months(month_start, 1) <= retention_start:
+                        self._sensor_reading_repository_instance.drop_sensor_reading_partition_but_do_not_commit(
+                            partition_name
+                        )
+                        dropped_partitions.append(partition_name)
+
+                # Readings of months without partitions are kept in the default partition until they expire
+                if default_partition_name is not None:
+                    deleted_readings = self._sensor_reading_repository_instance. \
+                        delete_partition_readings_older_than_but_do_not_commit(default_partition_name, retention_start)
+            except SQLAlchemyError:
+                self._sensor_reading_repository_instance.rollback_session()
+                return Constants.RESPONSE_MESSAGE_ERROR, None
+        else:
+            deleted_readings = \
+                self._sensor_reading_repository_instance.delete_sensor_readings_older_than_but_do_not_commit(
+                    retention_start
+                )
+
+        if not self._sensor_reading_repository_instance.update_database():
+            return Constants.RESPONSE_MESSAGE_ERROR, None
+
+        return Constants.RESPONSE_MESSAGE_OK, {
+            'createdPartitions': created_partitions,
+            'droppedPartitions': dropped_partitions,
+            'deletedReadings': deleted_readings
+        }
+
+    def get_partition_name(self, month_start: date) -> str:
+        return 'sensor_reading_y{:04d}m{:02d}'.format(month_start.year, month_start.month)
+
+    def _get_partition_month_start(self, partition_name: str) -> Optional[date]:
+        match = self._partition_name_pattern.match(partition_name)
+
+        if not match:
+            return None
+
+        return date(int(match.group(1)), int(match.group(2)), 1)
+
+    def _add_months(self, month_start: date, months: int) -> date:
+        month_index = month_start.year * 12 + month_start.month - 1 + months
+        return date(month_index // 12, month_index % 12 + 1, 1)
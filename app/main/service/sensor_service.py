@@ -1,10 +1,13 @@
 # pylint: disable=no-self-use
+import re
 from datetime import datetime
+from datetime import timedelta
 from typing import List
 from typing import Optional
 from typing import Tuple
 
 from app.main.model.deleted_device import DeletedDevice
+from app.main.model.reading_enumerator import ReadingEnumerator
 from app.main.model.sensor import Sensor
 from app.main.model.sensor_reading import SensorReading
 from app.main.model.sensor_type import SensorType
@@ -12,16 +15,27 @@ from app.main.model.user import User
 from app.main.model.user_group import UserGroup
 from app.main.repository.admin_repository import AdminRepository
 from app.main.repository.deleted_device_repository import DeletedDeviceRepository
+from app.main.repository.device_change_repository import DeviceChangeRepository
 from app.main.repository.device_group_repository import DeviceGroupRepository
-from app.main.repository.reading_enumerator_repository import ReadingEnumeratorRepository
 from app.main.repository.sensor_reading_repository import SensorReadingRepository
+from app.main.repository.sensor_reading_rollup_repository import SensorReadingRollupRepository
 from app.main.repository.sensor_repository import SensorRepository
 from app.main.repository.sensor_type_repository import SensorTypeRepository
 from app.main.repository.unconfigured_device_repository import UnconfiguredDeviceRepository
 from app.main.repository.user_group_repository import UserGroupRepository
 from app.main.repository.user_repository import UserRepository
+from app.main.service.permission_service import PermissionService
+from app.main.service.type_registry_service import SensorTypeMetadata
+from app.main.service.type_registry_service import TypeRegistryService
+from app.main.util.change_notifier import ChangeNotifier
 from app.main.util.constants import Constants
+from app.main.util.reading_downsampling import get_bucket_start
+from app.main.util.reading_downsampling import get_lttb_readings
+from app.main.util.reading_downsampling import get_reading_buckets
 from app.main.util.utils import is_bool
+from app.main.util.utils import parse_date
+from app.main.util.value_validation import get_validity_mask
+from app.main.util.value_validation import get_value_rule
 
 
 class SensorService:
@@ -35,6 +49,14 @@ class SensorService:
     _sensor_reading_repository = None
     _unconfigured_device_repository = None
     _admin_repository = None
+    _sensor_reading_rollup_repository_instance = None
+
+    _resolution_pattern = re.compile(r'^(\d+)([mhd])$')
+    _resolution_units = {
+        'm': timedelta(minutes=1),
+        'h': timedelta(hours=1),
+        'd': timedelta(days=1)
+    }
 
     @classmethod
     def get_instance(cls):
@@ -46,7 +68,6 @@ class SensorService:
     def __init__(self):
         self._user_repository = UserRepository.get_instance()
         self._sensor_reading_repository = SensorReadingRepository.get_instance()
-        self._reading_enumerator_repository_instance = ReadingEnumeratorRepository.get_instance()
         self._sensor_reading_repository_instance = SensorReadingRepository.get_instance()
         self._deleted_device_repository_instance = DeletedDeviceRepository.get_instance()
         self._device_group_repository_instance = DeviceGroupRepository.get_instance()
@@ -55,6 +76,11 @@ class SensorService:
         self._sensor_type_repository_instance = SensorTypeRepository.get_instance()
         self._unconfigured_device_repository = UnconfiguredDeviceRepository.get_instance()
         self._admin_repository = AdminRepository.get_instance()
+        self._sensor_reading_rollup_repository_instance = SensorReadingRollupRepository.get_instance()
+        self._device_change_repository_instance = DeviceChangeRepository.get_instance()
+        self._type_registry_service_instance = TypeRegistryService.get_instance()
+        self._change_notifier_instance = ChangeNotifier.get_instance()
+        self._permission_service_instance = PermissionService.get_instance()
 
     def get_sensor_info(self, device_key: str, product_key: str, user_id: str, is_admin: bool) -> Tuple[
         bool, Optional[dict]]:
@@ -85,19 +111,13 @@ class SensorService:
 
         if sensor.user_group_id is not None:
             if is_admin is False:
-
-                user_group = self._user_group_repository.get_user_group_by_user_id_and_sensor_device_key(
-                    user_id,
-                    device_key
-                )
-
-                if not user_group and sensor.user_group_id is not None:
+                if not self._permission_service_instance.is_user_in_user_group(user_id, sensor.user_group_id):
                     return Constants.RESPONSE_MESSAGE_USER_DOES_NOT_HAVE_PRIVILEGES, None
             else:
                 if device_group.admin_id != user_id:
                     return Constants.RESPONSE_MESSAGE_USER_DOES_NOT_HAVE_PRIVILEGES, None
 
-                user_group = self._user_group_repository.get_user_group_by_id(sensor.user_group_id)
+            user_group = self._user_group_repository.get_user_group_by_id(sensor.user_group_id)
 
         senor_info = {}
         senor_info['name'] = sensor.name
@@ -105,7 +125,10 @@ class SensorService:
         senor_info['isActive'] = sensor.is_active
         senor_info['isAssigned'] = sensor.is_assigned
         senor_info['deviceKey'] = sensor.device_key
-        sensor_type = self._sensor_type_repository_instance.get_sensor_type_by_id(sensor.sensor_type_id)
+        sensor_type = self._type_registry_service_instance.get_sensor_type(
+            sensor.device_group_id,
+            sensor.sensor_type_id
+        )
         senor_info['sensorTypeName'] = sensor_type.name
 
         if user_group:
@@ -150,8 +173,14 @@ class SensorService:
         )
 
         self._sensor_repository_instance.delete_but_do_not_commit(sensor)
+        self._device_change_repository_instance.add_device_change_but_do_not_commit(
+            device_group.id,
+            sensor.device_key,
+            is_deleted=True
+        )
 
         if self._deleted_device_repository_instance.save(deleted_device):
+            self._change_notifier_instance.notify(product_key)
             return Constants.RESPONSE_MESSAGE_OK
         else:
             return Constants.RESPONSE_MESSAGE_ERROR
@@ -210,11 +239,7 @@ class SensorService:
             if device_group.admin_id != user_id:
                 return Constants.RESPONSE_MESSAGE_USER_DOES_NOT_HAVE_PRIVILEGES, None
         else:
-            users_device_group = self._device_group_repository_instance.get_device_group_by_user_id_and_product_key(
-                user_id,
-                product_key)
-
-            if not users_device_group:
+            if not self._permission_service_instance.is_master_user_of_device_group(user_id, device_group.id):
                 return Constants.RESPONSE_MESSAGE_USER_DOES_NOT_HAVE_PRIVILEGES, None
         values = []
 
@@ -301,8 +326,142 @@ class SensorService:
 
         return Constants.RESPONSE_MESSAGE_CREATED
 
-    def get_sensor_readings(self, device_key: str, product_key: str, user_id: str) -> Tuple[
-        bool, Optional[dict]]:
+    def get_sensor_readings(
+            self,
+            device_key: str,
+            product_key: str,
+            user_id: str,
+            date_from: Optional[str] = None,
+            date_to: Optional[str] = None,
+            cursor: Optional[str] = None,
+            limit: Optional[str] = None,
+            mode: Optional[str] = None) -> Tuple[bool, Optional[dict]]:
+        """
+        Returns readings of the sensor from [date_from, date_to).
+        In 'raw' mode readings are returned newest first in pages of at most limit readings, 'nextCursor' points
+        to the next page. Modes 'buckets' and 'lttb' return chronologically ordered series downsampled to at most
+        limit points.
+        """
+        if not product_key:
+            return Constants.RESPONSE_MESSAGE_PRODUCT_KEY_NOT_FOUND, None
+
+        if not device_key:
+            return Constants.RESPONSE_MESSAGE_DEVICE_KEY_NOT_FOUND, None
+
+        if not user_id:
+            return Constants.RESPONSE_MESSAGE_USER_NOT_DEFINED, None
+
+        if mode is None:
+            mode = 'raw'
+
+        if mode == 'raw':
+            limit_value = self._get_limit_value(
+                limit,
+                Constants.SENSOR_READINGS_PAGE_SIZE,
+                Constants.SENSOR_READINGS_MAX_PAGE_SIZE)
+        elif mode in ('buckets', 'lttb'):
+            limit_value = self._get_limit_value(
+                limit,
+                Constants.SENSOR_READINGS_DOWNSAMPLING_POINTS,
+                Constants.SENSOR_READINGS_MAX_DOWNSAMPLING_POINTS)
+        else:
+            return Constants.RESPONSE_MESSAGE_BAD_REQUEST, None
+
+        parsed_date_from = parse_date(date_from) if date_from is not None else None
+        parsed_date_to = parse_date(date_to) if date_to is not None else None
+        parsed_cursor = self._parse_reading_cursor(cursor) if cursor is not None else None
+
+        if (limit_value is None or
+                (date_from is not None and parsed_date_from is None) or
+                (date_to is not None and parsed_date_to is None) or
+                (cursor is not None and parsed_cursor is None) or
+                (parsed_date_from and parsed_date_to and parsed_date_from >= parsed_date_to)):
+            return Constants.RESPONSE_MESSAGE_BAD_REQUEST, None
+
+        error_message, sensor = self._get_sensor_readable_by_user(device_key, product_key, user_id)
+
+        if error_message is not None:
+            return error_message, None
+
+        sensor_type = self._type_registry_service_instance.get_sensor_type(
+            sensor.device_group_id,
+            sensor.sensor_type_id
+        )
+
+        if sensor_type is None:
+            return Constants.RESPONSE_MESSAGE_SENSOR_TYPE_NOT_FOUND, None
+
+        if mode == 'buckets' and sensor_type.reading_type == 'Enum':
+            return Constants.RESPONSE_MESSAGE_BAD_REQUEST, None
+
+        sensor_readings_response = {
+            'sensorName': sensor.name
+        }
+
+        if mode == 'raw':
+            sensor_readings = self._sensor_reading_repository_instance.get_sensor_readings_page_by_sensor_id(
+                sensor.id,
+                parsed_date_from,
+                parsed_date_to,
+                parsed_cursor,
+                limit_value + 1
+            )
+
+            next_cursor = None
+            if len(sensor_readings) > limit_value:
+                sensor_readings = sensor_readings[:limit_value]
+                next_cursor = self._get_reading_cursor(sensor_readings[-1])
+
+            sensor_readings_response['values'] = [
+                {
+                    'value': self.get_type_reading_value(sensor_type, sensor_reading.value),
+                    'date': str(sensor_reading.date)
+                } for sensor_reading in sensor_readings
+            ]
+            sensor_readings_response['nextCursor'] = next_cursor
+        else:
+            dates_and_values = \
+                self._sensor_reading_repository_instance.get_sensor_reading_dates_and_values_by_sensor_id(
+                    sensor.id,
+                    parsed_date_from,
+                    parsed_date_to
+                )
+
+            if mode == 'buckets':
+                values = []
+                if dates_and_values:
+                    values = get_reading_buckets(
+                        dates_and_values,
+                        parsed_date_from or dates_and_values[0][0],
+                        parsed_date_to or dates_and_values[-1][0] + timedelta(microseconds=1),
+                        limit_value
+                    )
+            else:
+                values = [
+                    {
+                        'value': self.get_type_reading_value(sensor_type, reading_value),
+                        'date': str(reading_date)
+                    } for reading_date, reading_value in get_lttb_readings(dates_and_values, limit_value)
+                ]
+
+            sensor_readings_response['values'] = values
+
+        return Constants.RESPONSE_MESSAGE_OK, sensor_readings_response
+
+    def get_sensor_reading_aggregates(
+            self,
+            device_key: str,
+            product_key: str,
+            user_id: str,
+            date_from: Optional[str],
+            date_to: Optional[str],
+            resolution: Optional[str]) -> Tuple[bool, Optional[dict]]:
+        """
+        Returns min/max/avg/count of the sensor readings in buckets of the requested resolution (aligned to the Unix
+        epoch) that start in [date_from, date_to), the last bucket aggregates readings until date_to. Buckets are
+        computed from the coarsest rollup table that the resolution is a multiple of, the resolution must not be
+        longer than the requested range.
+        """
         if not product_key:
             return Constants.RESPONSE_MESSAGE_PRODUCT_KEY_NOT_FOUND, None
 
@@ -312,6 +471,83 @@ class SensorService:
         if not user_id:
             return Constants.RESPONSE_MESSAGE_USER_NOT_DEFINED, None
 
+        parsed_date_from = parse_date(date_from)
+        parsed_date_to = parse_date(date_to)
+        resolution_value = self._parse_resolution(resolution)
+
+        if (parsed_date_from is None or
+                parsed_date_to is None or
+                resolution_value is None or
+                parsed_date_from >= parsed_date_to or
+                resolution_value > parsed_date_to - parsed_date_from or
+                (parsed_date_to - parsed_date_from) / resolution_value >
+                Constants.SENSOR_READINGS_MAX_DOWNSAMPLING_POINTS):
+            return Constants.RESPONSE_MESSAGE_BAD_REQUEST, None
+
+        error_message, sensor = self._get_sensor_readable_by_user(device_key, product_key, user_id)
+
+        if error_message is not None:
+            return error_message, None
+
+        sensor_type = self._type_registry_service_instance.get_sensor_type(
+            sensor.device_group_id,
+            sensor.sensor_type_id
+        )
+
+        if sensor_type is None:
+            return Constants.RESPONSE_MESSAGE_SENSOR_TYPE_NOT_FOUND, None
+
+        if sensor_type.reading_type == 'Enum':
+            return Constants.RESPONSE_MESSAGE_BAD_REQUEST, None
+
+        rollup_model = [
+            rollup_model for rollup_model in self._sensor_reading_rollup_repository_instance.rollup_models
+            if resolution_value % rollup_model.resolution == timedelta(0)
+        ][-1]
+
+        first_bucket_start = get_bucket_start(parsed_date_from, resolution_value)
+        if first_bucket_start < parsed_date_from:
+            first_bucket_start += resolution_value
+
+        rollups = self._sensor_reading_rollup_repository_instance.get_sensor_reading_rollups_by_sensor_id(
+            rollup_model,
+            sensor.id,
+            first_bucket_start,
+            parsed_date_to
+        )
+
+        buckets = {}
+        for rollup in rollups:
+            bucket_start = get_bucket_start(rollup.date, resolution_value)
+            bucket = buckets.get(bucket_start)
+
+            if bucket is None:
+                buckets[bucket_start] = [rollup.min_value, rollup.max_value, rollup.sum_value, rollup.count]
+            else:
+                bucket[0] = min(bucket[0], rollup.min_value)
+                bucket[1] = max(bucket[1], rollup.max_value)
+                bucket[2] += rollup.sum_value
+                bucket[3] += rollup.count
+
+        return Constants.RESPONSE_MESSAGE_OK, {
+            'sensorName': sensor.name,
+            'resolution': resolution,
+            'values': [
+                {
+                    'date': str(bucket_start),
+                    'min': bucket[0],
+                    'max': bucket[1],
+                    'avg': bucket[2] / bucket[3],
+                    'count': bucket[3]
+                } for bucket_start, bucket in sorted(buckets.items())
+            ]
+        }
+
+    def _get_sensor_readable_by_user(
+            self,
+            device_key: str,
+            product_key: str,
+            user_id: str) -> Tuple[Optional[str], Optional[Sensor]]:
         device_group = self._device_group_repository_instance.get_device_group_by_product_key(product_key)
 
         if not device_group:
@@ -325,77 +561,174 @@ class SensorService:
         if not sensor:
             return Constants.RESPONSE_MESSAGE_DEVICE_KEY_NOT_FOUND, None
 
-        user_group = self._user_group_repository.get_user_group_by_user_id_and_sensor_device_key(user_id, device_key)
-
-        if not user_group and sensor.user_group_id is not None:
+        if sensor.user_group_id is not None and \
+                not self._permission_service_instance.is_user_in_user_group(user_id, sensor.user_group_id):
             return Constants.RESPONSE_MESSAGE_USER_DOES_NOT_HAVE_PRIVILEGES, None
 
-        sensor_readings = self._sensor_reading_repository_instance.get_sensor_readings_by_sensor_id(sensor.id)
+        return None, sensor
 
-        sensor_readings_values = []
-        for sensor_reading in sensor_readings:
-            sensor_readings_values.append({
-                'value': self.get_senor_reading_value(sensor, sensor_reading),
-                'date': str(sensor_reading.date)
-            })
+    def _parse_resolution(self, resolution: Optional[str]) -> Optional[timedelta]:
+        match = self._resolution_pattern.match(resolution) if isinstance(resolution, str) else None
 
-        sensor_readings_response = {
-            'sensorName': sensor.name,
-            'values': sensor_readings_values
+        if not match or int(match.group(1)) < 1:
+            return None
+
+        try:
+            return int(match.group(1)) * self._resolution_units[match.group(2)]
+        except OverflowError:
+            return None
+
+    def _get_limit_value(self, limit: Optional[str], default_limit: int, max_limit: int) -> Optional[int]:
+        if limit is None:
+            return default_limit
+
+        try:
+            limit_value = int(limit)
+        except (TypeError, ValueError):
+            return None
+
+        if limit_value < 1 or limit_value > max_limit:
+            return None
+
+        return limit_value
+
+    def _get_reading_cursor(self, sensor_reading: SensorReading) -> str:
+        return '{},{}'.format(sensor_reading.date.isoformat(), sensor_reading.id)
+
+    def _parse_reading_cursor(self, cursor: str) -> Optional[Tuple[datetime, int]]:
+        cursor_date, _, cursor_id = cursor.rpartition(',')
+        parsed_cursor_date = parse_date(cursor_date)
+
+        if parsed_cursor_date is None or not cursor_id.isdigit():
+            return None
+
+        return parsed_cursor_date, int(cursor_id)
+
+    def set_sensors_readings(self, device_group_id, sensors_readings: List[dict]) -> Tuple[bool, List[dict]]:
+        """
+        Function returns:
+            success status of the database update,
+            list of values that were rejected
+        """
+        wrong_sensors_readings = []
+        correct_sensors_readings = []
+
+        for values in sensors_readings:
+            if (not isinstance(values, dict) or
+                    'deviceKey' not in values or
+                    'readingValue' not in values or
+                    'isActive' not in values):
+                wrong_sensors_readings.append(values)
+            else:
+                correct_sensors_readings.append(values)
+
+        if not correct_sensors_readings:
+            return True, wrong_sensors_readings
+
+        sensors = self._sensor_repository_instance.get_sensors_by_device_group_id_and_device_keys(
+            device_group_id,
+            list({values['deviceKey'] for values in correct_sensors_readings})
+        )
+        sensor_by_device_key = {sensor.device_key: sensor for sensor in sensors}
+
+        sensor_types = [
+            self._type_registry_service_instance.get_sensor_type(device_group_id, sensor_type_id)
+            for sensor_type_id in {sensor.sensor_type_id for sensor in sensors}
+        ]
+
+        rule_by_sensor_type_id = {
+            sensor_type.id: get_value_rule(
+                sensor_type.reading_type,
+                sensor_type.range_min,
+                sensor_type.range_max,
+                sensor_type.text_by_number.keys()
+            ) for sensor_type in sensor_types if sensor_type is not None
         }
 
-        return Constants.RESPONSE_MESSAGE_OK, sensor_readings_response
+        sensors_of_readings = [sensor_by_device_key.get(values['deviceKey']) for values in correct_sensors_readings]
+        validity_mask = get_validity_mask(
+            [values['readingValue'] for values in correct_sensors_readings],
+            [
+                rule_by_sensor_type_id.get(sensor.sensor_type_id) if sensor else None
+                for sensor in sensors_of_readings
+            ]
+        )
 
-    def set_sensor_reading(self, device_group_id, values: dict) -> bool:
-        if (not isinstance(values, dict) or
-                'deviceKey' not in values or
-                'readingValue' not in values or
-                'isActive' not in values):
-            return False
+        reading_date = datetime.utcnow()
+        sensor_readings = []
 
-        device_key = values['deviceKey']
-        reading_value = values['readingValue']
-        is_active = values['isActive']
+        for values, sensor, is_valid in zip(correct_sensors_readings, sensors_of_readings, validity_mask):
+            if sensor is None or sensor.sensor_type_id not in rule_by_sensor_type_id:
+                wrong_sensors_readings.append(values)
+                continue
 
-        sensor = self._sensor_repository_instance.get_sensor_by_device_key_and_device_group_id(device_key,
-                                                                                               device_group_id)
-        if not sensor:
-            return False
+            is_active = values['isActive']
+            reading_value = values['readingValue']
 
-        sensor_type = self._sensor_type_repository_instance.get_sensor_type_by_id(sensor.sensor_type_id)
+            if is_active:
+                if not is_valid:
+                    wrong_sensors_readings.append(values)
+                    continue
 
-        if not sensor_type:
-            return False
+                sensor_readings.append(
+                    {
+                        'value': reading_value,
+                        'date': reading_date,
+                        'sensor_id': sensor.id
+                    }
+                )
+                sensor.last_reading_value = reading_value
+                sensor.last_reading_date = reading_date
+
+            sensor.is_active = is_active
+
+        if sensor_readings:
+            if not self._sensor_reading_repository_instance.save_sensor_readings_but_do_not_commit(sensor_readings):
+                return False, wrong_sensors_readings
 
-        if is_active:
-            if not self.reading_in_range(reading_value, sensor_type):
-                return False
+            if not self._sensor_reading_rollup_repository_instance.update_sensor_reading_rollups_but_do_not_commit(
+                    sensor_readings):
+                return False, wrong_sensors_readings
 
-            sensor_reading = SensorReading(value=reading_value, sensor_id=sensor.id, date=datetime.utcnow())
-            if not self._sensor_reading_repository_instance.save(sensor_reading):
-                return False
+        if not self._sensor_reading_repository_instance.update_database():
+            return False, wrong_sensors_readings
 
-        sensor.is_active = is_active
-        return self._sensor_repository_instance.update_database()
+        return True, wrong_sensors_readings
 
     def get_senor_reading_value(self, sensor: Sensor, sensor_reading: SensorReading = None):
-        sensor_type = self._sensor_type_repository_instance.get_sensor_type_by_id(sensor.sensor_type_id)
-        reading_type = sensor_type.reading_type
+        sensor_type = self._type_registry_service_instance.get_sensor_type(
+            sensor.device_group_id,
+            sensor.sensor_type_id
+        )
 
         if sensor_reading is None:
-            reading = self._sensor_reading_repository.get_last_reading_for_sensor_by_sensor_id(sensor.id)
-            if not reading:
-                return None
-            reading_value = reading.value
+            reading_value = sensor.last_reading_value
         else:
             reading_value = sensor_reading.value
 
+        return self.get_type_reading_value(sensor_type, reading_value)
+
+    def get_type_reading_value(self, sensor_type: SensorTypeMetadata, reading_value: Optional[float]):
+        if reading_value is None:
+            return None
+
+        if sensor_type.reading_type == 'Enum':
+            return sensor_type.text_by_number.get(int(reading_value))
+
+        return self.get_reading_return_value(sensor_type.reading_type, reading_value)
+
+    def get_reading_return_value(
+            self,
+            reading_type: str,
+            reading_value: Optional[float],
+            reading_enumerator: Optional[ReadingEnumerator] = None):
+        if reading_value is None:
+            return None
+
         reading_return_value = None
         if reading_type == 'Enum':
-            reading_return_value = \
-                self._reading_enumerator_repository_instance.get_reading_enumerator_by_sensor_type_id_and_number(
-                    sensor_type.id,
-                    int(reading_value)).text
+            if reading_enumerator is not None:
+                reading_return_value = reading_enumerator.text
         elif reading_type == 'Decimal':
             reading_return_value = float(reading_value)
         elif reading_type == 'Boolean':
@@ -438,11 +771,7 @@ class SensorService:
 
         if is_admin is not True:
 
-            users_device_group = self._device_group_repository_instance.get_device_group_by_user_id_and_product_key(
-                user_id,
-                product_key)
-
-            if not users_device_group:
+            if not self._permission_service_instance.is_master_user_of_device_group(user_id, device_group.id):
                 return Constants.RESPONSE_MESSAGE_USER_DOES_NOT_HAVE_PRIVILEGES, None
             user = self._user_repository.get_user_by_id(user_id)
         else:
@@ -491,8 +820,10 @@ class SensorService:
             return error_message, None
 
         sensor.is_updated = True
+        self._device_change_repository_instance.add_device_change_but_do_not_commit(device_group.id, sensor.device_key)
 
         if self._sensor_repository_instance.update_database():
+            self._change_notifier_instance.notify(product_key)
             executive_device_info = self._get_modified_sensor_info(
                 sensor, new_sensor_type, new_user_group)
 
@@ -544,11 +875,13 @@ class SensorService:
         error_message = None
         if is_admin is not True:
             if sensor.user_group_id is not None:
-                old_user_group = self._user_group_repository.get_user_group_by_id(sensor.user_group_id)
-                if old_user_group is not None and user not in old_user_group.users:
+                if user is None or \
+                        not self._permission_service_instance.is_user_in_user_group(user.id, sensor.user_group_id):
                     error_message = Constants.RESPONSE_MESSAGE_USER_DOES_NOT_HAVE_PRIVILEGES
 
-            if new_user_group is not None and user not in new_user_group.users:
+            if new_user_group is not None and (
+                    user is None or
+                    not self._permission_service_instance.is_user_in_user_group(user.id, new_user_group.id)):
                 error_message = Constants.RESPONSE_MESSAGE_USER_DOES_NOT_HAVE_PRIVILEGES
         if error_message is not None:
             return False, error_message
@@ -589,23 +922,23 @@ class SensorService:
         else:
             return False
 
-    def is_enum_reading_text_right(self, reading_text: str, sensor_type_id: str) -> bool:
+    def is_enum_reading_text_right(self, reading_text: str, sensor_type: SensorType) -> bool:
         if not isinstance(reading_text, str):
             return False
-        possible_readings = self._reading_enumerator_repository_instance.get_reading_enumerators_by_sensor_type_id(
-            sensor_type_id)
-        if reading_text in [possible_reading.text for possible_reading in possible_readings]:
-            return True
-        return False
+        sensor_type_metadata = self._type_registry_service_instance.get_sensor_type(
+            sensor_type.device_group_id,
+            sensor_type.id
+        )
+        return sensor_type_metadata is not None and reading_text in sensor_type_metadata.number_by_text
 
     def _is_enum_reading_right(self, reading_value: int, sensor_type: SensorType) -> bool:
         if isinstance(reading_value, str):
             return False
-        possible_readings = self._reading_enumerator_repository_instance.get_reading_enumerators_by_sensor_type_id(
-            sensor_type.id)
-        if reading_value in [possible_reading.number for possible_reading in possible_readings]:
-            return True
-        return False
+        sensor_type_metadata = self._type_registry_service_instance.get_sensor_type(
+            sensor_type.device_group_id,
+            sensor_type.id
+        )
+        return sensor_type_metadata is not None and reading_value in sensor_type_metadata.text_by_number
 
     def _is_decimal_reading_in_range(self, reading_value, sensor_type: SensorType) -> bool:
         if not isinstance(reading_value, (float, int)):
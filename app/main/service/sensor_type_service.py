@@ -12,9 +12,10 @@ from app.main.repository.sensor_repository import SensorRepository
 from app.main.repository.sensor_type_repository import SensorTypeRepository
 from app.main.repository.user_group_repository import UserGroupRepository
 from app.main.repository.user_repository import UserRepository
+from app.main.service.permission_service import PermissionService
+from app.main.service.type_registry_service import TypeRegistryService
 from app.main.util.constants import Constants
 from app.main.util.utils import is_dict_with_keys
-from app.main.util.utils import is_user_in_one_of_user_groups_in_device_group
 
 
 class SensorTypeService:
@@ -27,6 +28,7 @@ class SensorTypeService:
     _user_repository = None
     _admin_repository = None
     _user_group_repository = None
+    _type_registry_service_instance = None
 
     @classmethod
     def get_instance(cls):
@@ -43,6 +45,8 @@ class SensorTypeService:
         self._reading_enumerator_repository = ReadingEnumeratorRepository.get_instance()
         self._user_repository = UserRepository.get_instance()
         self._admin_repository = AdminRepository.get_instance()
+        self._type_registry_service_instance = TypeRegistryService.get_instance()
+        self._permission_service_instance = PermissionService.get_instance()
 
     def create_sensor_type_in_device_group(
             self,
@@ -116,8 +120,8 @@ class SensorTypeService:
             sensor_type.range_min = range_min
             sensor_type.range_max = range_max
 
-        if not self._sensor_type_repository_instance.save(sensor_type):
-            return Constants.RESPONSE_MESSAGE_ERROR
+        # The type is committed together with its enumerators, so that other processes never load it without them
+        self._sensor_type_repository_instance.save_but_do_not_commit(sensor_type)
 
         if enumerator and reading_type == 'Enum':
             for enum in enumerator:
@@ -125,12 +129,14 @@ class SensorTypeService:
                     reading_enum = ReadingEnumerator(
                         number=enum['number'],
                         text=enum['text'],
-                        sensor_type_id=sensor_type.id
+                        sensor_type=sensor_type
                     )
                     self._reading_enumerator_repository.save_but_do_not_commit(reading_enum)
 
-            if not self._reading_enumerator_repository.update_database():
-                return Constants.RESPONSE_MESSAGE_ERROR
+        if not self._sensor_type_repository_instance.update_database():
+            return Constants.RESPONSE_MESSAGE_ERROR
+
+        self._type_registry_service_instance.invalidate(device_group.id)
 
         return Constants.RESPONSE_MESSAGE_CREATED
 
@@ -158,7 +164,7 @@ class SensorTypeService:
             if not user:
                 return Constants.RESPONSE_MESSAGE_USER_NOT_DEFINED, None
 
-            if not is_user_in_one_of_user_groups_in_device_group(user, device_group):
+            if not self._permission_service_instance.is_user_in_device_group(user.id, device_group.id):
                 return Constants.RESPONSE_MESSAGE_USER_DOES_NOT_HAVE_PRIVILEGES, None
 
         else:
@@ -0,0 +1,186 @@
+import threading
+from collections import namedtuple
+from typing import Iterable
+from typing import Optional
+
+from app.main.model.executive_type import ExecutiveType
+from app.main.model.reading_enumerator import ReadingEnumerator
+from app.main.model.sensor_type import SensorType
+from app.main.model.state_enumerator import StateEnumerator
+from app.main.repository.executive_type_repository import ExecutiveTypeRepository
+from app.main.repository.reading_enumerator_repository import ReadingEnumeratorRepository
+from app.main.repository.sensor_type_repository import SensorTypeRepository
+from app.main.repository.state_enumerator_repository import StateEnumeratorRepository
+from app.main.util.cache import TTLCache
+from app.main.util.constants import Constants
+
+SensorTypeMetadata = namedtuple(
+    'SensorTypeMetadata',
+    ['id', 'name', 'reading_type', 'range_min', 'range_max', 'device_group_id', 'text_by_number', 'number_by_text']
+)
+ExecutiveTypeMetadata = namedtuple(
+    'ExecutiveTypeMetadata',
+    ['id', 'name', 'state_type', 'state_range_min', 'state_range_max', 'default_state', 'device_group_id',
+     'text_by_number', 'number_by_text']
+)
+DeviceGroupTypes = namedtuple('DeviceGroupTypes', ['version', 'sensor_types', 'executive_types'])
+
+
+def create_sensor_type_metadata(
+        sensor_type: SensorType,
+        reading_enumerators: Iterable[ReadingEnumerator]) -> SensorTypeMetadata:
+    text_by_number = {reading_enumerator.number: reading_enumerator.text for reading_enumerator in reading_enumerators}
+
+    return SensorTypeMetadata(
+        sensor_type.id,
+        sensor_type.name,
+        sensor_type.reading_type,
+        sensor_type.range_min,
+        sensor_type.range_max,
+        sensor_type.device_group_id,
+        text_by_number,
+        {text: number for number, text in text_by_number.items()}
+    )
+
+
+def create_executive_type_metadata(
+        executive_type: ExecutiveType,
+        state_enumerators: Iterable[StateEnumerator]) -> ExecutiveTypeMetadata:
+    text_by_number = {state_enumerator.number: state_enumerator.text for state_enumerator in state_enumerators}
+
+    return ExecutiveTypeMetadata(
+        executive_type.id,
+        executive_type.name,
+        executive_type.state_type,
+        executive_type.state_range_min,
+        executive_type.state_range_max,
+        executive_type.default_state,
+        executive_type.device_group_id,
+        text_by_number,
+        {text: number for number, text in text_by_number.items()}
+    )
+
+
+class TypeRegistryService:
+    """
+    Process-wide registry of sensor and executive types with their enumerators.
+
+    All types of a device group are loaded at once into immutable metadata with number to text maps of enumerators.
+    Every device group has a version in this process which is bumped by writes of types, a snapshot loaded while
+    the version changed is not stored. Types are committed together with their enumerators, types created in other
+    processes are picked up by reloading the device group when a type is not found.
+    """
+    _instance = None
+
+    _sensor_type_repository_instance = None
+    _reading_enumerator_repository_instance = None
+    _executive_type_repository_instance = None
+    _state_enumerator_repository_instance = None
+
+    _device_group_types_cache = TTLCache(
+        Constants.TYPE_REGISTRY_CACHE_MAX_SIZE,
+        Constants.TYPE_REGISTRY_CACHE_TTL_SECONDS
+    )
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+
+        return cls._instance
+
+    def __init__(self):
+        self._sensor_type_repository_instance = SensorTypeRepository.get_instance()
+        self._reading_enumerator_repository_instance = ReadingEnumeratorRepository.get_instance()
+        self._executive_type_repository_instance = ExecutiveTypeRepository.get_instance()
+        self._state_enumerator_repository_instance = StateEnumeratorRepository.get_instance()
+
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get_sensor_type(self, device_group_id: int, sensor_type_id: int) -> Optional[SensorTypeMetadata]:
+        sensor_type = self.get_device_group_types(device_group_id).sensor_types.get(sensor_type_id)
+
+        if sensor_type is None:
+            sensor_type = self._load_device_group_types(device_group_id).sensor_types.get(sensor_type_id)
+
+        return sensor_type
+
+    def get_executive_type(self, device_group_id: int, executive_type_id: int) -> Optional[ExecutiveTypeMetadata]:
+        executive_type = self.get_device_group_types(device_group_id).executive_types.get(executive_type_id)
+
+        if executive_type is None:
+            executive_type = self._load_device_group_types(device_group_id).executive_types.get(executive_type_id)
+
+        return executive_type
+
+    def get_device_group_types(self, device_group_id: int) -> DeviceGroupTypes:
+        device_group_types = self._device_group_types_cache.get(device_group_id)
+
+        if device_group_types is None:
+            device_group_types = self._load_device_group_types(device_group_id)
+
+        return device_group_types
+
+    def get_version(self, device_group_id: int) -> int:
+        with self._lock:
+            return self._versions.get(device_group_id, 0)
+
+    def invalidate(self, device_group_id: int) -> None:
+        with self._lock:
+            self._versions[device_group_id] = self._versions.get(device_group_id, 0) + 1
+            self._device_group_types_cache.invalidate(device_group_id)
+
+    def _load_device_group_types(self, device_group_id: int) -> DeviceGroupTypes:
+        version = self.get_version(device_group_id)
+
+        sensor_types = self._sensor_type_repository_instance.get_sensor_types_by_device_group_id(device_group_id)
+        enum_sensor_type_ids = [
+            sensor_type.id for sensor_type in sensor_types if sensor_type.reading_type == 'Enum'
+        ]
+        reading_enumerators = self._reading_enumerator_repository_instance.get_reading_enumerators_by_sensor_type_ids(
+            enum_sensor_type_ids
+        ) if enum_sensor_type_ids else []
+
+        executive_types = \
+            self._executive_type_repository_instance.get_executive_types_by_device_group_id(device_group_id)
+        enum_executive_type_ids = [
+            executive_type.id for executive_type in executive_types if executive_type.state_type == 'Enum'
+        ]
+        state_enumerators = self._state_enumerator_repository_instance.get_state_enumerators_by_executive_type_ids(
+            enum_executive_type_ids
+        ) if enum_executive_type_ids else []
+
+        reading_enumerators_by_sensor_type_id = {}
+        for reading_enumerator in reading_enumerators:
+            reading_enumerators_by_sensor_type_id.setdefault(reading_enumerator.sensor_type_id, []).append(
+                reading_enumerator
+            )
+
+        state_enumerators_by_executive_type_id = {}
+        for state_enumerator in state_enumerators:
+            state_enumerators_by_executive_type_id.setdefault(state_enumerator.executive_type_id, []).append(
+                state_enumerator
+            )
+
+        device_group_types = DeviceGroupTypes(
+            version,
+            {
+                sensor_type.id: create_sensor_type_metadata(
+                    sensor_type,
+                    reading_enumerators_by_sensor_type_id.get(sensor_type.id, ())
+                ) for sensor_type in sensor_types
+            },
+            {
+                executive_type.id: create_executive_type_metadata(
+                    executive_type,
+                    state_enumerators_by_executive_type_id.get(executive_type.id, ())
+                ) for executive_type in executive_types
+            }
+        )
+
+        with self._lock:
+            if self._versions.get(device_group_id, 0) == version:
+                self._device_group_types_cache.set(device_group_id, device_group_types)
+
+        return device_group_types
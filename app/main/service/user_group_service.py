@@ -10,6 +10,7 @@ from app.main.repository.sensor_type_repository import SensorTypeRepository
 from app.main.repository.user_group_repository import UserGroupRepository
 from app.main.repository.user_repository import UserRepository
 from app.main.service.executive_device_service import ExecutiveDeviceService
+from app.main.service.permission_service import PermissionService
 from app.main.service.sensor_service import SensorService
 from app.main.util.constants import Constants
 from app.main.util.utils import get_password_hash
@@ -51,6 +52,7 @@ class UserGroupService:
         self._reading_enumerator_repository = ReadingEnumeratorRepository.get_instance()
         self._executive_device_service = ExecutiveDeviceService.get_instance()
         self._admin_repository = AdminRepository.get_instance()
+        self._permission_service_instance = PermissionService.get_instance()
 
     def create_user_group_in_device_group(self, product_key: str, group_name: str, password: str, user_id: str) -> str:
         if not product_key:
@@ -65,10 +67,7 @@ class UserGroupService:
         if not user_id:
             return Constants.RESPONSE_MESSAGE_USER_NOT_DEFINED
 
-        device_group = self._device_group_repository_instance.get_device_group_by_user_id_and_product_key(
-            user_id,
-            product_key
-        )
+        device_group = self._permission_service_instance.get_master_user_device_group(user_id, product_key)
 
         if not device_group:
             return Constants.RESPONSE_MESSAGE_PRODUCT_KEY_NOT_FOUND
@@ -106,11 +105,7 @@ class UserGroupService:
 
         if is_admin is False:
 
-            users_device_group = self._device_group_repository_instance.get_device_group_by_user_id_and_product_key(
-                user_id,
-                product_key)
-
-            if not users_device_group:
+            if not self._permission_service_instance.is_master_user_of_device_group(user_id, device_group.id):
                 return Constants.RESPONSE_MESSAGE_USER_DOES_NOT_HAVE_PRIVILEGES, None
 
         else:
@@ -138,9 +133,11 @@ class UserGroupService:
             if user is None:
                 return Constants.RESPONSE_MESSAGE_USER_NOT_DEFINED, None
 
+            user_group_ids = self._permission_service_instance.get_user_access(user.id).user_group_ids
+
             for user_group in user_groups:
                 values = {'name': user_group.name,
-                          'isAssignedTo': user in user_group.users
+                          'isAssignedTo': user_group.id in user_group_ids
                           }
                 list_of_user_groups.append(values)
 
@@ -172,7 +169,10 @@ class UserGroupService:
         if not user_group:
             return Constants.RESPONSE_MESSAGE_USER_GROUP_NAME_NOT_FOUND
 
+        user_ids = [user.id for user in user_group.users]
+
         if self._user_group_repository.delete(user_group):
+            self._permission_service_instance.invalidate_users_access(user_ids)
             return Constants.RESPONSE_MESSAGE_OK
         else:
             return Constants.RESPONSE_MESSAGE_ERROR
@@ -205,7 +205,7 @@ class UserGroupService:
         if not user:
             return Constants.RESPONSE_MESSAGE_USER_NOT_DEFINED, None
 
-        if user not in user_group.users:
+        if not self._permission_service_instance.is_user_in_user_group(user.id, user_group.id):
             return Constants.RESPONSE_MESSAGE_USER_DOES_NOT_HAVE_PRIVILEGES, None
 
         executive_devices = self._executive_device_repository.get_executive_devices_by_user_group_id(user_group.id)
@@ -258,15 +258,21 @@ class UserGroupService:
         if not user:
             return Constants.RESPONSE_MESSAGE_USER_NOT_DEFINED, None
 
-        if user not in user_group.users:
+        if not self._permission_service_instance.is_user_in_user_group(user.id, user_group.id):
             return Constants.RESPONSE_MESSAGE_USER_DOES_NOT_HAVE_PRIVILEGES, None
 
-        sensors = self._sensor_repository.get_sensors_by_user_group_id(user_group.id)
+        sensors_with_last_readings = self._sensor_repository.get_sensors_with_last_readings_by_user_group_id(
+            user_group.id
+        )
 
         list_of_sensors_info = []
 
-        for sensor in sensors:
-            sensor_reading_value = self._sensor_service.get_senor_reading_value(sensor)
+        for sensor, sensor_type, reading_enumerator in sensors_with_last_readings:
+            sensor_reading_value = self._sensor_service.get_reading_return_value(
+                sensor_type.reading_type,
+                sensor.last_reading_value,
+                reading_enumerator
+            )
 
             sensor_info = {
                 "name": sensor.name,
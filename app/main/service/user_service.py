@@ -1,14 +1,16 @@
 from datetime import datetime
 from typing import Optional, Dict
 from typing import Tuple
+from typing import Union
 
-import flask_bcrypt
-
+from app.main.model.admin import Admin
 from app.main.model.user import User
 from app.main.repository.admin_repository import AdminRepository
 from app.main.repository.device_group_repository import DeviceGroupRepository
 from app.main.repository.user_group_repository import UserGroupRepository
 from app.main.repository.user_repository import UserRepository
+from app.main.service.password_service import PasswordService
+from app.main.service.permission_service import PermissionService
 from app.main.util.auth_utils import Auth
 from app.main.util.constants import Constants
 
@@ -21,6 +23,7 @@ class UserService:
     _admin_repository_instance = None
     _user_repository_instance = None
     _user_group_repository_instance = None
+    _password_service_instance = None
 
     @classmethod
     def get_instance(cls):
@@ -34,6 +37,8 @@ class UserService:
         self._admin_repository_instance = AdminRepository.get_instance()
         self._user_repository_instance = UserRepository.get_instance()
         self._user_group_repository_instance = UserGroupRepository.get_instance()
+        self._password_service_instance = PasswordService.get_instance()
+        self._permission_service_instance = PermissionService.get_instance()
 
     def create_auth_token(self, email: str, password: str) -> Tuple[str, Optional[Dict]]:
         user = self._user_repository_instance.get_user_by_email(email)
@@ -46,14 +51,17 @@ class UserService:
             if user is None:
                 return Constants.RESPONSE_MESSAGE_INVALID_CREDENTIALS, None
 
-        try:
-            is_password_correct = flask_bcrypt.check_password_hash(user.password, password)
-        except ValueError:
-            return Constants.RESPONSE_MESSAGE_INVALID_CREDENTIALS, None
+        is_password_correct = self._password_service_instance.check_password_hash(user.password, password)
+
+        if is_password_correct is None:
+            return Constants.RESPONSE_MESSAGE_SERVICE_UNAVAILABLE, None
 
         if not is_password_correct:
             return Constants.RESPONSE_MESSAGE_INVALID_CREDENTIALS, None
 
+        if self._password_service_instance.needs_rehash(user.password):
+            self._rehash_password(user, password, is_admin)
+
         token = Auth.encode_auth_token(user.id, is_admin)
 
         response = {"authToken": token, "isAdmin": is_admin, 'username': user.username}
@@ -70,7 +78,10 @@ class UserService:
         if self._admin_repository_instance.get_admin_by_email_or_username(email, username) is not None:
             return Constants.RESPONSE_MESSAGE_USER_ALREADY_EXISTS
 
-        password_hash = flask_bcrypt.generate_password_hash(password).decode('utf-8')
+        password_hash = self._password_service_instance.generate_password_hash(password)
+
+        if password_hash is None:
+            return Constants.RESPONSE_MESSAGE_SERVICE_UNAVAILABLE
 
         user = User(
             username=username,
@@ -120,6 +131,7 @@ class UserService:
             return Constants.RESPONSE_MESSAGE_USER_ALREADY_IN_DEVICE_GROUP
 
         if self._user_group_repository_instance.update_database():
+            self._permission_service_instance.invalidate_user_access(user.id)
             return Constants.RESPONSE_MESSAGE_OK
         else:
             return Constants.RESPONSE_MESSAGE_ERROR
@@ -140,12 +152,11 @@ class UserService:
         if not device_group:
             return Constants.RESPONSE_MESSAGE_PRODUCT_KEY_NOT_FOUND
 
-        user_device_group = self._device_group_repository_instance.get_device_group_by_user_id_and_product_key(
-            user_id, product_key)
+        is_master_user = self._permission_service_instance.is_master_user_of_device_group(user_id, device_group.id)
 
         user = self._user_repository_instance.get_user_by_id(user_id)
 
-        if not user or is_admin is True or user_device_group is None:
+        if not user or is_admin is True or not is_master_user:
             return Constants.RESPONSE_MESSAGE_USER_DOES_NOT_HAVE_PRIVILEGES
 
         user_group = self._user_group_repository_instance.get_user_group_by_name_and_device_group_id(
@@ -164,6 +175,21 @@ class UserService:
             return Constants.RESPONSE_MESSAGE_USER_ALREADY_IN_USER_GROUP
 
         if self._user_group_repository_instance.update_database():
+            self._permission_service_instance.invalidate_user_access(user.id)
             return Constants.RESPONSE_MESSAGE_OK
         else:
             return Constants.RESPONSE_MESSAGE_ERROR
+
+    def _rehash_password(self, user: Union[User, Admin], password: str, is_admin: bool) -> None:
+        """ Stores the password hashed with the configured cost factor, the old hash is kept if hashing fails """
+        password_hash = self._password_service_instance.generate_password_hash(password)
+
+        if password_hash is None:
+            return
+
+        user.password = password_hash
+
+        if is_admin:
+            self._admin_repository_instance.update_database()
+        else:
+            self._user_repository_instance.update_database()
@@ -1,13 +1,19 @@
 import datetime
+import hashlib
+import time
+from typing import Dict
 from typing import Optional
 from typing import Tuple
 
 import jwt
 
+from app.main.util.cache import TTLCache
 from app.main.util.constants import Constants
 
 
 class Auth:
+    # User info of verified tokens by digest of the token, until the token expires
+    _token_cache = TTLCache(Constants.AUTH_TOKEN_CACHE_MAX_SIZE, Constants.AUTH_TOKEN_CACHE_TTL_SECONDS)
 
     @staticmethod
     def encode_auth_token(user_id: str, is_admin: bool) -> str:
@@ -44,6 +50,12 @@ class Auth:
 
             if len(auth_header_parts) == 2 and auth_header_parts[0] == 'Bearer':
                 auth_token = auth_header_parts[1]
+                token_digest = hashlib.sha256(auth_token.encode()).digest()
+
+                user_info = Auth._token_cache.get(token_digest)
+                if user_info is not None:
+                    return None, dict(user_info)
+
                 result, token_payload = Auth.decode_auth_token(auth_token)
 
                 if result is None:
@@ -53,11 +65,27 @@ class Auth:
                     except KeyError:
                         return Constants.RESPONSE_MESSAGE_INVALID_TOKEN, None
 
-                    return None, {
+                    user_info = {
                         'user_id': user_id,
                         'is_admin': admin
                     }
+
+                    if isinstance(token_payload.get('exp'), (int, float)):
+                        Auth._token_cache.set(token_digest, dict(user_info), token_payload['exp'] - time.time())
+
+                    return None, user_info
                 else:
                     return result, None
 
         return Constants.RESPONSE_MESSAGE_USER_NOT_DEFINED, None
+
+    @staticmethod
+    def revoke_user_tokens(user_id: str, is_admin: bool) -> int:
+        """ Removes cached tokens of the user, so that they are verified again, returns the number of removed tokens """
+        return Auth._token_cache.invalidate_matching(
+            lambda token_digest, user_info: user_info['user_id'] == user_id and user_info['is_admin'] == is_admin
+        )
+
+    @staticmethod
+    def get_token_cache_stats() -> Dict[str, int]:
+        return Auth._token_cache.get_stats()
@@ -0,0 +1,111 @@
+import select
+import threading
+import uuid
+from typing import Optional
+
+from flask import has_app_context
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.main import db
+from app.main.util.constants import Constants
+
+
+class ChangeNotifier:
+    """
+    Wakes up hubs waiting for changes in their device groups.
+
+    Every process keeps a version counter per product key. Changes published in the process bump the counter
+    directly, on PostgreSQL they are also sent with NOTIFY so that a listener thread of every other process bumps
+    its own counter. Cursors carry a token of the process they were issued by, a cursor issued by another process
+    is never considered current.
+    """
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+
+        return cls._instance
+
+    def __init__(self):
+        self.process_token = uuid.uuid4().hex[:12]
+
+        self._versions = {}
+        self._condition = threading.Condition()
+        self._listener_thread = None
+
+    def get_cursor(self, product_key: str) -> str:
+        with self._condition:
+            return self._get_cursor(product_key)
+
+    def notify(self, product_key: str) -> None:
+        self._set_changed(product_key)
+
+        if self._is_listen_notify_available():
+            self._publish(product_key)
+
+    def wait_for_change(self, product_key: str, cursor: Optional[str], timeout: float) -> bool:
+        """ Blocks until the cursor stops being current or timeout passes, returns whether it stopped being current """
+        if self._is_listen_notify_available():
+            self._start_listener()
+
+        with self._condition:
+            return self._condition.wait_for(lambda: self._get_cursor(product_key) != cursor, timeout)
+
+    def _get_cursor(self, product_key: str) -> str:
+        return '{}:{}'.format(self.process_token, self._versions.get(product_key, 0))
+
+    def _set_changed(self, product_key: str) -> None:
+        with self._condition:
+            self._versions[product_key] = self._versions.get(product_key, 0) + 1
+            self._condition.notify_all()
+
+    def _is_listen_notify_available(self) -> bool:
+        return has_app_context() and db.engine.dialect.name == 'postgresql'
+
+    def _publish(self, product_key: str) -> None:
+        try:
+            db.session.execute(
+                text('SELECT pg_notify(:channel, :payload)'),
+                {
+                    'channel': Constants.CHANGE_NOTIFIER_CHANNEL,
+                    'payload': '{}:{}'.format(self.process_token, product_key)
+                }
+            )
+            db.session.commit()
+        except SQLAlchemyError:
+            db.session.rollback()
+
+    def _start_listener(self) -> None:
+        with self._condition:
+            if self._listener_thread is not None and self._listener_thread.is_alive():
+                return
+
+            self._listener_thread = threading.Thread(target=self._listen, args=(db.engine,), daemon=True)
+            self._listener_thread.start()
+
+    def _listen(self, engine) -> None:
+        connection = engine.raw_connection()
+        # The listening connection is never returned, keep it out of the pool limits
+        connection.detach()
+
+        try:
+            dbapi_connection = connection.connection
+            dbapi_connection.autocommit = True
+            dbapi_connection.cursor().execute('LISTEN {}'.format(Constants.CHANGE_NOTIFIER_CHANNEL))
+
+            while True:
+                if not select.select([dbapi_connection], [], [], Constants.CHANGE_NOTIFIER_LISTEN_TIMEOUT_SECONDS)[0]:
+                    continue
+
+                dbapi_connection.poll()
+
+                while dbapi_connection.notifies:
+                    process_token, _, product_key = dbapi_connection.notifies.pop(0).payload.partition(':')
+
+                    if process_token != self.process_token:
+                        self._set_changed(product_key)
+        finally:
+            connection.close()
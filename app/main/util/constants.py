@@ -1,3 +1,4 @@
+import multiprocessing
 import os
 
 
@@ -9,10 +10,83 @@ class Constants:
     API_URL = os.environ.get('API_URL')
 
     DATABASE_URL_PROD = os.environ.get('DATABASE_URL')
+    DATABASE_REPLICA_URLS = [url for url in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if url]
     DATABASE_URL_TEST = 'sqlite:///' + os.path.join(
         os.path.abspath(os.path.dirname(__file__)), 'flask_boilerplate_test.db')
     SECRET_KEY = os.getenv('SECRET_KEY', 'secret_key')
 
+    DATABASE_POOL_SIZE = int(os.environ.get('DATABASE_POOL_SIZE', 5))
+    DATABASE_MAX_OVERFLOW = int(os.environ.get('DATABASE_MAX_OVERFLOW', 10))
+    DATABASE_POOL_TIMEOUT_SECONDS = float(os.environ.get('DATABASE_POOL_TIMEOUT_SECONDS', 10))
+    DATABASE_POOL_RECYCLE_SECONDS = int(os.environ.get('DATABASE_POOL_RECYCLE_SECONDS', 1800))
+    DATABASE_POOL_PRE_PING = os.environ.get('DATABASE_POOL_PRE_PING', 'true').lower() == 'true'
+    DATABASE_POOL_METRICS_INTERVAL_SECONDS = float(os.environ.get('DATABASE_POOL_METRICS_INTERVAL_SECONDS', 60))
+    DATABASE_STATEMENT_TIMEOUT_MS = int(os.environ.get('DATABASE_STATEMENT_TIMEOUT_MS', 30000))
+
+    SENSOR_READING_RETENTION_MONTHS = int(os.environ.get('SENSOR_READING_RETENTION_MONTHS', 12))
+    SENSOR_READING_PARTITIONS_AHEAD = int(os.environ.get('SENSOR_READING_PARTITIONS_AHEAD', 2))
+
+    DEVICE_GROUP_CACHE_MAX_SIZE = int(os.environ.get('DEVICE_GROUP_CACHE_MAX_SIZE', 1024))
+    DEVICE_GROUP_CACHE_TTL_SECONDS = float(os.environ.get('DEVICE_GROUP_CACHE_TTL_SECONDS', 60))
+
+    FORMULA_CACHE_MAX_SIZE = int(os.environ.get('FORMULA_CACHE_MAX_SIZE', 4096))
+    FORMULA_CACHE_TTL_SECONDS = float(os.environ.get('FORMULA_CACHE_TTL_SECONDS', 3600))
+    FORMULA_DEPENDENCY_CACHE_MAX_SIZE = int(os.environ.get('FORMULA_DEPENDENCY_CACHE_MAX_SIZE', 1024))
+    FORMULA_DEPENDENCY_CACHE_TTL_SECONDS = float(os.environ.get('FORMULA_DEPENDENCY_CACHE_TTL_SECONDS', 60))
+    FORMULA_CHECK_CACHE_MAX_SIZE = int(os.environ.get('FORMULA_CHECK_CACHE_MAX_SIZE', 4096))
+    FORMULA_CHECK_CACHE_TTL_SECONDS = float(os.environ.get('FORMULA_CHECK_CACHE_TTL_SECONDS', 3600))
+    FORMULA_CHECK_TIMEOUT_SECONDS = float(os.environ.get('FORMULA_CHECK_TIMEOUT_SECONDS', 5))
+    FORMULA_CHECK_WORKERS = int(os.environ.get('FORMULA_CHECK_WORKERS', 1))
+    FORMULA_MAX_CONDITIONS = int(os.environ.get('FORMULA_MAX_CONDITIONS', 64))
+    FORMULA_MAX_NORMAL_FORM_TERMS = int(os.environ.get('FORMULA_MAX_NORMAL_FORM_TERMS', 4096))
+    FORMULA_SCHEDULER_RELOAD_SECONDS = float(os.environ.get('FORMULA_SCHEDULER_RELOAD_SECONDS', 60))
+    FORMULA_SCHEDULER_RETRY_SECONDS = float(os.environ.get('FORMULA_SCHEDULER_RETRY_SECONDS', 5))
+
+    TYPE_REGISTRY_CACHE_MAX_SIZE = int(os.environ.get('TYPE_REGISTRY_CACHE_MAX_SIZE', 1024))
+    TYPE_REGISTRY_CACHE_TTL_SECONDS = float(os.environ.get('TYPE_REGISTRY_CACHE_TTL_SECONDS', 3600))
+
+    AUTH_TOKEN_CACHE_MAX_SIZE = int(os.environ.get('AUTH_TOKEN_CACHE_MAX_SIZE', 4096))
+    AUTH_TOKEN_CACHE_TTL_SECONDS = float(os.environ.get('AUTH_TOKEN_CACHE_TTL_SECONDS', 3600))
+
+    USER_ACCESS_CACHE_MAX_SIZE = int(os.environ.get('USER_ACCESS_CACHE_MAX_SIZE', 4096))
+    USER_ACCESS_CACHE_TTL_SECONDS = float(os.environ.get('USER_ACCESS_CACHE_TTL_SECONDS', 60))
+
+    PASSWORD_HASHING_ROUNDS = int(os.environ.get('PASSWORD_HASHING_ROUNDS', 12))
+    PASSWORD_HASHING_WORKERS = int(os.environ.get('PASSWORD_HASHING_WORKERS', 2))
+    PASSWORD_HASHING_QUEUE_MAX_SIZE = int(os.environ.get('PASSWORD_HASHING_QUEUE_MAX_SIZE', 16))
+    PASSWORD_HASHING_TIMEOUT_SECONDS = float(os.environ.get('PASSWORD_HASHING_TIMEOUT_SECONDS', 10))
+
+    LOG_QUEUE_MAX_SIZE = int(os.environ.get('LOG_QUEUE_MAX_SIZE', 10000))
+    LOG_QUEUE_BATCH_SIZE = int(os.environ.get('LOG_QUEUE_BATCH_SIZE', 500))
+    LOG_QUEUE_FLUSH_INTERVAL_MS = int(os.environ.get('LOG_QUEUE_FLUSH_INTERVAL_MS', 200))
+    LOG_QUEUE_PUT_TIMEOUT_SECONDS = 0.05
+    LOG_QUEUE_SHUTDOWN_TIMEOUT_SECONDS = 10
+
+    CHANGE_NOTIFIER_CHANNEL = 'device_group_changes'
+    CHANGE_NOTIFIER_LISTEN_TIMEOUT_SECONDS = 5
+    HUB_STATES_MAX_WAIT_SECONDS = int(os.environ.get('HUB_STATES_MAX_WAIT_SECONDS', 30))
+    HUB_STATES_STREAM_KEEP_ALIVE_SECONDS = 15
+    HUB_STATES_STREAM_MAX_SECONDS = int(os.environ.get('HUB_STATES_STREAM_MAX_SECONDS', 300))
+
+    SERVER_PORT = int(os.environ.get('PORT', 5000))
+    SERVER_MODE = os.environ.get('SERVER_MODE', 'sync')
+    SERVER_WORKERS = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+    SERVER_THREADS = int(os.environ.get('SERVER_THREADS', 4))
+    SERVER_WORKER_CONNECTIONS = int(os.environ.get('SERVER_WORKER_CONNECTIONS', 1000))
+    SERVER_KEEP_ALIVE_SECONDS = int(os.environ.get('SERVER_KEEP_ALIVE_SECONDS', 5))
+    SERVER_TIMEOUT_SECONDS = int(os.environ.get('SERVER_TIMEOUT_SECONDS', 60))
+    SERVER_GRACEFUL_TIMEOUT_SECONDS = int(os.environ.get('SERVER_GRACEFUL_TIMEOUT_SECONDS', 30))
+    SERVER_MAX_REQUESTS = int(os.environ.get('SERVER_MAX_REQUESTS', 10000))
+    SERVER_MAX_REQUESTS_JITTER = int(os.environ.get('SERVER_MAX_REQUESTS_JITTER', 1000))
+
+    DEVICE_CHANGES_PAGE_SIZE = 1000
+    DEVICE_CHANGE_RETENTION_DAYS = int(os.environ.get('DEVICE_CHANGE_RETENTION_DAYS', 7))
+
+    SENSOR_READINGS_PAGE_SIZE = 1000
+    SENSOR_READINGS_MAX_PAGE_SIZE = 10000
+    SENSOR_READINGS_DOWNSAMPLING_POINTS = 500
+    SENSOR_READINGS_MAX_DOWNSAMPLING_POINTS = 5000
+
     RESPONSE_MESSAGE_ADMIN_NOT_DEFINED = 'Admin not defined.'
     RESPONSE_MESSAGE_BAD_MIMETYPE = (
         'The browser (or proxy) sent a request with mimetype that does not indicate JSON data.')
@@ -31,6 +105,7 @@ class Constants:
     RESPONSE_MESSAGE_EXECUTIVE_TYPE_ALREADY_EXISTS = 'Executive type with given name already exists.'
     RESPONSE_MESSAGE_EXECUTIVE_TYPE_NOT_FOUND = 'Executive type name not found.'
     RESPONSE_MESSAGE_FORMULA_NOT_FOUND = 'Formula name not found.'
+    RESPONSE_MESSAGE_FORMULA_TOO_COMPLEX = 'Formula is too complex.'
     RESPONSE_MESSAGE_INVALID_CREDENTIALS = 'User credentials are invalid.'
     RESPONSE_MESSAGE_INVALID_FORMULA = 'Formula is invalid.'
     RESPONSE_MESSAGE_INVALID_TOKEN = 'Invalid token.'
@@ -47,6 +122,7 @@ class Constants:
     RESPONSE_MESSAGE_SENSOR_TYPES_NOT_FOUND = 'Sensor types name not found.'
     RESPONSE_MESSAGE_SENSOR_TYPE_NAME_NOT_DEFINED = 'Sensor type name not defined.'
     RESPONSE_MESSAGE_SENSOR_TYPE_NOT_FOUND = 'Sensor type name not found.'
+    RESPONSE_MESSAGE_SERVICE_UNAVAILABLE = 'Server is busy, try again later.'
     RESPONSE_MESSAGE_SIGNATURE_EXPIRED = 'Signature expired.'
     RESPONSE_MESSAGE_UNCONFIGURED_DEVICE_NOT_FOUND = 'Unconfigure device not found.'
     RESPONSE_MESSAGE_UPDATED_SENSORS_AND_DEVICES = 'States of devices and readings of sensors were updated'
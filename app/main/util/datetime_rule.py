@@ -0,0 +1,70 @@
+import datetime
+from collections import namedtuple
+from typing import Optional
+
+from app.main.util.utils import is_dict_with_keys
+from app.main.util.utils import parse_date
+
+DatetimeRule = namedtuple('DatetimeRule', ['start', 'end', 'days'])
+
+ALL_DAYS = frozenset(range(1, 8))
+
+
+def parse_datetime_rule(data: dict) -> Optional[DatetimeRule]:
+    """
+    Reads the datetime rule of a formula, days are ISO weekdays separated by commas, all days when not given.
+    Returns None when the rule is malformed.
+    """
+    if not is_dict_with_keys(data, ['datetimeStart', 'datetimeEnd']):
+        return None
+
+    start = parse_date(data['datetimeStart'])
+    end = parse_date(data['datetimeEnd'])
+
+    if start is None or end is None:
+        return None
+
+    days = data.get('days')
+
+    if days is None or days == '':
+        return DatetimeRule(start, end, ALL_DAYS)
+
+    if isinstance(days, str):
+        days = days.split(',')
+
+    try:
+        days = frozenset(int(day) for day in days)
+    except (TypeError, ValueError):
+        return None
+
+    if not days or not days <= ALL_DAYS:
+        return None
+
+    return DatetimeRule(start, end, days)
+
+
+def is_datetime_rule_active(rule: DatetimeRule, moment: datetime.datetime) -> bool:
+    return rule.start <= moment < rule.end and moment.isoweekday() in rule.days
+
+
+def get_next_boundary(rule: DatetimeRule, moment: datetime.datetime) -> Optional[datetime.datetime]:
+    """ Returns the first instant after the moment at which the rule may become active or inactive """
+    if moment < rule.start:
+        return rule.start
+
+    if moment >= rule.end:
+        return None
+
+    is_day_included = moment.isoweekday() in rule.days
+    midnight = datetime.datetime.combine(moment.date(), datetime.time()) + datetime.timedelta(days=1)
+
+    for _ in range(len(ALL_DAYS)):
+        if midnight >= rule.end:
+            break
+
+        if (midnight.isoweekday() in rule.days) is not is_day_included:
+            return midnight
+
+        midnight += datetime.timedelta(days=1)
+
+    return rule.end
@@ -0,0 +1,174 @@
+import datetime
+import operator
+from collections import namedtuple
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Optional
+
+from app.main.util.datetime_rule import is_datetime_rule_active
+from app.main.util.datetime_rule import parse_datetime_rule
+from app.main.util.utils import is_dict_with_keys
+
+CompiledRule = namedtuple('CompiledRule', ['device_keys', 'evaluate', 'datetime_rule', 'reading_kinds'])
+
+UNCOMPILED_RULE = CompiledRule(frozenset(), None, None, {})
+
+# Kind of device key compared with values of different kinds, no reading matches it
+_CONFLICTING_READING_KIND = 'Conflicting'
+
+_functors = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<=': operator.le,
+    '=>': operator.ge
+}
+
+
+def compile_formula_rule(rule: dict) -> CompiledRule:
+    """
+    Compiles the formula rule into a function of readings by device key and of the moment of evaluation,
+    which defaults to the current time in UTC. Rules which can not be compiled are left to hubs.
+    """
+    if not isinstance(rule, dict) or (not rule.get('datetimeRule') and not rule.get('sensorRule')):
+        return UNCOMPILED_RULE
+
+    datetime_rule = None
+    if rule.get('datetimeRule'):
+        datetime_rule = parse_datetime_rule(rule['datetimeRule'])
+
+        if datetime_rule is None:
+            return UNCOMPILED_RULE
+
+    reading_kinds = {}
+    evaluate_sensor_rule = None
+    if rule.get('sensorRule'):
+        evaluate_sensor_rule = _compile_node(rule['sensorRule'], reading_kinds)
+
+        if evaluate_sensor_rule is None:
+            return UNCOMPILED_RULE
+
+    if datetime_rule is None:
+        return CompiledRule(
+            frozenset(reading_kinds),
+            lambda readings, moment=None: evaluate_sensor_rule(readings),
+            None,
+            reading_kinds
+        )
+
+    if evaluate_sensor_rule is None:
+        return CompiledRule(
+            frozenset(),
+            lambda readings, moment=None: is_datetime_rule_active(datetime_rule, moment or datetime.datetime.utcnow()),
+            datetime_rule,
+            {}
+        )
+
+    if rule.get('operator') not in ('and', 'or'):
+        return UNCOMPILED_RULE
+
+    combine = all if rule['operator'] == 'and' else any
+
+    def evaluate(readings: Dict[str, Any], moment: datetime.datetime = None) -> bool:
+        return combine((
+            is_datetime_rule_active(datetime_rule, moment or datetime.datetime.utcnow()),
+            evaluate_sensor_rule(readings)
+        ))
+
+    return CompiledRule(frozenset(reading_kinds), evaluate, datetime_rule, reading_kinds)
+
+
+def can_evaluate_rule(compiled_rule: CompiledRule, readings: Dict[str, Any]) -> bool:
+    """ Returns True if the rule is compiled and readings of all its sensors are of kinds compared in the rule """
+    if compiled_rule.evaluate is None:
+        return False
+
+    return all(
+        _get_reading_kind(readings.get(device_key)) == reading_kind
+        for device_key, reading_kind in compiled_rule.reading_kinds.items()
+    )
+
+
+def _get_reading_kind(value: Any) -> Optional[str]:
+    if isinstance(value, bool):
+        return 'Boolean'
+
+    if isinstance(value, (int, float)):
+        return 'Decimal'
+
+    if isinstance(value, str):
+        return 'Enum'
+
+    return None
+
+
+def _compile_node(node: dict, reading_kinds: Dict[str, str]) -> Optional[Callable[[Dict[str, Any]], bool]]:
+    if is_dict_with_keys(node, ['isNegated', 'value', 'functor', 'deviceKey']):
+        if (node['value'] is not None
+                and node['isNegated'] is not None
+                and node['functor']
+                and node['deviceKey']):
+            return _compile_condition(node, reading_kinds)
+
+    if (is_dict_with_keys(node, ['isNegated', 'complexLeft', 'complexRight', 'operator'])
+            and node['complexLeft']
+            and node['complexRight']
+            and node['operator']):
+        return _compile_complex(node, reading_kinds)
+
+    # Same as the expression built for validation, a malformed node never holds
+    return lambda readings: False
+
+
+def _compile_condition(node: dict, reading_kinds: Dict[str, str]) -> Optional[Callable[[Dict[str, Any]], bool]]:
+    functor = _functors.get(node['functor'])
+    reading_kind = _get_reading_kind(node['value'])
+
+    if functor is None or reading_kind is None:
+        return None
+
+    device_key = node['deviceKey']
+    value = node['value']
+
+    if reading_kinds.setdefault(device_key, reading_kind) != reading_kind:
+        reading_kinds[device_key] = _CONFLICTING_READING_KIND
+
+    if node['isNegated'] is True:
+        return lambda readings: not functor(readings[device_key], value)
+
+    return lambda readings: functor(readings[device_key], value)
+
+
+def _compile_complex(node: dict, reading_kinds: Dict[str, str]) -> Optional[Callable[[Dict[str, Any]], bool]]:
+    if node['operator'] not in ('and', 'or'):
+        return None
+
+    # Operands of consecutive not negated nodes with the same operator are flattened into a single tuple
+    operands = []
+    nodes = [node['complexLeft'], node['complexRight']]
+
+    while nodes:
+        operand_node = nodes.pop(0)
+
+        if (is_dict_with_keys(operand_node, ['isNegated', 'complexLeft', 'complexRight', 'operator'])
+                and operand_node['isNegated'] is not True
+                and operand_node['operator'] == node['operator']
+                and operand_node['complexLeft']
+                and operand_node['complexRight']):
+            nodes[0:0] = [operand_node['complexLeft'], operand_node['complexRight']]
+            continue
+
+        operand = _compile_node(operand_node, reading_kinds)
+
+        if operand is None:
+            return None
+
+        operands.append(operand)
+
+    operands = tuple(operands)
+    combine = all if node['operator'] == 'and' else any
+
+    if node['isNegated'] is True:
+        return lambda readings: not combine(operand(readings) for operand in operands)
+
+    return lambda readings: combine(operand(readings) for operand in operands)
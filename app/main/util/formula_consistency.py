@@ -0,0 +1,117 @@
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import Optional
+from typing import Tuple
+
+
+class DecimalConstraint:
+    """ Interval of decimal readings with excluded points, bounds are stored with their inclusiveness """
+
+    def __init__(self):
+        self.low = None
+        self.is_low_inclusive = True
+        self.high = None
+        self.is_high_inclusive = True
+        self.excluded = set()
+
+    def add(self, functor: str, value, is_negated: bool) -> bool:
+        """ Narrows the constraint by the condition, returns False when no reading satisfies it anymore """
+        if functor == '=>':
+            if is_negated:
+                self._set_high(value, False)
+            else:
+                self._set_low(value, True)
+        elif functor == '<=':
+            if is_negated:
+                self._set_low(value, False)
+            else:
+                self._set_high(value, True)
+        elif (functor == '==') is not is_negated:
+            self._set_low(value, True)
+            self._set_high(value, True)
+        else:
+            self.excluded.add(value)
+
+        return not self.is_empty()
+
+    def is_empty(self) -> bool:
+        if self.low is None or self.high is None:
+            return False
+
+        if self.low == self.high:
+            return not (self.is_low_inclusive and self.is_high_inclusive) or self.low in self.excluded
+
+        return self.low > self.high
+
+    def _set_low(self, value, is_inclusive: bool) -> None:
+        if self.low is None or value > self.low or (value == self.low and not is_inclusive):
+            self.low = value
+            self.is_low_inclusive = is_inclusive
+
+    def _set_high(self, value, is_inclusive: bool) -> None:
+        if self.high is None or value < self.high or (value == self.high and not is_inclusive):
+            self.high = value
+            self.is_high_inclusive = is_inclusive
+
+
+class ValueSetConstraint:
+    """ Required value and excluded values of a reading with finite number of possible values """
+
+    def __init__(self, number_of_values: int):
+        self.number_of_values = number_of_values
+        self.value = None
+        self.is_value_set = False
+        self.excluded = set()
+
+    def add(self, functor: str, value, is_negated: bool) -> bool:
+        """ Narrows the constraint by the condition, returns False when no reading satisfies it anymore """
+        if (functor == '==') is not is_negated:
+            if self.is_value_set and self.value != value:
+                return False
+
+            self.value = value
+            self.is_value_set = True
+        else:
+            self.excluded.add(value)
+
+        return not self.is_empty()
+
+    def is_empty(self) -> bool:
+        if self.is_value_set:
+            return self.value in self.excluded
+
+        return self.number_of_values is not None and len(self.excluded) >= self.number_of_values
+
+
+def is_conjunction_consistent(conditions: Iterable[Tuple[Optional[Dict[str, Any]], bool]]) -> bool:
+    """
+    Checks whether some readings satisfy all conditions of a conjunction at once.
+    Conditions come with their negation flags, they are merged into one constraint per device
+    in a single pass, which stops at the first device left without possible readings.
+    """
+    constraints = {}
+
+    for condition, is_negated in conditions:
+        if condition is None:
+            return False
+
+        constraint = constraints.get(condition['deviceKey'])
+
+        if constraint is None:
+            constraint = _create_constraint(condition)
+            constraints[condition['deviceKey']] = constraint
+
+        if not constraint.add(condition['functor'], condition['value'], is_negated):
+            return False
+
+    return True
+
+
+def _create_constraint(condition: Dict[str, Any]):
+    if condition['type'] == 'Decimal':
+        return DecimalConstraint()
+    elif condition['type'] == 'Boolean':
+        return ValueSetConstraint(2)
+    else:
+        return ValueSetConstraint(condition.get('number_of_reading_values'))
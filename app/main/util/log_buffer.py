@@ -0,0 +1,143 @@
+import queue
+import threading
+import time
+from typing import Callable
+from typing import Dict
+from typing import List
+
+from flask import Flask
+
+_STOP = object()
+
+
+class LogBuffer:
+    """
+    Bounded queue of log rows written in batches by a background thread.
+
+    Rows are written every flush interval or as soon as batch size rows are queued. When the queue is full callers
+    wait at most put timeout for space and the row is dropped afterwards. Until the flusher is started rows are
+    written synchronously by the caller.
+    """
+
+    def __init__(
+            self,
+            write_rows: Callable[[List[dict]], int],
+            max_size: int,
+            batch_size: int,
+            flush_interval: float,
+            put_timeout: float):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+        self._write_rows = write_rows
+        self._queue = queue.Queue(max_size)
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._flusher_thread = None
+
+    def put(self, row: dict) -> bool:
+        if not self.is_flusher_running():
+            return self._write([row]) == 1
+
+        try:
+            self._queue.put(row, timeout=self.put_timeout)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+
+        return True
+
+    def start_flusher(self, app: Flask) -> None:
+        with self._lock:
+            if self._flusher_thread is not None and self._flusher_thread.is_alive():
+                return
+
+            self._stop_event.clear()
+            self._flusher_thread = threading.Thread(target=self._run, args=(app,), daemon=True)
+            self._flusher_thread.start()
+
+    def stop_flusher(self, timeout: float = None) -> None:
+        """ Stops the flusher after it writes all queued rows """
+        self._stop_event.set()
+
+        flusher_thread = self._flusher_thread
+        if flusher_thread is None or not flusher_thread.is_alive():
+            return
+
+        try:
+            # Wakes up the flusher waiting for rows, a full queue means it is not waiting
+            self._queue.put_nowait(_STOP)
+        except queue.Full:
+            pass
+
+        flusher_thread.join(timeout)
+
+    def is_flusher_running(self) -> bool:
+        flusher_thread = self._flusher_thread
+        return flusher_thread is not None and flusher_thread.is_alive() and not self._stop_event.is_set()
+
+    def flush(self) -> None:
+        """ Writes all queued rows in the calling thread """
+        while True:
+            rows = self._get_rows(0)
+
+            if not rows:
+                return
+
+            self._write(rows)
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'queued': self._queue.qsize(),
+                'written': self.written,
+                'dropped': self.dropped,
+                'failed': self.failed
+            }
+
+    def _run(self, app: Flask) -> None:
+        with app.app_context():
+            while not self._stop_event.is_set():
+                rows = self._get_rows(self.flush_interval)
+
+                if rows:
+                    self._write(rows)
+
+            self.flush()
+
+    def _get_rows(self, timeout: float) -> List[dict]:
+        rows = []
+        deadline = time.monotonic() + timeout
+
+        while len(rows) < self.batch_size:
+            remaining_time = deadline - time.monotonic()
+
+            try:
+                if remaining_time > 0:
+                    row = self._queue.get(timeout=remaining_time)
+                else:
+                    row = self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+            if row is _STOP:
+                break
+
+            rows.append(row)
+
+        return rows
+
+    def _write(self, rows: List[dict]) -> int:
+        written_rows = self._write_rows(rows)
+
+        with self._lock:
+            self.written += written_rows
+            self.failed += len(rows) - written_rows
+
+        return written_rows
@@ -0,0 +1,145 @@
+import threading
+import time
+from typing import Dict
+from typing import Optional
+
+from flask import Flask
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.pool import Pool
+from sqlalchemy.pool import QueuePool
+
+_COUNTER_NAMES = ('connects', 'checkouts', 'overflows', 'invalidations', 'waits', 'timeouts')
+
+
+class InstrumentedQueuePool(QueuePool):
+    """ QueuePool which reports checkouts waiting for a connection and connections opened over the pool size """
+
+    def __init__(self, *args, **kwargs):
+        # Listeners of pool events are registered with the first instance of metrics
+        PoolMetrics.get_instance()
+        super().__init__(*args, **kwargs)
+
+    def _do_get(self):
+        if self._pool.qsize() > 0 or self._max_overflow < 0 or self._overflow < self._max_overflow:
+            return super()._do_get()
+
+        start = time.monotonic()
+        try:
+            return super()._do_get()
+        except TimeoutError:
+            PoolMetrics.get_instance().record_timeout()
+            raise
+        finally:
+            PoolMetrics.get_instance().record_wait(time.monotonic() - start)
+
+    def _create_connection(self):
+        if self._overflow > 0:
+            PoolMetrics.get_instance().record_overflow()
+
+        return super()._create_connection()
+
+
+class PoolMetrics:
+    """
+    Counts events of database connection pools of the process.
+
+    Counters are cumulative since the start of the process. The reporter thread prints them together with
+    the current state of the pool in the l2met format of Heroku, ``count#`` values are deltas since the last report.
+    """
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+
+        return cls._instance
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(_COUNTER_NAMES, 0)
+        self._wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+        self._reporter_thread = None
+
+        event.listen(InstrumentedQueuePool, 'connect', lambda *args: self._increment('connects'))
+        event.listen(InstrumentedQueuePool, 'checkout', lambda *args: self._increment('checkouts'))
+        event.listen(InstrumentedQueuePool, 'invalidate', lambda *args: self._increment('invalidations'))
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self._counters['waits'] += 1
+            self._wait_seconds += seconds
+            self._max_wait_seconds = max(self._max_wait_seconds, seconds)
+
+    def record_timeout(self) -> None:
+        self._increment('timeouts')
+
+    def record_overflow(self) -> None:
+        self._increment('overflows')
+
+    def get_stats(self, pool: Optional[Pool] = None) -> Dict[str, float]:
+        """ Returns counters of pool events, with sizes of connections of the pool if it is given """
+        with self._lock:
+            stats = dict(self._counters)
+            stats['wait_ms'] = self._wait_seconds * 1000
+            stats['max_wait_ms'] = self._max_wait_seconds * 1000
+
+        if isinstance(pool, QueuePool):
+            stats['size'] = pool.size()
+            stats['checked_in'] = pool.checkedin()
+            stats['checked_out'] = pool.checkedout()
+            stats['overflow'] = max(pool.overflow(), 0)
+
+        return stats
+
+    def start_reporter(self, app: Flask, interval_seconds: float) -> None:
+        """ Prints metrics of the pool of the application every interval in a background thread """
+        if interval_seconds <= 0:
+            return
+
+        with self._lock:
+            if self._reporter_thread is not None and self._reporter_thread.is_alive():
+                return
+
+            self._reporter_thread = threading.Thread(
+                target=self._run_reporter,
+                args=(app, interval_seconds),
+                daemon=True
+            )
+            self._reporter_thread.start()
+
+    def _run_reporter(self, app: Flask, interval_seconds: float) -> None:
+        from app.main import db
+
+        with app.app_context():
+            previous_stats = self.get_stats()
+
+            while True:
+                time.sleep(interval_seconds)
+
+                stats = self.get_stats(db.engine.pool)
+                print(format_pool_metrics(stats, previous_stats), flush=True)
+                previous_stats = stats
+
+    def _increment(self, counter_name: str) -> None:
+        with self._lock:
+            self._counters[counter_name] += 1
+
+
+def format_pool_metrics(stats: Dict[str, float], previous_stats: Dict[str, float]) -> str:
+    metrics = ['source=db_pool']
+
+    for name in ('size', 'checked_in', 'checked_out', 'overflow'):
+        if name in stats:
+            metrics.append('sample#db_pool.{}={}'.format(name, stats[name]))
+
+    for name in _COUNTER_NAMES:
+        metrics.append('count#db_pool.{}={}'.format(name, stats[name] - previous_stats.get(name, 0)))
+
+    waits = stats['waits'] - previous_stats.get('waits', 0)
+    wait_ms = stats['wait_ms'] - previous_stats.get('wait_ms', 0)
+    metrics.append('measure#db_pool.wait_ms={:.1f}'.format(wait_ms / waits if waits else 0))
+
+    return ' '.join(metrics)
@@ -0,0 +1,97 @@
+from datetime import datetime
+from datetime import timedelta
+from typing import Iterable
+from typing import List
+from typing import Tuple
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def get_bucket_start(date: datetime, resolution: timedelta) -> datetime:
+    return _EPOCH + ((date - _EPOCH) // resolution) * resolution
+
+
+def get_reading_buckets(
+        readings: Iterable[Tuple[datetime, float]],
+        range_start: datetime,
+        range_end: datetime,
+        buckets_number: int) -> List[dict]:
+    """
+    Splits [range_start, range_end) into equal buckets and aggregates chronologically ordered (date, value) pairs.
+    Empty buckets are omitted.
+    """
+    bucket_seconds = max((range_end - range_start).total_seconds() / buckets_number, 1e-6)
+    buckets = {}
+
+    for reading_date, reading_value in readings:
+        index = min(int((reading_date - range_start).total_seconds() / bucket_seconds), buckets_number - 1)
+        bucket = buckets.get(index)
+
+        if bucket is None:
+            buckets[index] = [reading_value, reading_value, reading_value, 1]
+        else:
+            bucket[0] = min(bucket[0], reading_value)
+            bucket[1] = max(bucket[1], reading_value)
+            bucket[2] += reading_value
+            bucket[3] += 1
+
+    return [
+        {
+            'date': str(range_start + timedelta(seconds=bucket_seconds * index)),
+            'min': bucket[0],
+            'max': bucket[1],
+            'avg': bucket[2] / bucket[3],
+            'count': bucket[3]
+        } for index, bucket in sorted(buckets.items())
+    ]
+
+
+def get_lttb_readings(
+        readings: List[Tuple[datetime, float]],
+        threshold: int) -> List[Tuple[datetime, float]]:
+    """
+    Largest-Triangle-Three-Buckets downsampling of chronologically ordered (date, value) pairs.
+    Keeps the first and the last reading and picks the visually most significant reading from every bucket between.
+    """
+    if threshold >= len(readings):
+        return list(readings)
+
+    if threshold < 3:
+        # No bucket fits between the first and the last reading, the last reading is kept alone
+        return [readings[0], readings[-1]][2 - threshold:] if threshold > 0 else []
+
+    origin = readings[0][0]
+    points = [((reading_date - origin).total_seconds(), reading_value) for reading_date, reading_value in readings]
+
+    sampled_indexes = [0]
+    bucket_size = (len(points) - 2) / (threshold - 2)
+    selected_index = 0
+
+    for bucket_index in range(threshold - 2):
+        next_bucket_start = int((bucket_index + 1) * bucket_size) + 1
+        next_bucket_end = min(int((bucket_index + 2) * bucket_size) + 1, len(points))
+        next_bucket = points[next_bucket_start:next_bucket_end]
+        average_x = sum(point[0] for point in next_bucket) / len(next_bucket)
+        average_y = sum(point[1] for point in next_bucket) / len(next_bucket)
+
+        selected_x, selected_y = points[selected_index]
+        bucket_start = int(bucket_index * bucket_size) + 1
+        bucket_end = int((bucket_index + 1) * bucket_size) + 1
+
+        max_area = -1.0
+        max_area_index = bucket_start
+        for index in range(bucket_start, bucket_end):
+            area = abs(
+                (selected_x - average_x) * (points[index][1] - selected_y) -
+                (selected_x - points[index][0]) * (average_y - selected_y)
+            )
+            if area > max_area:
+                max_area = area
+                max_area_index = index
+
+        selected_index = max_area_index
+        sampled_indexes.append(selected_index)
+
+    sampled_indexes.append(len(points) - 1)
+
+    return [readings[index] for index in sampled_indexes]
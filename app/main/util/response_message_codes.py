@@ -17,6 +17,7 @@ response_message_codes = {
     Constants.RESPONSE_MESSAGE_EXECUTIVE_TYPE_ALREADY_EXISTS: 403,
     Constants.RESPONSE_MESSAGE_EXECUTIVE_TYPE_NAME_NOT_DEFINED: 400,
     Constants.RESPONSE_MESSAGE_FORMULA_NOT_FOUND: 400,
+    Constants.RESPONSE_MESSAGE_FORMULA_TOO_COMPLEX: 400,
     Constants.RESPONSE_MESSAGE_INVALID_CREDENTIALS: 401,
     Constants.RESPONSE_MESSAGE_USER_ALREADY_IN_USER_GROUP: 400,
     Constants.RESPONSE_MESSAGE_USER_ALREADY_IN_DEVICE_GROUP: 400,
@@ -35,6 +36,7 @@ response_message_codes = {
     Constants.RESPONSE_MESSAGE_SENSOR_TYPE_ALREADY_EXISTS: 403,
     Constants.RESPONSE_MESSAGE_SENSOR_TYPE_NAME_NOT_DEFINED: 400,
     Constants.RESPONSE_MESSAGE_SENSOR_TYPE_NOT_FOUND: 400,
+    Constants.RESPONSE_MESSAGE_SERVICE_UNAVAILABLE: 503,
     Constants.RESPONSE_MESSAGE_SIGNATURE_EXPIRED: 400,
     Constants.RESPONSE_MESSAGE_UNCONFIGURED_DEVICE_NOT_FOUND: 400,
     Constants.RESPONSE_MESSAGE_UPDATED_SENSORS_AND_DEVICES: 201,
@@ -79,7 +79,7 @@ class ResponseUtils:
                 _logger.log_exception(
                     dict(
                         type='Error',
-                        creationDate=datetime.datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S.%fZ'),
+                        creationDate=datetime.datetime.utcnow(),
                         errorMessage=result_message,
                         stackTrace=traceback.format_exc()
                     ),
@@ -125,7 +125,7 @@ class ResponseUtils:
         _logger.log_exception(
             dict(
                 type='Error',
-                creationDate=datetime.datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S.%fZ'),
+                creationDate=datetime.datetime.utcnow(),
                 errorMessage=error_message
             ),
             product_key
@@ -136,7 +136,7 @@ class ResponseUtils:
         _logger.log_exception(
             dict(
                 type='Error',
-                creationDate=datetime.datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S.%fZ'),
+                creationDate=datetime.datetime.utcnow(),
                 errorMessage=error_message,
                 payload=json.dumps(payload)
             ),
@@ -0,0 +1,76 @@
+import functools
+import random
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy import SignallingSession
+from flask_sqlalchemy import get_state
+from sqlalchemy import orm
+from sqlalchemy.sql import Select
+
+REPLICA_BIND_KEY_PREFIX = 'replica_'
+
+
+def get_replica_binds(replica_urls: List[str]) -> Dict[str, str]:
+    return {'{}{}'.format(REPLICA_BIND_KEY_PREFIX, index): url for index, url in enumerate(replica_urls)}
+
+
+def get_replica_bind_keys(app: Flask) -> List[str]:
+    binds = app.config.get('SQLALCHEMY_BINDS') or {}
+
+    return sorted(bind_key for bind_key in binds if bind_key.startswith(REPLICA_BIND_KEY_PREFIX))
+
+
+class RoutingSession(SignallingSession):
+    """
+    Session which sends queries of read-only repository methods to a replica database and everything else
+    to the primary database.
+
+    A session reads from one replica picked at random. After the session writes, all its queries go to the primary
+    until the session is removed at the end of the request, so that requests read their own writes.
+    """
+
+    def get_bind(self, mapper=None, clause=None):
+        if self._flushing or (clause is not None and not isinstance(clause, Select)):
+            self.info['is_written'] = True
+        elif isinstance(clause, Select) and self.info.get('read_only_depth') and not self.info.get('is_written'):
+            replica_bind_key = self._get_replica_bind_key()
+
+            if replica_bind_key is not None:
+                return get_state(self.app).db.get_engine(self.app, bind=replica_bind_key)
+
+        return super().get_bind(mapper, clause)
+
+    def _get_replica_bind_key(self) -> Optional[str]:
+        if 'replica_bind_key' not in self.info:
+            replica_bind_keys = get_replica_bind_keys(self.app)
+            self.info['replica_bind_key'] = random.choice(replica_bind_keys) if replica_bind_keys else None
+
+        return self.info['replica_bind_key']
+
+
+class RoutingSQLAlchemy(SQLAlchemy):
+
+    def create_session(self, options):
+        return orm.sessionmaker(class_=RoutingSession, db=self, **options)
+
+
+def read_only(method: Callable) -> Callable:
+    """ Sends queries of the repository method to a replica database, unless the session of the request has written """
+
+    @functools.wraps(method)
+    def _read_only(*args, **kwargs):
+        from app.main import db
+
+        session_info = db.session.info
+        session_info['read_only_depth'] = session_info.get('read_only_depth', 0) + 1
+        try:
+            return method(*args, **kwargs)
+        finally:
+            session_info['read_only_depth'] -= 1
+
+    return _read_only
@@ -1,10 +1,10 @@
+import datetime
 import hashlib
 import random
 import string
+from typing import Optional
 
 from app.main import Constants
-from app.main.model import DeviceGroup
-from app.main.model import User
 
 
 # TODO make those functions methods
@@ -18,13 +18,6 @@ def is_dict(value) -> bool:
     return isinstance(value, dict)
 
 
-def is_user_in_one_of_user_groups_in_device_group(user: User, device_group: DeviceGroup) -> bool:
-    if any(user in user_group.users for user_group in device_group.user_groups):
-        return True
-    else:
-        return False
-
-
 def is_dict_with_keys(data_object, keys) -> bool:
     if not is_dict(data_object) or not all(key in data_object for key in keys):
         return False
@@ -47,3 +40,20 @@ def is_password_hash_correct(password: str, device_group_password: str):
 
 def get_password_hash(password: str):
     return hashlib.sha224((password + Constants.SECRET_KEY).encode()).hexdigest()
+
+
+def parse_date(value: str) -> Optional[datetime.datetime]:
+    if not isinstance(value, str):
+        return None
+
+    if value.endswith('Z'):
+        value = value[:-1]
+
+    for date_format in ('%Y-%m-%dT%H:%M:%S.%f', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S.%f', '%Y-%m-%d %H:%M:%S',
+                        '%Y-%m-%d'):
+        try:
+            return datetime.datetime.strptime(value, date_format)
+        except ValueError:
+            continue
+
+    return None
@@ -0,0 +1,53 @@
+from collections import namedtuple
+from typing import Callable
+from typing import List
+from typing import Optional
+
+ValueRule = namedtuple('ValueRule', ['value_type', 'range_min', 'range_max', 'numbers'])
+
+
+def get_value_rule(
+        value_type: str,
+        range_min: Optional[float] = None,
+        range_max: Optional[float] = None,
+        numbers=()) -> ValueRule:
+    return ValueRule(value_type, range_min, range_max, frozenset(numbers))
+
+
+def get_validity_mask(values: List, rules: List[Optional[ValueRule]]) -> List[bool]:
+    """
+    Validates every value against the rule at the same index, values without a rule are invalid.
+    Values are grouped by rule, so that range bounds and enumerator sets are resolved once per type.
+    """
+    validity_mask = [False] * len(values)
+
+    indexes_by_rule = {}
+    for index, rule in enumerate(rules):
+        if rule is not None:
+            indexes_by_rule.setdefault(rule, []).append(index)
+
+    for rule, indexes in indexes_by_rule.items():
+        is_valid = _get_value_check(rule)
+
+        for index in indexes:
+            validity_mask[index] = is_valid(values[index])
+
+    return validity_mask
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float))
+
+
+def _get_value_check(rule: ValueRule) -> Callable[[object], bool]:
+    if rule.value_type == 'Decimal':
+        range_min = rule.range_min
+        range_max = rule.range_max
+        return lambda value: _is_number(value) and range_min <= value <= range_max
+    elif rule.value_type == 'Enum':
+        numbers = rule.numbers
+        return lambda value: _is_number(value) and value in numbers
+    elif rule.value_type == 'Boolean':
+        return lambda value: isinstance(value, bool)
+    else:
+        return lambda value: False
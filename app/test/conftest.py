@@ -23,6 +23,14 @@ from app.main.model.state_enumerator import StateEnumerator
 from app.main.model.unconfigured_device import UnconfiguredDevice
 from app.main.model.user import User
 from app.main.model.user_group import UserGroup
+from app.main.util.cache import clear_caches
+
+
+@pytest.fixture(autouse=True)
+def clear_process_caches():
+    clear_caches()
+    yield
+    clear_caches()
 
 
 @pytest.fixture
@@ -572,6 +580,8 @@ def sensor_default_values(
         'sensor_type_id': sensor_type_default_values['id'],
         'user_group_id': user_group_default_values['id'],
         'device_group_id': device_group_default_values['id'],
+        'last_reading_value': None,
+        'last_reading_date': None,
         'sensor_readings': []
     }
 
@@ -611,6 +621,8 @@ def create_sensors():
                     sensor_type_id=value['sensor_type_id'],
                     user_group_id=value['user_group_id'],
                     device_group_id=value['device_group_id'],
+                    last_reading_value=value['last_reading_value'],
+                    last_reading_date=value['last_reading_date'],
                     sensor_readings=value['sensor_readings']
                 )
             )
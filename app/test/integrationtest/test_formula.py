@@ -81,6 +81,10 @@ def test_create_formula_should_add_new_formula_to_use_group_when_valid_request(
     formulas = Formula.query.filter(Formula.name == formula_name).all()
     assert formulas
     assert len(formulas) == 1
+    assert [
+        (sensor_dependency.device_key, sensor_dependency.device_group_id)
+        for sensor_dependency in formulas[0].sensor_dependencies
+    ] == [(sensor.device_key, device_group.id)]
 
 
 def test_create_formula_should_return_error_message_when_invalid_request(
@@ -1,10 +1,18 @@
 import base64
 import hashlib
 import json
+from datetime import datetime
+from datetime import timedelta
 
 import pytest
+from sqlalchemy import event
 
+from app.main import db
+from app.main.model import FormulaSensorDependency
+from app.main.repository.device_change_repository import DeviceChangeRepository
 from app.main.repository.sensor_reading_repository import SensorReadingRepository
+from app.main.service.hub_service import HubService
+from app.main.util.change_notifier import ChangeNotifier
 from app.main.util.constants import Constants
 
 
@@ -72,6 +80,114 @@ def test_get_states_should_return_keys_of_updated_devices_when_valid_request(
     assert response_data['changedDevices'][0] == executive_device_key
     assert response_data['changedDevices'][1] == sensor_key
     assert response_data['deletedDevices'][0] == deleted_device.device_key
+    assert response_data['cursor'] == ChangeNotifier.get_instance().get_cursor(product_key)
+
+
+def test_get_states_should_return_device_changes_since_sequence_when_since_passed(
+        client,
+        get_device_group_default_values,
+        insert_device_group):
+    product_key = 'product_key'
+
+    password = "password"
+    device_group_password = hashlib.sha224((password + Constants.SECRET_KEY).encode()).hexdigest()
+
+    authorization_bytes = (product_key + ":" + password).encode()
+    authorization = "Basic " + base64.b64encode(authorization_bytes).decode()
+
+    device_group_values = get_device_group_default_values()
+    device_group_values['product_key'] = product_key
+    device_group_values['user_id'] = None
+    device_group_values['password'] = device_group_password
+
+    test_device_group = insert_device_group(device_group_values)
+
+    device_change_repository_instance = DeviceChangeRepository.get_instance()
+    device_change_repository_instance.add_device_change_but_do_not_commit(test_device_group.id, 'first device key')
+    device_change_repository_instance.add_device_change_but_do_not_commit(test_device_group.id, 'second device key')
+    device_change_repository_instance.add_device_change_but_do_not_commit(
+        test_device_group.id,
+        'first device key',
+        is_deleted=True
+    )
+    device_change_repository_instance.update_database()
+
+    expected_values = {
+        'isUpdated': True,
+        'changedDevices': ['second device key'],
+        'isDeleted': True,
+        'deletedDevices': ['first device key'],
+        'sequence': 3,
+        'hasMore': False
+    }
+
+    response = client.get('/api/hubs/' + product_key + '/states?since=0', headers={"Authorization": authorization})
+
+    assert response.status_code == 200
+    response_data = json.loads(response.data.decode())
+    del response_data['cursor']
+    assert response_data == expected_values
+
+    result, result_values = HubService.get_instance().compact_device_changes(1, datetime.utcnow() + timedelta(days=2))
+
+    assert result == Constants.RESPONSE_MESSAGE_OK
+    assert result_values == {'deletedChanges': 1}
+
+    response = client.get('/api/hubs/' + product_key + '/states?since=0', headers={"Authorization": authorization})
+    response_data = json.loads(response.data.decode())
+    del response_data['cursor']
+    assert response_data == expected_values
+
+    response = client.get('/api/hubs/' + product_key + '/states?since=3', headers={"Authorization": authorization})
+    response_data = json.loads(response.data.decode())
+    assert not response_data['isUpdated']
+    assert not response_data['isDeleted']
+    assert response_data['sequence'] == 3
+
+
+def test_get_states_stream_should_send_changed_devices_when_valid_request(
+        client,
+        get_sensor_default_values,
+        insert_sensor,
+        get_device_group_default_values,
+        insert_device_group):
+    product_key = 'product_key'
+    sensor_key = 'sensor device key'
+
+    password = "password"
+    device_group_password = hashlib.sha224((password + Constants.SECRET_KEY).encode()).hexdigest()
+
+    authorization_bytes = (product_key + ":" + password).encode()
+    authorization = "Basic " + base64.b64encode(authorization_bytes).decode()
+
+    device_group_values = get_device_group_default_values()
+    device_group_values['product_key'] = product_key
+    device_group_values['user_id'] = None
+    device_group_values['password'] = device_group_password
+
+    test_device_group = insert_device_group(device_group_values)
+
+    sensor_values = get_sensor_default_values()
+    sensor_values['device_key'] = sensor_key
+    sensor_values['user_group_id'] = None
+    sensor_values['device_group_id'] = test_device_group.id
+
+    insert_sensor(sensor_values)
+
+    response = client.get('/api/hubs/' + product_key + '/states/stream',
+                          headers={"Authorization": authorization},
+                          buffered=False)
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+
+    events = iter(response.response)
+    next(events)
+    event = next(events).decode()
+    response.close()
+
+    assert event.startswith('id: {}\n'.format(ChangeNotifier.get_instance().get_cursor(product_key)))
+    assert json.loads(event.split('data: ')[1])['changedDevices'] == [sensor_key]
 
 
 def test_get_states_should_return_bad_request_message_when_invalid_request(
@@ -343,6 +459,79 @@ def test_set_devices_states_should_update_devices_when_partially_valid_request(
     assert executive_device.is_active
 
 
+def test_set_devices_states_should_update_all_devices_with_single_statement(
+        client,
+        get_device_group_default_values,
+        insert_device_group,
+        get_executive_device_default_values,
+        insert_executive_devices,
+        get_executive_type_default_values,
+        insert_executive_type):
+    password = "password"
+
+    device_group_values = get_device_group_default_values()
+    device_group_values["password"] = hashlib.sha224((password + Constants.SECRET_KEY).encode()).hexdigest()
+    device_group = insert_device_group(device_group_values)
+
+    authorization_bytes = (device_group.product_key + ":" + password).encode()
+    authorization = "Basic " + base64.b64encode(authorization_bytes).decode()
+
+    executive_type_values = get_executive_type_default_values()
+    executive_type_values['state_type'] = 'Decimal'
+    executive_type_values['state_range_min'] = 0
+    executive_type_values['state_range_max'] = 1.0
+    insert_executive_type(executive_type_values)
+
+    executive_devices_values = []
+    for index in range(5):
+        executive_device_values = get_executive_device_default_values()
+        executive_device_values['id'] = index + 1
+        executive_device_values['name'] = 'executive device {}'.format(index)
+        executive_device_values['device_key'] = 'executive device key {}'.format(index)
+        executive_device_values['state'] = 0
+        executive_devices_values.append(executive_device_values)
+
+    executive_devices = insert_executive_devices(executive_devices_values)
+
+    devices_states = [
+        {
+            "deviceKey": executive_device.device_key,
+            "state": 0.5,
+            "isActive": True
+        } for executive_device in executive_devices[:-1]
+    ]
+    devices_states.append(
+        {
+            "deviceKey": executive_devices[-1].device_key,
+            "state": 2,
+            "isActive": True
+        }
+    )
+
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        response = client.post(
+            'api/hubs/' + device_group.product_key + '/states',
+            data=json.dumps({'devices': devices_states}),
+            content_type='application/json',
+            headers={"Authorization": authorization}
+        )
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+    assert response.status_code == 400
+    response_data = json.loads(response.data.decode())
+    assert Constants.RESPONSE_MESSAGE_PARTIALLY_WRONG_DATA == response_data['errorMessage']
+
+    assert [executive_device.state for executive_device in executive_devices] == [0.5, 0.5, 0.5, 0.5, 0]
+    assert len([statement for statement in statements if statement.startswith('UPDATE executive_device')]) == 1
+
+
 def test_set_devices_states_should_return_error_message_when_wrong_request(
         client):
     content_type = 'application/json'
@@ -480,6 +669,98 @@ def test_get_devices_configurations_should_return_devices_configurations_when_va
     assert not sensor.is_updated
 
 
+def test_get_devices_configurations_should_run_same_number_of_queries_regardless_of_number_of_devices(
+        client,
+        get_device_group_default_values,
+        insert_device_group,
+        get_executive_device_default_values,
+        insert_executive_devices,
+        get_executive_type_default_values,
+        insert_executive_type,
+        get_sensor_default_values,
+        insert_sensors,
+        insert_sensor_type,
+        insert_state_enumerator,
+        insert_sensor_reading_enumerator,
+        insert_formula):
+    password = "password"
+
+    device_group_values = get_device_group_default_values()
+    device_group_values["password"] = hashlib.sha224((password + Constants.SECRET_KEY).encode()).hexdigest()
+    device_group = insert_device_group(device_group_values)
+
+    authorization_bytes = (device_group.product_key + ":" + password).encode()
+    authorization = "Basic " + base64.b64encode(authorization_bytes).decode()
+
+    executive_type_values = get_executive_type_default_values()
+    executive_type_values['state_type'] = 'Enum'
+    insert_executive_type(executive_type_values)
+    insert_state_enumerator()
+    insert_sensor_reading_enumerator()
+    insert_sensor_type()
+    insert_formula()
+
+    executive_devices_values = []
+    sensors_values = []
+    for index in range(5):
+        executive_device_values = get_executive_device_default_values()
+        executive_device_values['id'] = index + 1
+        executive_device_values['name'] = 'executive device {}'.format(index)
+        executive_device_values['device_key'] = 'executive device key {}'.format(index)
+        executive_device_values['is_formula_used'] = True
+        executive_devices_values.append(executive_device_values)
+
+        sensor_values = get_sensor_default_values()
+        sensor_values['id'] = index + 1
+        sensor_values['name'] = 'sensor {}'.format(index)
+        sensor_values['device_key'] = 'sensor key {}'.format(index)
+        sensors_values.append(sensor_values)
+
+    executive_devices = insert_executive_devices(executive_devices_values)
+    sensors = insert_sensors(sensors_values)
+
+    def get_devices_configurations(device_keys):
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            response = client.post(
+                'api/hubs/' + device_group.product_key + '/devices/config',
+                data=json.dumps({"devices": device_keys}),
+                content_type='application/json',
+                headers={"Authorization": authorization}
+            )
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+        assert response.status_code == 200
+        return json.loads(response.data.decode()), statements
+
+    get_devices_configurations([executive_devices[0].device_key, sensors[0].device_key])
+
+    response_data, single_device_statements = get_devices_configurations(
+        [executive_devices[0].device_key, sensors[0].device_key]
+    )
+    assert len(response_data['devices']) == 1
+    assert len(response_data['sensors']) == 1
+
+    response_data, all_devices_statements = get_devices_configurations(
+        [executive_device.device_key for executive_device in executive_devices]
+        + [sensor.device_key for sensor in sensors]
+    )
+    assert len(response_data['devices']) == 5
+    assert len(response_data['sensors']) == 5
+    assert all(device['rule'] and device['enumerator'] for device in response_data['devices'])
+
+    # Update statements of all changed flags of a table are executed at once
+    assert len([statement for statement in all_devices_statements if statement.startswith('UPDATE')]) == 2
+    assert (len([statement for statement in all_devices_statements if statement.startswith('SELECT')])
+            == len([statement for statement in single_device_statements if statement.startswith('SELECT')]))
+
+
 def test_get_devices_configurations_should_return_error_message_when_invalid_request(client):
     content_type = 'application/json'
 
@@ -553,6 +834,87 @@ def test_set_sensors_readings_should_update_sensors_when_valid_request(
     assert sensor.is_active
 
 
+def test_set_sensors_readings_should_set_states_of_executive_devices_using_formulas(
+        client,
+        get_device_group_default_values,
+        insert_device_group,
+        get_sensor_type_default_values,
+        insert_sensor_type,
+        insert_sensor,
+        get_formula_default_values,
+        insert_formula,
+        insert_executive_type,
+        get_executive_device_default_values,
+        insert_executive_device,
+        create_record):
+    content_type = 'application/json'
+
+    password = "password"
+
+    device_group_values = get_device_group_default_values()
+    device_group_values["password"] = hashlib.sha224((password + Constants.SECRET_KEY).encode()).hexdigest()
+    device_group = insert_device_group(device_group_values)
+
+    authorization_bytes = (device_group.product_key + ":" + password).encode()
+    authorization = "Basic " + base64.b64encode(authorization_bytes).decode()
+
+    sensor_type_values = get_sensor_type_default_values()
+    sensor_type_values['reading_type'] = 'Decimal'
+    sensor_type_values['range_min'] = -1
+    sensor_type_values['range_max'] = 2
+
+    insert_sensor_type(sensor_type_values)
+    sensor = insert_sensor()
+
+    formula_values = get_formula_default_values()
+    formula_values['rule'] = json.dumps(
+        {
+            'datetimeRule': None,
+            'operator': 'and',
+            'sensorRule': {
+                'isNegated': False,
+                'value': 0.5,
+                'functor': '=>',
+                'deviceKey': sensor.device_key
+            }
+        }
+    )
+    formula = insert_formula(formula_values)
+    create_record(
+        FormulaSensorDependency(formula_id=formula.id, device_key=sensor.device_key, device_group_id=device_group.id)
+    )
+    insert_executive_type()
+
+    executive_device_values = get_executive_device_default_values()
+    executive_device_values['state'] = 0
+    executive_device_values['is_updated'] = False
+    executive_device_values['is_formula_used'] = True
+    executive_device_values['positive_state'] = 1
+    executive_device_values['negative_state'] = 0
+    executive_device = insert_executive_device(executive_device_values)
+
+    response = client.post('api/hubs/' + device_group.product_key + '/readings',
+                           data=json.dumps({'sensors': [
+                               {
+                                   "deviceKey": sensor.device_key,
+                                   "readingValue": 0.9,
+                                   "isActive": True
+                               }
+                           ]}),
+                           content_type=content_type,
+                           headers={"Authorization": authorization}
+                           )
+
+    assert response is not None
+    assert response.status_code == 201
+
+    assert executive_device.state == 1
+    assert executive_device.is_updated
+
+    device_changes = DeviceChangeRepository.get_instance().get_device_changes_by_device_group_id(device_group.id, 0, 10)
+    assert [device_change.device_key for device_change in device_changes] == [executive_device.device_key]
+
+
 def test_set_sensors_readings_should_update_sensors_when_partially_valid_request(
         client,
         get_device_group_default_values,
@@ -605,6 +967,86 @@ def test_set_sensors_readings_should_update_sensors_when_partially_valid_request
     assert sensor.is_active
 
 
+def test_set_sensors_readings_should_save_valid_readings_when_batch_is_partially_valid(
+        client,
+        get_device_group_default_values,
+        insert_device_group,
+        get_sensor_type_default_values,
+        insert_sensor_type,
+        get_sensor_default_values,
+        insert_sensors):
+    sensor_reading_repository_instance = SensorReadingRepository.get_instance()
+
+    content_type = 'application/json'
+
+    password = "password"
+
+    device_group_values = get_device_group_default_values()
+    device_group_values["password"] = hashlib.sha224((password + Constants.SECRET_KEY).encode()).hexdigest()
+    device_group = insert_device_group(device_group_values)
+
+    authorization_bytes = (device_group.product_key + ":" + password).encode()
+    authorization = "Basic " + base64.b64encode(authorization_bytes).decode()
+
+    sensor_type_values = get_sensor_type_default_values()
+    sensor_type_values['reading_type'] = 'Decimal'
+    sensor_type_values['range_min'] = -1
+    sensor_type_values['range_max'] = 2
+
+    insert_sensor_type(sensor_type_values)
+
+    first_sensor_values = get_sensor_default_values()
+    second_sensor_values = get_sensor_default_values()
+    second_sensor_values['id'] += 1
+    second_sensor_values['name'] = 'second sensor'
+    second_sensor_values['device_key'] = 'second sensor device key'
+
+    first_sensor, second_sensor = insert_sensors([first_sensor_values, second_sensor_values])
+
+    sensors_readings = [
+        {
+            "deviceKey": first_sensor.device_key,
+            "readingValue": 0.9,
+            "isActive": True
+        },
+        {
+            "deviceKey": first_sensor.device_key,
+            "readingValue": 1.5,
+            "isActive": True
+        },
+        {
+            "deviceKey": second_sensor.device_key,
+            "readingValue": 5,
+            "isActive": True
+        },
+        {
+            "deviceKey": 'unknown device key',
+            "readingValue": 1,
+            "isActive": True
+        }
+    ]
+
+    data_json = {'sensors': sensors_readings}
+
+    response = client.post('api/hubs/' + device_group.product_key + '/readings',
+                           data=json.dumps(data_json),
+                           content_type=content_type,
+                           headers={"Authorization": authorization}
+                           )
+
+    assert response is not None
+    assert response.status_code == 400
+    response_data = json.loads(response.data.decode())
+    assert Constants.RESPONSE_MESSAGE_PARTIALLY_WRONG_DATA == response_data['errorMessage']
+
+    first_sensor_readings = sensor_reading_repository_instance.get_sensor_readings_by_sensor_id(first_sensor.id)
+    assert sorted(reading.value for reading in first_sensor_readings) == [0.9, 1.5]
+    assert not sensor_reading_repository_instance.get_sensor_readings_by_sensor_id(second_sensor.id)
+
+    assert first_sensor.last_reading_value == sensors_readings[1]['readingValue']
+    assert second_sensor.last_reading_value is None
+
+
 def test_set_sensors_readings_should_return_error_message_when_wrong_request(
         client):
     content_type = 'application/json'
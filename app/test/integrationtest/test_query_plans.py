@@ -0,0 +1,184 @@
+import re
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+
+from app.main import db
+from app.main.model import SensorReadingHourRollup
+from app.main.repository.admin_repository import AdminRepository
+from app.main.repository.deleted_device_repository import DeletedDeviceRepository
+from app.main.repository.device_change_repository import DeviceChangeRepository
+from app.main.repository.device_group_repository import DeviceGroupRepository
+from app.main.repository.executive_device_repository import ExecutiveDeviceRepository
+from app.main.repository.executive_type_repository import ExecutiveTypeRepository
+from app.main.repository.formula_repository import FormulaRepository
+from app.main.repository.formula_sensor_dependency_repository import FormulaSensorDependencyRepository
+from app.main.repository.log_repository import LogRepository
+from app.main.repository.reading_enumerator_repository import ReadingEnumeratorRepository
+from app.main.repository.sensor_reading_repository import SensorReadingRepository
+from app.main.repository.sensor_reading_rollup_repository import SensorReadingRollupRepository
+from app.main.repository.sensor_repository import SensorRepository
+from app.main.repository.sensor_type_repository import SensorTypeRepository
+from app.main.repository.state_enumerator_repository import StateEnumeratorRepository
+from app.main.repository.unconfigured_device_repository import UnconfiguredDeviceRepository
+from app.main.repository.user_group_repository import UserGroupRepository
+from app.main.repository.user_repository import UserRepository
+
+# Maintenance methods are left out on purpose: removing expired rows and superseded changes visits old rows
+# of every sensor or device group, partitioned PostgreSQL storage drops whole partitions instead.
+repository_queries = [
+    (AdminRepository, 'get_admin_by_email', ('email',)),
+    (AdminRepository, 'get_admin_by_email_or_username', ('email', 'username')),
+    (AdminRepository, 'get_admin_by_id', (1,)),
+    (DeletedDeviceRepository, 'get_deleted_devices_by_device_group_id', (1,)),
+    (DeviceChangeRepository, 'get_device_changes_by_device_group_id', (1, 0, 100)),
+    (DeviceGroupRepository, 'get_device_group_by_admin_id_and_product_key', (1, 'product key')),
+    (DeviceGroupRepository, 'get_device_group_by_admin_id', (1,)),
+    (DeviceGroupRepository, 'get_device_group_by_product_key', ('product key',)),
+    (DeviceGroupRepository, 'get_device_group_by_user_id_and_product_key', (1, 'product key')),
+    (DeviceGroupRepository, 'get_device_groups_by_user_id', (1,)),
+    (ExecutiveDeviceRepository, 'get_updated_executive_devices_by_device_group_id', (1,)),
+    (ExecutiveDeviceRepository, 'get_executive_devices_by_device_group_id', (1,)),
+    (ExecutiveDeviceRepository, 'get_executive_devices_using_formulas_by_formula_ids', ([1, 2],)),
+    (ExecutiveDeviceRepository, 'get_executive_device_by_device_key_and_device_group_id', ('device key', 1)),
+    (ExecutiveDeviceRepository, 'get_executive_devices_by_device_group_id_and_device_keys', (1, ['key'])),
+    (ExecutiveDeviceRepository, 'get_executive_devices_by_user_group_id', (1,)),
+    (ExecutiveDeviceRepository, 'get_executive_devices_by_product_key_and_device_keys', ('product key', ['key'])),
+    (ExecutiveDeviceRepository, 'get_executive_devices_with_types_and_formulas_by_device_group_id_and_device_keys',
+     (1, ['device key'])),
+    (ExecutiveDeviceRepository, 'get_executive_devices_by_device_group_id_that_are_not_in_user_group', (1,)),
+    (ExecutiveDeviceRepository, 'get_executive_device_by_name_and_user_group_id', ('name', 1)),
+    (ExecutiveTypeRepository, 'get_executive_type_by_id', (1,)),
+    (ExecutiveTypeRepository, 'get_executive_type_by_device_group_id_and_name', (1, 'name')),
+    (ExecutiveTypeRepository, 'get_executive_types_by_ids', ([1, 2],)),
+    (ExecutiveTypeRepository, 'get_executive_types_by_device_group_id', (1,)),
+    (FormulaRepository, 'get_formula_by_id', (1,)),
+    (FormulaRepository, 'get_formulas_by_ids', ([1, 2],)),
+    (FormulaRepository, 'get_formula_by_name_and_user_group_id', ('name', 1)),
+    (FormulaSensorDependencyRepository, 'get_formula_sensor_dependencies_by_device_group_id', (1,)),
+    (LogRepository, 'get_logs_by_device_group_id', (1,)),
+    (ReadingEnumeratorRepository, 'get_reading_enumerators_by_sensor_type_id', (1,)),
+    (ReadingEnumeratorRepository, 'get_reading_enumerators_by_sensor_type_ids', ([1, 2],)),
+    (ReadingEnumeratorRepository, 'get_reading_enumerator_by_sensor_type_id_and_number', (1, 1)),
+    (SensorReadingRepository, 'get_sensor_readings_by_sensor_id', (1,)),
+    (SensorReadingRepository, 'get_sensor_readings_page_by_sensor_id',
+     (1, datetime(2019, 1, 1), datetime(2020, 1, 1), (datetime(2019, 6, 1), 1), 100)),
+    (SensorReadingRepository, 'get_sensor_reading_dates_and_values_by_sensor_id',
+     (1, datetime(2019, 1, 1), datetime(2020, 1, 1))),
+    (SensorReadingRepository, 'get_last_reading_for_sensor_by_sensor_id', (1,)),
+    (SensorReadingRollupRepository, 'get_sensor_reading_rollups_by_sensor_id',
+     (SensorReadingHourRollup, 1, datetime(2019, 1, 1), datetime(2020, 1, 1))),
+    (SensorRepository, 'get_sensors_by_device_group_id_and_update_status', (1,)),
+    (SensorRepository, 'get_sensors_by_device_group_id', (1,)),
+    (SensorRepository, 'get_sensor_by_device_key_and_device_group_id', ('device key', 1)),
+    (SensorRepository, 'get_sensors_by_device_group_id_and_device_keys', (1, ['key'])),
+    (SensorRepository, 'get_sensors_by_user_group_id', (1,)),
+    (SensorRepository, 'get_sensors_with_last_readings_by_user_group_id', (1,)),
+    (SensorRepository, 'get_sensor_by_name_and_user_group_id', ('name', 1)),
+    (SensorRepository, 'get_sensors_by_device_group_id_and_user_group_id_and_device_keys', (1, 1, ['key'])),
+    (SensorRepository, 'get_sensors_by_product_key_and_device_keys', ('product key', ['key'])),
+    (SensorRepository, 'get_sensors_with_types_by_device_group_id_and_device_keys', (1, ['device key'])),
+    (SensorRepository, 'get_sensors_by_device_group_id_that_are_not_in_user_group', (1,)),
+    (SensorTypeRepository, 'get_sensor_type_by_id', (1,)),
+    (SensorTypeRepository, 'get_sensor_types_by_ids', ([1, 2],)),
+    (SensorTypeRepository, 'get_sensor_type_by_device_group_id_and_name', (1, 'name')),
+    (SensorTypeRepository, 'get_sensor_types_by_device_group_id', (1,)),
+    (StateEnumeratorRepository, 'get_state_enumerators_by_executive_type_id', (1,)),
+    (StateEnumeratorRepository, 'get_state_enumerators_by_executive_type_ids', ([1, 2],)),
+    (StateEnumeratorRepository, 'get_state_enumerator_by_executive_type_id_and_number', (1, 1)),
+    (UnconfiguredDeviceRepository, 'get_unconfigured_devices_by_device_group_id', (1,)),
+    (UnconfiguredDeviceRepository, 'get_unconfigured_device_by_device_key', ('device key',)),
+    (UnconfiguredDeviceRepository, 'get_unconfigured_device_by_device_key_and_device_group_id', ('device key', 1)),
+    (UserGroupRepository, 'get_user_group_by_user_id_and_executive_device_device_key', (1, 'device key')),
+    (UserGroupRepository, 'get_user_group_by_user_id_and_sensor_device_key', (1, 'device key')),
+    (UserGroupRepository, 'get_user_group_by_name_and_device_group_id', ('name', 1)),
+    (UserGroupRepository, 'get_user_group_by_id_and_user_id', (1, 1)),
+    (UserGroupRepository, 'get_user_groups_by_device_group_id', (1,)),
+    (UserGroupRepository, 'get_user_group_by_id', (1,)),
+    (UserGroupRepository, 'get_user_group_by_name_and_device_group_id_and_user_id', ('name', 1, 1)),
+    (UserRepository, 'get_user_by_email', ('email',)),
+    (UserRepository, 'get_user_by_id', (1,)),
+    (UserRepository, 'get_user_by_email_or_username', ('email', 'username')),
+]
+
+
+@pytest.fixture
+def seeded_database(
+        client,
+        insert_device_group,
+        insert_user,
+        get_user_group_default_values,
+        insert_user_group,
+        insert_sensor_type,
+        insert_sensor_reading_enumerator,
+        insert_executive_type,
+        insert_state_enumerator,
+        insert_formula,
+        insert_sensor,
+        insert_executive_device,
+        insert_sensor_reading,
+        insert_unconfigured_device,
+        insert_deleted_device,
+        insert_log):
+    insert_device_group()
+    user = insert_user()
+
+    user_group_values = get_user_group_default_values()
+    user_group_values['users'] = [user]
+    insert_user_group(user_group_values)
+
+    insert_sensor_type()
+    insert_sensor_reading_enumerator()
+    insert_executive_type()
+    insert_state_enumerator()
+    insert_formula()
+    insert_sensor()
+    insert_executive_device()
+    insert_sensor_reading()
+    insert_unconfigured_device()
+    insert_deleted_device()
+    insert_log()
+
+    DeviceChangeRepository.get_instance().add_device_change_but_do_not_commit(1, 'device key')
+    DeviceChangeRepository.get_instance().update_database()
+
+
+def get_sequential_scans(statement: str, parameters) -> list:
+    table_names = set(db.metadata.tables)
+
+    cursor = db.session.connection().connection.cursor()
+    cursor.execute('EXPLAIN QUERY PLAN ' + statement, parameters)
+
+    sequential_scans = []
+    for row in cursor.fetchall():
+        # SQLite reports a full table scan as 'SCAN TABLE <table>' or 'SCAN <table>' without an index
+        match = re.match(r'SCAN (?:TABLE )?(\w+)', row[-1])
+
+        if match and match.group(1) in table_names and 'USING' not in row[-1]:
+            sequential_scans.append(row[-1])
+
+    return sequential_scans
+
+
+@pytest.mark.parametrize("repository_class, method_name, arguments", repository_queries)
+def test_repository_query_should_not_scan_whole_tables(repository_class, method_name, arguments, seeded_database):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        getattr(repository_class.get_instance(), method_name)(*arguments)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+    assert statements
+
+    for statement, parameters in statements:
+        assert get_sequential_scans(statement, parameters) == [], statement
+
+
+if __name__ == '__main__':
+    pytest.main(['app/unittest/{}.py'.format(__file__)])
@@ -0,0 +1,72 @@
+import datetime
+
+import pytest
+from flask import Flask
+
+from app.main import create_app
+from app.main import db
+from app.main.model.device_group import DeviceGroup
+from app.main.model.log import Log
+from app.main.repository.device_group_repository import DeviceGroupRepository
+from app.main.repository.log_repository import LogRepository
+from app.main.util.routing_session import get_replica_binds
+
+
+@pytest.fixture
+def replica_app(tmp_path) -> Flask:
+    """ Application with a primary and a replica database in separate SQLite files, which are not replicated """
+    app = create_app('test')
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///{}'.format(tmp_path / 'primary.db')
+    app.config['SQLALCHEMY_BINDS'] = get_replica_binds(['sqlite:///{}'.format(tmp_path / 'replica.db')])
+
+    with app.app_context():
+        db.create_all()
+        db.Model.metadata.create_all(bind=db.get_engine(app, 'replica_0'))
+
+        db.get_engine(app, 'replica_0').execute(
+            Log.__table__.insert(),
+            [dict(type='Info', error_message='replica', creation_date=datetime.datetime.now(), device_group_id=1)]
+        )
+        db.session.add(DeviceGroup(id=1, name='primary', password='password', product_key='product key'))
+        db.session.commit()
+        db.session.remove()
+
+    yield app
+
+
+def test_read_only_repository_method_should_read_from_replica(replica_app):
+    with replica_app.app_context():
+        logs = LogRepository.get_instance().get_logs_by_device_group_id(1)
+        device_group = DeviceGroupRepository.get_instance().get_device_group_by_product_key('product key')
+
+    assert [log.error_message for log in logs] == ['replica']
+    assert device_group.name == 'primary'
+
+
+def test_read_only_repository_method_should_read_from_primary_after_session_has_written(replica_app):
+    with replica_app.app_context():
+        db.session.add(
+            Log(type='Info', error_message='primary', creation_date=datetime.datetime.now(), device_group_id=1)
+        )
+        db.session.commit()
+
+        logs = LogRepository.get_instance().get_logs_by_device_group_id(1)
+
+    assert [log.error_message for log in logs] == ['primary']
+
+
+def test_read_only_repository_method_should_read_from_replica_in_next_request_after_write(replica_app):
+    with replica_app.test_request_context():
+        db.session.add(
+            Log(type='Info', error_message='primary', creation_date=datetime.datetime.now(), device_group_id=1)
+        )
+        db.session.commit()
+
+    with replica_app.test_request_context():
+        logs = LogRepository.get_instance().get_logs_by_device_group_id(1)
+
+    assert [log.error_message for log in logs] == ['replica']
+
+
+if __name__ == '__main__':
+    pytest.main(['app/unittest/{}.py'.format(__file__)])
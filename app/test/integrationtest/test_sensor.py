@@ -1,5 +1,8 @@
+import base64
+import hashlib
 import json
 from datetime import datetime
+from datetime import timedelta
 
 from sqlalchemy import and_
 
@@ -20,6 +23,7 @@ def test_get_sensor_info_should_return_sensor_info_when_valid_request(
         insert_user_group,
         insert_sensor_type,
         insert_sensor_reading,
+        get_sensor_default_values,
         get_sensor_type_default_values):
     content_type = 'application/json'
 
@@ -33,10 +37,12 @@ def test_get_sensor_info_should_return_sensor_info_when_valid_request(
     sensor_type_values = get_sensor_type_default_values()
     sensor_type_values['reading_type'] = 'Decimal'
     sensor_type = insert_sensor_type(sensor_type_values)
-    sensor = insert_sensor()
-
     sensor_reading = insert_sensor_reading()
 
+    sensor_values = get_sensor_default_values()
+    sensor_values['last_reading_value'] = sensor_reading.value
+    sensor = insert_sensor(sensor_values)
+
     response = client.get(
         '/api/hubs/' + device_group.product_key + '/sensors/' + sensor.device_key,
         content_type=content_type,
@@ -72,6 +78,7 @@ def test_get_sensor_info_should_return_sensor_info_when_valid_request_and_user_i
         insert_user_group,
         insert_sensor_type,
         insert_sensor_reading,
+        get_sensor_default_values,
         get_sensor_type_default_values):
     content_type = 'application/json'
 
@@ -84,10 +91,12 @@ def test_get_sensor_info_should_return_sensor_info_when_valid_request_and_user_i
     sensor_type_values = get_sensor_type_default_values()
     sensor_type_values['reading_type'] = 'Decimal'
     sensor_type = insert_sensor_type(sensor_type_values)
-    sensor = insert_sensor()
-
     sensor_reading = insert_sensor_reading()
 
+    sensor_values = get_sensor_default_values()
+    sensor_values['last_reading_value'] = sensor_reading.value
+    sensor = insert_sensor(sensor_values)
+
     response = client.get(
         '/api/hubs/' + device_group.product_key + '/sensors/' + sensor.device_key,
         content_type=content_type,
@@ -252,6 +261,171 @@ def test_get_sensor_readings_should_return_sensors_readings_when_valid_request(
     assert response_data['values'] == expected_values
 
 
+def test_get_sensor_reading_aggregates_should_return_rollups_of_readings_sent_by_hub(
+        client,
+        get_device_group_default_values,
+        insert_device_group,
+        get_sensor_type_default_values,
+        insert_sensor_type,
+        insert_sensor,
+        insert_user,
+        get_user_group_default_values,
+        insert_user_group):
+    content_type = 'application/json'
+    password = 'password'
+
+    device_group_values = get_device_group_default_values()
+    device_group_values['password'] = hashlib.sha224((password + Constants.SECRET_KEY).encode()).hexdigest()
+    device_group = insert_device_group(device_group_values)
+    user = insert_user()
+
+    user_group_values = get_user_group_default_values()
+    user_group_values['users'] = [user]
+    insert_user_group(user_group_values)
+
+    sensor_type_values = get_sensor_type_default_values()
+    sensor_type_values['reading_type'] = 'Decimal'
+    sensor_type_values['range_min'] = 0
+    sensor_type_values['range_max'] = 10
+    insert_sensor_type(sensor_type_values)
+
+    sensor = insert_sensor()
+
+    hub_authorization = 'Basic ' + base64.b64encode((device_group.product_key + ':' + password).encode()).decode()
+
+    for reading_value in [1.0, 2.0, 6.0]:
+        response = client.post(
+            '/api/hubs/' + device_group.product_key + '/readings',
+            data=json.dumps({
+                'sensors': [
+                    {
+                        'deviceKey': sensor.device_key,
+                        'readingValue': reading_value,
+                        'isActive': True
+                    }
+                ]
+            }),
+            content_type=content_type,
+            headers={'Authorization': hub_authorization}
+        )
+        assert response.status_code == 201
+
+    now = datetime.utcnow()
+    response = client.get(
+        '/api/hubs/' + device_group.product_key + '/sensors/' + sensor.device_key + '/readings/aggregates',
+        query_string={
+            'from': (now - timedelta(days=2)).isoformat(),
+            'to': (now + timedelta(days=2)).isoformat(),
+            'resolution': '2h'
+        },
+        content_type=content_type,
+        headers={
+            'Authorization': 'Bearer ' + Auth.encode_auth_token(user.id, False)
+        }
+    )
+
+    assert response.status_code == 200
+    response_data = json.loads(response.data.decode())
+    assert response_data['sensorName'] == sensor.name
+    assert response_data['resolution'] == '2h'
+    assert sum(value['count'] for value in response_data['values']) == 3
+    assert min(value['min'] for value in response_data['values']) == 1.0
+    assert max(value['max'] for value in response_data['values']) == 6.0
+    assert response_data['values'][-1]['date'] <= str(now)
+
+
+def test_get_sensor_readings_should_return_readings_pages_when_limit_and_cursor_given(
+        client,
+        insert_device_group,
+        get_sensor_type_default_values,
+        insert_sensor_type,
+        insert_sensor,
+        insert_user,
+        get_user_group_default_values,
+        insert_user_group,
+        get_sensor_reading_default_values,
+        insert_sensor_readings):
+    content_type = 'application/json'
+
+    device_group = insert_device_group()
+    user = insert_user()
+
+    user_group_values = get_user_group_default_values()
+    user_group_values['users'] = [user]
+    insert_user_group(user_group_values)
+
+    sensor_type_values = get_sensor_type_default_values()
+    sensor_type_values['reading_type'] = 'Decimal'
+    insert_sensor_type(sensor_type_values)
+
+    sensor = insert_sensor()
+
+    readings_values = []
+    for index in range(5):
+        reading_values = get_sensor_reading_default_values()
+        reading_values['id'] += index
+        reading_values['value'] = float(index)
+        reading_values['date'] = datetime(2019, 8, 5, 8, index)
+        readings_values.append(reading_values)
+
+    insert_sensor_readings(readings_values)
+
+    url = '/api/hubs/' + device_group.product_key + '/sensors/' + sensor.device_key + '/readings'
+    headers = {
+        'Authorization': 'Bearer ' + Auth.encode_auth_token(user.id, False)
+    }
+
+    response = client.get(
+        url,
+        query_string={'from': '2019-08-05T08:01:00', 'limit': 2},
+        content_type=content_type,
+        headers=headers
+    )
+
+    assert response.status_code == 200
+    response_data = json.loads(response.data.decode())
+    assert [value['value'] for value in response_data['values']] == [4.0, 3.0]
+    assert response_data['nextCursor']
+
+    response = client.get(
+        url,
+        query_string={'from': '2019-08-05T08:01:00', 'limit': 2, 'cursor': response_data['nextCursor']},
+        content_type=content_type,
+        headers=headers
+    )
+
+    assert response.status_code == 200
+    response_data = json.loads(response.data.decode())
+    assert [value['value'] for value in response_data['values']] == [2.0, 1.0]
+    assert response_data['nextCursor'] is None
+
+    response = client.get(
+        url,
+        query_string={'mode': 'buckets', 'to': '2019-08-05T08:04:00', 'limit': 2},
+        content_type=content_type,
+        headers=headers
+    )
+
+    assert response.status_code == 200
+    response_data = json.loads(response.data.decode())
+    assert response_data['values'] == [
+        {
+            'date': str(datetime(2019, 8, 5, 8, 0)),
+            'min': 0.0,
+            'max': 1.0,
+            'avg': 0.5,
+            'count': 2
+        },
+        {
+            'date': str(datetime(2019, 8, 5, 8, 2)),
+            'min': 2.0,
+            'max': 3.0,
+            'avg': 2.5,
+            'count': 2
+        }
+    ]
+
+
 def test_get_get_list_of_sensors_should_return_list_of_sensors_info_when_is_is_admin_of_device_group(
         client,
         insert_device_group,
@@ -317,7 +317,10 @@ def test_get_list_of_sensors_should_return_sensors_info_when_valid_request_and_s
     sensor_type_values = get_sensor_type_default_values()
     sensor_type_values['reading_type'] = reading_type
     insert_sensor_type(sensor_type_values)
-    sensor = insert_sensor()
+
+    sensor_values = get_sensor_default_values()
+    sensor_values['last_reading_value'] = reading
+    sensor = insert_sensor(sensor_values)
 
     response = client.get(
         '/api/hubs/' + device_group.product_key + '/user-groups/' + user_group.name + '/sensors',
@@ -376,7 +379,9 @@ def test_get_list_of_sensors_should_return_sensors_info_when_valid_request_and_s
 
     reading_enumerator = insert_sensor_reading_enumerator()
 
-    sensor = insert_sensor()
+    sensor_values = get_sensor_default_values()
+    sensor_values['last_reading_value'] = reading_info['value']
+    sensor = insert_sensor(sensor_values)
 
     response = client.get(
         '/api/hubs/' + device_group.product_key + '/user-groups/' + user_group.name + '/sensors',
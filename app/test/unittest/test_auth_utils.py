@@ -1,4 +1,5 @@
 import datetime
+from unittest.mock import patch
 
 import jwt
 import pytest
@@ -186,5 +187,38 @@ def test_get_user_info_from_auth_header_should_user_not_defined_message_when_no_
     assert result_message == Constants.RESPONSE_MESSAGE_USER_NOT_DEFINED
 
 
+def test_get_user_info_from_auth_header_should_verify_token_once_until_user_tokens_are_revoked():
+    user_id = 1
+    auth_token = Auth.encode_auth_token(user_id, False)
+    other_auth_token = Auth.encode_auth_token(2, False)
+
+    with patch.object(Auth, 'decode_auth_token', wraps=Auth.decode_auth_token) as decode_auth_token_mock:
+        first_user_info = Auth.get_user_info_from_auth_header('Bearer ' + auth_token)[1]
+        second_user_info = Auth.get_user_info_from_auth_header('Bearer ' + auth_token)[1]
+        Auth.get_user_info_from_auth_header('Bearer ' + other_auth_token)
+
+        assert decode_auth_token_mock.call_count == 2
+
+        assert Auth.revoke_user_tokens(user_id, False) == 1
+        Auth.get_user_info_from_auth_header('Bearer ' + auth_token)
+        Auth.get_user_info_from_auth_header('Bearer ' + other_auth_token)
+
+        assert decode_auth_token_mock.call_count == 3
+
+    assert first_user_info == second_user_info == {'user_id': user_id, 'is_admin': False}
+    assert Auth.get_token_cache_stats() == {'size': 2, 'hits': 2, 'misses': 3}
+
+
+def test_get_user_info_from_auth_header_should_not_cache_token_after_it_expires():
+    auth_token = Auth.encode_auth_token(1, True)
+
+    with patch('app.main.util.auth_utils.time.time') as time_mock:
+        time_mock.return_value = jwt.decode(auth_token, verify=False)['exp'] + 1
+        result_message, user_info = Auth.get_user_info_from_auth_header('Bearer ' + auth_token)
+
+    assert not result_message
+    assert Auth.get_token_cache_stats()['size'] == 0
+
+
 if __name__ == '__main__':
     pytest.main(['app/unittest/{}.py'.format(__file__)])
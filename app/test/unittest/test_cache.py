@@ -0,0 +1,91 @@
+from unittest.mock import patch
+
+import pytest
+
+from app.main.util.cache import TTLCache
+from app.main.util.cache import clear_caches
+
+
+def test_get_should_return_cached_value_and_count_hits_and_misses():
+    cache = TTLCache(2, 60)
+
+    assert cache.get('key') is None
+    cache.set('key', 'value')
+
+    assert cache.get('key') == 'value'
+    assert cache.get_stats() == {'size': 1, 'hits': 1, 'misses': 1}
+
+
+def test_set_should_evict_least_recently_used_value_when_cache_is_full():
+    cache = TTLCache(2, 60)
+
+    cache.set('first key', 1)
+    cache.set('second key', 2)
+    cache.get('first key')
+    cache.set('third key', 3)
+
+    assert cache.get('first key') == 1
+    assert cache.get('second key') is None
+    assert cache.get('third key') == 3
+
+
+def test_get_should_return_none_when_value_expired():
+    cache = TTLCache(2, 10)
+
+    with patch('app.main.util.cache.time.monotonic') as monotonic_mock:
+        monotonic_mock.return_value = 100
+        cache.set('key', 'value')
+
+        monotonic_mock.return_value = 109.9
+        assert cache.get('key') == 'value'
+
+        monotonic_mock.return_value = 110
+        assert cache.get('key') is None
+
+    assert cache.get_stats() == {'size': 0, 'hits': 1, 'misses': 1}
+
+
+def test_invalidate_and_clear_caches_should_remove_values():
+    cache = TTLCache(2, 60)
+
+    cache.set('first key', 1)
+    cache.set('second key', 2)
+
+    cache.invalidate('first key')
+    assert cache.get('first key') is None
+
+    clear_caches()
+    assert cache.get_stats() == {'size': 0, 'hits': 0, 'misses': 0}
+
+
+def test_set_should_expire_value_after_given_ttl_shorter_than_ttl_of_cache():
+    cache = TTLCache(2, 10)
+
+    with patch('app.main.util.cache.time.monotonic') as monotonic_mock:
+        monotonic_mock.return_value = 100
+        cache.set('first key', 1, 5)
+        cache.set('second key', 2, 20)
+
+        monotonic_mock.return_value = 105
+        assert cache.get('first key') is None
+        assert cache.get('second key') == 2
+
+        monotonic_mock.return_value = 110
+        assert cache.get('second key') is None
+
+
+def test_invalidate_matching_should_remove_values_matching_predicate():
+    cache = TTLCache(3, 60)
+
+    cache.set('first key', 1)
+    cache.set('second key', 2)
+    cache.set('third key', 1)
+
+    assert cache.invalidate_matching(lambda key, value: value == 1) == 2
+    assert cache.get('first key') is None
+    assert cache.get('second key') == 2
+    assert cache.get('third key') is None
+
+
+if __name__ == '__main__':
+    pytest.main(['app/unittest/{}.py'.format(__file__)])
@@ -0,0 +1,57 @@
+import threading
+
+import pytest
+
+from app.main.util.change_notifier import ChangeNotifier
+
+
+def test_notify_should_change_cursor_only_of_notified_product_key():
+    change_notifier = ChangeNotifier()
+
+    first_cursor = change_notifier.get_cursor('first product key')
+    second_cursor = change_notifier.get_cursor('second product key')
+
+    change_notifier.notify('first product key')
+
+    assert change_notifier.get_cursor('first product key') != first_cursor
+    assert change_notifier.get_cursor('second product key') == second_cursor
+
+
+def test_wait_for_change_should_return_immediately_when_cursor_not_current():
+    change_notifier = ChangeNotifier()
+    other_change_notifier = ChangeNotifier()
+
+    cursor = change_notifier.get_cursor('product key')
+    change_notifier.notify('product key')
+
+    assert change_notifier.wait_for_change('product key', cursor, 10)
+    assert change_notifier.wait_for_change('product key', None, 10)
+    assert change_notifier.wait_for_change('product key', other_change_notifier.get_cursor('product key'), 10)
+
+
+def test_wait_for_change_should_return_false_when_nothing_changed():
+    change_notifier = ChangeNotifier()
+
+    cursor = change_notifier.get_cursor('product key')
+    change_notifier.notify('other product key')
+
+    assert not change_notifier.wait_for_change('product key', cursor, 0.01)
+
+
+def test_wait_for_change_should_wake_up_when_notified_from_other_thread():
+    change_notifier = ChangeNotifier()
+    cursor = change_notifier.get_cursor('product key')
+
+    timer = threading.Timer(0.05, change_notifier.notify, args=('product key',))
+    timer.start()
+
+    try:
+        assert change_notifier.wait_for_change('product key', cursor, 10)
+    finally:
+        timer.cancel()
+
+    assert change_notifier.get_cursor('product key') != cursor
+
+
+if __name__ == '__main__':
+    pytest.main(['app/unittest/{}.py'.format(__file__)])
@@ -0,0 +1,51 @@
+from datetime import datetime
+
+import pytest
+
+from app.main.util.datetime_rule import ALL_DAYS
+from app.main.util.datetime_rule import DatetimeRule
+from app.main.util.datetime_rule import get_next_boundary
+from app.main.util.datetime_rule import is_datetime_rule_active
+from app.main.util.datetime_rule import parse_datetime_rule
+
+# 2019-06-03 is a Monday
+WORKING_DAYS_RULE = DatetimeRule(datetime(2019, 6, 3, 8), datetime(2019, 6, 17, 8), frozenset([1, 2, 3, 4, 5]))
+
+
+@pytest.mark.parametrize("data, datetime_rule", [
+    ({'datetimeStart': '2019-06-03T08:00:00.000000Z', 'datetimeEnd': '2019-06-17T08:00:00Z', 'days': '1,2,3,4,5'},
+     WORKING_DAYS_RULE),
+    ({'datetimeStart': '2019-06-03T08:00:00Z', 'datetimeEnd': '2019-06-17T08:00:00Z', 'days': [1, 2, 3, 4, 5]},
+     WORKING_DAYS_RULE),
+    ({'datetimeStart': '2019-06-03T08:00:00Z', 'datetimeEnd': '2019-06-17T08:00:00Z', 'days': ''},
+     DatetimeRule(datetime(2019, 6, 3, 8), datetime(2019, 6, 17, 8), ALL_DAYS)),
+    ({'datetimeStart': '2019-06-03T08:00:00Z', 'datetimeEnd': '2019-06-17T08:00:00Z', 'days': '1,8'}, None),
+    ({'datetimeStart': '2019-06-03T08:00:00Z', 'datetimeEnd': '2019-06-17T08:00:00Z', 'days': 'monday'}, None),
+    ({'datetimeStart': None, 'datetimeEnd': '2019-06-17T08:00:00Z', 'days': '1'}, None),
+    ({'datetimeEnd': '2019-06-17T08:00:00Z', 'days': '1'}, None)])
+def test_parse_datetime_rule_should_read_rule_when_well_formed(data, datetime_rule):
+    assert parse_datetime_rule(data) == datetime_rule
+
+
+@pytest.mark.parametrize("moment, is_active, next_boundary", [
+    (datetime(2019, 6, 1), False, datetime(2019, 6, 3, 8)),
+    (datetime(2019, 6, 3, 8), True, datetime(2019, 6, 8)),
+    (datetime(2019, 6, 7, 23, 59), True, datetime(2019, 6, 8)),
+    (datetime(2019, 6, 8), False, datetime(2019, 6, 10)),
+    (datetime(2019, 6, 14, 12), True, datetime(2019, 6, 15)),
+    (datetime(2019, 6, 16, 12), False, datetime(2019, 6, 17)),
+    (datetime(2019, 6, 17, 7), True, datetime(2019, 6, 17, 8)),
+    (datetime(2019, 6, 17, 8), False, None)])
+def test_get_next_boundary_should_return_next_change_of_rule_activity(moment, is_active, next_boundary):
+    assert is_datetime_rule_active(WORKING_DAYS_RULE, moment) is is_active
+    assert get_next_boundary(WORKING_DAYS_RULE, moment) == next_boundary
+
+
+def test_get_next_boundary_should_return_end_of_rule_when_all_days_included():
+    datetime_rule = DatetimeRule(datetime(2019, 6, 3, 8), datetime(2019, 7, 3, 8), ALL_DAYS)
+
+    assert get_next_boundary(datetime_rule, datetime(2019, 6, 4)) == datetime(2019, 7, 3, 8)
+
+
+if __name__ == '__main__':
+    pytest.main(['app/unittest/{}.py'.format(__file__)])
@@ -5,6 +5,7 @@ import pytest
 from app.main.repository.admin_repository import AdminRepository
 from app.main.repository.device_group_repository import DeviceGroupRepository
 from app.main.service.device_group_service import DeviceGroupService
+from app.main.service.hub_service import HubService
 from app.main.util.constants import Constants
 
 
@@ -32,9 +33,11 @@ def test_change_name_should_change_device_group_name_when_valid_product_key_for_
         with patch.object(DeviceGroupRepository, 'update_database') as update_database_mock:
             update_database_mock.return_value = True
 
-            result = device_group_service_instance.change_name(test_product_key, 'new_name', admin.id)
+            with patch.object(HubService, 'invalidate_device_group_cache') as invalidate_device_group_cache_mock:
+                result = device_group_service_instance.change_name(test_product_key, 'new_name', admin.id)
 
     assert result == Constants.RESPONSE_MESSAGE_OK
+    invalidate_device_group_cache_mock.assert_called_once_with(test_product_key)
 
 
 def test_change_name_should_return_product_key_not_found_when_invalid_product_key_for_admin(create_admin):
@@ -110,12 +113,21 @@ def test_delete_device_group_should_delete_device_group_and_admin_when_right_par
                     ) as update_database_mock:
                         update_database_mock.return_value = True
 
-                        result = device_group_service_instance.delete_device_group('product_key', admin.id, is_admin)
+                        with patch.object(
+                                HubService,
+                                'invalidate_device_group_cache'
+                        ) as invalidate_device_group_cache_mock:
+                            result = device_group_service_instance.delete_device_group(
+                                'product_key',
+                                admin.id,
+                                is_admin
+                            )
 
     assert result == Constants.RESPONSE_MESSAGE_OK
     delete_but_do_not_commit_device_group_mock.assert_called_with(device_group)
     delete_but_do_not_commit_admin_mock.assert_called_with(admin)
     update_database_mock.assert_called_once()
+    invalidate_device_group_cache_mock.assert_called_once_with('product_key')
 
 
 def test_delete_device_group_should_return_error_message_when_unsuccessful_db_update(
@@ -2,11 +2,15 @@ from unittest.mock import Mock
 from unittest.mock import patch
 
 import pytest
+from sqlalchemy.exc import OperationalError
 
+from app.main import create_app
+from app.main import db
 from app.main.model import ExecutiveDevice
 from app.main.repository.admin_repository import AdminRepository
 from app.main.repository.base_repository import BaseRepository
 from app.main.repository.deleted_device_repository import DeletedDeviceRepository
+from app.main.repository.device_change_repository import DeviceChangeRepository
 from app.main.repository.device_group_repository import DeviceGroupRepository
 from app.main.repository.executive_device_repository import ExecutiveDeviceRepository
 from app.main.repository.executive_type_repository import ExecutiveTypeRepository
@@ -14,6 +18,10 @@ from app.main.repository.formula_repository import FormulaRepository
 from app.main.repository.unconfigured_device_repository import UnconfiguredDeviceRepository
 from app.main.repository.user_group_repository import UserGroupRepository
 from app.main.service.executive_device_service import ExecutiveDeviceService
+from app.main.service.permission_service import PermissionService
+from app.main.service.type_registry_service import TypeRegistryService
+from app.main.service.type_registry_service import create_executive_type_metadata
+from app.main.util.change_notifier import ChangeNotifier
 from app.main.util.constants import Constants
 
 
@@ -33,45 +41,45 @@ def test_get_executive_device_info_should_return_device_info_when_valid_product_
 
     test_user_id = 1
 
-    with patch.object(
-            ExecutiveDeviceRepository,
-            'get_executive_device_by_device_key_and_device_group_id'
-    ) as get_executive_device_by_device_key_and_device_group_id_mock:
-        get_executive_device_by_device_key_and_device_group_id_mock.return_value = executive_device
+    with patch.object(UserGroupRepository, 'get_user_group_by_id') as get_user_group_by_id_mock:
+        get_user_group_by_id_mock.return_value = user_group
 
         with patch.object(
-                ExecutiveTypeRepository,
-                'get_executive_type_by_id'
-        ) as get_executive_type_by_id_mock:
-            get_executive_type_by_id_mock.return_value = executive_type
+                ExecutiveDeviceRepository,
+                'get_executive_device_by_device_key_and_device_group_id'
+        ) as get_executive_device_by_device_key_and_device_group_id_mock:
+            get_executive_device_by_device_key_and_device_group_id_mock.return_value = executive_device
 
             with patch.object(
-                    DeviceGroupRepository,
-                    'get_device_group_by_product_key'
-            ) as get_device_group_by_product_key_mock:
-                get_device_group_by_product_key_mock.return_value = device_group
+                    TypeRegistryService,
+                    'get_executive_type'
+            ) as get_executive_type_mock:
+                get_executive_type_mock.return_value = create_executive_type_metadata(executive_type, [])
 
-                with patch.object(FormulaRepository, 'get_formula_by_id') as get_formula_by_id_mock:
-                    get_formula_by_id_mock.return_value = formula
+                with patch.object(
+                        DeviceGroupRepository,
+                        'get_device_group_by_product_key'
+                ) as get_device_group_by_product_key_mock:
+                    get_device_group_by_product_key_mock.return_value = device_group
 
-                    with patch.object(
-                            UserGroupRepository,
-                            'get_user_group_by_user_id_and_executive_device_device_key'
-                    ) as get_user_group_by_user_id_and_executive_device_device_key_mock:
-                        get_user_group_by_user_id_and_executive_device_device_key_mock.return_value = user_group
+                    with patch.object(FormulaRepository, 'get_formula_by_id') as get_formula_by_id_mock:
+                        get_formula_by_id_mock.return_value = formula
 
-                        with patch.object(
-                                ExecutiveDeviceService,
-                                'get_executive_device_state_value'
-                        ) as get_executive_device_state_value_mock:
-                            get_executive_device_state_value_mock.return_value = "test"
+                        with patch.object(PermissionService, 'is_user_in_user_group') as is_user_in_user_group_mock:
+                            is_user_in_user_group_mock.return_value = True
 
-                            result, result_values = executive_device_service_instance.get_executive_device_info(
-                                executive_device.device_key,
-                                device_group.product_key,
-                                test_user_id,
-                                False
-                            )
+                            with patch.object(
+                                    ExecutiveDeviceService,
+                                    'get_executive_device_state_value'
+                            ) as get_executive_device_state_value_mock:
+                                get_executive_device_state_value_mock.return_value = "test"
+
+                                result, result_values = executive_device_service_instance.get_executive_device_info(
+                                    executive_device.device_key,
+                                    device_group.product_key,
+                                    test_user_id,
+                                    False
+                                )
 
     assert result == Constants.RESPONSE_MESSAGE_OK
     assert result_values
@@ -113,10 +121,10 @@ def test_get_executive_device_info_should_return_device_info_when_valid_user_is_
         get_executive_device_by_device_key_and_device_group_id_mock.return_value = executive_device
 
         with patch.object(
-                ExecutiveTypeRepository,
-                'get_executive_type_by_id'
-        ) as get_executive_type_by_id_mock:
-            get_executive_type_by_id_mock.return_value = executive_type
+                TypeRegistryService,
+                'get_executive_type'
+        ) as get_executive_type_mock:
+            get_executive_type_mock.return_value = create_executive_type_metadata(executive_type, [])
 
             with patch.object(
                     DeviceGroupRepository,
@@ -186,10 +194,10 @@ def test_get_executive_device_info_should_return_device_info_when_user_is_not_in
         get_executive_device_by_device_key_and_device_group_id_mock.return_value = executive_device
 
         with patch.object(
-                ExecutiveTypeRepository,
-                'get_executive_type_by_id'
-        ) as get_executive_type_by_id_mock:
-            get_executive_type_by_id_mock.return_value = executive_type
+                TypeRegistryService,
+                'get_executive_type'
+        ) as get_executive_type_mock:
+            get_executive_type_mock.return_value = create_executive_type_metadata(executive_type, [])
 
             with patch.object(
                     DeviceGroupRepository,
@@ -200,11 +208,8 @@ def test_get_executive_device_info_should_return_device_info_when_user_is_not_in
                 with patch.object(FormulaRepository, 'get_formula_by_id') as get_formula_by_id_mock:
                     get_formula_by_id_mock.return_value = formula
 
-                    with patch.object(
-                            UserGroupRepository,
-                            'get_user_group_by_user_id_and_executive_device_device_key'
-                    ) as get_user_group_by_user_id_and_executive_device_device_key_mock:
-                        get_user_group_by_user_id_and_executive_device_device_key_mock.return_value = None
+                    with patch.object(PermissionService, 'is_user_in_user_group') as is_user_in_user_group_mock:
+                        is_user_in_user_group_mock.return_value = False
 
                         with patch.object(
                                 ExecutiveDeviceService,
@@ -257,10 +262,10 @@ def test_get_executive_device_info_should_return_device_info_when_device_is_not_
         get_executive_device_by_device_key_and_device_group_id_mock.return_value = executive_device
 
         with patch.object(
-                ExecutiveTypeRepository,
-                'get_executive_type_by_id'
-        ) as get_executive_type_by_id_mock:
-            get_executive_type_by_id_mock.return_value = executive_type
+                TypeRegistryService,
+                'get_executive_type'
+        ) as get_executive_type_mock:
+            get_executive_type_mock.return_value = create_executive_type_metadata(executive_type, [])
 
             with patch.object(
                     DeviceGroupRepository,
@@ -271,11 +276,8 @@ def test_get_executive_device_info_should_return_device_info_when_device_is_not_
                 with patch.object(FormulaRepository, 'get_formula_by_id') as get_formula_by_id_mock:
                     get_formula_by_id_mock.return_value = formula
 
-                    with patch.object(
-                            UserGroupRepository,
-                            'get_user_group_by_user_id_and_executive_device_device_key'
-                    ) as get_user_group_by_user_id_and_executive_device_device_key_mock:
-                        get_user_group_by_user_id_and_executive_device_device_key_mock.return_value = None
+                    with patch.object(PermissionService, 'is_user_in_user_group') as is_user_in_user_group_mock:
+                        is_user_in_user_group_mock.return_value = False
 
                         with patch.object(
                                 ExecutiveDeviceService,
@@ -381,11 +383,8 @@ def test_get_executive_device_info_should_not_return_device_info_when_user_is_no
         ) as get_device_group_by_product_key_mock:
             get_device_group_by_product_key_mock.return_value = device_group
 
-            with patch.object(
-                    UserGroupRepository,
-                    'get_user_group_by_user_id_and_executive_device_device_key'
-            ) as get_user_group_by_user_id_and_executive_device_device_key_mock:
-                get_user_group_by_user_id_and_executive_device_device_key_mock.return_value = None
+            with patch.object(PermissionService, 'is_user_in_user_group') as is_user_in_user_group_mock:
+                is_user_in_user_group_mock.return_value = False
 
                 result, result_values = executive_device_service_instance.get_executive_device_info(
                     executive_device.device_key,
@@ -445,11 +444,8 @@ def test_get_executive_device_info_should_not_return_device_info_when_executive_
         ) as get_device_group_by_product_key_mock:
             get_device_group_by_product_key_mock.return_value = device_group
 
-            with patch.object(
-                    UserGroupRepository,
-                    'get_user_group_by_user_id_and_executive_device_device_key'
-            ) as get_user_group_by_user_id_and_executive_device_device_key_mock:
-                get_user_group_by_user_id_and_executive_device_device_key_mock.return_value = user_group
+            with patch.object(PermissionService, 'is_user_in_user_group') as is_user_in_user_group_mock:
+                is_user_in_user_group_mock.return_value = True
 
                 result, result_values = executive_device_service_instance.get_executive_device_info(
                     test_device_key,
@@ -486,11 +482,8 @@ def test_get_executive_device_info_should_not_return_device_info_when_device_gro
         ) as get_device_group_by_product_key_mock:
             get_device_group_by_product_key_mock.return_value = None
 
-            with patch.object(
-                    UserGroupRepository,
-                    'get_user_group_by_user_id_and_executive_device_device_key'
-            ) as get_user_group_by_user_id_and_executive_device_device_key_mock:
-                get_user_group_by_user_id_and_executive_device_device_key_mock.return_value = user_group
+            with patch.object(PermissionService, 'is_user_in_user_group') as is_user_in_user_group_mock:
+                is_user_in_user_group_mock.return_value = True
 
                 result, result_values = executive_device_service_instance.get_executive_device_info(
                     test_device_key,
@@ -503,7 +496,7 @@ def test_get_executive_device_info_should_not_return_device_info_when_device_gro
     assert result_values is None
 
 
-def test_set_device_state_should_set_device_state_when_called_with_right_parameters(
+def test_set_devices_states_should_set_devices_states_when_called_with_right_parameters(
         create_executive_type,
         create_executive_device):
     executive_device_service_instance = ExecutiveDeviceService.get_instance()
@@ -511,7 +504,7 @@ def test_set_device_state_should_set_device_state_when_called_with_right_paramet
     executive_type = create_executive_type()
 
     executive_device = create_executive_device()
-    executive_device.is_active = True
+    executive_device.is_active = False
 
     test_device_group_id = executive_device.device_group_id
 
@@ -523,88 +516,194 @@ def test_set_device_state_should_set_device_state_when_called_with_right_paramet
 
     with patch.object(
             ExecutiveDeviceRepository,
-            'get_executive_device_by_device_key_and_device_group_id'
-    ) as get_executive_device_by_device_key_and_device_group_id_mock:
-        get_executive_device_by_device_key_and_device_group_id_mock.return_value = executive_device
+            'get_executive_devices_by_device_group_id_and_device_keys'
+    ) as get_executive_devices_by_device_group_id_and_device_keys_mock:
+        get_executive_devices_by_device_group_id_and_device_keys_mock.return_value = [executive_device]
 
         with patch.object(
-                ExecutiveTypeRepository,
-                'get_executive_type_by_id'
-        ) as get_executive_type_by_id_mock:
-            get_executive_type_by_id_mock.return_value = executive_type
+                TypeRegistryService,
+                'get_executive_type'
+        ) as get_executive_type_mock:
+            get_executive_type_mock.return_value = create_executive_type_metadata(executive_type, [])
 
             with patch.object(
-                    ExecutiveDeviceService,
-                    '_state_in_range'
-            ) as _state_in_range_mock:
-                _state_in_range_mock.return_value = True
-
+                    ExecutiveDeviceRepository,
+                    'update_executive_devices_states_but_do_not_commit'
+            ) as update_executive_devices_states_but_do_not_commit_mock:
                 with patch.object(
                         ExecutiveDeviceRepository,
                         'update_database'
                 ) as update_database_mock:
                     update_database_mock.return_value = True
 
-                    executive_device_service_instance.set_device_state(test_device_group_id, values)
+                    is_saved, wrong_devices_states = executive_device_service_instance.set_devices_states(
+                        test_device_group_id,
+                        [values]
+                    )
 
-    assert executive_device.is_active == values['isActive']
-    assert executive_device.state == values['state']
+    assert is_saved
+    assert wrong_devices_states == []
+    update_executive_devices_states_but_do_not_commit_mock.assert_called_once_with(
+        [(executive_device, values['state'], values['isActive'])]
+    )
+    get_executive_devices_by_device_group_id_and_device_keys_mock.assert_called_once_with(
+        test_device_group_id,
+        [executive_device.device_key]
+    )
     update_database_mock.assert_called_once()
 
 
-def test_set_device_state_should_not_set_device_state_when_state_not_in_range(
+def test_set_devices_states_should_return_false_when_states_not_updated(
         create_executive_type,
         create_executive_device):
     executive_device_service_instance = ExecutiveDeviceService.get_instance()
+
     executive_type = create_executive_type()
     executive_device = create_executive_device()
-    executive_device.is_active = True
-
-    test_device_group_id = executive_device.device_group_id
 
     values = {
         'deviceKey': executive_device.device_key,
         'state': 0.5,
         'isActive': True
     }
+    wrong_values = {
+        'deviceKey': executive_device.device_key,
+        'isActive': True
+    }
 
     with patch.object(
             ExecutiveDeviceRepository,
-            'get_executive_device_by_device_key_and_device_group_id'
-    ) as get_executive_device_by_device_key_and_device_group_id_mock:
-        get_executive_device_by_device_key_and_device_group_id_mock.return_value = executive_device
+            'get_executive_devices_by_device_group_id_and_device_keys'
+    ) as get_executive_devices_by_device_group_id_and_device_keys_mock:
+        get_executive_devices_by_device_group_id_and_device_keys_mock.return_value = [executive_device]
 
         with patch.object(
-                ExecutiveTypeRepository,
-                'get_executive_type_by_id'
-        ) as get_executive_type_by_id_mock:
-            get_executive_type_by_id_mock.return_value = executive_type
+                TypeRegistryService,
+                'get_executive_type'
+        ) as get_executive_type_mock:
+            get_executive_type_mock.return_value = create_executive_type_metadata(executive_type, [])
 
             with patch.object(
-                    ExecutiveDeviceService,
-                    '_state_in_range'
-            ) as _state_in_range_mock:
-                _state_in_range_mock.return_value = False
+                    ExecutiveDeviceRepository,
+                    'update_executive_devices_states_but_do_not_commit'
+            ) as update_executive_devices_states_but_do_not_commit_mock:
+                update_executive_devices_states_but_do_not_commit_mock.return_value = False
 
-                assert not executive_device_service_instance.set_device_state(test_device_group_id, values)
+                with patch.object(
+                        ExecutiveDeviceRepository,
+                        'update_database'
+                ) as update_database_mock:
+                    is_saved, wrong_devices_states = executive_device_service_instance.set_devices_states(
+                        executive_device.device_group_id,
+                        [values, wrong_values]
+                    )
 
+    assert not is_saved
+    assert wrong_devices_states == [wrong_values]
+    update_executive_devices_states_but_do_not_commit_mock.assert_called_once()
+    update_database_mock.assert_not_called()
+
+
+def test_update_executive_devices_states_but_do_not_commit_should_rollback_and_return_false_when_update_failed(
+        create_executive_device):
+    executive_device_repository_instance = ExecutiveDeviceRepository.get_instance()
+
+    executive_device = create_executive_device()
+    executive_device.state = 0
+
+    with create_app('test').app_context():
+        with patch.object(db.session, 'execute') as execute_mock:
+            execute_mock.side_effect = OperationalError('UPDATE executive_device', {}, Exception('timeout'))
+
+            with patch.object(ExecutiveDeviceRepository, 'rollback_session') as rollback_session_mock:
+                result = executive_device_repository_instance.update_executive_devices_states_but_do_not_commit(
+                    [(executive_device, 1, True)]
+                )
+
+    assert not result
+    rollback_session_mock.assert_called_once()
+    assert executive_device.state == 0
+
+
+@pytest.mark.parametrize("state_type, state, is_valid", [
+    ('Enum', 1, True),
+    ('Enum', 2, False),
+    ('Enum', '1', False),
+    ('Boolean', 1, True),
+    ('Boolean', False, True),
+    ('Boolean', 2, False),
+    ('Decimal', 1.5, False),
+    ('Decimal', 'test', False)])
+def test_set_devices_states_should_validate_states_against_preloaded_executive_types(
+        state_type, state, is_valid,
+        create_executive_type,
+        create_executive_device,
+        create_state_enumerator,
+        get_executive_type_default_values):
+    executive_device_service_instance = ExecutiveDeviceService.get_instance()
+
+    executive_type_values = get_executive_type_default_values()
+    executive_type_values['state_type'] = state_type
+    executive_type = create_executive_type(executive_type_values)
+    state_enumerator = create_state_enumerator()
+
+    executive_device = create_executive_device()
+    executive_device.state = 0
+    executive_device.is_active = False
 
-def test_set_device_state_should_not_set_device_state_when_called_with_wrong_dictionary():
-    device_group_id = 1
     values = {
-        'deviceKey': 1,
-        'test': 0.5,
-        'isActive': False
+        'deviceKey': executive_device.device_key,
+        'state': state,
+        'isActive': True
     }
-    executive_device_service_instance = ExecutiveDeviceService.get_instance()
 
-    assert not executive_device_service_instance.set_device_state(device_group_id, values)
+    with patch.object(
+            ExecutiveDeviceRepository,
+            'get_executive_devices_by_device_group_id_and_device_keys'
+    ) as get_executive_devices_by_device_group_id_and_device_keys_mock:
+        get_executive_devices_by_device_group_id_and_device_keys_mock.return_value = [executive_device]
+
+        with patch.object(
+                TypeRegistryService,
+                'get_executive_type'
+        ) as get_executive_type_mock:
+            get_executive_type_mock.return_value = create_executive_type_metadata(
+                executive_type,
+                [state_enumerator] if state_type == 'Enum' else []
+            )
 
+            with patch.object(
+                    ExecutiveDeviceRepository,
+                    'update_executive_devices_states_but_do_not_commit'
+            ) as update_executive_devices_states_but_do_not_commit_mock:
+                with patch.object(
+                        ExecutiveDeviceRepository,
+                        'update_database'
+                ) as update_database_mock:
+                    update_database_mock.return_value = True
 
-def test_set_device_state_should_not_set_device_when_device_not_in_device_group():
+                    is_saved, wrong_devices_states = executive_device_service_instance.set_devices_states(
+                        executive_device.device_group_id,
+                        [values]
+                    )
+
+    assert is_saved
+    assert (wrong_devices_states == []) == is_valid
+    update_executive_devices_states_but_do_not_commit_mock.assert_called_once_with(
+        [(executive_device, state, True)] if is_valid else []
+    )
+    get_executive_type_mock.assert_called_once_with(executive_device.device_group_id, executive_type.id)
+
+
+def test_set_devices_states_should_return_wrong_states_when_device_not_found_or_wrong_dict():
     device_group_id = 1
-    values = {
+    wrong_dict_values = {
         'deviceKey': 1,
+        'test': 0.5,
+        'isActive': False
+    }
+    unknown_device_values = {
+        'deviceKey': 'unknown device key',
         'state': 0.5,
         'isActive': False
     }
@@ -613,10 +712,65 @@ def test_set_device_state_should_not_set_device_when_device_not_in_device_group(
 
     with patch.object(
             ExecutiveDeviceRepository,
-            'get_executive_device_by_device_key_and_device_group_id'
-    ) as get_executive_device_by_device_key_and_device_group_id_mock:
-        get_executive_device_by_device_key_and_device_group_id_mock.return_value = None
-        assert not executive_device_service_instance.set_device_state(device_group_id, values)
+            'get_executive_devices_by_device_group_id_and_device_keys'
+    ) as get_executive_devices_by_device_group_id_and_device_keys_mock:
+        get_executive_devices_by_device_group_id_and_device_keys_mock.return_value = []
+
+        with patch.object(
+                ExecutiveDeviceRepository,
+                'update_database'
+        ) as update_database_mock:
+            update_database_mock.return_value = True
+
+            is_saved, wrong_devices_states = executive_device_service_instance.set_devices_states(
+                device_group_id,
+                [wrong_dict_values, unknown_device_values]
+            )
+
+    assert is_saved
+    assert wrong_devices_states == [wrong_dict_values, unknown_device_values]
+
+
+def test_set_devices_states_should_return_negative_status_when_database_update_failed(
+        create_executive_type,
+        create_executive_device):
+    executive_device_service_instance = ExecutiveDeviceService.get_instance()
+
+    executive_type = create_executive_type()
+    executive_device = create_executive_device()
+
+    values = {
+        'deviceKey': executive_device.device_key,
+        'state': 0.5,
+        'isActive': True
+    }
+
+    with patch.object(
+            ExecutiveDeviceRepository,
+            'get_executive_devices_by_device_group_id_and_device_keys'
+    ) as get_executive_devices_by_device_group_id_and_device_keys_mock:
+        get_executive_devices_by_device_group_id_and_device_keys_mock.return_value = [executive_device]
+
+        with patch.object(
+                TypeRegistryService,
+                'get_executive_type'
+        ) as get_executive_type_mock:
+            get_executive_type_mock.return_value = create_executive_type_metadata(executive_type, [])
+
+            with patch.object(ExecutiveDeviceRepository, 'update_executive_devices_states_but_do_not_commit'):
+                with patch.object(
+                        ExecutiveDeviceRepository,
+                        'update_database'
+                ) as update_database_mock:
+                    update_database_mock.return_value = False
+
+                    is_saved, wrong_devices_states = executive_device_service_instance.set_devices_states(
+                        executive_device.device_group_id,
+                        [values]
+                    )
+
+    assert not is_saved
+    assert wrong_devices_states == []
 
 
 @pytest.mark.parametrize("state_range_min,state_range_max,value", [
@@ -877,11 +1031,8 @@ def test_get_list_of_unassigned_executive_devices_should_return_list_of_unassign
             'get_device_group_by_product_key') as get_device_group_by_product_key_mock:
         get_device_group_by_product_key_mock.return_value = device_group
 
-        with patch.object(
-                DeviceGroupRepository,
-                'get_device_group_by_user_id_and_product_key'
-        ) as get_device_group_by_user_id_and_product_key_mock:
-            get_device_group_by_user_id_and_product_key_mock.return_value = device_group
+        with patch.object(PermissionService, 'is_master_user_of_device_group') as is_master_user_of_device_group_mock:
+            is_master_user_of_device_group_mock.return_value = True
 
             with patch.object(
                     ExecutiveDeviceRepository,
@@ -930,11 +1081,8 @@ def test_get_list_of_unassigned_executive_devices_should_return_list_of_unassign
             'get_device_group_by_product_key') as get_device_group_by_product_key_mock:
         get_device_group_by_product_key_mock.return_value = device_group
 
-        with patch.object(
-                DeviceGroupRepository,
-                'get_device_group_by_user_id_and_product_key'
-        ) as get_device_group_by_user_id_and_product_key_mock:
-            get_device_group_by_user_id_and_product_key_mock.return_value = device_group
+        with patch.object(PermissionService, 'is_master_user_of_device_group') as is_master_user_of_device_group_mock:
+            is_master_user_of_device_group_mock.return_value = True
 
             with patch.object(
                     ExecutiveDeviceRepository,
@@ -967,11 +1115,8 @@ def test_get_list_of_unassigned_executive_devices_should_return_empty_list_when_
             'get_device_group_by_product_key') as get_device_group_by_product_key_mock:
         get_device_group_by_product_key_mock.return_value = device_group
 
-        with patch.object(
-                DeviceGroupRepository,
-                'get_device_group_by_user_id_and_product_key'
-        ) as get_device_group_by_user_id_and_product_key_mock:
-            get_device_group_by_user_id_and_product_key_mock.return_value = device_group
+        with patch.object(PermissionService, 'is_master_user_of_device_group') as is_master_user_of_device_group_mock:
+            is_master_user_of_device_group_mock.return_value = True
 
             with patch.object(
                     ExecutiveDeviceRepository,
@@ -1000,11 +1145,8 @@ def test_get_list_of_unassigned_executive_devices_should_error_message_when_admi
             'get_device_group_by_product_key') as get_device_group_by_product_key_mock:
         get_device_group_by_product_key_mock.return_value = device_group
 
-        with patch.object(
-                DeviceGroupRepository,
-                'get_device_group_by_user_id_and_product_key'
-        ) as get_device_group_by_user_id_and_product_key_mock:
-            get_device_group_by_user_id_and_product_key_mock.return_value = device_group
+        with patch.object(PermissionService, 'is_master_user_of_device_group') as is_master_user_of_device_group_mock:
+            is_master_user_of_device_group_mock.return_value = True
 
             result, result_values = executive_device_service_instance.get_list_of_unassigned_executive_devices(
                 device_group.product_key,
@@ -1027,11 +1169,8 @@ def test_get_list_of_unassigned_executive_devices_should_error_message_when_user
             'get_device_group_by_product_key') as get_device_group_by_product_key_mock:
         get_device_group_by_product_key_mock.return_value = device_group
 
-        with patch.object(
-                DeviceGroupRepository,
-                'get_device_group_by_user_id_and_product_key'
-        ) as get_device_group_by_user_id_and_product_key_mock:
-            get_device_group_by_user_id_and_product_key_mock.return_value = None
+        with patch.object(PermissionService, 'is_master_user_of_device_group') as is_master_user_of_device_group_mock:
+            is_master_user_of_device_group_mock.return_value = False
 
             result, result_values = executive_device_service_instance.get_list_of_unassigned_executive_devices(
                 device_group.product_key,
@@ -1549,14 +1688,11 @@ def test__change_device_user_group_should_change_devices_user_group_if_user_in_o
 
     new_user_group = create_user_group()
 
-    old_user_group.users = [user]
-    new_user_group.users = [user]
-
     with patch.object(
-            UserGroupRepository,
-            'get_user_group_by_id'
-    ) as get_user_group_by_id_mock:
-        get_user_group_by_id_mock.return_value = old_user_group
+            PermissionService,
+            'is_user_in_user_group'
+    ) as is_user_in_user_group_mock:
+        is_user_in_user_group_mock.return_value = True
 
         status, error_msg = executive_device_service_instance._change_device_user_group(
             executive_device,
@@ -1614,21 +1750,11 @@ def test__change_device_user_group_should_return_error_message_when_user_not_in_
 
     new_user_group = create_user_group()
 
-    if user_in_old_user_group:
-        old_user_group.users = [user]
-    else:
-        old_user_group.users = []
-
-    if user_in_new_user_group:
-        new_user_group.users = [user]
-    else:
-        new_user_group.users = []
-
     with patch.object(
-            UserGroupRepository,
-            'get_user_group_by_id'
-    ) as get_user_group_by_id_mock:
-        get_user_group_by_id_mock.return_value = old_user_group
+            PermissionService,
+            'is_user_in_user_group'
+    ) as is_user_in_user_group_mock:
+        is_user_in_user_group_mock.side_effect = [user_in_old_user_group, user_in_new_user_group]
 
         status, error_msg = executive_device_service_instance._change_device_user_group(
             executive_device,
@@ -2019,15 +2145,26 @@ def test_delete_executive_device_should_delete_sensor_when_right_parameters_are_
                     ) as save_mock:
                         save_mock.return_value = True
 
-                        result = executive_device_service_instance.delete_executive_device(
-                            executive_device.device_key,
-                            'product_key',
-                            admin_id,
-                            is_admin
-                        )
+                        with patch.object(ChangeNotifier, 'notify') as notify_mock:
+                            with patch.object(
+                                    DeviceChangeRepository,
+                                    'add_device_change_but_do_not_commit'
+                            ) as add_device_change_but_do_not_commit_mock:
+                                result = executive_device_service_instance.delete_executive_device(
+                                    executive_device.device_key,
+                                    'product_key',
+                                    admin_id,
+                                    is_admin
+                                )
 
     assert result == Constants.RESPONSE_MESSAGE_OK
     delete_but_do_not_commit_mock.assert_called_once_with(executive_device)
+    notify_mock.assert_called_once_with('product_key')
+    add_device_change_but_do_not_commit_mock.assert_called_once_with(
+        device_group.id,
+        executive_device.device_key,
+        is_deleted=True
+    )
 
 
 def test_delete_executive_device_should_return_error_message_when_unsuccessful_db_deletion(
@@ -2074,12 +2211,16 @@ def test_delete_executive_device_should_return_error_message_when_unsuccessful_d
                     ) as save_mock:
                         save_mock.return_value = False
 
-                        result = executive_device_service_instance.delete_executive_device(
-                            executive_device.device_key,
-                            'product_key',
-                            admin_id,
-                            is_admin
-                        )
+                        with patch.object(
+                                DeviceChangeRepository,
+                                'add_device_change_but_do_not_commit'
+                        ):
+                            result = executive_device_service_instance.delete_executive_device(
+                                executive_device.device_key,
+                                'product_key',
+                                admin_id,
+                                is_admin
+                            )
 
     assert result == Constants.RESPONSE_MESSAGE_ERROR
     delete_but_do_not_commit_mock.assert_called_once_with(executive_device)
@@ -8,6 +8,7 @@ from app.main.repository.executive_type_repository import ExecutiveTypeRepositor
 from app.main.repository.state_enumerator_repository import StateEnumeratorRepository
 from app.main.repository.user_repository import UserRepository
 from app.main.service.executive_type_service import ExecutiveTypeService
+from app.main.service.permission_service import PermissionService
 from app.main.util.constants import Constants
 
 
@@ -49,39 +50,42 @@ def test_get_executive_type_info_should_return_executive_type_info_when_valid_re
         'defaultState': executive_type.default_state
     }
 
-    with patch.object(
-            DeviceGroupRepository,
-            'get_device_group_by_product_key'
-    ) as get_device_group_by_product_key_mock:
-        get_device_group_by_product_key_mock.return_value = device_group
+    with patch.object(PermissionService, 'is_user_in_device_group') as is_user_in_device_group_mock:
+        is_user_in_device_group_mock.return_value = True
 
         with patch.object(
-                UserRepository,
-                'get_user_by_id'
-        ) as get_user_by_id_mock:
-            get_user_by_id_mock.return_value = user
+                DeviceGroupRepository,
+                'get_device_group_by_product_key'
+        ) as get_device_group_by_product_key_mock:
+            get_device_group_by_product_key_mock.return_value = device_group
 
             with patch.object(
-                    ExecutiveTypeRepository,
-                    'get_executive_type_by_device_group_id_and_name'
-            ) as get_executive_type_by_device_group_id_and_name_mock:
-                get_executive_type_by_device_group_id_and_name_mock.return_value = executive_type
+                    UserRepository,
+                    'get_user_by_id'
+            ) as get_user_by_id_mock:
+                get_user_by_id_mock.return_value = user
 
                 with patch.object(
-                        StateEnumeratorRepository,
-                        'get_state_enumerators_by_executive_type_id'
-                ) as get_state_enumerators_by_sensor_type_id_mock:
-                    get_state_enumerators_by_sensor_type_id_mock.return_value = [
-                        first_enumerator,
-                        second_enumerator
-                    ]
+                        ExecutiveTypeRepository,
+                        'get_executive_type_by_device_group_id_and_name'
+                ) as get_executive_type_by_device_group_id_and_name_mock:
+                    get_executive_type_by_device_group_id_and_name_mock.return_value = executive_type
 
-                    result, result_values = executive_type_service_instance.get_executive_type_info(
-                        device_group.product_key,
-                        user_group.name,
-                        test_user_id,
-                        False
-                    )
+                    with patch.object(
+                            StateEnumeratorRepository,
+                            'get_state_enumerators_by_executive_type_id'
+                    ) as get_state_enumerators_by_sensor_type_id_mock:
+                        get_state_enumerators_by_sensor_type_id_mock.return_value = [
+                            first_enumerator,
+                            second_enumerator
+                        ]
+
+                        result, result_values = executive_type_service_instance.get_executive_type_info(
+                            device_group.product_key,
+                            user_group.name,
+                            test_user_id,
+                            False
+                        )
 
     assert result == Constants.RESPONSE_MESSAGE_OK
     assert result_values == expected_returned_values
@@ -127,30 +131,33 @@ def test_get_sensor_type_info_should_return_sensor_info_when_valid_request_and_r
     if state_type == 'Boolean':
         expected_returned_values['defaultState'] = False
 
-    with patch.object(
-            DeviceGroupRepository,
-            'get_device_group_by_product_key'
-    ) as get_device_group_by_product_key_mock:
-        get_device_group_by_product_key_mock.return_value = device_group
+    with patch.object(PermissionService, 'is_user_in_device_group') as is_user_in_device_group_mock:
+        is_user_in_device_group_mock.return_value = True
 
         with patch.object(
-                UserRepository,
-                'get_user_by_id'
-        ) as get_user_by_id_mock:
-            get_user_by_id_mock.return_value = user
+                DeviceGroupRepository,
+                'get_device_group_by_product_key'
+        ) as get_device_group_by_product_key_mock:
+            get_device_group_by_product_key_mock.return_value = device_group
 
             with patch.object(
-                    ExecutiveTypeRepository,
-                    'get_executive_type_by_device_group_id_and_name'
-            ) as get_executive_type_by_device_group_id_and_name_mock:
-                get_executive_type_by_device_group_id_and_name_mock.return_value = executive_type
+                    UserRepository,
+                    'get_user_by_id'
+            ) as get_user_by_id_mock:
+                get_user_by_id_mock.return_value = user
 
-                result, result_values = executive_type_service_instance.get_executive_type_info(
-                    device_group.product_key,
-                    user_group.name,
-                    test_user_id,
-                    False
-                )
+                with patch.object(
+                        ExecutiveTypeRepository,
+                        'get_executive_type_by_device_group_id_and_name'
+                ) as get_executive_type_by_device_group_id_and_name_mock:
+                    get_executive_type_by_device_group_id_and_name_mock.return_value = executive_type
+
+                    result, result_values = executive_type_service_instance.get_executive_type_info(
+                        device_group.product_key,
+                        user_group.name,
+                        test_user_id,
+                        False
+                    )
 
     assert result == Constants.RESPONSE_MESSAGE_OK
     assert result_values == expected_returned_values
@@ -173,30 +180,33 @@ def test_get_sensor_type_info_should_return_error_message_when_sensor_type_not_i
     device_group.user_groups = [user_group]
     user_group.users = [user]
 
-    with patch.object(
-            DeviceGroupRepository,
-            'get_device_group_by_product_key'
-    ) as get_device_group_by_product_key_mock:
-        get_device_group_by_product_key_mock.return_value = device_group
+    with patch.object(PermissionService, 'is_user_in_device_group') as is_user_in_device_group_mock:
+        is_user_in_device_group_mock.return_value = True
 
         with patch.object(
-                UserRepository,
-                'get_user_by_id'
-        ) as get_user_by_id_mock:
-            get_user_by_id_mock.return_value = user
+                DeviceGroupRepository,
+                'get_device_group_by_product_key'
+        ) as get_device_group_by_product_key_mock:
+            get_device_group_by_product_key_mock.return_value = device_group
 
             with patch.object(
-                    ExecutiveTypeRepository,
-                    'get_executive_type_by_device_group_id_and_name'
-            ) as get_executive_type_by_device_group_id_and_name_mock:
-                get_executive_type_by_device_group_id_and_name_mock.return_value = None
+                    UserRepository,
+                    'get_user_by_id'
+            ) as get_user_by_id_mock:
+                get_user_by_id_mock.return_value = user
 
-                result, result_values = executive_type_service_instance.get_executive_type_info(
-                    device_group.product_key,
-                    user_group.name,
-                    test_user_id,
-                    False
-                )
+                with patch.object(
+                        ExecutiveTypeRepository,
+                        'get_executive_type_by_device_group_id_and_name'
+                ) as get_executive_type_by_device_group_id_and_name_mock:
+                    get_executive_type_by_device_group_id_and_name_mock.return_value = None
+
+                    result, result_values = executive_type_service_instance.get_executive_type_info(
+                        device_group.product_key,
+                        user_group.name,
+                        test_user_id,
+                        False
+                    )
 
     assert result == Constants.RESPONSE_MESSAGE_EXECUTIVE_TYPE_NOT_FOUND
     assert result_values is None
@@ -215,24 +225,27 @@ def test_get_sensor_type_info_should_return_error_message_when_user_not_in_any_u
     device_group.user_groups = [user_group]
     user_group.users = []
 
-    with patch.object(
-            DeviceGroupRepository,
-            'get_device_group_by_product_key'
-    ) as get_device_group_by_product_key_mock:
-        get_device_group_by_product_key_mock.return_value = device_group
+    with patch.object(PermissionService, 'is_user_in_device_group') as is_user_in_device_group_mock:
+        is_user_in_device_group_mock.return_value = False
 
         with patch.object(
-                UserRepository,
-                'get_user_by_id'
-        ) as get_user_by_id_mock:
-            get_user_by_id_mock.return_value = user
+                DeviceGroupRepository,
+                'get_device_group_by_product_key'
+        ) as get_device_group_by_product_key_mock:
+            get_device_group_by_product_key_mock.return_value = device_group
 
-            result, result_values = executive_type_service_instance.get_executive_type_info(
-                device_group.product_key,
-                user_group.name,
-                test_user_id,
-                False
-            )
+            with patch.object(
+                    UserRepository,
+                    'get_user_by_id'
+            ) as get_user_by_id_mock:
+                get_user_by_id_mock.return_value = user
+
+                result, result_values = executive_type_service_instance.get_executive_type_info(
+                    device_group.product_key,
+                    user_group.name,
+                    test_user_id,
+                    False
+                )
 
     assert result == Constants.RESPONSE_MESSAGE_USER_DOES_NOT_HAVE_PRIVILEGES
     assert result_values is None
@@ -509,16 +522,14 @@ def test_create_executive_type_in_device_group_should_create_executive_type_when
 
             with patch.object(
                     ExecutiveTypeRepository,
-                    'save'
-            ) as save_mock:
-                save_mock.return_value = True
-
+                    'save_but_do_not_commit'
+            ) as save_but_do_not_commit_mock:
                 with patch.object(
                         StateEnumeratorRepository,
                         'save_but_do_not_commit'
-                ):
+                ) as save_enumerator_but_do_not_commit_mock:
                     with patch.object(
-                            StateEnumeratorRepository,
+                            ExecutiveTypeRepository,
                             'update_database'
                     ) as update_database_mock:
                         update_database_mock.return_value = True
@@ -542,6 +553,18 @@ def test_create_executive_type_in_device_group_should_create_executive_type_when
     assert result
     assert result == Constants.RESPONSE_MESSAGE_CREATED
 
+    save_but_do_not_commit_mock.assert_called_once()
+    executive_type = save_but_do_not_commit_mock.call_args[0][0]
+    update_database_mock.assert_called_once()
+
+    if state_type == 'Enum':
+        assert [
+            (call[0][0].number, call[0][0].text, call[0][0].executive_type)
+            for call in save_enumerator_but_do_not_commit_mock.call_args_list
+        ] == [(0, 'zero', executive_type), (1, 'one', executive_type)]
+    else:
+        save_enumerator_but_do_not_commit_mock.assert_not_called()
+
 
 def test_create_executive_type_in_device_group_should_return_error_message_when_no_device_group():
     executive_type_service_instance = ExecutiveTypeService.get_instance()
@@ -1,3 +1,4 @@
+import multiprocessing
 from datetime import datetime
 from unittest.mock import patch
 
@@ -9,6 +10,8 @@ from app.main.repository.sensor_repository import SensorRepository
 from app.main.repository.sensor_type_repository import SensorTypeRepository
 from app.main.repository.user_group_repository import UserGroupRepository
 from app.main.service.formula_service import FormulaService
+from app.main.service.permission_service import PermissionService
+from app.main.util.cache import TTLCache
 from app.main.util.constants import Constants
 
 
@@ -67,11 +70,8 @@ def test_add_formula_to_user_group_should_create_formula_when_valid_formula(
         }
     }
 
-    with patch.object(
-            DeviceGroupRepository,
-            'get_device_group_by_user_id_and_product_key'
-    ) as get_device_group_by_user_id_and_product_key_mock:
-        get_device_group_by_user_id_and_product_key_mock.return_value = device_group
+    with patch.object(PermissionService, 'get_master_user_device_group') as get_master_user_device_group_mock:
+        get_master_user_device_group_mock.return_value = device_group
 
         with patch.object(
                 UserGroupRepository,
@@ -169,11 +169,8 @@ def test_add_formula_to_user_group_should_return_invalid_formula_message_when_in
         }
     }
 
-    with patch.object(
-            DeviceGroupRepository,
-            'get_device_group_by_user_id_and_product_key'
-    ) as get_device_group_by_user_id_and_product_key_mock:
-        get_device_group_by_user_id_and_product_key_mock.return_value = device_group
+    with patch.object(PermissionService, 'get_master_user_device_group') as get_master_user_device_group_mock:
+        get_master_user_device_group_mock.return_value = device_group
 
         with patch.object(
                 UserGroupRepository,
@@ -275,11 +272,8 @@ def test_add_formula_to_user_group_should_return_invalid_formula_message_when_in
         }
     }
 
-    with patch.object(
-            DeviceGroupRepository,
-            'get_device_group_by_user_id_and_product_key'
-    ) as get_device_group_by_user_id_and_product_key_mock:
-        get_device_group_by_user_id_and_product_key_mock.return_value = device_group
+    with patch.object(PermissionService, 'get_master_user_device_group') as get_master_user_device_group_mock:
+        get_master_user_device_group_mock.return_value = device_group
 
         with patch.object(
                 UserGroupRepository,
@@ -370,11 +364,8 @@ def test_add_formula_to_user_group_should_create_formula_when_valid_formula_with
         }
     }
 
-    with patch.object(
-            DeviceGroupRepository,
-            'get_device_group_by_user_id_and_product_key'
-    ) as get_device_group_by_user_id_and_product_key_mock:
-        get_device_group_by_user_id_and_product_key_mock.return_value = device_group
+    with patch.object(PermissionService, 'get_master_user_device_group') as get_master_user_device_group_mock:
+        get_master_user_device_group_mock.return_value = device_group
 
         with patch.object(
                 UserGroupRepository,
@@ -417,6 +408,288 @@ def test_add_formula_to_user_group_should_create_formula_when_valid_formula_with
     assert result == Constants.RESPONSE_MESSAGE_CREATED
 
 
+def test_add_formula_to_user_group_should_check_equal_rules_once(
+        create_device_group,
+        get_sensor_type_default_values,
+        create_sensor_type,
+        create_sensor,
+        create_user,
+        get_user_group_default_values,
+        create_user_group):
+    formula_service_instance = FormulaService.get_instance()
+
+    device_group = create_device_group()
+    user = create_user()
+
+    user_group_values = get_user_group_default_values()
+    user_group_values['users'] = [user]
+    user_group = create_user_group(user_group_values)
+
+    sensor_type_values = get_sensor_type_default_values()
+    sensor_type_values['reading_type'] = 'Decimal'
+    sensor_type_values['range_min'] = 0
+    sensor_type_values['range_max'] = 20
+
+    sensor_type = create_sensor_type(sensor_type_values)
+    sensor = create_sensor()
+
+    formulas_data = [
+        {
+            "name": formula_name,
+            "rule": {
+                "datetimeRule": None,
+                "sensorRule": {
+                    "isNegated": False,
+                    "operator": "or",
+                    "complexRight": {
+                        "isNegated": False,
+                        "value": 15,
+                        "functor": "==",
+                        "deviceKey": sensor.device_key
+                    },
+                    "complexLeft": {
+                        "isNegated": True,
+                        "value": 10,
+                        "functor": "<=",
+                        "deviceKey": sensor.device_key
+                    }
+                }
+            }
+        } for formula_name in ['first', 'second']
+    ]
+
+    with patch.object(PermissionService, 'get_master_user_device_group') as get_master_user_device_group_mock:
+        get_master_user_device_group_mock.return_value = device_group
+
+        with patch.object(
+                UserGroupRepository,
+                'get_user_group_by_name_and_device_group_id_and_user_id'
+        ) as get_user_group_by_name_and_device_group_id_and_user_id_mock:
+            get_user_group_by_name_and_device_group_id_and_user_id_mock.return_value = user_group
+
+            with patch.object(
+                    FormulaRepository,
+                    'get_formula_by_name_and_user_group_id'
+            ) as get_formula_by_name_and_user_group_id_mock:
+                get_formula_by_name_and_user_group_id_mock.return_value = None
+
+                with patch.object(
+                        SensorRepository,
+                        'get_sensors_by_device_group_id_and_user_group_id_and_device_keys'
+                ) as get_sensors_by_device_group_id_and_user_group_id_and_device_keys_mock:
+                    get_sensors_by_device_group_id_and_user_group_id_and_device_keys_mock.return_value = [sensor]
+
+                    with patch.object(
+                            SensorTypeRepository,
+                            'get_sensor_types_by_ids'
+                    ) as get_sensor_types_by_ids_mock:
+                        get_sensor_types_by_ids_mock.return_value = [sensor_type]
+
+                        with patch.object(
+                                FormulaService,
+                                '_get_rule_verdict_with_timeout'
+                        ) as _get_rule_verdict_with_timeout_mock:
+                            _get_rule_verdict_with_timeout_mock.return_value = Constants.RESPONSE_MESSAGE_OK
+
+                            with patch.object(
+                                    FormulaRepository,
+                                    'save'
+                            ) as save_mock:
+                                save_mock.return_value = True
+
+                                results = [
+                                    formula_service_instance.add_formula_to_user_group(
+                                        device_group.product_key,
+                                        user_group.name,
+                                        user.id,
+                                        formula_data
+                                    ) for formula_data in formulas_data
+                                ]
+
+    assert results == [Constants.RESPONSE_MESSAGE_CREATED, Constants.RESPONSE_MESSAGE_CREATED]
+    _get_rule_verdict_with_timeout_mock.assert_called_once()
+    assert _get_rule_verdict_with_timeout_mock.call_args[0][0] == '(~c0 | c1)'
+
+
+def test_add_formula_to_user_group_should_return_formula_too_complex_message_when_normal_form_exceeds_budget(
+        create_device_group,
+        get_sensor_type_default_values,
+        create_sensor_type,
+        create_sensor,
+        create_user,
+        get_user_group_default_values,
+        create_user_group):
+    formula_service_instance = FormulaService.get_instance()
+
+    device_group = create_device_group()
+    user = create_user()
+
+    user_group_values = get_user_group_default_values()
+    user_group_values['users'] = [user]
+    user_group = create_user_group(user_group_values)
+
+    sensor_type_values = get_sensor_type_default_values()
+    sensor_type_values['reading_type'] = 'Decimal'
+    sensor_type_values['range_min'] = 0
+    sensor_type_values['range_max'] = 20
+
+    sensor_type = create_sensor_type(sensor_type_values)
+    sensor = create_sensor()
+
+    def get_and_rule(value_min, value_max):
+        return {
+            "isNegated": False,
+            "operator": "and",
+            "complexLeft": {"isNegated": False, "value": value_min, "functor": "=>", "deviceKey": sensor.device_key},
+            "complexRight": {"isNegated": False, "value": value_max, "functor": "<=", "deviceKey": sensor.device_key}
+        }
+
+    formula_data = {
+        "name": 'test',
+        "rule": {
+            "datetimeRule": None,
+            "sensorRule": {
+                "isNegated": False,
+                "operator": "or",
+                "complexLeft": get_and_rule(0, 5),
+                "complexRight": {
+                    "isNegated": False,
+                    "operator": "or",
+                    "complexLeft": get_and_rule(10, 12),
+                    "complexRight": get_and_rule(15, 20)
+                }
+            }
+        }
+    }
+
+    with patch.object(PermissionService, 'get_master_user_device_group') as get_master_user_device_group_mock:
+        get_master_user_device_group_mock.return_value = device_group
+
+        with patch.object(
+                UserGroupRepository,
+                'get_user_group_by_name_and_device_group_id_and_user_id'
+        ) as get_user_group_by_name_and_device_group_id_and_user_id_mock:
+            get_user_group_by_name_and_device_group_id_and_user_id_mock.return_value = user_group
+
+            with patch.object(
+                    FormulaRepository,
+                    'get_formula_by_name_and_user_group_id'
+            ) as get_formula_by_name_and_user_group_id_mock:
+                get_formula_by_name_and_user_group_id_mock.return_value = None
+
+                with patch.object(
+                        SensorRepository,
+                        'get_sensors_by_device_group_id_and_user_group_id_and_device_keys'
+                ) as get_sensors_by_device_group_id_and_user_group_id_and_device_keys_mock:
+                    get_sensors_by_device_group_id_and_user_group_id_and_device_keys_mock.return_value = [sensor]
+
+                    with patch.object(
+                            SensorTypeRepository,
+                            'get_sensor_types_by_ids'
+                    ) as get_sensor_types_by_ids_mock:
+                        get_sensor_types_by_ids_mock.return_value = [sensor_type]
+
+                        with patch.object(
+                                FormulaService,
+                                '_get_rule_verdict_with_timeout'
+                        ) as _get_rule_verdict_with_timeout_mock:
+                            with patch.object(Constants, 'FORMULA_MAX_NORMAL_FORM_TERMS', 4):
+                                result = formula_service_instance.add_formula_to_user_group(
+                                    device_group.product_key,
+                                    user_group.name,
+                                    user.id,
+                                    formula_data
+                                )
+
+    assert result == Constants.RESPONSE_MESSAGE_FORMULA_TOO_COMPLEX
+    _get_rule_verdict_with_timeout_mock.assert_not_called()
+
+
+@pytest.fixture
+def formula_service_with_rule_check_pool():
+    formula_service_instance = FormulaService()
+
+    yield formula_service_instance
+
+    formula_service_instance.shutdown_rule_check_pool()
+
+
+def test_get_rule_verdict_with_timeout_should_check_rule_in_pool_reused_by_next_checks(
+        formula_service_with_rule_check_pool):
+    with patch.object(Constants, 'FORMULA_CHECK_TIMEOUT_SECONDS', 60):
+        first_result = formula_service_with_rule_check_pool._get_rule_verdict_with_timeout('c0 & ~c0', {})
+        idle_rule_check_pools = list(formula_service_with_rule_check_pool._idle_rule_check_pools)
+        second_result = formula_service_with_rule_check_pool._get_rule_verdict_with_timeout('c0 & ~c0', {})
+
+    assert first_result == Constants.RESPONSE_MESSAGE_INVALID_FORMULA
+    assert second_result == Constants.RESPONSE_MESSAGE_INVALID_FORMULA
+    assert len(idle_rule_check_pools) == 1
+    assert formula_service_with_rule_check_pool._idle_rule_check_pools == idle_rule_check_pools
+
+
+def test_get_rule_verdict_with_timeout_should_return_formula_too_complex_message_and_drop_pool_when_check_times_out(
+        formula_service_with_rule_check_pool):
+    with patch.object(Constants, 'FORMULA_CHECK_TIMEOUT_SECONDS', 0.000001):
+        with patch.object(formula_service_with_rule_check_pool, '_get_idle_rule_check_pool') as get_idle_pool_mock:
+            get_idle_pool_mock.return_value.apply_async.return_value.get.side_effect = multiprocessing.TimeoutError
+
+            result = formula_service_with_rule_check_pool._get_rule_verdict_with_timeout('c0', {})
+
+    assert result == Constants.RESPONSE_MESSAGE_FORMULA_TOO_COMPLEX
+    get_idle_pool_mock.return_value.terminate.assert_called_once_with()
+    assert formula_service_with_rule_check_pool._idle_rule_check_pools == []
+    assert formula_service_with_rule_check_pool._rule_check_slots.acquire(blocking=False)
+
+
+def test_get_rule_verdict_with_timeout_should_return_service_unavailable_message_when_no_process_is_free(
+        formula_service_with_rule_check_pool):
+    with patch.object(Constants, 'FORMULA_CHECK_WORKERS', 1):
+        with patch.object(Constants, 'FORMULA_CHECK_TIMEOUT_SECONDS', 0.01):
+            with patch.object(formula_service_with_rule_check_pool, '_get_idle_rule_check_pool') as get_idle_pool_mock:
+                assert formula_service_with_rule_check_pool._acquire_rule_check_slot()
+
+                result = formula_service_with_rule_check_pool._get_rule_verdict_with_timeout('c0', {})
+
+    assert result == Constants.RESPONSE_MESSAGE_SERVICE_UNAVAILABLE
+    get_idle_pool_mock.assert_not_called()
+
+
+@pytest.mark.parametrize("rule_verdict, is_cached", [
+    (Constants.RESPONSE_MESSAGE_OK, True),
+    (Constants.RESPONSE_MESSAGE_INVALID_FORMULA, True),
+    (Constants.RESPONSE_MESSAGE_FORMULA_TOO_COMPLEX, False),
+    (Constants.RESPONSE_MESSAGE_SERVICE_UNAVAILABLE, False),
+    (Constants.RESPONSE_MESSAGE_ERROR, False),
+])
+def test_get_cached_rule_verdict_should_cache_only_verdicts_of_finished_checks(rule_verdict, is_cached):
+    formula_service_instance = FormulaService()
+
+    with patch.object(FormulaService, '_rule_verdict_cache', TTLCache(10, 60)):
+        with patch.object(FormulaService, '_get_rule_verdict_with_timeout') as _get_rule_verdict_with_timeout_mock:
+            _get_rule_verdict_with_timeout_mock.return_value = rule_verdict
+
+            first_result = formula_service_instance._get_cached_rule_verdict('c0', {})
+            second_result = formula_service_instance._get_cached_rule_verdict('c0', {})
+
+    assert first_result == rule_verdict
+    assert second_result == rule_verdict
+    assert _get_rule_verdict_with_timeout_mock.call_count == (1 if is_cached else 2)
+
+
+def test_get_rule_verdict_with_timeout_should_check_rule_in_current_thread_when_no_workers():
+    formula_service_instance = FormulaService()
+
+    with patch.object(FormulaService, '_get_rule_verdict') as _get_rule_verdict_mock:
+        _get_rule_verdict_mock.return_value = Constants.RESPONSE_MESSAGE_OK
+
+        with patch.object(Constants, 'FORMULA_CHECK_WORKERS', 0):
+            result = formula_service_instance._get_rule_verdict_with_timeout('c0', {})
+
+    assert result == Constants.RESPONSE_MESSAGE_OK
+    _get_rule_verdict_mock.assert_called_once_with('c0', {})
+    assert formula_service_instance._idle_rule_check_pools == []
+
+
 def test_get_formula_names_in_user_group_should_return_formula_names_when_valid_product_key_user_group_and_user(
         create_device_group,
         get_user_default_values,
@@ -436,24 +709,27 @@ def test_get_formula_names_in_user_group_should_return_formula_names_when_valid_
 
     user_group = create_user_group(user_group_values)
 
-    with patch.object(
-            DeviceGroupRepository,
-            'get_device_group_by_product_key'
-    ) as get_device_group_by_product_key_mock:
-        get_device_group_by_product_key_mock.return_value = device_group
+    with patch.object(PermissionService, 'is_user_in_user_group') as is_user_in_user_group_mock:
+        is_user_in_user_group_mock.return_value = True
 
         with patch.object(
-                UserGroupRepository,
-                'get_user_group_by_name_and_device_group_id'
-        ) as get_user_group_by_name_and_device_group_id_mock:
-            get_user_group_by_name_and_device_group_id_mock.return_value = user_group
+                DeviceGroupRepository,
+                'get_device_group_by_product_key'
+        ) as get_device_group_by_product_key_mock:
+            get_device_group_by_product_key_mock.return_value = device_group
 
-            result, result_values = formula_service_instance.get_formula_names_in_user_group(
-                device_group.product_key,
-                user_group.name,
-                user.id,
-                False
-            )
+            with patch.object(
+                    UserGroupRepository,
+                    'get_user_group_by_name_and_device_group_id'
+            ) as get_user_group_by_name_and_device_group_id_mock:
+                get_user_group_by_name_and_device_group_id_mock.return_value = user_group
+
+                result, result_values = formula_service_instance.get_formula_names_in_user_group(
+                    device_group.product_key,
+                    user_group.name,
+                    user.id,
+                    False
+                )
 
     assert result
     assert result == Constants.RESPONSE_MESSAGE_OK
@@ -474,29 +750,33 @@ def test_get_formula_names_in_user_group_should_return_no_privileges_message_whe
     user = create_user()
     user_group = create_user_group()
 
-    with patch.object(
-            DeviceGroupRepository,
-            'get_device_group_by_product_key'
-    ) as get_device_group_by_product_key_mock:
-        get_device_group_by_product_key_mock.return_value = device_group
+    with patch.object(PermissionService, 'is_user_in_user_group') as is_user_in_user_group_mock:
+        is_user_in_user_group_mock.return_value = False
 
         with patch.object(
-                UserGroupRepository,
-                'get_user_group_by_name_and_device_group_id'
-        ) as get_user_group_by_name_and_device_group_id_mock:
-            get_user_group_by_name_and_device_group_id_mock.return_value = user_group
+                DeviceGroupRepository,
+                'get_device_group_by_product_key'
+        ) as get_device_group_by_product_key_mock:
+            get_device_group_by_product_key_mock.return_value = device_group
 
-            result, result_values = formula_service_instance.get_formula_names_in_user_group(
-                device_group.product_key,
-                user_group.name,
-                user.id,
-                False
-            )
+            with patch.object(
+                    UserGroupRepository,
+                    'get_user_group_by_name_and_device_group_id'
+            ) as get_user_group_by_name_and_device_group_id_mock:
+                get_user_group_by_name_and_device_group_id_mock.return_value = user_group
+
+                result, result_values = formula_service_instance.get_formula_names_in_user_group(
+                    device_group.product_key,
+                    user_group.name,
+                    user.id,
+                    False
+                )
 
     assert result
     assert result == Constants.RESPONSE_MESSAGE_USER_DOES_NOT_HAVE_PRIVILEGES
 
     assert not result_values
+    is_user_in_user_group_mock.assert_called_once_with(user.id, user_group.id)
 
 
 def test_get_formula_names_in_user_group_should_return_user_group_not_found_message_when_no_user_group(
@@ -608,24 +888,27 @@ def test_get_formula_info_should_return_formula_information_when_valid_product_k
 
     user_group = create_user_group(user_group_values)
 
-    with patch.object(
-            DeviceGroupRepository,
-            'get_device_group_by_product_key'
-    ) as get_device_group_by_product_key_mock:
-        get_device_group_by_product_key_mock.return_value = device_group
+    with patch.object(PermissionService, 'is_user_in_user_group') as is_user_in_user_group_mock:
+        is_user_in_user_group_mock.return_value = True
 
         with patch.object(
-                UserGroupRepository,
-                'get_user_group_by_name_and_device_group_id'
-        ) as get_user_group_by_name_and_device_group_id_mock:
-            get_user_group_by_name_and_device_group_id_mock.return_value = user_group
+                DeviceGroupRepository,
+                'get_device_group_by_product_key'
+        ) as get_device_group_by_product_key_mock:
+            get_device_group_by_product_key_mock.return_value = device_group
 
-            result, result_values = formula_service_instance.get_formula_info(
-                device_group.product_key,
-                user_group.name,
-                formula.name,
-                user.id
-            )
+            with patch.object(
+                    UserGroupRepository,
+                    'get_user_group_by_name_and_device_group_id'
+            ) as get_user_group_by_name_and_device_group_id_mock:
+                get_user_group_by_name_and_device_group_id_mock.return_value = user_group
+
+                result, result_values = formula_service_instance.get_formula_info(
+                    device_group.product_key,
+                    user_group.name,
+                    formula.name,
+                    user.id
+                )
 
     assert result
     assert result == Constants.RESPONSE_MESSAGE_OK
@@ -656,24 +939,27 @@ def test_get_formula_info_should_return_formula_not_found_message_when_no_formul
 
     user_group = create_user_group(user_group_values)
 
-    with patch.object(
-            DeviceGroupRepository,
-            'get_device_group_by_product_key'
-    ) as get_device_group_by_product_key_mock:
-        get_device_group_by_product_key_mock.return_value = device_group
+    with patch.object(PermissionService, 'is_user_in_user_group') as is_user_in_user_group_mock:
+        is_user_in_user_group_mock.return_value = True
 
         with patch.object(
-                UserGroupRepository,
-                'get_user_group_by_name_and_device_group_id'
-        ) as get_user_group_by_name_and_device_group_id_mock:
-            get_user_group_by_name_and_device_group_id_mock.return_value = user_group
+                DeviceGroupRepository,
+                'get_device_group_by_product_key'
+        ) as get_device_group_by_product_key_mock:
+            get_device_group_by_product_key_mock.return_value = device_group
 
-            result, result_values = formula_service_instance.get_formula_info(
-                device_group.product_key,
-                user_group.name,
-                'not' + formula.name,
-                user.id
-            )
+            with patch.object(
+                    UserGroupRepository,
+                    'get_user_group_by_name_and_device_group_id'
+            ) as get_user_group_by_name_and_device_group_id_mock:
+                get_user_group_by_name_and_device_group_id_mock.return_value = user_group
+
+                result, result_values = formula_service_instance.get_formula_info(
+                    device_group.product_key,
+                    user_group.name,
+                    'not' + formula.name,
+                    user.id
+                )
 
     assert result
     assert result == Constants.RESPONSE_MESSAGE_FORMULA_NOT_FOUND
@@ -692,29 +978,33 @@ def test_get_formula_info_should_return_no_privileges_message_when_user_not_in_u
     user = create_user()
     user_group = create_user_group()
 
-    with patch.object(
-            DeviceGroupRepository,
-            'get_device_group_by_product_key'
-    ) as get_device_group_by_product_key_mock:
-        get_device_group_by_product_key_mock.return_value = device_group
+    with patch.object(PermissionService, 'is_user_in_user_group') as is_user_in_user_group_mock:
+        is_user_in_user_group_mock.return_value = False
 
         with patch.object(
-                UserGroupRepository,
-                'get_user_group_by_name_and_device_group_id'
-        ) as get_user_group_by_name_and_device_group_id_mock:
-            get_user_group_by_name_and_device_group_id_mock.return_value = user_group
+                DeviceGroupRepository,
+                'get_device_group_by_product_key'
+        ) as get_device_group_by_product_key_mock:
+            get_device_group_by_product_key_mock.return_value = device_group
 
-            result, result_values = formula_service_instance.get_formula_info(
-                device_group.product_key,
-                user_group.name,
-                'formula_name',
-                user.id
-            )
+            with patch.object(
+                    UserGroupRepository,
+                    'get_user_group_by_name_and_device_group_id'
+            ) as get_user_group_by_name_and_device_group_id_mock:
+                get_user_group_by_name_and_device_group_id_mock.return_value = user_group
+
+                result, result_values = formula_service_instance.get_formula_info(
+                    device_group.product_key,
+                    user_group.name,
+                    'formula_name',
+                    user.id
+                )
 
     assert result
     assert result == Constants.RESPONSE_MESSAGE_USER_DOES_NOT_HAVE_PRIVILEGES
 
     assert not result_values
+    is_user_in_user_group_mock.assert_called_once_with(user.id, user_group.id)
 
 
 def test_get_formula_info_should_return_user_group_not_found_message_when_no_user_group(
@@ -828,30 +1118,33 @@ def test_delete_formula_from_user_group_should_delete_formula_when_valid_product
 
     user_group = create_user_group(user_group_values)
 
-    with patch.object(
-            DeviceGroupRepository,
-            'get_device_group_by_product_key'
-    ) as get_device_group_by_product_key_mock:
-        get_device_group_by_product_key_mock.return_value = device_group
+    with patch.object(PermissionService, 'is_user_in_user_group') as is_user_in_user_group_mock:
+        is_user_in_user_group_mock.return_value = True
 
         with patch.object(
-                UserGroupRepository,
-                'get_user_group_by_name_and_device_group_id'
-        ) as get_user_group_by_name_and_device_group_id_mock:
-            get_user_group_by_name_and_device_group_id_mock.return_value = user_group
+                DeviceGroupRepository,
+                'get_device_group_by_product_key'
+        ) as get_device_group_by_product_key_mock:
+            get_device_group_by_product_key_mock.return_value = device_group
 
             with patch.object(
-                    FormulaRepository,
-                    'delete'
-            ) as delete_mock:
-                delete_mock.return_value = True
+                    UserGroupRepository,
+                    'get_user_group_by_name_and_device_group_id'
+            ) as get_user_group_by_name_and_device_group_id_mock:
+                get_user_group_by_name_and_device_group_id_mock.return_value = user_group
 
-                result = formula_service_instance.delete_formula_from_user_group(
-                    device_group.product_key,
-                    user_group.name,
-                    formula.name,
-                    user.id
-                )
+                with patch.object(
+                        FormulaRepository,
+                        'delete'
+                ) as delete_mock:
+                    delete_mock.return_value = True
+
+                    result = formula_service_instance.delete_formula_from_user_group(
+                        device_group.product_key,
+                        user_group.name,
+                        formula.name,
+                        user.id
+                    )
 
     assert result
     assert result == Constants.RESPONSE_MESSAGE_OK
@@ -876,30 +1169,33 @@ def test_delete_formula_from_user_group_should_return_error_message_when_delete_
 
     user_group = create_user_group(user_group_values)
 
-    with patch.object(
-            DeviceGroupRepository,
-            'get_device_group_by_product_key'
-    ) as get_device_group_by_product_key_mock:
-        get_device_group_by_product_key_mock.return_value = device_group
+    with patch.object(PermissionService, 'is_user_in_user_group') as is_user_in_user_group_mock:
+        is_user_in_user_group_mock.return_value = True
 
         with patch.object(
-                UserGroupRepository,
-                'get_user_group_by_name_and_device_group_id'
-        ) as get_user_group_by_name_and_device_group_id_mock:
-            get_user_group_by_name_and_device_group_id_mock.return_value = user_group
+                DeviceGroupRepository,
+                'get_device_group_by_product_key'
+        ) as get_device_group_by_product_key_mock:
+            get_device_group_by_product_key_mock.return_value = device_group
 
             with patch.object(
-                    FormulaRepository,
-                    'delete'
-            ) as delete_mock:
-                delete_mock.return_value = False
+                    UserGroupRepository,
+                    'get_user_group_by_name_and_device_group_id'
+            ) as get_user_group_by_name_and_device_group_id_mock:
+                get_user_group_by_name_and_device_group_id_mock.return_value = user_group
 
-                result = formula_service_instance.delete_formula_from_user_group(
-                    device_group.product_key,
-                    user_group.name,
-                    formula.name,
-                    user.id
-                )
+                with patch.object(
+                        FormulaRepository,
+                        'delete'
+                ) as delete_mock:
+                    delete_mock.return_value = False
+
+                    result = formula_service_instance.delete_formula_from_user_group(
+                        device_group.product_key,
+                        user_group.name,
+                        formula.name,
+                        user.id
+                    )
 
     assert result
     assert result == Constants.RESPONSE_MESSAGE_ERROR
@@ -924,24 +1220,27 @@ def test_delete_formula_from_user_group_should_return_formula_not_found_message_
 
     user_group = create_user_group(user_group_values)
 
-    with patch.object(
-            DeviceGroupRepository,
-            'get_device_group_by_product_key'
-    ) as get_device_group_by_product_key_mock:
-        get_device_group_by_product_key_mock.return_value = device_group
+    with patch.object(PermissionService, 'is_user_in_user_group') as is_user_in_user_group_mock:
+        is_user_in_user_group_mock.return_value = True
 
         with patch.object(
-                UserGroupRepository,
-                'get_user_group_by_name_and_device_group_id'
-        ) as get_user_group_by_name_and_device_group_id_mock:
-            get_user_group_by_name_and_device_group_id_mock.return_value = user_group
+                DeviceGroupRepository,
+                'get_device_group_by_product_key'
+        ) as get_device_group_by_product_key_mock:
+            get_device_group_by_product_key_mock.return_value = device_group
 
-            result = formula_service_instance.delete_formula_from_user_group(
-                device_group.product_key,
-                user_group.name,
-                'not' + formula.name,
-                user.id
-            )
+            with patch.object(
+                    UserGroupRepository,
+                    'get_user_group_by_name_and_device_group_id'
+            ) as get_user_group_by_name_and_device_group_id_mock:
+                get_user_group_by_name_and_device_group_id_mock.return_value = user_group
+
+                result = formula_service_instance.delete_formula_from_user_group(
+                    device_group.product_key,
+                    user_group.name,
+                    'not' + formula.name,
+                    user.id
+                )
 
     assert result
     assert result == Constants.RESPONSE_MESSAGE_FORMULA_NOT_FOUND
@@ -958,27 +1257,31 @@ def test_delete_formula_from_user_group_should_return_no_privileges_message_when
     user = create_user()
     user_group = create_user_group()
 
-    with patch.object(
-            DeviceGroupRepository,
-            'get_device_group_by_product_key'
-    ) as get_device_group_by_product_key_mock:
-        get_device_group_by_product_key_mock.return_value = device_group
+    with patch.object(PermissionService, 'is_user_in_user_group') as is_user_in_user_group_mock:
+        is_user_in_user_group_mock.return_value = False
 
         with patch.object(
-                UserGroupRepository,
-                'get_user_group_by_name_and_device_group_id'
-        ) as get_user_group_by_name_and_device_group_id_mock:
-            get_user_group_by_name_and_device_group_id_mock.return_value = user_group
+                DeviceGroupRepository,
+                'get_device_group_by_product_key'
+        ) as get_device_group_by_product_key_mock:
+            get_device_group_by_product_key_mock.return_value = device_group
 
-            result = formula_service_instance.delete_formula_from_user_group(
-                device_group.product_key,
-                user_group.name,
-                'formula_name',
-                user.id
-            )
+            with patch.object(
+                    UserGroupRepository,
+                    'get_user_group_by_name_and_device_group_id'
+            ) as get_user_group_by_name_and_device_group_id_mock:
+                get_user_group_by_name_and_device_group_id_mock.return_value = user_group
+
+                result = formula_service_instance.delete_formula_from_user_group(
+                    device_group.product_key,
+                    user_group.name,
+                    'formula_name',
+                    user.id
+                )
 
     assert result
     assert result == Constants.RESPONSE_MESSAGE_USER_DOES_NOT_HAVE_PRIVILEGES
+    is_user_in_user_group_mock.assert_called_once_with(user.id, user_group.id)
 
 
 def test_delete_formula_from_user_group_should_return_user_group_not_found_message_when_no_user_group(
@@ -0,0 +1,131 @@
+from datetime import datetime
+
+import pytest
+
+from app.main.util.formula_compiler import can_evaluate_rule
+from app.main.util.formula_compiler import compile_formula_rule
+
+
+def get_rule(sensor_rule: dict, datetime_rule: dict = None, operator: str = 'and') -> dict:
+    return {
+        'datetimeRule': datetime_rule,
+        'operator': operator,
+        'sensorRule': sensor_rule
+    }
+
+
+@pytest.mark.parametrize("temperature, light, window, result", [
+    (15, 'day', False, True),
+    (25, 'day', False, False),
+    (15, 'night', False, False),
+    (5, 'night', True, True),
+    (5, 'night', False, False)])
+def test_compile_formula_rule_should_evaluate_nested_conditions(temperature, light, window, result):
+    compiled_rule = compile_formula_rule(get_rule({
+        'isNegated': False,
+        'operator': 'or',
+        'complexLeft': {
+            'isNegated': False,
+            'operator': 'and',
+            'complexLeft': {
+                'isNegated': False,
+                'operator': 'and',
+                'complexLeft': {'isNegated': False, 'value': 10, 'functor': '=>', 'deviceKey': 'temperature'},
+                'complexRight': {'isNegated': True, 'value': 20, 'functor': '=>', 'deviceKey': 'temperature'}
+            },
+            'complexRight': {'isNegated': False, 'value': 'day', 'functor': '==', 'deviceKey': 'light'}
+        },
+        'complexRight': {
+            'isNegated': True,
+            'operator': 'or',
+            'complexLeft': {'isNegated': False, 'value': False, 'functor': '==', 'deviceKey': 'window'},
+            'complexRight': {'isNegated': False, 'value': 0, 'functor': '<=', 'deviceKey': 'temperature'}
+        }
+    }))
+
+    assert compiled_rule.device_keys == {'temperature', 'light', 'window'}
+    assert compiled_rule.evaluate({'temperature': temperature, 'light': light, 'window': window}) is result
+
+
+@pytest.mark.parametrize("operator, temperature, moment, result", [
+    ('and', 15, datetime(2014, 6, 10, 12), True),
+    ('and', 5, datetime(2014, 6, 10, 12), False),
+    ('and', 15, datetime(2014, 6, 14, 12), False),
+    ('and', 15, datetime(2015, 6, 10, 12), False),
+    ('or', 5, datetime(2014, 6, 10, 12), True),
+    ('or', 15, datetime(2015, 6, 10, 12), True),
+    ('or', 5, datetime(2014, 6, 14, 12), False)])
+def test_compile_formula_rule_should_combine_datetime_rule_with_sensor_rule(operator, temperature, moment, result):
+    compiled_rule = compile_formula_rule(get_rule(
+        {'isNegated': False, 'value': 10, 'functor': '=>', 'deviceKey': 'temperature'},
+        {'datetimeStart': '2014-06-05T08:10:10.000010Z', 'datetimeEnd': '2015-06-05T08:10:10.000010Z', 'days': '1,2,3'},
+        operator
+    ))
+
+    assert compiled_rule.device_keys == {'temperature'}
+    assert compiled_rule.datetime_rule.days == {1, 2, 3}
+    assert compiled_rule.evaluate({'temperature': temperature}, moment) is result
+
+
+def test_compile_formula_rule_should_compile_rule_depending_only_on_datetime():
+    compiled_rule = compile_formula_rule(get_rule(
+        None,
+        {'datetimeStart': '2014-06-05T08:10:10.000010Z', 'datetimeEnd': '2015-06-05T08:10:10.000010Z', 'days': ''}
+    ))
+
+    assert compiled_rule.device_keys == frozenset()
+    assert compiled_rule.evaluate({}, datetime(2014, 6, 14, 12))
+    assert not compiled_rule.evaluate({}, datetime(2014, 6, 5, 8))
+
+
+def test_compile_formula_rule_should_not_compile_rule_with_malformed_datetime_rule():
+    compiled_rule = compile_formula_rule(get_rule(
+        {'isNegated': False, 'value': 10, 'functor': '=>', 'deviceKey': 'temperature'},
+        {'datetimeStart': 'yesterday', 'datetimeEnd': '2015-06-05T08:10:10.000010Z', 'days': '1'}
+    ))
+
+    assert compiled_rule.device_keys == frozenset()
+    assert compiled_rule.evaluate is None
+
+
+def test_compile_formula_rule_should_not_compile_rule_with_unknown_functor():
+    compiled_rule = compile_formula_rule(get_rule(
+        {'isNegated': False, 'value': 10, 'functor': '>', 'deviceKey': 'temperature'}
+    ))
+
+    assert compiled_rule.device_keys == frozenset()
+
+
+@pytest.mark.parametrize("readings, result", [
+    ({'temperature': 15.5, 'light': 'day'}, True),
+    ({'temperature': 15, 'light': 'day'}, True),
+    ({'temperature': 'hot', 'light': 'day'}, False),
+    ({'temperature': True, 'light': 'day'}, False),
+    ({'temperature': 15.5, 'light': 1}, False),
+    ({'temperature': 15.5}, False)])
+def test_can_evaluate_rule_should_check_readings_are_of_kinds_compared_in_rule(readings, result):
+    compiled_rule = compile_formula_rule(get_rule({
+        'isNegated': False,
+        'operator': 'and',
+        'complexLeft': {'isNegated': False, 'value': 15, 'functor': '<=', 'deviceKey': 'temperature'},
+        'complexRight': {'isNegated': False, 'value': 'day', 'functor': '==', 'deviceKey': 'light'}
+    }))
+
+    assert can_evaluate_rule(compiled_rule, readings) is result
+
+
+def test_can_evaluate_rule_should_not_evaluate_sensor_compared_with_values_of_different_kinds():
+    compiled_rule = compile_formula_rule(get_rule({
+        'isNegated': False,
+        'operator': 'or',
+        'complexLeft': {'isNegated': False, 'value': 15, 'functor': '<=', 'deviceKey': 'temperature'},
+        'complexRight': {'isNegated': False, 'value': 'hot', 'functor': '==', 'deviceKey': 'temperature'}
+    }))
+
+    assert compiled_rule.device_keys == {'temperature'}
+    assert not can_evaluate_rule(compiled_rule, {'temperature': 15})
+    assert not can_evaluate_rule(compiled_rule, {'temperature': 'hot'})
+
+
+if __name__ == '__main__':
+    pytest.main(['app/unittest/{}.py'.format(__file__)])
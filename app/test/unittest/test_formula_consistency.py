@@ -0,0 +1,57 @@
+import pytest
+
+from app.benchmark.formula_consistency_benchmark import run_formula_consistency_benchmark
+from app.main.util.formula_consistency import is_conjunction_consistent
+
+
+def get_condition(functor, value, reading_type='Decimal', device_key='temperature', number_of_reading_values=None):
+    condition = {'deviceKey': device_key, 'functor': functor, 'value': value, 'type': reading_type}
+
+    if number_of_reading_values is not None:
+        condition['number_of_reading_values'] = number_of_reading_values
+
+    return condition
+
+
+@pytest.mark.parametrize("conditions, is_consistent", [
+    ([(get_condition('=>', 10), False), (get_condition('<=', 20), False)], True),
+    ([(get_condition('=>', 20), False), (get_condition('<=', 10), False)], False),
+    ([(get_condition('=>', 10), False), (get_condition('<=', 10), False)], True),
+    ([(get_condition('=>', 10), False), (get_condition('=>', 10), True)], False),
+    ([(get_condition('<=', 10), True), (get_condition('=>', 10), True)], False),
+    ([(get_condition('=>', 10), False), (get_condition('<=', 10), False), (get_condition('==', 10), True)], False),
+    ([(get_condition('==', 10), False), (get_condition('!=', 10), False)], False),
+    ([(get_condition('==', 15), False), (get_condition('=>', 10), False), (get_condition('!=', 12), False)], True),
+    ([(get_condition('==', 10), False), (get_condition('<=', 5, device_key='humidity'), False)], True)])
+def test_is_conjunction_consistent_should_merge_decimal_conditions_into_intervals(conditions, is_consistent):
+    assert is_conjunction_consistent(conditions) is is_consistent
+
+
+@pytest.mark.parametrize("conditions, is_consistent", [
+    ([(get_condition('==', True, 'Boolean'), False), (get_condition('==', False, 'Boolean'), True)], True),
+    ([(get_condition('==', True, 'Boolean'), True), (get_condition('==', False, 'Boolean'), True)], False),
+    ([(get_condition('==', True, 'Boolean'), False), (get_condition('!=', True, 'Boolean'), False)], False),
+    ([(get_condition('==', 'on', 'Enum', number_of_reading_values=3), False),
+      (get_condition('==', 'off', 'Enum', number_of_reading_values=3), False)], False),
+    ([(get_condition('==', 'on', 'Enum', number_of_reading_values=3), True),
+      (get_condition('!=', 'off', 'Enum', number_of_reading_values=3), False)], True),
+    ([(get_condition('==', 'on', 'Enum', number_of_reading_values=2), True),
+      (get_condition('!=', 'off', 'Enum', number_of_reading_values=2), False)], False)])
+def test_is_conjunction_consistent_should_merge_enumerated_conditions_into_value_sets(conditions, is_consistent):
+    assert is_conjunction_consistent(conditions) is is_consistent
+
+
+def test_is_conjunction_consistent_should_reject_conjunction_with_unknown_condition():
+    assert not is_conjunction_consistent([(get_condition('=>', 10), False), (None, False)])
+
+
+def test_run_formula_consistency_benchmark_should_give_same_verdicts_for_both_checks():
+    results = run_formula_consistency_benchmark(literal_counts=(2, 20), repeats=1)
+
+    assert [result['literals'] for result in results] == [2, 20]
+    assert [result['conjuncts'] for result in results] == [1, 2]
+    assert all(result['verdicts_match'] for result in results)
+
+
+if __name__ == '__main__':
+    pytest.main(['app/unittest/{}.py'.format(__file__)])
@@ -0,0 +1,359 @@
+import json
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+from app.main.model import FormulaSensorDependency
+from app.main.repository.device_change_repository import DeviceChangeRepository
+from app.main.repository.device_group_repository import DeviceGroupRepository
+from app.main.repository.executive_device_repository import ExecutiveDeviceRepository
+from app.main.repository.formula_repository import FormulaRepository
+from app.main.repository.formula_sensor_dependency_repository import FormulaSensorDependencyRepository
+from app.main.repository.sensor_repository import SensorRepository
+from app.main.service.formula_evaluation_service import FormulaEvaluationService
+from app.main.service.type_registry_service import TypeRegistryService
+from app.main.service.type_registry_service import create_sensor_type_metadata
+from app.main.util.change_notifier import ChangeNotifier
+
+
+@pytest.fixture
+def create_formula_with_sensor_rule(get_formula_default_values, create_formula, get_sensor_default_values):
+    def _create_formula_with_sensor_rule(value, functor='=='):
+        formula_values = get_formula_default_values()
+        formula_values['rule'] = json.dumps(
+            {
+                'datetimeRule': None,
+                'operator': 'and',
+                'sensorRule': {
+                    'isNegated': False,
+                    'value': value,
+                    'functor': functor,
+                    'deviceKey': get_sensor_default_values()['device_key']
+                }
+            }
+        )
+        formula = create_formula(formula_values)
+        formula.sensor_dependencies = [
+            FormulaSensorDependency(
+                formula_id=formula.id,
+                device_key=get_sensor_default_values()['device_key'],
+                device_group_id=get_sensor_default_values()['device_group_id']
+            )
+        ]
+        return formula
+
+    return _create_formula_with_sensor_rule
+
+
+@pytest.fixture
+def create_executive_device_using_formula(get_executive_device_default_values, create_executive_device):
+    def _create_executive_device_using_formula():
+        executive_device_values = get_executive_device_default_values()
+        executive_device_values['state'] = 0
+        executive_device_values['is_updated'] = False
+        executive_device_values['is_formula_used'] = True
+        executive_device_values['positive_state'] = 1
+        executive_device_values['negative_state'] = 0
+        return create_executive_device(executive_device_values)
+
+    return _create_executive_device_using_formula
+
+
+@pytest.mark.parametrize("reading_value, state", [
+    (1, 1),
+    (2, 0)])
+def test_evaluate_formulas_should_set_states_of_devices_using_formulas_with_changed_sensors(
+        reading_value, state,
+        create_formula_with_sensor_rule,
+        create_executive_device_using_formula,
+        create_sensor,
+        create_sensor_type,
+        create_sensor_reading_enumerators,
+        get_sensor_reading_enumerator_default_values):
+    formula_evaluation_service_instance = FormulaEvaluationService.get_instance()
+
+    formula = create_formula_with_sensor_rule('on')
+    executive_device = create_executive_device_using_formula()
+    sensor_type = create_sensor_type()
+    sensor = create_sensor()
+    sensor.last_reading_value = reading_value
+
+    first_reading_enumerator_values = get_sensor_reading_enumerator_default_values()
+    first_reading_enumerator_values['text'] = 'on'
+    second_reading_enumerator_values = get_sensor_reading_enumerator_default_values()
+    second_reading_enumerator_values['number'] = 2
+    second_reading_enumerator_values['text'] = 'off'
+    reading_enumerators = create_sensor_reading_enumerators(
+        [first_reading_enumerator_values, second_reading_enumerator_values]
+    )
+
+    with patch.object(
+            FormulaSensorDependencyRepository,
+            'get_formula_sensor_dependencies_by_device_group_id'
+    ) as get_formula_sensor_dependencies_by_device_group_id_mock:
+        get_formula_sensor_dependencies_by_device_group_id_mock.return_value = formula.sensor_dependencies
+
+        with patch.object(
+                ExecutiveDeviceRepository,
+                'get_executive_devices_using_formulas_by_formula_ids'
+        ) as get_executive_devices_using_formulas_by_formula_ids_mock:
+            get_executive_devices_using_formulas_by_formula_ids_mock.return_value = [executive_device]
+
+            with patch.object(FormulaRepository, 'get_formulas_by_ids') as get_formulas_by_ids_mock:
+                get_formulas_by_ids_mock.return_value = [formula]
+
+                with patch.object(
+                        SensorRepository,
+                        'get_sensors_by_device_group_id_and_device_keys'
+                ) as get_sensors_by_device_group_id_and_device_keys_mock:
+                    get_sensors_by_device_group_id_and_device_keys_mock.return_value = [sensor]
+
+                    with patch.object(TypeRegistryService, 'get_sensor_type') as get_sensor_type_mock:
+                        get_sensor_type_mock.return_value = create_sensor_type_metadata(
+                            sensor_type,
+                            reading_enumerators
+                        )
+
+                        with patch.object(
+                                DeviceChangeRepository,
+                                'add_device_change_but_do_not_commit'
+                        ) as add_device_change_but_do_not_commit_mock:
+                            with patch.object(ExecutiveDeviceRepository, 'update_database') as update_database_mock:
+                                update_database_mock.return_value = True
+
+                                with patch.object(ChangeNotifier, 'notify') as notify_mock:
+                                    assert formula_evaluation_service_instance.evaluate_formulas(
+                                        executive_device.device_group_id,
+                                        'product key',
+                                        [sensor.device_key]
+                                    )
+
+                                    assert formula_evaluation_service_instance.evaluate_formulas(
+                                        executive_device.device_group_id,
+                                        'product key',
+                                        [sensor.device_key]
+                                    )
+
+    assert executive_device.state == state
+    get_formula_sensor_dependencies_by_device_group_id_mock.assert_called_once_with(executive_device.device_group_id)
+    get_formulas_by_ids_mock.assert_called_once_with([formula.id])
+
+    if state != 0:
+        assert executive_device.is_updated
+        add_device_change_but_do_not_commit_mock.assert_called_once_with(
+            executive_device.device_group_id,
+            executive_device.device_key
+        )
+        update_database_mock.assert_called_once()
+        notify_mock.assert_called_once_with('product key')
+    else:
+        assert not executive_device.is_updated
+        add_device_change_but_do_not_commit_mock.assert_not_called()
+        update_database_mock.assert_not_called()
+        notify_mock.assert_not_called()
+
+
+def test_evaluate_formulas_should_not_read_devices_when_no_formula_depends_on_changed_sensors(
+        create_formula_with_sensor_rule,
+        create_executive_device_using_formula):
+    formula_evaluation_service_instance = FormulaEvaluationService.get_instance()
+
+    formula = create_formula_with_sensor_rule(10, '<=')
+    executive_device = create_executive_device_using_formula()
+
+    with patch.object(
+            FormulaSensorDependencyRepository,
+            'get_formula_sensor_dependencies_by_device_group_id'
+    ) as get_formula_sensor_dependencies_by_device_group_id_mock:
+        get_formula_sensor_dependencies_by_device_group_id_mock.return_value = formula.sensor_dependencies
+
+        with patch.object(
+                ExecutiveDeviceRepository,
+                'get_executive_devices_using_formulas_by_formula_ids'
+        ) as get_executive_devices_using_formulas_by_formula_ids_mock:
+            get_executive_devices_using_formulas_by_formula_ids_mock.return_value = [executive_device]
+
+            with patch.object(FormulaRepository, 'get_formulas_by_ids') as get_formulas_by_ids_mock:
+                get_formulas_by_ids_mock.return_value = [formula]
+
+                with patch.object(
+                        SensorRepository,
+                        'get_sensors_by_device_group_id_and_device_keys'
+                ) as get_sensors_by_device_group_id_and_device_keys_mock:
+                    assert formula_evaluation_service_instance.evaluate_formulas(
+                        executive_device.device_group_id,
+                        'product key',
+                        ['other device key']
+                    )
+
+    get_executive_devices_using_formulas_by_formula_ids_mock.assert_not_called()
+    get_sensors_by_device_group_id_and_device_keys_mock.assert_not_called()
+    assert executive_device.state == 0
+
+
+def test_evaluate_formulas_should_not_set_state_when_sensor_has_no_reading(
+        create_formula_with_sensor_rule,
+        create_executive_device_using_formula,
+        create_sensor):
+    formula_evaluation_service_instance = FormulaEvaluationService.get_instance()
+
+    formula = create_formula_with_sensor_rule(10, '<=')
+    executive_device = create_executive_device_using_formula()
+    sensor = create_sensor()
+
+    with patch.object(
+            FormulaSensorDependencyRepository,
+            'get_formula_sensor_dependencies_by_device_group_id'
+    ) as get_formula_sensor_dependencies_by_device_group_id_mock:
+        get_formula_sensor_dependencies_by_device_group_id_mock.return_value = formula.sensor_dependencies
+
+        with patch.object(
+                ExecutiveDeviceRepository,
+                'get_executive_devices_using_formulas_by_formula_ids'
+        ) as get_executive_devices_using_formulas_by_formula_ids_mock:
+            get_executive_devices_using_formulas_by_formula_ids_mock.return_value = [executive_device]
+
+            with patch.object(FormulaRepository, 'get_formulas_by_ids') as get_formulas_by_ids_mock:
+                get_formulas_by_ids_mock.return_value = [formula]
+
+                with patch.object(
+                        SensorRepository,
+                        'get_sensors_by_device_group_id_and_device_keys'
+                ) as get_sensors_by_device_group_id_and_device_keys_mock:
+                    get_sensors_by_device_group_id_and_device_keys_mock.return_value = [sensor]
+
+                    with patch.object(ExecutiveDeviceRepository, 'update_database') as update_database_mock:
+                        assert formula_evaluation_service_instance.evaluate_formulas(
+                            executive_device.device_group_id,
+                            'product key',
+                            [sensor.device_key]
+                        )
+
+    update_database_mock.assert_not_called()
+    assert executive_device.state == 0
+
+
+def test_evaluate_formulas_should_not_set_state_when_sensor_reading_type_differs_from_formula_values(
+        create_formula_with_sensor_rule,
+        create_executive_device_using_formula,
+        create_sensor,
+        create_sensor_type,
+        create_sensor_reading_enumerator):
+    formula_evaluation_service_instance = FormulaEvaluationService.get_instance()
+
+    formula = create_formula_with_sensor_rule(15, '<=')
+    executive_device = create_executive_device_using_formula()
+    sensor_type = create_sensor_type()
+    sensor = create_sensor()
+    sensor.last_reading_value = 1
+    reading_enumerator = create_sensor_reading_enumerator()
+
+    with patch.object(
+            FormulaSensorDependencyRepository,
+            'get_formula_sensor_dependencies_by_device_group_id'
+    ) as get_formula_sensor_dependencies_by_device_group_id_mock:
+        get_formula_sensor_dependencies_by_device_group_id_mock.return_value = formula.sensor_dependencies
+
+        with patch.object(
+                ExecutiveDeviceRepository,
+                'get_executive_devices_using_formulas_by_formula_ids'
+        ) as get_executive_devices_using_formulas_by_formula_ids_mock:
+            get_executive_devices_using_formulas_by_formula_ids_mock.return_value = [executive_device]
+
+            with patch.object(FormulaRepository, 'get_formulas_by_ids') as get_formulas_by_ids_mock:
+                get_formulas_by_ids_mock.return_value = [formula]
+
+                with patch.object(
+                        SensorRepository,
+                        'get_sensors_by_device_group_id_and_device_keys'
+                ) as get_sensors_by_device_group_id_and_device_keys_mock:
+                    get_sensors_by_device_group_id_and_device_keys_mock.return_value = [sensor]
+
+                    with patch.object(TypeRegistryService, 'get_sensor_type') as get_sensor_type_mock:
+                        get_sensor_type_mock.return_value = create_sensor_type_metadata(
+                            sensor_type,
+                            [reading_enumerator]
+                        )
+
+                        with patch.object(ExecutiveDeviceRepository, 'update_database') as update_database_mock:
+                            assert formula_evaluation_service_instance.evaluate_formulas(
+                                executive_device.device_group_id,
+                                'product key',
+                                [sensor.device_key]
+                            )
+
+    update_database_mock.assert_not_called()
+    assert executive_device.state == 0
+    assert not executive_device.is_updated
+
+
+def test_evaluate_scheduled_formulas_should_set_states_of_devices_using_datetime_formulas_at_given_moment(
+        get_formula_default_values,
+        create_formula,
+        create_executive_device_using_formula,
+        create_device_group):
+    formula_evaluation_service_instance = FormulaEvaluationService.get_instance()
+
+    formula_values = get_formula_default_values()
+    formula_values['rule'] = json.dumps(
+        {
+            'datetimeRule': {
+                'datetimeStart': '2019-06-03T08:00:00.000000Z',
+                'datetimeEnd': '2019-06-03T16:00:00.000000Z',
+                'days': ''
+            },
+            'operator': 'and',
+            'sensorRule': None
+        }
+    )
+    formula = create_formula(formula_values)
+    executive_device = create_executive_device_using_formula()
+    device_group = create_device_group()
+
+    with patch.object(
+            ExecutiveDeviceRepository,
+            'get_executive_devices_using_formulas_by_formula_ids'
+    ) as get_executive_devices_using_formulas_by_formula_ids_mock:
+        get_executive_devices_using_formulas_by_formula_ids_mock.return_value = [executive_device]
+
+        with patch.object(FormulaRepository, 'get_formulas_by_ids') as get_formulas_by_ids_mock:
+            get_formulas_by_ids_mock.return_value = [formula]
+
+            with patch.object(
+                    SensorRepository,
+                    'get_sensors_by_device_group_id_and_device_keys'
+            ) as get_sensors_by_device_group_id_and_device_keys_mock:
+                with patch.object(
+                        DeviceChangeRepository,
+                        'add_device_change_but_do_not_commit'
+                ) as add_device_change_but_do_not_commit_mock:
+                    with patch.object(ExecutiveDeviceRepository, 'update_database') as update_database_mock:
+                        update_database_mock.return_value = True
+
+                        with patch.object(
+                                DeviceGroupRepository,
+                                'get_device_groups_by_ids'
+                        ) as get_device_groups_by_ids_mock:
+                            get_device_groups_by_ids_mock.return_value = [device_group]
+
+                            with patch.object(ChangeNotifier, 'notify') as notify_mock:
+                                assert formula_evaluation_service_instance.evaluate_scheduled_formulas(
+                                    [formula.id],
+                                    datetime(2019, 6, 3, 12)
+                                )
+
+    assert executive_device.state == executive_device.positive_state
+    assert executive_device.is_updated
+    get_sensors_by_device_group_id_and_device_keys_mock.assert_not_called()
+    add_device_change_but_do_not_commit_mock.assert_called_once_with(
+        executive_device.device_group_id,
+        executive_device.device_key
+    )
+    update_database_mock.assert_called_once()
+    get_device_groups_by_ids_mock.assert_called_once_with([executive_device.device_group_id])
+    notify_mock.assert_called_once_with(device_group.product_key)
+
+
+if __name__ == '__main__':
+    pytest.main(['app/unittest/{}.py'.format(__file__)])
@@ -0,0 +1,148 @@
+from datetime import datetime
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+
+from app.main.repository.executive_device_repository import ExecutiveDeviceRepository
+from app.main.service.formula_evaluation_service import FormulaEvaluationService
+from app.main.service.formula_scheduler_service import FormulaSchedulerService
+from app.main.util.constants import Constants
+from app.main.util.datetime_rule import ALL_DAYS
+from app.main.util.datetime_rule import DatetimeRule
+from app.main.util.formula_compiler import CompiledRule
+from app.main.util.formula_compiler import UNCOMPILED_RULE
+
+
+@pytest.fixture
+def compiled_rules():
+    return {
+        1: CompiledRule(
+            frozenset(), None, DatetimeRule(datetime(2019, 6, 3, 8), datetime(2019, 6, 3, 16), ALL_DAYS), {}
+        ),
+        2: CompiledRule(
+            frozenset(), None, DatetimeRule(datetime(2019, 6, 3, 10), datetime(2019, 6, 3, 12), ALL_DAYS), {}
+        ),
+        3: UNCOMPILED_RULE
+    }
+
+
+def test_load_schedule_should_evaluate_new_formulas_with_datetime_rules_and_schedule_their_next_boundaries(
+        compiled_rules):
+    formula_scheduler_service_instance = FormulaSchedulerService()
+
+    with patch.object(
+            ExecutiveDeviceRepository,
+            'get_formula_ids_used_by_executive_devices'
+    ) as get_formula_ids_used_by_executive_devices_mock:
+        get_formula_ids_used_by_executive_devices_mock.return_value = [1, 2, 3]
+
+        with patch.object(FormulaEvaluationService, 'get_compiled_rules') as get_compiled_rules_mock:
+            get_compiled_rules_mock.return_value = compiled_rules
+
+            with patch.object(
+                    FormulaEvaluationService,
+                    'evaluate_scheduled_formulas'
+            ) as evaluate_scheduled_formulas_mock:
+                evaluate_scheduled_formulas_mock.return_value = True
+
+                assert formula_scheduler_service_instance.load_schedule(datetime(2019, 6, 3, 9))
+                assert formula_scheduler_service_instance.load_schedule(datetime(2019, 6, 3, 9, 30))
+
+    evaluate_scheduled_formulas_mock.assert_called_once_with([1, 2], datetime(2019, 6, 3, 9))
+    assert formula_scheduler_service_instance.get_next_boundary() == datetime(2019, 6, 3, 10)
+
+
+def test_run_due_formulas_should_evaluate_formulas_with_crossed_boundaries_in_single_batch(compiled_rules):
+    formula_scheduler_service_instance = FormulaSchedulerService()
+
+    with patch.object(
+            ExecutiveDeviceRepository,
+            'get_formula_ids_used_by_executive_devices'
+    ) as get_formula_ids_used_by_executive_devices_mock:
+        get_formula_ids_used_by_executive_devices_mock.return_value = [1, 2]
+
+        with patch.object(FormulaEvaluationService, 'get_compiled_rules') as get_compiled_rules_mock:
+            get_compiled_rules_mock.return_value = compiled_rules
+
+            with patch.object(
+                    FormulaEvaluationService,
+                    'evaluate_scheduled_formulas'
+            ) as evaluate_scheduled_formulas_mock:
+                evaluate_scheduled_formulas_mock.return_value = True
+
+                formula_scheduler_service_instance.load_schedule(datetime(2019, 6, 3, 7))
+                evaluate_scheduled_formulas_mock.reset_mock()
+
+                assert formula_scheduler_service_instance.run_due_formulas(datetime(2019, 6, 3, 7, 30))
+                evaluate_scheduled_formulas_mock.assert_not_called()
+
+                assert formula_scheduler_service_instance.run_due_formulas(datetime(2019, 6, 3, 10, 30))
+
+    evaluate_scheduled_formulas_mock.assert_called_once()
+    assert set(evaluate_scheduled_formulas_mock.call_args[0][0]) == {1, 2}
+    assert formula_scheduler_service_instance.get_next_boundary() == datetime(2019, 6, 3, 12)
+
+
+def test_run_due_formulas_should_retry_formulas_when_evaluation_failed(compiled_rules):
+    formula_scheduler_service_instance = FormulaSchedulerService()
+    moment = datetime(2019, 6, 3, 8)
+
+    with patch.object(
+            ExecutiveDeviceRepository,
+            'get_formula_ids_used_by_executive_devices'
+    ) as get_formula_ids_used_by_executive_devices_mock:
+        get_formula_ids_used_by_executive_devices_mock.return_value = [1]
+
+        with patch.object(FormulaEvaluationService, 'get_compiled_rules') as get_compiled_rules_mock:
+            get_compiled_rules_mock.return_value = compiled_rules
+
+            with patch.object(
+                    FormulaEvaluationService,
+                    'evaluate_scheduled_formulas'
+            ) as evaluate_scheduled_formulas_mock:
+                evaluate_scheduled_formulas_mock.return_value = False
+
+                assert not formula_scheduler_service_instance.load_schedule(moment)
+
+    assert (formula_scheduler_service_instance.get_next_boundary() - moment).total_seconds() == \
+        Constants.FORMULA_SCHEDULER_RETRY_SECONDS
+
+
+def test_run_due_formulas_should_evaluate_formulas_separately_and_retry_formula_which_raised_error(compiled_rules):
+    formula_scheduler_service_instance = FormulaSchedulerService()
+    moment = datetime(2019, 6, 3, 9)
+
+    def evaluate_scheduled_formulas(formula_ids, evaluation_moment):
+        if 1 in formula_ids:
+            raise TypeError("'<=' not supported between instances of 'str' and 'int'")
+        return True
+
+    with patch.object(
+            ExecutiveDeviceRepository,
+            'get_formula_ids_used_by_executive_devices'
+    ) as get_formula_ids_used_by_executive_devices_mock:
+        get_formula_ids_used_by_executive_devices_mock.return_value = [1, 2]
+
+        with patch.object(FormulaEvaluationService, 'get_compiled_rules') as get_compiled_rules_mock:
+            get_compiled_rules_mock.return_value = compiled_rules
+
+            with patch.object(
+                    FormulaEvaluationService,
+                    'evaluate_scheduled_formulas'
+            ) as evaluate_scheduled_formulas_mock:
+                evaluate_scheduled_formulas_mock.side_effect = evaluate_scheduled_formulas
+
+                with patch.object(ExecutiveDeviceRepository, 'rollback_session') as rollback_session_mock:
+                    assert not formula_scheduler_service_instance.load_schedule(moment)
+
+    assert evaluate_scheduled_formulas_mock.call_count == 3
+    rollback_session_mock.assert_called()
+    assert formula_scheduler_service_instance._next_boundaries == {
+        1: moment + timedelta(seconds=Constants.FORMULA_SCHEDULER_RETRY_SECONDS),
+        2: datetime(2019, 6, 3, 10)
+    }
+
+
+if __name__ == '__main__':
+    pytest.main(['app/unittest/{}.py'.format(__file__)])
@@ -1,23 +1,25 @@
 import base64
 import hashlib
+import json
 from unittest.mock import patch, Mock
 
 import pytest
 
+from app.main.model import DeviceChange
 from app.main.model import DeviceGroup
 from app.main.repository.base_repository import BaseRepository
 from app.main.repository.deleted_device_repository import DeletedDeviceRepository
+from app.main.repository.device_change_repository import DeviceChangeRepository
 from app.main.repository.device_group_repository import DeviceGroupRepository
 from app.main.repository.executive_device_repository import ExecutiveDeviceRepository
-from app.main.repository.executive_type_repository import ExecutiveTypeRepository
-from app.main.repository.formula_repository import FormulaRepository
 from app.main.repository.sensor_repository import SensorRepository
-from app.main.repository.sensor_type_repository import SensorTypeRepository
 from app.main.repository.unconfigured_device_repository import UnconfiguredDeviceRepository
 from app.main.service.executive_device_service import ExecutiveDeviceService
+from app.main.service.formula_evaluation_service import FormulaEvaluationService
 from app.main.service.hub_service import HubService
 from app.main.service.log_service import LogService
 from app.main.service.sensor_service import SensorService
+from app.main.util.change_notifier import ChangeNotifier
 from app.main.util.constants import Constants
 
 
@@ -388,19 +390,25 @@ def test_set_sensors_readings_should_return_update_info_when_called_with_right_p
         get_device_group_by_product_key_mock.return_value = device_group
         with patch.object(
                 SensorService,
-                'set_sensor_reading'
-        ) as _set_sensor_reading_mock:
-            _set_sensor_reading_mock.return_value = True
-            with patch.object(HubService,
-                              'is_authorization_correct'
-                              ) as is_authorization_correct_mock:
-                is_authorization_correct_mock.return_value = True
+                'set_sensors_readings'
+        ) as set_sensors_readings_mock:
+            set_sensors_readings_mock.return_value = (True, [])
+            with patch.object(
+                    FormulaEvaluationService,
+                    'evaluate_formulas'
+            ) as evaluate_formulas_mock:
+                evaluate_formulas_mock.return_value = True
+                with patch.object(HubService,
+                                  'is_authorization_correct'
+                                  ) as is_authorization_correct_mock:
+                    is_authorization_correct_mock.return_value = True
 
-                result = hub_service_instance.set_sensors_readings(
-                    device_group.product_key,
-                    device_group.password,
-                    sensors_readings)
+                    result = hub_service_instance.set_sensors_readings(
+                        device_group.product_key,
+                        device_group.password,
+                        sensors_readings)
     assert result == Constants.RESPONSE_MESSAGE_UPDATED_SENSORS_AND_DEVICES
+    evaluate_formulas_mock.assert_called_once_with(device_group.id, device_group.product_key, {'2'})
 
 
 def test_set_sensors_readings_should_return_partial_success_message_when_called_with_right_parameters(
@@ -420,26 +428,64 @@ def test_set_sensors_readings_should_return_partial_success_message_when_called_
         get_device_group_by_product_key_mock.return_value = device_group
         with patch.object(
                 SensorService,
-                'set_sensor_reading'
-        ) as _set_sensor_reading_mock:
-            _set_sensor_reading_mock.return_value = False
+                'set_sensors_readings'
+        ) as set_sensors_readings_mock:
+            set_sensors_readings_mock.return_value = (True, sensors_readings)
             with patch.object(
                     LogService,
                     'log_exception'
             ) as log_exception_mock:
                 log_exception_mock.side_effects = None
 
-                with patch.object(HubService,
-                                  'is_authorization_correct'
-                                  ) as is_authorization_correct_mock:
-                    is_authorization_correct_mock.return_value = True
-                    result = hub_service_instance.set_sensors_readings(
-                        device_group.product_key,
-                        device_group.password,
-                        sensors_readings)
+                with patch.object(
+                        FormulaEvaluationService,
+                        'evaluate_formulas'
+                ) as evaluate_formulas_mock:
+                    evaluate_formulas_mock.return_value = True
+
+                    with patch.object(HubService,
+                                      'is_authorization_correct'
+                                      ) as is_authorization_correct_mock:
+                        is_authorization_correct_mock.return_value = True
+                        result = hub_service_instance.set_sensors_readings(
+                            device_group.product_key,
+                            device_group.password,
+                            sensors_readings)
     assert result == Constants.RESPONSE_MESSAGE_PARTIALLY_WRONG_DATA
 
 
+def test_set_sensors_readings_should_return_error_message_when_readings_were_not_saved(
+        create_device_group):
+    hub_service_instance = HubService.get_instance()
+    device_group = create_device_group()
+    sensors_readings = [{
+        "deviceKey": "2",
+        "readingValue": 0.9,
+        "isActive": False
+    }]
+
+    with patch.object(
+            DeviceGroupRepository,
+            'get_device_group_by_product_key'
+    ) as get_device_group_by_product_key_mock:
+        get_device_group_by_product_key_mock.return_value = device_group
+        with patch.object(
+                SensorService,
+                'set_sensors_readings'
+        ) as set_sensors_readings_mock:
+            set_sensors_readings_mock.return_value = (False, [])
+            with patch.object(HubService,
+                              'is_authorization_correct'
+                              ) as is_authorization_correct_mock:
+                is_authorization_correct_mock.return_value = True
+
+                result = hub_service_instance.set_sensors_readings(
+                    device_group.product_key,
+                    device_group.password,
+                    sensors_readings)
+    assert result == Constants.RESPONSE_MESSAGE_ERROR
+
+
 def test_set_sensors_readings_should_return_product_key_error_when_called_with_wrong_product_key(
         create_device_group):
     hub_service_instance = HubService.get_instance()
@@ -564,60 +610,47 @@ def test_get_devices_informations_should_return_device_informations_when_valid_p
     formula_values = get_formula_default_values()
     formulas = create_formulas([formula_values])
 
+    sensors[0].sensor_type = sensor_types[0]
+    executive_devices[0].executive_type = executive_types[0]
+    executive_devices[0].formula = formulas[0]
+
     with patch.object(
             SensorRepository,
-            'get_sensors_by_product_key_and_device_keys'
-    ) as get_sensors_by_product_key_and_device_keys_mock:
-        get_sensors_by_product_key_and_device_keys_mock.return_value = sensors
+            'get_sensors_with_types_by_device_group_id_and_device_keys'
+    ) as get_sensors_with_types_by_device_group_id_and_device_keys_mock:
+        get_sensors_with_types_by_device_group_id_and_device_keys_mock.return_value = sensors
 
         with patch.object(
-                SensorTypeRepository,
-                'get_sensor_types_by_ids'
-        ) as get_sensor_types_by_ids_mock:
-            get_sensor_types_by_ids_mock.return_value = sensor_types
+                ExecutiveDeviceRepository,
+                'get_executive_devices_with_types_and_formulas_by_device_group_id_and_device_keys'
+        ) as get_executive_devices_with_types_and_formulas_by_device_group_id_and_device_keys_mock:
+            get_executive_devices_with_types_and_formulas_by_device_group_id_and_device_keys_mock.return_value = \
+                executive_devices
 
             with patch.object(
-                    ExecutiveDeviceRepository,
-                    'get_executive_devices_by_product_key_and_device_keys'
-            ) as get_executive_devices_by_product_key_and_device_keys_mock:
-                get_executive_devices_by_product_key_and_device_keys_mock.return_value = executive_devices
-
-                with patch.object(
-                        ExecutiveTypeRepository,
-                        'get_executive_types_by_ids'
-                ) as get_executive_types_by_ids_mock:
-                    get_executive_types_by_ids_mock.return_value = executive_types
-
-                    with patch.object(
-                            FormulaRepository,
-                            'get_formulas_by_ids'
-                    ) as get_formulas_by_ids_mock:
-                        get_formulas_by_ids_mock.return_value = formulas
-
-                        with patch.object(
-                                BaseRepository,
-                                'update_database'
-                        ) as update_database_mock:
-                            update_database_mock.return_value = True
+                    BaseRepository,
+                    'update_database'
+            ) as update_database_mock:
+                update_database_mock.return_value = True
 
-                            with patch.object(HubService,
-                                              'is_authorization_correct'
-                                              ) as is_authorization_correct_mock:
-                                is_authorization_correct_mock.return_value = True
+                with patch.object(HubService,
+                                  'is_authorization_correct'
+                                  ) as is_authorization_correct_mock:
+                    is_authorization_correct_mock.return_value = True
 
-                                with patch.object(DeviceGroupRepository,
-                                                  'get_device_group_by_product_key'
-                                                  ) as get_device_group_by_product_key_mock:
-                                    get_device_group_by_product_key_mock.return_value = Mock(spec=DeviceGroup)
+                    with patch.object(DeviceGroupRepository,
+                                      'get_device_group_by_product_key'
+                                      ) as get_device_group_by_product_key_mock:
+                        get_device_group_by_product_key_mock.return_value = Mock(spec=DeviceGroup)
 
-                                    result, result_values = hub_service_instance.get_devices_informations(
-                                        "test_product_key",
-                                        "test_password",
-                                        [
-                                            sensors[0].device_key,
-                                            executive_devices[0].device_key
-                                        ]
-                                    )
+                        result, result_values = hub_service_instance.get_devices_informations(
+                            "test_product_key",
+                            "test_password",
+                            [
+                                sensors[0].device_key,
+                                executive_devices[0].device_key
+                            ]
+                        )
 
     assert result == Constants.RESPONSE_MESSAGE_OK
     assert result_values
@@ -654,15 +687,15 @@ def test_get_devices_informations_should_return_empty_lists_when_valid_product_k
 
     with patch.object(
             SensorRepository,
-            'get_sensors_by_product_key_and_device_keys'
-    ) as get_sensors_by_product_key_and_device_keys_mock:
-        get_sensors_by_product_key_and_device_keys_mock.return_value = None
+            'get_sensors_with_types_by_device_group_id_and_device_keys'
+    ) as get_sensors_with_types_by_device_group_id_and_device_keys_mock:
+        get_sensors_with_types_by_device_group_id_and_device_keys_mock.return_value = []
 
         with patch.object(
                 ExecutiveDeviceRepository,
-                'get_executive_devices_by_product_key_and_device_keys'
-        ) as get_executive_devices_by_product_key_and_device_keys_mock:
-            get_executive_devices_by_product_key_and_device_keys_mock.return_value = None
+                'get_executive_devices_with_types_and_formulas_by_device_group_id_and_device_keys'
+        ) as get_executive_devices_with_types_and_formulas_by_device_group_id_and_device_keys_mock:
+            get_executive_devices_with_types_and_formulas_by_device_group_id_and_device_keys_mock.return_value = []
 
             with patch.object(
                     BaseRepository,
@@ -738,9 +771,9 @@ def test_set_devices_states_should_return_update_info_when_called_with_right_par
         get_device_group_by_product_key_mock.return_value = device_group
         with patch.object(
                 ExecutiveDeviceService,
-                'set_device_state'
-        ) as _set_device_state_mock:
-            _set_device_state_mock.return_value = True
+                'set_devices_states'
+        ) as set_devices_states_mock:
+            set_devices_states_mock.return_value = (True, [])
 
             with patch.object(HubService,
                               'is_authorization_correct'
@@ -774,9 +807,9 @@ def test_set_devices_states_should_return_partial_success_message_when_called_wi
         get_device_group_by_product_key_mock.return_value = device_group
         with patch.object(
                 ExecutiveDeviceService,
-                'set_device_state'
-        ) as _set_device_state_mock:
-            _set_device_state_mock.return_value = False
+                'set_devices_states'
+        ) as set_devices_states_mock:
+            set_devices_states_mock.return_value = (True, devices_states)
             with patch.object(
                     LogService,
                     'log_exception'
@@ -855,5 +888,347 @@ def test_is_authorization_correct_should_return_true_if_right_authentication_is_
     assert hub_service_instance.is_authorization_correct(device_group, authorization)
 
 
+def test_get_changed_devices_for_device_group_should_use_cached_device_group_when_authorization_verified(
+        create_device_group):
+    hub_service_instance = HubService.get_instance()
+
+    device_group = create_device_group()
+    authorization = 'Basic authorization'
+
+    with patch.object(
+            DeviceGroupRepository,
+            'get_device_group_by_product_key'
+    ) as get_device_group_by_product_key_mock:
+        get_device_group_by_product_key_mock.return_value = device_group
+
+        with patch.object(HubService, 'is_authorization_correct') as is_authorization_correct_mock:
+            is_authorization_correct_mock.side_effect = \
+                lambda device_group, authorization: authorization == 'Basic authorization'
+
+            with patch.object(
+                    ExecutiveDeviceRepository,
+                    'get_updated_executive_devices_by_device_group_id'
+            ) as get_updated_executive_devices_by_device_group_id_mock:
+                get_updated_executive_devices_by_device_group_id_mock.return_value = []
+
+                with patch.object(
+                        SensorRepository,
+                        'get_sensors_by_device_group_id_and_update_status'
+                ) as get_sensors_by_device_group_id_and_update_status_mock:
+                    get_sensors_by_device_group_id_and_update_status_mock.return_value = []
+
+                    with patch.object(
+                            DeletedDeviceRepository,
+                            'get_deleted_devices_by_device_group_id'
+                    ) as get_deleted_devices_by_device_group_id_mock:
+                        get_deleted_devices_by_device_group_id_mock.return_value = []
+
+                        first_result, _ = hub_service_instance.get_changed_devices_for_device_group(
+                            device_group.product_key,
+                            authorization
+                        )
+                        second_result, _ = hub_service_instance.get_changed_devices_for_device_group(
+                            device_group.product_key,
+                            authorization
+                        )
+                        wrong_password_result, _ = hub_service_instance.get_changed_devices_for_device_group(
+                            device_group.product_key,
+                            'Basic wrong authorization'
+                        )
+
+    assert first_result == Constants.RESPONSE_MESSAGE_OK
+    assert second_result == Constants.RESPONSE_MESSAGE_OK
+    assert wrong_password_result == Constants.RESPONSE_MESSAGE_WRONG_PASSWORD
+    assert get_device_group_by_product_key_mock.call_count == 2
+    assert is_authorization_correct_mock.call_count == 2
+    get_updated_executive_devices_by_device_group_id_mock.assert_called_with(device_group.id)
+    assert hub_service_instance.get_device_group_cache_stats() == {'size': 1, 'hits': 2, 'misses': 1}
+
+
+def test_invalidate_device_group_cache_should_force_device_group_reload(create_device_group):
+    hub_service_instance = HubService.get_instance()
+
+    device_group = create_device_group()
+
+    with patch.object(
+            DeviceGroupRepository,
+            'get_device_group_by_product_key'
+    ) as get_device_group_by_product_key_mock:
+        get_device_group_by_product_key_mock.return_value = device_group
+
+        with patch.object(HubService, 'is_authorization_correct') as is_authorization_correct_mock:
+            is_authorization_correct_mock.return_value = True
+
+            with patch.object(
+                    UnconfiguredDeviceRepository,
+                    'get_unconfigured_device_by_device_key'
+            ) as get_unconfigured_device_by_device_key_mock:
+                get_unconfigured_device_by_device_key_mock.return_value = None
+
+                hub_service_instance.add_device_to_device_group(device_group.product_key, 'Basic auth', 'key')
+                hub_service_instance.invalidate_device_group_cache(device_group.product_key)
+                hub_service_instance.add_device_to_device_group(device_group.product_key, 'Basic auth', 'key')
+
+    assert get_device_group_by_product_key_mock.call_count == 2
+
+
+def test_get_changed_devices_for_device_group_should_wait_for_change_when_cursor_current(create_device_group):
+    hub_service_instance = HubService.get_instance()
+    change_notifier = ChangeNotifier.get_instance()
+
+    device_group = create_device_group()
+    cursor = change_notifier.get_cursor(device_group.product_key)
+
+    with patch.object(
+            HubService,
+            '_get_authorized_device_group_id'
+    ) as get_authorized_device_group_id_mock:
+        get_authorized_device_group_id_mock.return_value = (None, device_group.id)
+
+        with patch.object(
+                ChangeNotifier,
+                'wait_for_change'
+        ) as wait_for_change_mock:
+            wait_for_change_mock.side_effect = \
+                lambda product_key, cursor, timeout: change_notifier.notify(product_key) is None
+
+            with patch.object(BaseRepository, 'rollback_session'):
+                with patch.object(
+                        ExecutiveDeviceRepository,
+                        'get_updated_executive_devices_by_device_group_id'
+                ) as get_updated_executive_devices_by_device_group_id_mock:
+                    get_updated_executive_devices_by_device_group_id_mock.return_value = []
+
+                    with patch.object(
+                            SensorRepository,
+                            'get_sensors_by_device_group_id_and_update_status'
+                    ) as get_sensors_by_device_group_id_and_update_status_mock:
+                        get_sensors_by_device_group_id_and_update_status_mock.return_value = []
+
+                        with patch.object(
+                                DeletedDeviceRepository,
+                                'get_deleted_devices_by_device_group_id'
+                        ) as get_deleted_devices_by_device_group_id_mock:
+                            get_deleted_devices_by_device_group_id_mock.return_value = []
+
+                            result, result_values = hub_service_instance.get_changed_devices_for_device_group(
+                                device_group.product_key,
+                                'Basic auth',
+                                wait='20',
+                                cursor=cursor
+                            )
+
+    assert result == Constants.RESPONSE_MESSAGE_OK
+    assert result_values['cursor'] == change_notifier.get_cursor(device_group.product_key)
+    assert result_values['cursor'] != cursor
+    wait_for_change_mock.assert_called_once_with(device_group.product_key, cursor, 20)
+    get_updated_executive_devices_by_device_group_id_mock.assert_called_once_with(device_group.id)
+
+
+def test_get_changed_devices_for_device_group_should_not_wait_when_changes_not_seen_by_hub(
+        create_device_group,
+        create_sensor):
+    hub_service_instance = HubService.get_instance()
+
+    device_group = create_device_group()
+    sensor = create_sensor()
+
+    with patch.object(
+            HubService,
+            '_get_authorized_device_group_id'
+    ) as get_authorized_device_group_id_mock:
+        get_authorized_device_group_id_mock.return_value = (None, device_group.id)
+
+        with patch.object(ChangeNotifier, 'wait_for_change') as wait_for_change_mock:
+            with patch.object(
+                    ExecutiveDeviceRepository,
+                    'get_updated_executive_devices_by_device_group_id'
+            ) as get_updated_executive_devices_by_device_group_id_mock:
+                get_updated_executive_devices_by_device_group_id_mock.return_value = []
+
+                with patch.object(
+                        SensorRepository,
+                        'get_sensors_by_device_group_id_and_update_status'
+                ) as get_sensors_by_device_group_id_and_update_status_mock:
+                    get_sensors_by_device_group_id_and_update_status_mock.return_value = [sensor]
+
+                    with patch.object(
+                            DeletedDeviceRepository,
+                            'get_deleted_devices_by_device_group_id'
+                    ) as get_deleted_devices_by_device_group_id_mock:
+                        get_deleted_devices_by_device_group_id_mock.return_value = []
+
+                        result, result_values = hub_service_instance.get_changed_devices_for_device_group(
+                            device_group.product_key,
+                            'Basic auth',
+                            wait='20'
+                        )
+
+    assert result == Constants.RESPONSE_MESSAGE_OK
+    assert result_values['changedDevices'] == [sensor.device_key]
+    assert result_values['cursor'] == ChangeNotifier.get_instance().get_cursor(device_group.product_key)
+    wait_for_change_mock.assert_not_called()
+
+
+@pytest.mark.parametrize("wait", ['-1', str(Constants.HUB_STATES_MAX_WAIT_SECONDS + 1), 'wait'])
+def test_get_changed_devices_for_device_group_should_return_bad_request_when_invalid_wait(
+        wait,
+        create_device_group):
+    hub_service_instance = HubService.get_instance()
+
+    device_group = create_device_group()
+
+    with patch.object(
+            HubService,
+            '_get_authorized_device_group_id'
+    ) as get_authorized_device_group_id_mock:
+        get_authorized_device_group_id_mock.return_value = (None, device_group.id)
+
+        result, result_values = hub_service_instance.get_changed_devices_for_device_group(
+            device_group.product_key,
+            'Basic auth',
+            wait=wait
+        )
+
+    assert result == Constants.RESPONSE_MESSAGE_BAD_REQUEST
+    assert result_values is None
+
+
+@pytest.mark.parametrize("since", ['-1', 'since'])
+def test_get_changed_devices_for_device_group_should_return_bad_request_when_invalid_since(
+        since,
+        create_device_group):
+    hub_service_instance = HubService.get_instance()
+
+    device_group = create_device_group()
+
+    with patch.object(
+            HubService,
+            '_get_authorized_device_group_id'
+    ) as get_authorized_device_group_id_mock:
+        get_authorized_device_group_id_mock.return_value = (None, device_group.id)
+
+        with patch.object(
+                DeviceChangeRepository,
+                'get_device_changes_by_device_group_id'
+        ) as get_device_changes_by_device_group_id_mock:
+            result, result_values = hub_service_instance.get_changed_devices_for_device_group(
+                device_group.product_key,
+                'Basic auth',
+                since=since
+            )
+
+    assert result == Constants.RESPONSE_MESSAGE_BAD_REQUEST
+    assert result_values is None
+    get_device_changes_by_device_group_id_mock.assert_not_called()
+
+
+def test_get_changed_devices_for_device_group_should_return_latest_change_of_every_device_when_since_passed(
+        create_device_group):
+    hub_service_instance = HubService.get_instance()
+
+    device_group = create_device_group()
+    device_changes = [
+        DeviceChange(device_group_id=device_group.id, sequence=5, device_key='first', is_deleted=False),
+        DeviceChange(device_group_id=device_group.id, sequence=6, device_key='second', is_deleted=True),
+        DeviceChange(device_group_id=device_group.id, sequence=7, device_key='first', is_deleted=True),
+        DeviceChange(device_group_id=device_group.id, sequence=9, device_key='second', is_deleted=False)
+    ]
+
+    with patch.object(
+            HubService,
+            '_get_authorized_device_group_id'
+    ) as get_authorized_device_group_id_mock:
+        get_authorized_device_group_id_mock.return_value = (None, device_group.id)
+
+        with patch.object(
+                DeviceChangeRepository,
+                'get_device_changes_by_device_group_id'
+        ) as get_device_changes_by_device_group_id_mock:
+            get_device_changes_by_device_group_id_mock.return_value = device_changes
+
+            result, result_values = hub_service_instance.get_changed_devices_for_device_group(
+                device_group.product_key,
+                'Basic auth',
+                since='4'
+            )
+
+    assert result == Constants.RESPONSE_MESSAGE_OK
+    assert result_values['changedDevices'] == ['second']
+    assert result_values['deletedDevices'] == ['first']
+    assert result_values['sequence'] == 9
+    assert not result_values['hasMore']
+    get_device_changes_by_device_group_id_mock.assert_called_once_with(
+        device_group.id,
+        4,
+        Constants.DEVICE_CHANGES_PAGE_SIZE + 1
+    )
+
+
+@pytest.mark.parametrize("retention_days", [None, 0])
+def test_compact_device_changes_should_return_bad_request_when_invalid_retention_days(retention_days):
+    hub_service_instance = HubService.get_instance()
+
+    with patch.object(
+            DeviceChangeRepository,
+            'delete_superseded_device_changes_but_do_not_commit'
+    ) as delete_superseded_device_changes_but_do_not_commit_mock:
+        result, result_values = hub_service_instance.compact_device_changes(retention_days)
+
+    assert result == Constants.RESPONSE_MESSAGE_BAD_REQUEST
+    assert result_values is None
+    delete_superseded_device_changes_but_do_not_commit_mock.assert_not_called()
+
+
+def test_get_changed_devices_stream_should_send_changes_and_keep_alive_comments(create_device_group, create_sensor):
+    hub_service_instance = HubService.get_instance()
+
+    device_group = create_device_group()
+    sensor = create_sensor()
+
+    with patch.object(
+            HubService,
+            '_get_authorized_device_group_id'
+    ) as get_authorized_device_group_id_mock:
+        get_authorized_device_group_id_mock.return_value = (None, device_group.id)
+
+        with patch.object(ChangeNotifier, 'wait_for_change') as wait_for_change_mock:
+            wait_for_change_mock.return_value = False
+
+            with patch.object(BaseRepository, 'rollback_session'):
+                with patch.object(
+                        ExecutiveDeviceRepository,
+                        'get_updated_executive_devices_by_device_group_id'
+                ) as get_updated_executive_devices_by_device_group_id_mock:
+                    get_updated_executive_devices_by_device_group_id_mock.return_value = []
+
+                    with patch.object(
+                            SensorRepository,
+                            'get_sensors_by_device_group_id_and_update_status'
+                    ) as get_sensors_by_device_group_id_and_update_status_mock:
+                        get_sensors_by_device_group_id_and_update_status_mock.return_value = [sensor]
+
+                        with patch.object(
+                                DeletedDeviceRepository,
+                                'get_deleted_devices_by_device_group_id'
+                        ) as get_deleted_devices_by_device_group_id_mock:
+                            get_deleted_devices_by_device_group_id_mock.return_value = []
+
+                            result, events = hub_service_instance.get_changed_devices_stream(
+                                device_group.product_key,
+                                'Basic auth'
+                            )
+                            first_events = [next(events) for _ in range(4)]
+
+    cursor = ChangeNotifier.get_instance().get_cursor(device_group.product_key)
+
+    assert result == Constants.RESPONSE_MESSAGE_OK
+    assert first_events[0].startswith('retry: ')
+    assert first_events[1].startswith('id: {}\nevent: states\ndata: '.format(cursor))
+    assert json.loads(first_events[1].split('data: ')[1])['changedDevices'] == [sensor.device_key]
+    assert first_events[2:] == [': keep-alive\n\n', ': keep-alive\n\n']
+    get_sensors_by_device_group_id_and_update_status_mock.assert_called_once_with(device_group.id)
+
+
 if __name__ == '__main__':
     pytest.main(['app/unittest/{}.py'.format(__file__)])
@@ -0,0 +1,49 @@
+from unittest.mock import Mock
+from unittest.mock import patch
+
+import pytest
+import requests
+
+from app.benchmark.hub_load_benchmark import run_hub_load_test
+from app.benchmark.hub_load_benchmark import summarize_latencies
+
+
+def test_summarize_latencies_should_return_throughput_and_percentiles_in_milliseconds():
+    result = summarize_latencies('states', [i / 1000 for i in range(100, 0, -1)], 2, 10)
+
+    assert result['request'] == 'states'
+    assert result['requests'] == 100
+    assert result['errors'] == 2
+    assert result['per_second'] == 10
+    assert result['p50_ms'] == pytest.approx(51)
+    assert result['p95_ms'] == pytest.approx(95)
+    assert result['p99_ms'] == pytest.approx(99)
+
+
+def test_run_hub_load_test_should_send_readings_states_and_changes_of_every_hub():
+    with patch.object(requests.Session, 'request') as request_mock:
+        request_mock.return_value = Mock(status_code=200)
+
+        results = run_hub_load_test(
+            'http://localhost:5000/',
+            'product key',
+            'password',
+            ['sensor key'],
+            ['device key'],
+            hubs=2,
+            duration_seconds=0.05
+        )
+
+    assert [result['request'] for result in results] == ['readings', 'states', 'changes']
+    assert all(result['requests'] > 0 and result['errors'] == 0 for result in results)
+
+    method, url = request_mock.call_args_list[0][0]
+    assert (method, url) == ('POST', 'http://localhost:5000/api/hubs/product key/readings')
+    assert request_mock.call_args_list[0][1]['json'] == {
+        'sensors': [{'deviceKey': 'sensor key', 'readingValue': 1, 'isActive': True}]
+    }
+    assert request_mock.call_args_list[0][1]['headers']['Authorization'].startswith('Basic ')
+
+
+if __name__ == '__main__':
+    pytest.main(['app/unittest/{}.py'.format(__file__)])
@@ -37,20 +37,54 @@ def test_log_exception_should_log_data_when_valid_product_key_and_data(
     ) as get_device_group_by_product_key_mock:
         get_device_group_by_product_key_mock.return_value = user_device_group
 
-        with patch.object(LogRepository, 'save') as save_mock:
-            save_mock.return_value = True
+        with patch.object(LogRepository, 'save_logs') as save_logs_mock:
+            save_logs_mock.return_value = True
 
             result = log_service_instance.log_exception(log_values, test_product_key)
-            args = save_mock.call_args_list[0][0]
-            created_log = args[0]
+            args = save_logs_mock.call_args_list[0][0]
+            created_log = args[0][0]
 
     assert result == Constants.RESPONSE_MESSAGE_CREATED
-    assert log_default_values['type'] == created_log.type
-    assert log_default_values['creation_date'] == created_log.creation_date
-    assert log_default_values['error_message'] == created_log.error_message
-    assert log_default_values['stack_trace'] == created_log.stack_trace
-    assert log_default_values['payload'] == created_log.payload
-    assert log_default_values['time'] == created_log.time
+    assert log_default_values['type'] == created_log['type']
+    assert log_default_values['creation_date'] == created_log['creation_date']
+    assert log_default_values['error_message'] == created_log['error_message']
+    assert log_default_values['stack_trace'] == created_log['stack_trace']
+    assert log_default_values['payload'] == created_log['payload']
+    assert log_default_values['time'] == created_log['time']
+    assert user_device_group.id == created_log['device_group_id']
+
+
+def test_log_exception_should_look_up_device_group_once_when_logging_for_the_same_product_key(
+        get_log_default_values,
+        create_device_group):
+    log_service_instance = LogService.get_instance()
+
+    device_group = create_device_group()
+
+    log_default_values = get_log_default_values()
+    log_values = dict(
+        type=log_default_values['type'],
+        creationDate=log_default_values['creation_date'],
+        errorMessage=log_default_values['error_message']
+    )
+
+    with patch.object(
+            DeviceGroupRepository,
+            'get_device_group_by_product_key'
+    ) as get_device_group_by_product_key_mock:
+        get_device_group_by_product_key_mock.return_value = device_group
+
+        with patch.object(LogRepository, 'save_logs') as save_logs_mock:
+            save_logs_mock.return_value = True
+
+            first_result = log_service_instance.log_exception(log_values, device_group.product_key)
+            second_result = log_service_instance.log_exception(log_values, device_group.product_key)
+
+    assert first_result == Constants.RESPONSE_MESSAGE_CREATED
+    assert second_result == Constants.RESPONSE_MESSAGE_CREATED
+    get_device_group_by_product_key_mock.assert_called_once_with(device_group.product_key)
+    assert save_logs_mock.call_count == 2
+    assert save_logs_mock.call_args[0][0][0]['creation_date'] == log_default_values['creation_date']
 
 
 def test_log_exception_should_not_log_data_when_product_key_is_none(
@@ -0,0 +1,65 @@
+import threading
+import time
+
+import pytest
+from flask import Flask
+
+from app.main.util.log_buffer import LogBuffer
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    return condition()
+
+
+def test_put_should_write_row_synchronously_when_flusher_not_started():
+    written_batches = []
+    log_buffer = LogBuffer(lambda rows: written_batches.append(rows) or len(rows), 10, 5, 0.01, 0.01)
+
+    assert log_buffer.put({'id': 1})
+    assert written_batches == [[{'id': 1}]]
+    assert log_buffer.get_stats() == {'queued': 0, 'written': 1, 'dropped': 0, 'failed': 0}
+
+
+def test_flusher_should_write_rows_in_batches_and_write_queued_rows_when_stopped():
+    written_batches = []
+    log_buffer = LogBuffer(lambda rows: written_batches.append(rows) or len(rows), 10, 2, 60, 0.01)
+
+    log_buffer.start_flusher(Flask(__name__))
+
+    for row_id in range(3):
+        assert log_buffer.put({'id': row_id})
+
+    assert wait_until(lambda: len(written_batches) == 1)
+    log_buffer.stop_flusher(5)
+
+    assert written_batches == [[{'id': 0}, {'id': 1}], [{'id': 2}]]
+    assert log_buffer.get_stats() == {'queued': 0, 'written': 3, 'dropped': 0, 'failed': 0}
+
+
+def test_put_should_drop_row_when_queue_full():
+    write_event = threading.Event()
+
+    def write_rows(rows):
+        write_event.wait(5)
+        return len(rows) - 1
+
+    log_buffer = LogBuffer(write_rows, 1, 1, 0.01, 0.01)
+    log_buffer.start_flusher(Flask(__name__))
+
+    assert log_buffer.put({'id': 1})
+    assert wait_until(lambda: log_buffer.get_stats()['queued'] == 0)
+    assert log_buffer.put({'id': 2})
+    assert not log_buffer.put({'id': 3})
+
+    write_event.set()
+    log_buffer.stop_flusher(5)
+
+    assert log_buffer.get_stats() == {'queued': 0, 'written': 0, 'dropped': 1, 'failed': 2}
+
+
+if __name__ == '__main__':
+    pytest.main(['app/unittest/{}.py'.format(__file__)])
@@ -0,0 +1,74 @@
+from unittest.mock import patch
+
+import flask_bcrypt
+import pytest
+
+from app.main.service import password_service
+from app.main.service.password_service import PasswordService
+from app.main.util.constants import Constants
+
+
+def test_generate_password_hash_should_hash_password_in_process_pool_with_configured_rounds():
+    password_service_instance = PasswordService()
+
+    with patch.object(Constants, 'PASSWORD_HASHING_ROUNDS', 4):
+        try:
+            password_hash = password_service_instance.generate_password_hash('password')
+            is_password_correct = password_service_instance.check_password_hash(password_hash, 'password')
+            is_wrong_password_correct = password_service_instance.check_password_hash(password_hash, 'not password')
+        finally:
+            password_service_instance.shutdown()
+
+    assert password_hash.startswith('$2b$04$')
+    assert is_password_correct is True
+    assert is_wrong_password_correct is False
+
+
+def test_get_executor_should_start_processes_by_fork_server():
+    password_service_instance = PasswordService()
+
+    with patch.object(password_service, 'ProcessPoolExecutor') as process_pool_executor_mock:
+        with patch.object(Constants, 'PASSWORD_HASHING_WORKERS', 2):
+            executor = password_service_instance._get_executor()
+
+    assert executor is process_pool_executor_mock.return_value
+    _, kwargs = process_pool_executor_mock.call_args
+    assert kwargs['max_workers'] == 2
+    assert kwargs['mp_context'].get_start_method() == 'forkserver'
+
+
+def test_check_password_hash_should_return_false_when_password_hash_is_invalid():
+    password_service_instance = PasswordService()
+
+    with patch.object(Constants, 'PASSWORD_HASHING_WORKERS', 0):
+        result = password_service_instance.check_password_hash('not hash', 'password')
+
+    assert result is False
+
+
+def test_check_password_hash_should_return_none_when_queue_is_full():
+    with patch.object(Constants, 'PASSWORD_HASHING_QUEUE_MAX_SIZE', 0):
+        password_service_instance = PasswordService()
+
+        result = password_service_instance.check_password_hash(
+            flask_bcrypt.generate_password_hash('password', 4).decode('utf-8'),
+            'password'
+        )
+
+    assert result is None
+
+
+@pytest.mark.parametrize('rounds, expected_result', [(12, False), (4, True)])
+def test_needs_rehash_should_return_true_when_password_hash_has_different_rounds(rounds, expected_result):
+    password_service_instance = PasswordService()
+
+    password_hash = flask_bcrypt.generate_password_hash('password', rounds).decode('utf-8')
+
+    with patch.object(Constants, 'PASSWORD_HASHING_ROUNDS', 12):
+        result = password_service_instance.needs_rehash(password_hash)
+
+    assert result is expected_result
+
+
+if __name__ == '__main__':
+    pytest.main(['app/unittest/{}.py'.format(__file__)])
@@ -0,0 +1,87 @@
+from unittest.mock import patch
+
+import pytest
+
+from app.main.repository.user_group_repository import UserGroupRepository
+from app.main.service.permission_service import PermissionService
+
+
+def test_get_user_access_should_load_memberships_of_user_once(create_user):
+    permission_service_instance = PermissionService.get_instance()
+
+    user = create_user()
+
+    with patch.object(
+            UserGroupRepository,
+            'get_user_group_memberships_by_user_id'
+    ) as get_user_group_memberships_by_user_id_mock:
+        get_user_group_memberships_by_user_id_mock.return_value = [(1, 1, 'Master'), (2, 1, 'group'), (3, 2, 'group')]
+
+        is_master_user = permission_service_instance.is_master_user_of_device_group(user.id, 1)
+        is_user_in_device_group = permission_service_instance.is_user_in_device_group(user.id, 2)
+        is_user_in_user_group = permission_service_instance.is_user_in_user_group(user.id, 3)
+
+    assert is_master_user is True
+    assert is_user_in_device_group is True
+    assert is_user_in_user_group is True
+    get_user_group_memberships_by_user_id_mock.assert_called_once_with(user.id)
+
+
+def test_is_master_user_of_device_group_should_return_false_when_user_is_not_in_master_user_group(create_user):
+    permission_service_instance = PermissionService.get_instance()
+
+    user = create_user()
+
+    with patch.object(
+            UserGroupRepository,
+            'get_user_group_memberships_by_user_id'
+    ) as get_user_group_memberships_by_user_id_mock:
+        get_user_group_memberships_by_user_id_mock.return_value = [(2, 1, 'group')]
+
+        result = permission_service_instance.is_master_user_of_device_group(user.id, 1)
+
+    assert result is False
+
+
+def test_is_user_in_user_group_should_load_memberships_again_when_user_group_is_not_cached(create_user):
+    permission_service_instance = PermissionService.get_instance()
+
+    user = create_user()
+
+    with patch.object(
+            UserGroupRepository,
+            'get_user_group_memberships_by_user_id'
+    ) as get_user_group_memberships_by_user_id_mock:
+        get_user_group_memberships_by_user_id_mock.side_effect = [
+            [(1, 1, 'Master')],
+            [(1, 1, 'Master'), (2, 1, 'group')]
+        ]
+
+        permission_service_instance.get_user_access(user.id)
+        result = permission_service_instance.is_user_in_user_group(user.id, 2)
+
+    assert result is True
+    assert get_user_group_memberships_by_user_id_mock.call_count == 2
+
+
+def test_invalidate_user_access_should_drop_cached_memberships_of_user(create_user):
+    permission_service_instance = PermissionService.get_instance()
+
+    user = create_user()
+
+    with patch.object(
+            UserGroupRepository,
+            'get_user_group_memberships_by_user_id'
+    ) as get_user_group_memberships_by_user_id_mock:
+        get_user_group_memberships_by_user_id_mock.side_effect = [[(1, 1, 'Master')], []]
+
+        permission_service_instance.get_user_access(user.id)
+        permission_service_instance.invalidate_user_access(user.id)
+        user_access = permission_service_instance.get_user_access(user.id)
+
+    assert user_access.user_group_ids == frozenset()
+    assert get_user_group_memberships_by_user_id_mock.call_count == 2
+
+
+if __name__ == '__main__':
+    pytest.main(['app/unittest/{}.py'.format(__file__)])
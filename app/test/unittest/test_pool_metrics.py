@@ -0,0 +1,75 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError
+
+from app.main.util.pool_metrics import InstrumentedQueuePool
+from app.main.util.pool_metrics import PoolMetrics
+from app.main.util.pool_metrics import format_pool_metrics
+
+
+def test_get_stats_should_count_checkouts_overflows_and_pool_sizes():
+    pool_metrics_instance = PoolMetrics.get_instance()
+    engine = create_engine('sqlite://', poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=1)
+
+    previous_stats = pool_metrics_instance.get_stats()
+
+    first_connection = engine.connect()
+    second_connection = engine.connect()
+    stats = pool_metrics_instance.get_stats(engine.pool)
+
+    first_connection.close()
+    second_connection.close()
+    engine.dispose()
+
+    assert stats['checkouts'] - previous_stats['checkouts'] == 2
+    assert stats['connects'] - previous_stats['connects'] == 2
+    assert stats['overflows'] - previous_stats['overflows'] == 1
+    assert stats['waits'] == previous_stats['waits']
+    assert stats['size'] == 1
+    assert stats['checked_out'] == 2
+    assert stats['overflow'] == 1
+
+
+def test_get_stats_should_count_wait_and_timeout_when_pool_is_exhausted():
+    pool_metrics_instance = PoolMetrics.get_instance()
+    engine = create_engine(
+        'sqlite://',
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05
+    )
+
+    previous_stats = pool_metrics_instance.get_stats()
+
+    connection = engine.connect()
+    with pytest.raises(TimeoutError):
+        engine.connect()
+    stats = pool_metrics_instance.get_stats()
+
+    connection.close()
+    engine.dispose()
+
+    assert stats['waits'] - previous_stats['waits'] == 1
+    assert stats['timeouts'] - previous_stats['timeouts'] == 1
+    assert stats['wait_ms'] - previous_stats['wait_ms'] >= 50
+
+
+def test_format_pool_metrics_should_return_samples_and_counts_since_previous_stats():
+    previous_stats = dict(connects=1, checkouts=10, overflows=0, invalidations=0, waits=1, timeouts=0, wait_ms=5)
+    stats = dict(
+        connects=2, checkouts=30, overflows=1, invalidations=0, waits=3, timeouts=1, wait_ms=25,
+        size=5, checked_in=1, checked_out=4, overflow=0
+    )
+
+    result = format_pool_metrics(stats, previous_stats)
+
+    assert result == (
+        'source=db_pool sample#db_pool.size=5 sample#db_pool.checked_in=1 sample#db_pool.checked_out=4 '
+        'sample#db_pool.overflow=0 count#db_pool.connects=1 count#db_pool.checkouts=20 count#db_pool.overflows=1 '
+        'count#db_pool.invalidations=0 count#db_pool.waits=2 count#db_pool.timeouts=1 measure#db_pool.wait_ms=10.0'
+    )
+
+
+if __name__ == '__main__':
+    pytest.main(['app/unittest/{}.py'.format(__file__)])
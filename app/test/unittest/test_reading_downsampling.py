@@ -0,0 +1,75 @@
+from datetime import datetime
+from datetime import timedelta
+
+import pytest
+
+from app.main.util.reading_downsampling import get_lttb_readings
+from app.main.util.reading_downsampling import get_reading_buckets
+
+
+def test_get_reading_buckets_should_return_aggregates_of_non_empty_buckets():
+    range_start = datetime(2019, 8, 5, 8, 0, 0)
+    readings = [
+        (range_start, 1.0),
+        (range_start + timedelta(minutes=10), 3.0),
+        (range_start + timedelta(minutes=59), 2.0),
+        (range_start + timedelta(hours=2, minutes=30), 5.0)
+    ]
+
+    buckets = get_reading_buckets(readings, range_start, range_start + timedelta(hours=3), 3)
+
+    assert buckets == [
+        {
+            'date': str(range_start),
+            'min': 1.0,
+            'max': 3.0,
+            'avg': 2.0,
+            'count': 3
+        },
+        {
+            'date': str(range_start + timedelta(hours=2)),
+            'min': 5.0,
+            'max': 5.0,
+            'avg': 5.0,
+            'count': 1
+        }
+    ]
+
+
+def test_get_lttb_readings_should_keep_first_last_and_peak_readings():
+    range_start = datetime(2019, 8, 5, 8, 0, 0)
+    values = [0.0, 0.1, 0.0, 9.0, 0.1, 0.0, 0.1, 0.0, -7.0, 0.0, 0.1, 0.0]
+    readings = [(range_start + timedelta(seconds=index), value) for index, value in enumerate(values)]
+
+    sampled_readings = get_lttb_readings(readings, 4)
+
+    assert len(sampled_readings) == 4
+    assert sampled_readings[0] == readings[0]
+    assert sampled_readings[-1] == readings[-1]
+    assert readings[3] in sampled_readings
+    assert readings[8] in sampled_readings
+
+
+@pytest.mark.parametrize("threshold", [5, 10])
+def test_get_lttb_readings_should_return_all_readings_when_threshold_not_lower_than_number_of_readings(threshold):
+    range_start = datetime(2019, 8, 5, 8, 0, 0)
+    readings = [(range_start + timedelta(seconds=index), float(index)) for index in range(5)]
+
+    assert get_lttb_readings(readings, threshold) == readings
+
+
+@pytest.mark.parametrize("threshold, expected_indexes", [
+    (2, [0, 9]),
+    (1, [9]),
+    (0, [])])
+def test_get_lttb_readings_should_return_at_most_threshold_readings_when_threshold_below_three(
+        threshold,
+        expected_indexes):
+    range_start = datetime(2019, 8, 5, 8, 0, 0)
+    readings = [(range_start + timedelta(minutes=index), float(index)) for index in range(10)]
+
+    assert get_lttb_readings(readings, threshold) == [readings[index] for index in expected_indexes]
+
+
+if __name__ == '__main__':
+    pytest.main(['app/unittest/{}.py'.format(__file__)])
@@ -1,20 +1,30 @@
+from datetime import datetime
 from unittest.mock import Mock
 from unittest.mock import patch
 
 import pytest
 
 from app.main.model import Sensor
+from app.main.model.sensor_reading_rollup import SensorReadingDayRollup
+from app.main.model.sensor_reading_rollup import SensorReadingHourRollup
+from app.main.model.sensor_reading_rollup import SensorReadingMinuteRollup
 from app.main.repository.admin_repository import AdminRepository
 from app.main.repository.base_repository import BaseRepository
 from app.main.repository.deleted_device_repository import DeletedDeviceRepository
+from app.main.repository.device_change_repository import DeviceChangeRepository
 from app.main.repository.device_group_repository import DeviceGroupRepository
 from app.main.repository.sensor_reading_repository import SensorReadingRepository
+from app.main.repository.sensor_reading_rollup_repository import SensorReadingRollupRepository
 from app.main.repository.sensor_repository import SensorRepository
 from app.main.repository.sensor_type_repository import SensorTypeRepository
 from app.main.repository.unconfigured_device_repository import UnconfiguredDeviceRepository
 from app.main.repository.user_group_repository import UserGroupRepository
 from app.main.repository.user_repository import UserRepository
+from app.main.service.permission_service import PermissionService
 from app.main.service.sensor_service import SensorService
+from app.main.service.type_registry_service import TypeRegistryService
+from app.main.service.type_registry_service import create_sensor_type_metadata
+from app.main.util.change_notifier import ChangeNotifier
 from app.main.util.constants import Constants
 
 
@@ -32,35 +42,35 @@ def test_get_sensor_info_should_return_sensor_info_when_valid_product_key_device
 
     test_user_id = 1
 
-    with patch.object(
-            DeviceGroupRepository,
-            'get_device_group_by_product_key') as get_device_group_by_product_key_mock:
-        get_device_group_by_product_key_mock.return_value = device_group
+    with patch.object(UserGroupRepository, 'get_user_group_by_id') as get_user_group_by_id_mock:
+        get_user_group_by_id_mock.return_value = user_group
 
         with patch.object(
-                SensorRepository,
-                'get_sensor_by_device_key_and_device_group_id'
-        ) as get_sensor_by_device_key_and_device_group_id_mock:
-            get_sensor_by_device_key_and_device_group_id_mock.return_value = sensor
+                DeviceGroupRepository,
+                'get_device_group_by_product_key') as get_device_group_by_product_key_mock:
+            get_device_group_by_product_key_mock.return_value = device_group
 
             with patch.object(
-                    UserGroupRepository,
-                    'get_user_group_by_user_id_and_sensor_device_key'
-            ) as get_user_group_by_user_id_and_sensor_device_key_mock:
-                get_user_group_by_user_id_and_sensor_device_key_mock.return_value = user_group
+                    SensorRepository,
+                    'get_sensor_by_device_key_and_device_group_id'
+            ) as get_sensor_by_device_key_and_device_group_id_mock:
+                get_sensor_by_device_key_and_device_group_id_mock.return_value = sensor
 
-                with patch.object(SensorTypeRepository, 'get_sensor_type_by_id') as get_sensor_type_by_id_mock:
-                    get_sensor_type_by_id_mock.return_value = sensor_type
+                with patch.object(PermissionService, 'is_user_in_user_group') as is_user_in_user_group_mock:
+                    is_user_in_user_group_mock.return_value = True
 
-                    with patch.object(SensorService, 'get_senor_reading_value') as get_senor_reading_value_mock:
-                        get_senor_reading_value_mock.return_value = 1
+                    with patch.object(TypeRegistryService, 'get_sensor_type') as get_sensor_type_mock:
+                        get_sensor_type_mock.return_value = create_sensor_type_metadata(sensor_type, [])
 
-                        result, result_values = sensor_service_instance.get_sensor_info(
-                            sensor.device_key,
-                            device_group.product_key,
-                            test_user_id,
-                            False
-                        )
+                        with patch.object(SensorService, 'get_senor_reading_value') as get_senor_reading_value_mock:
+                            get_senor_reading_value_mock.return_value = 1
+
+                            result, result_values = sensor_service_instance.get_sensor_info(
+                                sensor.device_key,
+                                device_group.product_key,
+                                test_user_id,
+                                False
+                            )
 
     assert result == Constants.RESPONSE_MESSAGE_OK
     assert result_values
@@ -105,8 +115,8 @@ def test_get_sensor_info_should_return_sensor_info_when_valid_user_is_admin(
             ) as get_user_group_by_id_mock:
                 get_user_group_by_id_mock.return_value = user_group
 
-                with patch.object(SensorTypeRepository, 'get_sensor_type_by_id') as get_sensor_type_by_id_mock:
-                    get_sensor_type_by_id_mock.return_value = sensor_type
+                with patch.object(TypeRegistryService, 'get_sensor_type') as get_sensor_type_mock:
+                    get_sensor_type_mock.return_value = create_sensor_type_metadata(sensor_type, [])
 
                     with patch.object(SensorService, 'get_senor_reading_value') as get_senor_reading_value_mock:
                         get_senor_reading_value_mock.return_value = 1
@@ -153,15 +163,11 @@ def test_get_sensor_info_should_return_sensor_info_when_sensor_is_not_in_any_use
         ) as get_sensor_by_device_key_and_device_group_id_mock:
             get_sensor_by_device_key_and_device_group_id_mock.return_value = sensor
 
-            with patch.object(
-                    UserGroupRepository,
-                    'get_user_group_by_user_id_and_sensor_device_key'
-            ) as get_user_group_by_user_id_and_sensor_device_key_mock:
-                get_user_group_by_user_id_and_sensor_device_key_mock.return_value = None
+            with patch.object(PermissionService, 'is_user_in_user_group') as is_user_in_user_group_mock:
+                is_user_in_user_group_mock.return_value = False
 
-                with patch.object(SensorTypeRepository,
-                                  'get_sensor_type_by_id') as get_sensor_type_by_id_mock:
-                    get_sensor_type_by_id_mock.return_value = sensor_type
+                with patch.object(TypeRegistryService, 'get_sensor_type') as get_sensor_type_mock:
+                    get_sensor_type_mock.return_value = create_sensor_type_metadata(sensor_type, [])
 
                     with patch.object(SensorService, 'get_senor_reading_value') as get_senor_reading_value_mock:
                         get_senor_reading_value_mock.return_value = 1
@@ -260,14 +266,11 @@ def test_get_sensor_info_should_not_return_sensor_info_when_user_is_not_in_the_s
         ) as get_sensor_by_device_key_and_device_group_id_mock:
             get_sensor_by_device_key_and_device_group_id_mock.return_value = sensor
 
-            with patch.object(
-                    UserGroupRepository,
-                    'get_user_group_by_user_id_and_sensor_device_key'
-            ) as get_user_group_by_user_id_and_sensor_device_key_mock:
-                get_user_group_by_user_id_and_sensor_device_key_mock.return_value = None
+            with patch.object(PermissionService, 'is_user_in_user_group') as is_user_in_user_group_mock:
+                is_user_in_user_group_mock.return_value = False
 
-                with patch.object(SensorTypeRepository, 'get_sensor_type_by_id') as get_sensor_type_by_id_mock:
-                    get_sensor_type_by_id_mock.return_value = sensor_type
+                with patch.object(TypeRegistryService, 'get_sensor_type') as get_sensor_type_mock:
+                    get_sensor_type_mock.return_value = create_sensor_type_metadata(sensor_type, [])
 
                     result, result_values = sensor_service_instance.get_sensor_info(
                         sensor.device_key,
@@ -304,14 +307,11 @@ def test_get_sensor_info_should_not_return_sensor_info_when_sensor_is_not_in_dev
         ) as get_sensor_by_device_key_and_device_group_id_mock:
             get_sensor_by_device_key_and_device_group_id_mock.return_value = None
 
-            with patch.object(
-                    UserGroupRepository,
-                    'get_user_group_by_user_id_and_sensor_device_key'
-            ) as get_user_group_by_user_id_and_sensor_device_key_mock:
-                get_user_group_by_user_id_and_sensor_device_key_mock.return_value = user_group
+            with patch.object(PermissionService, 'is_user_in_user_group') as is_user_in_user_group_mock:
+                is_user_in_user_group_mock.return_value = True
 
-                with patch.object(SensorTypeRepository, 'get_sensor_type_by_id') as get_sensor_type_by_id_mock:
-                    get_sensor_type_by_id_mock.return_value = sensor_type
+                with patch.object(TypeRegistryService, 'get_sensor_type') as get_sensor_type_mock:
+                    get_sensor_type_mock.return_value = create_sensor_type_metadata(sensor_type, [])
 
                     result, result_values = sensor_service_instance.get_sensor_info(
                         test_sensor_id,
@@ -347,14 +347,11 @@ def test_get_sensor_info_should_not_return_sensor_info_when_device_group_does_no
         ) as get_sensor_by_device_key_and_device_group_id_mock:
             get_sensor_by_device_key_and_device_group_id_mock.return_value = sensor
 
-            with patch.object(
-                    UserGroupRepository,
-                    'get_user_group_by_user_id_and_sensor_device_key'
-            ) as get_user_group_by_user_id_and_sensor_device_key_mock:
-                get_user_group_by_user_id_and_sensor_device_key_mock.return_value = user_group
+            with patch.object(PermissionService, 'is_user_in_user_group') as is_user_in_user_group_mock:
+                is_user_in_user_group_mock.return_value = True
 
-                with patch.object(SensorTypeRepository, 'get_sensor_type_by_id') as get_sensor_type_by_id_mock:
-                    get_sensor_type_by_id_mock.return_value = sensor_type
+                with patch.object(TypeRegistryService, 'get_sensor_type') as get_sensor_type_mock:
+                    get_sensor_type_mock.return_value = create_sensor_type_metadata(sensor_type, [])
 
                     result, result_values = sensor_service_instance.get_sensor_info(
                         sensor.device_key,
@@ -369,6 +366,8 @@ def test_get_sensor_info_should_not_return_sensor_info_when_device_group_does_no
 
 def test_get_sensor_readings_should_return_sensors_readings_when_called_with_right_parameters(
         create_sensor,
+        create_sensor_type,
+        get_sensor_type_default_values,
         create_sensor_reading,
         create_device_group,
         create_user_group):
@@ -377,6 +376,9 @@ def test_get_sensor_readings_should_return_sensors_readings_when_called_with_rig
     device_group = create_device_group()
     user_group = create_user_group()
     sensor = create_sensor()
+    sensor_type_values = get_sensor_type_default_values()
+    sensor_type_values['reading_type'] = 'Decimal'
+    sensor_type = create_sensor_type(sensor_type_values)
     first_reading = create_sensor_reading()
 
     second_reading = create_sensor_reading()
@@ -399,7 +401,8 @@ def test_get_sensor_readings_should_return_sensors_readings_when_called_with_rig
 
     expected_returned_dict = {
         'sensorName': sensor.name,
-        'values': readings_list_values
+        'values': readings_list_values,
+        'nextCursor': None
     }
 
     with patch.object(
@@ -413,20 +416,18 @@ def test_get_sensor_readings_should_return_sensors_readings_when_called_with_rig
         ) as get_sensor_by_device_key_and_device_group_id_mock:
             get_sensor_by_device_key_and_device_group_id_mock.return_value = sensor
 
-            with patch.object(
-                    UserGroupRepository,
-                    'get_user_group_by_user_id_and_sensor_device_key'
-            ) as get_user_group_by_user_id_and_sensor_device_key_mock:
-                get_user_group_by_user_id_and_sensor_device_key_mock.return_value = user_group
+            with patch.object(PermissionService, 'is_user_in_user_group') as is_user_in_user_group_mock:
+                is_user_in_user_group_mock.return_value = True
 
-                with patch.object(
-                        SensorReadingRepository,
-                        'get_sensor_readings_by_sensor_id'
-                ) as get_sensor_readings_by_sensor_id_mock:
-                    get_sensor_readings_by_sensor_id_mock.return_value = readings_list
+                with patch.object(TypeRegistryService, 'get_sensor_type') as get_sensor_type_mock:
+                    get_sensor_type_mock.return_value = create_sensor_type_metadata(sensor_type, [])
+
+                    with patch.object(
+                            SensorReadingRepository,
+                            'get_sensor_readings_page_by_sensor_id'
+                    ) as get_sensor_readings_page_by_sensor_id_mock:
+                        get_sensor_readings_page_by_sensor_id_mock.return_value = readings_list
 
-                    with patch.object(SensorService, 'get_senor_reading_value') as get_senor_reading_value_mock:
-                        get_senor_reading_value_mock.return_value = 0.5
                         result, result_values = sensor_service_instance.get_sensor_readings(
                             sensor.device_key,
                             device_group.product_key,
@@ -438,6 +439,8 @@ def test_get_sensor_readings_should_return_sensors_readings_when_called_with_rig
 
 def test_get_sensor_readings_should_return_empty_list_of_readings_when_sensor_does_not_have_readings(
         create_sensor,
+        create_sensor_type,
+        get_sensor_type_default_values,
         create_sensor_reading,
         get_sensor_reading_default_values,
         create_device_group,
@@ -447,10 +450,14 @@ def test_get_sensor_readings_should_return_empty_list_of_readings_when_sensor_do
     device_group = create_device_group()
     user_group = create_user_group()
     sensor = create_sensor()
+    sensor_type_values = get_sensor_type_default_values()
+    sensor_type_values['reading_type'] = 'Decimal'
+    sensor_type = create_sensor_type(sensor_type_values)
 
     expected_returned_dict = {
         'sensorName': sensor.name,
-        'values': []
+        'values': [],
+        'nextCursor': None
     }
 
     with patch.object(
@@ -464,22 +471,22 @@ def test_get_sensor_readings_should_return_empty_list_of_readings_when_sensor_do
         ) as get_sensor_by_device_key_and_device_group_id_mock:
             get_sensor_by_device_key_and_device_group_id_mock.return_value = sensor
 
-            with patch.object(
-                    UserGroupRepository,
-                    'get_user_group_by_user_id_and_sensor_device_key'
-            ) as get_user_group_by_user_id_and_sensor_device_key_mock:
-                get_user_group_by_user_id_and_sensor_device_key_mock.return_value = user_group
+            with patch.object(PermissionService, 'is_user_in_user_group') as is_user_in_user_group_mock:
+                is_user_in_user_group_mock.return_value = True
 
-                with patch.object(
-                        SensorReadingRepository,
-                        'get_sensor_readings_by_sensor_id'
-                ) as get_sensor_readings_by_sensor_id_mock:
-                    get_sensor_readings_by_sensor_id_mock.return_value = []
+                with patch.object(TypeRegistryService, 'get_sensor_type') as get_sensor_type_mock:
+                    get_sensor_type_mock.return_value = create_sensor_type_metadata(sensor_type, [])
 
-                    result, result_values = sensor_service_instance.get_sensor_readings(
-                        sensor.device_key,
-                        device_group.product_key,
-                        test_user_id)
+                    with patch.object(
+                            SensorReadingRepository,
+                            'get_sensor_readings_page_by_sensor_id'
+                    ) as get_sensor_readings_page_by_sensor_id_mock:
+                        get_sensor_readings_page_by_sensor_id_mock.return_value = []
+
+                        result, result_values = sensor_service_instance.get_sensor_readings(
+                            sensor.device_key,
+                            device_group.product_key,
+                            test_user_id)
 
     assert result == Constants.RESPONSE_MESSAGE_OK
     assert result_values == expected_returned_dict
@@ -487,6 +494,8 @@ def test_get_sensor_readings_should_return_empty_list_of_readings_when_sensor_do
 
 def test_get_sensor_readings_should_return_sensors_readings_when_sensor_is_not_assigned_to_user_group(
         create_sensor,
+        create_sensor_type,
+        get_sensor_type_default_values,
         create_sensor_reading,
         get_sensor_reading_default_values,
         create_device_group):
@@ -494,6 +503,9 @@ def test_get_sensor_readings_should_return_sensors_readings_when_sensor_is_not_a
 
     device_group = create_device_group()
     sensor = create_sensor()
+    sensor_type_values = get_sensor_type_default_values()
+    sensor_type_values['reading_type'] = 'Decimal'
+    sensor_type = create_sensor_type(sensor_type_values)
     sensor.user_group_id = None
     first_reading = create_sensor_reading()
     second_reading_values = get_sensor_reading_default_values()
@@ -506,11 +518,11 @@ def test_get_sensor_readings_should_return_sensors_readings_when_sensor_is_not_a
     readings_list_values = [
 
         {
-            'value': 1,
+            'value': first_reading.value,
             'date': str(first_reading.date)
         },
         {
-            'value': 1,
+            'value': 0.0,
             'date': str(second_reading.date)
         }
 
@@ -518,7 +530,8 @@ def test_get_sensor_readings_should_return_sensors_readings_when_sensor_is_not_a
 
     expected_returned_dict = {
         'sensorName': sensor.name,
-        'values': readings_list_values
+        'values': readings_list_values,
+        'nextCursor': None
     }
 
     with patch.object(
@@ -532,20 +545,17 @@ def test_get_sensor_readings_should_return_sensors_readings_when_sensor_is_not_a
         ) as get_sensor_by_device_key_and_device_group_id_mock:
             get_sensor_by_device_key_and_device_group_id_mock.return_value = sensor
 
-            with patch.object(
-                    UserGroupRepository,
-                    'get_user_group_by_user_id_and_sensor_device_key'
-            ) as get_user_group_by_user_id_and_sensor_device_key_mock:
-                get_user_group_by_user_id_and_sensor_device_key_mock.return_value = None
+            with patch.object(PermissionService, 'is_user_in_user_group') as is_user_in_user_group_mock:
+                is_user_in_user_group_mock.return_value = False
 
-                with patch.object(
-                        SensorReadingRepository,
-                        'get_sensor_readings_by_sensor_id'
-                ) as get_sensor_readings_by_sensor_id_mock:
-                    get_sensor_readings_by_sensor_id_mock.return_value = readings_list
+                with patch.object(TypeRegistryService, 'get_sensor_type') as get_sensor_type_mock:
+                    get_sensor_type_mock.return_value = create_sensor_type_metadata(sensor_type, [])
 
-                    with patch.object(SensorService, 'get_senor_reading_value') as get_senor_reading_value_mock:
-                        get_senor_reading_value_mock.return_value = 1
+                    with patch.object(
+                            SensorReadingRepository,
+                            'get_sensor_readings_page_by_sensor_id'
+                    ) as get_sensor_readings_page_by_sensor_id_mock:
+                        get_sensor_readings_page_by_sensor_id_mock.return_value = readings_list
 
                         result, result_values = sensor_service_instance.get_sensor_readings(
                             sensor.device_key,
@@ -556,6 +566,323 @@ def test_get_sensor_readings_should_return_sensors_readings_when_sensor_is_not_a
     assert result_values == expected_returned_dict
 
 
+def test_get_sensor_readings_should_return_next_cursor_when_more_readings_than_limit(
+        create_sensor,
+        create_sensor_type,
+        get_sensor_type_default_values,
+        create_sensor_reading,
+        get_sensor_reading_default_values,
+        create_device_group,
+        create_user_group):
+    sensor_service_instance = SensorService.get_instance()
+
+    device_group = create_device_group()
+    user_group = create_user_group()
+    sensor = create_sensor()
+    sensor_type_values = get_sensor_type_default_values()
+    sensor_type_values['reading_type'] = 'Decimal'
+    sensor_type = create_sensor_type(sensor_type_values)
+
+    first_reading = create_sensor_reading()
+    second_reading_values = get_sensor_reading_default_values()
+    second_reading_values['id'] += 1
+    second_reading = create_sensor_reading(second_reading_values)
+
+    with patch.object(
+            DeviceGroupRepository,
+            'get_device_group_by_product_key'
+    ) as get_device_group_by_product_key_mock:
+        get_device_group_by_product_key_mock.return_value = device_group
+        with patch.object(
+                SensorRepository,
+                'get_sensor_by_device_key_and_device_group_id'
+        ) as get_sensor_by_device_key_and_device_group_id_mock:
+            get_sensor_by_device_key_and_device_group_id_mock.return_value = sensor
+
+            with patch.object(PermissionService, 'is_user_in_user_group') as is_user_in_user_group_mock:
+                is_user_in_user_group_mock.return_value = True
+
+                with patch.object(TypeRegistryService, 'get_sensor_type') as get_sensor_type_mock:
+                    get_sensor_type_mock.return_value = create_sensor_type_metadata(sensor_type, [])
+
+                    with patch.object(
+                            SensorReadingRepository,
+                            'get_sensor_readings_page_by_sensor_id'
+                    ) as get_sensor_readings_page_by_sensor_id_mock:
+                        get_sensor_readings_page_by_sensor_id_mock.return_value = [first_reading, second_reading]
+
+                        result, result_values = sensor_service_instance.get_sensor_readings(
+                            sensor.device_key,
+                            device_group.product_key,
+                            "1",
+                            date_from='2015-06-01',
+                            cursor='2015-06-06T00:00:00,7',
+                            limit='1')
+
+    assert result == Constants.RESPONSE_MESSAGE_OK
+    assert result_values == {
+        'sensorName': sensor.name,
+        'values': [
+            {
+                'value': first_reading.value,
+                'date': str(first_reading.date)
+            }
+        ],
+        'nextCursor': '{},{}'.format(first_reading.date.isoformat(), first_reading.id)
+    }
+    get_sensor_readings_page_by_sensor_id_mock.assert_called_once_with(
+        sensor.id,
+        datetime(2015, 6, 1),
+        None,
+        (datetime(2015, 6, 6), 7),
+        2
+    )
+
+
+@pytest.mark.parametrize("query_values", [
+    {'mode': 'unknown'},
+    {'limit': '0'},
+    {'limit': 'abc'},
+    {'limit': str(Constants.SENSOR_READINGS_MAX_PAGE_SIZE + 1)},
+    {'date_from': 'yesterday'},
+    {'date_from': '2019-08-05', 'date_to': '2019-08-04'},
+    {'cursor': '2019-08-05T08:10:10'},
+    {'cursor': '2019-08-05T08:10:10,id'}
+])
+def test_get_sensor_readings_should_return_bad_request_message_when_wrong_query_values(query_values):
+    sensor_service_instance = SensorService.get_instance()
+
+    with patch.object(
+            DeviceGroupRepository,
+            'get_device_group_by_product_key'
+    ) as get_device_group_by_product_key_mock:
+        result, result_values = sensor_service_instance.get_sensor_readings(
+            'device key',
+            'product key',
+            '1',
+            **query_values)
+
+    assert result == Constants.RESPONSE_MESSAGE_BAD_REQUEST
+    assert result_values is None
+    get_device_group_by_product_key_mock.assert_not_called()
+
+
+@pytest.mark.parametrize("resolution,expected_rollup_model,expected_date", [
+    ('15m', SensorReadingMinuteRollup, datetime(2019, 8, 5)),
+    ('2h', SensorReadingHourRollup, datetime(2019, 8, 5)),
+    ('7d', SensorReadingDayRollup, datetime(2019, 8, 1))
+])
+def test_get_sensor_reading_aggregates_should_merge_coarsest_matching_rollups(
+        resolution,
+        expected_rollup_model,
+        expected_date,
+        create_sensor,
+        create_sensor_type,
+        get_sensor_type_default_values,
+        create_device_group,
+        create_user_group):
+    sensor_service_instance = SensorService.get_instance()
+
+    device_group = create_device_group()
+    user_group = create_user_group()
+    sensor = create_sensor()
+    sensor_type_values = get_sensor_type_default_values()
+    sensor_type_values['reading_type'] = 'Decimal'
+    sensor_type = create_sensor_type(sensor_type_values)
+
+    rollups = [
+        expected_rollup_model(
+            sensor_id=sensor.id,
+            date=datetime(2019, 8, 5),
+            min_value=1.0,
+            max_value=3.0,
+            sum_value=4.0,
+            count=2),
+        expected_rollup_model(
+            sensor_id=sensor.id,
+            date=datetime(2019, 8, 5),
+            min_value=0.5,
+            max_value=2.0,
+            sum_value=2.0,
+            count=2)
+    ]
+
+    with patch.object(
+            DeviceGroupRepository,
+            'get_device_group_by_product_key'
+    ) as get_device_group_by_product_key_mock:
+        get_device_group_by_product_key_mock.return_value = device_group
+        with patch.object(
+                SensorRepository,
+                'get_sensor_by_device_key_and_device_group_id'
+        ) as get_sensor_by_device_key_and_device_group_id_mock:
+            get_sensor_by_device_key_and_device_group_id_mock.return_value = sensor
+
+            with patch.object(PermissionService, 'is_user_in_user_group') as is_user_in_user_group_mock:
+                is_user_in_user_group_mock.return_value = True
+
+                with patch.object(TypeRegistryService, 'get_sensor_type') as get_sensor_type_mock:
+                    get_sensor_type_mock.return_value = create_sensor_type_metadata(sensor_type, [])
+
+                    with patch.object(
+                            SensorReadingRollupRepository,
+                            'get_sensor_reading_rollups_by_sensor_id'
+                    ) as get_sensor_reading_rollups_by_sensor_id_mock:
+                        get_sensor_reading_rollups_by_sensor_id_mock.return_value = rollups
+
+                        result, result_values = sensor_service_instance.get_sensor_reading_aggregates(
+                            sensor.device_key,
+                            device_group.product_key,
+                            "1",
+                            '2019-08-01T00:00:00',
+                            '2019-08-15T00:00:00',
+                            resolution)
+
+    assert result == Constants.RESPONSE_MESSAGE_OK
+    assert result_values == {
+        'sensorName': sensor.name,
+        'resolution': resolution,
+        'values': [
+            {
+                'date': str(expected_date),
+                'min': 0.5,
+                'max': 3.0,
+                'avg': 1.5,
+                'count': 4
+            }
+        ]
+    }
+    assert get_sensor_reading_rollups_by_sensor_id_mock.call_args[0][0] is expected_rollup_model
+
+
+def test_get_sensor_reading_aggregates_should_read_rollups_of_buckets_starting_from_date_from(
+        create_sensor,
+        create_sensor_type,
+        get_sensor_type_default_values,
+        create_device_group):
+    sensor_service_instance = SensorService.get_instance()
+
+    device_group = create_device_group()
+    sensor = create_sensor()
+    sensor_type_values = get_sensor_type_default_values()
+    sensor_type_values['reading_type'] = 'Decimal'
+    sensor_type = create_sensor_type(sensor_type_values)
+
+    with patch.object(
+            DeviceGroupRepository,
+            'get_device_group_by_product_key'
+    ) as get_device_group_by_product_key_mock:
+        get_device_group_by_product_key_mock.return_value = device_group
+        with patch.object(
+                SensorRepository,
+                'get_sensor_by_device_key_and_device_group_id'
+        ) as get_sensor_by_device_key_and_device_group_id_mock:
+            get_sensor_by_device_key_and_device_group_id_mock.return_value = sensor
+
+            with patch.object(PermissionService, 'is_user_in_user_group') as is_user_in_user_group_mock:
+                is_user_in_user_group_mock.return_value = True
+
+                with patch.object(TypeRegistryService, 'get_sensor_type') as get_sensor_type_mock:
+                    get_sensor_type_mock.return_value = create_sensor_type_metadata(sensor_type, [])
+
+                    with patch.object(
+                            SensorReadingRollupRepository,
+                            'get_sensor_reading_rollups_by_sensor_id'
+                    ) as get_sensor_reading_rollups_by_sensor_id_mock:
+                        get_sensor_reading_rollups_by_sensor_id_mock.return_value = []
+
+                        result, result_values = sensor_service_instance.get_sensor_reading_aggregates(
+                            sensor.device_key,
+                            device_group.product_key,
+                            "1",
+                            '2019-08-05T00:30:00',
+                            '2019-08-05T06:00:00',
+                            '1h')
+
+    assert result == Constants.RESPONSE_MESSAGE_OK
+    assert result_values['values'] == []
+    assert get_sensor_reading_rollups_by_sensor_id_mock.call_args[0][2:] == (
+        datetime(2019, 8, 5, 1),
+        datetime(2019, 8, 5, 6)
+    )
+
+
+def test_get_sensor_reading_aggregates_should_return_sensor_type_not_found_message_when_sensor_type_not_found(
+        create_sensor,
+        create_device_group):
+    sensor_service_instance = SensorService.get_instance()
+
+    device_group = create_device_group()
+    sensor = create_sensor()
+
+    with patch.object(
+            DeviceGroupRepository,
+            'get_device_group_by_product_key'
+    ) as get_device_group_by_product_key_mock:
+        get_device_group_by_product_key_mock.return_value = device_group
+        with patch.object(
+                SensorRepository,
+                'get_sensor_by_device_key_and_device_group_id'
+        ) as get_sensor_by_device_key_and_device_group_id_mock:
+            get_sensor_by_device_key_and_device_group_id_mock.return_value = sensor
+
+            with patch.object(PermissionService, 'is_user_in_user_group') as is_user_in_user_group_mock:
+                is_user_in_user_group_mock.return_value = True
+
+                with patch.object(TypeRegistryService, 'get_sensor_type') as get_sensor_type_mock:
+                    get_sensor_type_mock.return_value = None
+
+                    with patch.object(
+                            SensorReadingRollupRepository,
+                            'get_sensor_reading_rollups_by_sensor_id'
+                    ) as get_sensor_reading_rollups_by_sensor_id_mock:
+                        result, result_values = sensor_service_instance.get_sensor_reading_aggregates(
+                            sensor.device_key,
+                            device_group.product_key,
+                            "1",
+                            '2019-08-05T00:00:00',
+                            '2019-08-06T00:00:00',
+                            '1h')
+
+    assert result == Constants.RESPONSE_MESSAGE_SENSOR_TYPE_NOT_FOUND
+    assert result_values is None
+    get_sensor_reading_rollups_by_sensor_id_mock.assert_not_called()
+
+
+@pytest.mark.parametrize("date_from,date_to,resolution", [
+    (None, '2019-08-06', '1h'),
+    ('2019-08-05', None, '1h'),
+    ('2019-08-06', '2019-08-05', '1h'),
+    ('2019-08-05', '2019-08-06', None),
+    ('2019-08-05', '2019-08-06', '1s'),
+    ('2019-08-05', '2019-08-06', '0h'),
+    ('2019-01-01', '2019-08-06', '1m'),
+    ('2019-08-05', '2019-08-06', '2d'),
+    ('2019-08-05', '2019-08-06', '1000000000d')
+])
+def test_get_sensor_reading_aggregates_should_return_bad_request_message_when_wrong_query_values(
+        date_from,
+        date_to,
+        resolution):
+    sensor_service_instance = SensorService.get_instance()
+
+    with patch.object(
+            DeviceGroupRepository,
+            'get_device_group_by_product_key'
+    ) as get_device_group_by_product_key_mock:
+        result, result_values = sensor_service_instance.get_sensor_reading_aggregates(
+            'device key',
+            'product key',
+            '1',
+            date_from,
+            date_to,
+            resolution)
+
+    assert result == Constants.RESPONSE_MESSAGE_BAD_REQUEST
+    assert result_values is None
+    get_device_group_by_product_key_mock.assert_not_called()
+
+
 def test_get_sensor_readings_should_return_error_message_when_device_group_does_not_exist():
     sensor_service_instance = SensorService.get_instance()
 
@@ -626,11 +953,8 @@ def test_get_sensor_readings_should_return_error_message_when_user_not_in_the_sa
         ) as get_sensor_by_device_key_and_device_group_id_mock:
             get_sensor_by_device_key_and_device_group_id_mock.return_value = sensor
 
-            with patch.object(
-                    UserGroupRepository,
-                    'get_user_group_by_user_id_and_sensor_device_key'
-            ) as get_user_group_by_user_id_and_sensor_device_key_mock:
-                get_user_group_by_user_id_and_sensor_device_key_mock.return_value = None
+            with patch.object(PermissionService, 'is_user_in_user_group') as is_user_in_user_group_mock:
+                is_user_in_user_group_mock.return_value = False
 
                 result, result_values = sensor_service_instance.get_sensor_readings(
                     sensor.device_key,
@@ -641,13 +965,16 @@ def test_get_sensor_readings_should_return_error_message_when_user_not_in_the_sa
     assert result_values is None
 
 
-def test_set_sensor_reading_should_set_sensor_reading_when_called_with_right_parameters(
+def test_set_sensors_readings_should_set_sensors_readings_when_called_with_right_parameters(
         create_sensor_type,
-        create_sensor):
+        create_sensor,
+        get_sensor_type_default_values):
     sensor_service_instance = SensorService.get_instance()
-    sensor_type = create_sensor_type()
+    sensor_type_values = get_sensor_type_default_values()
+    sensor_type_values['reading_type'] = 'Decimal'
+    sensor_type = create_sensor_type(sensor_type_values)
     sensor = create_sensor()
-    sensor.is_active = True
+    sensor.is_active = False
 
     test_device_group_id = sensor.device_group_id
 
@@ -659,87 +986,309 @@ def test_set_sensor_reading_should_set_sensor_reading_when_called_with_right_par
 
     with patch.object(
             SensorRepository,
-            'get_sensor_by_device_key_and_device_group_id'
-    ) as get_sensor_by_device_key_and_device_group_id_mock:
-        get_sensor_by_device_key_and_device_group_id_mock.return_value = sensor
+            'get_sensors_by_device_group_id_and_device_keys'
+    ) as get_sensors_by_device_group_id_and_device_keys_mock:
+        get_sensors_by_device_group_id_and_device_keys_mock.return_value = [sensor]
         with patch.object(
-                SensorTypeRepository,
-                'get_sensor_type_by_id'
-        ) as get_sensor_type_by_id_mock:
-            get_sensor_type_by_id_mock.return_value = sensor_type
+                TypeRegistryService,
+                'get_sensor_type'
+        ) as get_sensor_type_mock:
+            get_sensor_type_mock.return_value = create_sensor_type_metadata(sensor_type, [])
             with patch.object(
-                    SensorService,
-                    'reading_in_range'
-            ) as reading_in_range_mock:
+                    SensorReadingRepository,
+                    'save_sensor_readings_but_do_not_commit'
+            ) as save_sensor_readings_but_do_not_commit_mock:
                 with patch.object(
-                        SensorReadingRepository,
-                        'save'
-                ) as save_mock:
-                    save_mock.return_value = True
+                        SensorReadingRollupRepository,
+                        'update_sensor_reading_rollups_but_do_not_commit'
+                ) as update_sensor_reading_rollups_but_do_not_commit_mock:
                     with patch.object(
-                            SensorRepository,
+                            SensorReadingRepository,
                             'update_database'
                     ) as update_database_mock:
                         update_database_mock.return_value = True
 
-                        get_sensor_by_device_key_and_device_group_id_mock.return_value = sensor
-                        reading_in_range_mock.return_value = True
+                        is_saved, wrong_sensors_readings = sensor_service_instance.set_sensors_readings(
+                            test_device_group_id,
+                            [values]
+                        )
 
-                        sensor_service_instance.set_sensor_reading(test_device_group_id, values)
-                        assert sensor.is_active == values['isActive']
-                        save_mock.assert_called()
+    assert is_saved
+    assert wrong_sensors_readings == []
+    assert sensor.is_active == values['isActive']
+    save_sensor_readings_but_do_not_commit_mock.assert_called_once()
+
+    saved_sensor_readings = save_sensor_readings_but_do_not_commit_mock.call_args[0][0]
+    assert len(saved_sensor_readings) == 1
+    assert saved_sensor_readings[0]['value'] == values['readingValue']
+    assert saved_sensor_readings[0]['sensor_id'] == sensor.id
+    assert sensor.last_reading_value == values['readingValue']
+    assert sensor.last_reading_date == saved_sensor_readings[0]['date']
+    update_sensor_reading_rollups_but_do_not_commit_mock.assert_called_once_with(saved_sensor_readings)
+    update_database_mock.assert_called_once()
 
 
-def test_set_sensor_reading_should_not_set_sensor_reading_when_state_not_in_range(
+@pytest.mark.parametrize("is_inserted, are_rollups_updated", [
+    (False, True),
+    (True, False)])
+def test_set_sensors_readings_should_return_false_when_readings_or_rollups_not_saved(
+        is_inserted,
+        are_rollups_updated,
         create_sensor_type,
-        create_sensor, ):
+        create_sensor,
+        get_sensor_type_default_values):
     sensor_service_instance = SensorService.get_instance()
+    sensor_type_values = get_sensor_type_default_values()
+    sensor_type_values['reading_type'] = 'Decimal'
+    sensor_type = create_sensor_type(sensor_type_values)
+    sensor = create_sensor()
 
+    values = {
+        'deviceKey': sensor.device_key,
+        'readingValue': 0.5,
+        'isActive': True
+    }
+    wrong_values = {
+        'deviceKey': sensor.device_key,
+        'isActive': True
+    }
+
+    with patch.object(
+            SensorRepository,
+            'get_sensors_by_device_group_id_and_device_keys'
+    ) as get_sensors_by_device_group_id_and_device_keys_mock:
+        get_sensors_by_device_group_id_and_device_keys_mock.return_value = [sensor]
+        with patch.object(
+                TypeRegistryService,
+                'get_sensor_type'
+        ) as get_sensor_type_mock:
+            get_sensor_type_mock.return_value = create_sensor_type_metadata(sensor_type, [])
+            with patch.object(
+                    SensorReadingRepository,
+                    'save_sensor_readings_but_do_not_commit'
+            ) as save_sensor_readings_but_do_not_commit_mock:
+                save_sensor_readings_but_do_not_commit_mock.return_value = is_inserted
+
+                with patch.object(
+                        SensorReadingRollupRepository,
+                        'update_sensor_reading_rollups_but_do_not_commit'
+                ) as update_sensor_reading_rollups_but_do_not_commit_mock:
+                    update_sensor_reading_rollups_but_do_not_commit_mock.return_value = are_rollups_updated
+
+                    with patch.object(
+                            SensorReadingRepository,
+                            'update_database'
+                    ) as update_database_mock:
+                        is_saved, wrong_sensors_readings = sensor_service_instance.set_sensors_readings(
+                            sensor.device_group_id,
+                            [values, wrong_values]
+                        )
+
+    assert not is_saved
+    assert wrong_sensors_readings == [wrong_values]
+    save_sensor_readings_but_do_not_commit_mock.assert_called_once()
+    assert update_sensor_reading_rollups_but_do_not_commit_mock.called is is_inserted
+    update_database_mock.assert_not_called()
+
+
+def test_set_sensors_readings_should_validate_enum_readings_against_preloaded_enumerators(
+        create_sensor_type,
+        create_sensor,
+        create_sensor_reading_enumerator,
+        get_sensor_reading_enumerator_default_values):
+    sensor_service_instance = SensorService.get_instance()
     sensor_type = create_sensor_type()
     sensor = create_sensor()
-    sensor.is_active = True
 
-    test_device_group_id = sensor.device_group_id
+    reading_enumerator_values = get_sensor_reading_enumerator_default_values()
+    reading_enumerator_values['number'] = 2
+    reading_enumerator = create_sensor_reading_enumerator(reading_enumerator_values)
+
+    right_values = {
+        'deviceKey': sensor.device_key,
+        'readingValue': 2,
+        'isActive': True
+    }
+    wrong_values = {
+        'deviceKey': sensor.device_key,
+        'readingValue': 3,
+        'isActive': True
+    }
+
+    with patch.object(
+            SensorRepository,
+            'get_sensors_by_device_group_id_and_device_keys'
+    ) as get_sensors_by_device_group_id_and_device_keys_mock:
+        get_sensors_by_device_group_id_and_device_keys_mock.return_value = [sensor]
+        with patch.object(
+                TypeRegistryService,
+                'get_sensor_type'
+        ) as get_sensor_type_mock:
+            get_sensor_type_mock.return_value = create_sensor_type_metadata(sensor_type, [reading_enumerator])
+            with patch.object(
+                    SensorReadingRepository,
+                    'save_sensor_readings_but_do_not_commit'
+            ) as save_sensor_readings_but_do_not_commit_mock:
+                with patch.object(
+                        SensorReadingRollupRepository,
+                        'update_sensor_reading_rollups_but_do_not_commit'
+                ):
+                    with patch.object(
+                            SensorReadingRepository,
+                            'update_database'
+                    ) as update_database_mock:
+                        update_database_mock.return_value = True
+
+                        is_saved, wrong_sensors_readings = sensor_service_instance.set_sensors_readings(
+                            sensor.device_group_id,
+                            [right_values, wrong_values]
+                        )
+
+    assert is_saved
+    assert wrong_sensors_readings == [wrong_values]
+    get_sensor_type_mock.assert_called_once_with(sensor.device_group_id, sensor_type.id)
+
+    saved_sensor_readings = save_sensor_readings_but_do_not_commit_mock.call_args[0][0]
+    assert [sensor_reading['value'] for sensor_reading in saved_sensor_readings] == [2]
+
+
+def test_set_sensors_readings_should_not_set_sensor_reading_when_reading_not_in_range(
+        create_sensor_type,
+        create_sensor,
+        get_sensor_type_default_values):
+    sensor_service_instance = SensorService.get_instance()
+
+    sensor_type_values = get_sensor_type_default_values()
+    sensor_type_values['reading_type'] = 'Decimal'
+    sensor_type = create_sensor_type(sensor_type_values)
+    sensor = create_sensor()
+    sensor.is_active = False
 
     values = {
         'deviceKey': sensor.device_key,
-        'readingValue': 0.5,
+        'readingValue': 2.5,
         'isActive': True
     }
 
     with patch.object(
             SensorRepository,
-            'get_sensor_by_device_key_and_device_group_id'
-    ) as get_sensor_by_device_key_and_device_group_id_mock:
-        get_sensor_by_device_key_and_device_group_id_mock.return_value = sensor
+            'get_sensors_by_device_group_id_and_device_keys'
+    ) as get_sensors_by_device_group_id_and_device_keys_mock:
+        get_sensors_by_device_group_id_and_device_keys_mock.return_value = [sensor]
         with patch.object(
-                SensorTypeRepository,
-                'get_sensor_type_by_id'
-        ) as get_sensor_type_by_id_mock:
-            get_sensor_type_by_id_mock.return_value = sensor_type
+                TypeRegistryService,
+                'get_sensor_type'
+        ) as get_sensor_type_mock:
+            get_sensor_type_mock.return_value = create_sensor_type_metadata(sensor_type, [])
             with patch.object(
-                    SensorService,
-                    'reading_in_range'
-            ) as reading_in_range_mock:
-                get_sensor_by_device_key_and_device_group_id_mock.return_value = sensor
-                reading_in_range_mock.return_value = False
+                    SensorReadingRepository,
+                    'save_sensor_readings_but_do_not_commit'
+            ) as save_sensor_readings_but_do_not_commit_mock:
+                with patch.object(
+                        SensorReadingRollupRepository,
+                        'update_sensor_reading_rollups_but_do_not_commit'
+                ):
+                    with patch.object(
+                            SensorReadingRepository,
+                            'update_database'
+                    ) as update_database_mock:
+                        update_database_mock.return_value = True
+
+                        is_saved, wrong_sensors_readings = sensor_service_instance.set_sensors_readings(
+                            sensor.device_group_id,
+                            [values]
+                        )
 
-                result = sensor_service_instance.set_sensor_reading(test_device_group_id, values)
-                assert not result
+    assert is_saved
+    assert wrong_sensors_readings == [values]
+    assert sensor.is_active is False
+    save_sensor_readings_but_do_not_commit_mock.assert_not_called()
 
 
-def test_set_sensor_reading_should_not_set_sensor_reading_when_wrong_dict():
+def test_set_sensors_readings_should_return_wrong_readings_when_sensor_not_found_or_wrong_dict():
     sensor_service_instance = SensorService.get_instance()
 
     test_device_group_id = "test id"
 
-    values = {
+    wrong_dict_values = {
         'deviceKey': test_device_group_id,
         'Test': "test",
         'isActive': False
     }
+    unknown_sensor_values = {
+        'deviceKey': 'unknown device key',
+        'readingValue': 1,
+        'isActive': True
+    }
+
+    with patch.object(
+            SensorRepository,
+            'get_sensors_by_device_group_id_and_device_keys'
+    ) as get_sensors_by_device_group_id_and_device_keys_mock:
+        get_sensors_by_device_group_id_and_device_keys_mock.return_value = []
+        with patch.object(
+                SensorReadingRepository,
+                'update_database'
+        ) as update_database_mock:
+            update_database_mock.return_value = True
+
+            is_saved, wrong_sensors_readings = sensor_service_instance.set_sensors_readings(
+                test_device_group_id,
+                [wrong_dict_values, unknown_sensor_values]
+            )
 
-    assert not sensor_service_instance.set_sensor_reading(test_device_group_id, values)
+    assert is_saved
+    assert wrong_sensors_readings == [wrong_dict_values, unknown_sensor_values]
+
+
+def test_set_sensors_readings_should_return_negative_status_when_database_update_failed(
+        create_sensor_type,
+        create_sensor,
+        get_sensor_type_default_values):
+    sensor_service_instance = SensorService.get_instance()
+
+    sensor_type_values = get_sensor_type_default_values()
+    sensor_type_values['reading_type'] = 'Boolean'
+    sensor_type = create_sensor_type(sensor_type_values)
+    sensor = create_sensor()
+
+    values = {
+        'deviceKey': sensor.device_key,
+        'readingValue': True,
+        'isActive': True
+    }
+
+    with patch.object(
+            SensorRepository,
+            'get_sensors_by_device_group_id_and_device_keys'
+    ) as get_sensors_by_device_group_id_and_device_keys_mock:
+        get_sensors_by_device_group_id_and_device_keys_mock.return_value = [sensor]
+        with patch.object(
+                TypeRegistryService,
+                'get_sensor_type'
+        ) as get_sensor_type_mock:
+            get_sensor_type_mock.return_value = create_sensor_type_metadata(sensor_type, [])
+            with patch.object(
+                    SensorReadingRepository,
+                    'save_sensor_readings_but_do_not_commit'
+            ):
+                with patch.object(
+                        SensorReadingRollupRepository,
+                        'update_sensor_reading_rollups_but_do_not_commit'
+                ):
+                    with patch.object(
+                            SensorReadingRepository,
+                            'update_database'
+                    ) as update_database_mock:
+                        update_database_mock.return_value = False
+
+                        is_saved, wrong_sensors_readings = sensor_service_instance.set_sensors_readings(
+                            sensor.device_group_id,
+                            [values]
+                        )
+
+    assert not is_saved
+    assert wrong_sensors_readings == []
 
 
 @pytest.mark.parametrize("range_min,range_max,value", [
@@ -940,11 +1489,8 @@ def test_get_list_of_unassigned_sensors_should_return_list_of_unassigned_sensors
             'get_device_group_by_product_key') as get_device_group_by_product_key_mock:
         get_device_group_by_product_key_mock.return_value = device_group
 
-        with patch.object(
-                DeviceGroupRepository,
-                'get_device_group_by_user_id_and_product_key'
-        ) as get_device_group_by_user_id_and_product_key_mock:
-            get_device_group_by_user_id_and_product_key_mock.return_value = device_group
+        with patch.object(PermissionService, 'is_master_user_of_device_group') as is_master_user_of_device_group_mock:
+            is_master_user_of_device_group_mock.return_value = True
 
             with patch.object(
                     SensorRepository,
@@ -995,11 +1541,8 @@ def test_get_list_of_unassigned_sensors_should_return_list_of_unassigned_sensors
             'get_device_group_by_product_key') as get_device_group_by_product_key_mock:
         get_device_group_by_product_key_mock.return_value = device_group
 
-        with patch.object(
-                DeviceGroupRepository,
-                'get_device_group_by_user_id_and_product_key'
-        ) as get_device_group_by_user_id_and_product_key_mock:
-            get_device_group_by_user_id_and_product_key_mock.return_value = device_group
+        with patch.object(PermissionService, 'is_master_user_of_device_group') as is_master_user_of_device_group_mock:
+            is_master_user_of_device_group_mock.return_value = True
 
             with patch.object(
                     SensorRepository,
@@ -1032,11 +1575,8 @@ def test_get_list_of_unassigned_sensors_should_return_empty_list_when_there_are_
             'get_device_group_by_product_key') as get_device_group_by_product_key_mock:
         get_device_group_by_product_key_mock.return_value = device_group
 
-        with patch.object(
-                DeviceGroupRepository,
-                'get_device_group_by_user_id_and_product_key'
-        ) as get_device_group_by_user_id_and_product_key_mock:
-            get_device_group_by_user_id_and_product_key_mock.return_value = device_group
+        with patch.object(PermissionService, 'is_master_user_of_device_group') as is_master_user_of_device_group_mock:
+            is_master_user_of_device_group_mock.return_value = True
 
             with patch.object(
                     SensorRepository,
@@ -1065,11 +1605,8 @@ def test_get_list_of_unassigned_sensors_should_error_message_when_admin_id_is_di
             'get_device_group_by_product_key') as get_device_group_by_product_key_mock:
         get_device_group_by_product_key_mock.return_value = device_group
 
-        with patch.object(
-                DeviceGroupRepository,
-                'get_device_group_by_user_id_and_product_key'
-        ) as get_device_group_by_user_id_and_product_key_mock:
-            get_device_group_by_user_id_and_product_key_mock.return_value = device_group
+        with patch.object(PermissionService, 'is_master_user_of_device_group') as is_master_user_of_device_group_mock:
+            is_master_user_of_device_group_mock.return_value = True
 
             with patch.object(
                     SensorRepository,
@@ -1098,11 +1635,8 @@ def test_get_list_of_unassigned_sensors_should_error_message_when_user_not_in_de
             'get_device_group_by_product_key') as get_device_group_by_product_key_mock:
         get_device_group_by_product_key_mock.return_value = device_group
 
-        with patch.object(
-                DeviceGroupRepository,
-                'get_device_group_by_user_id_and_product_key'
-        ) as get_device_group_by_user_id_and_product_key_mock:
-            get_device_group_by_user_id_and_product_key_mock.return_value = None
+        with patch.object(PermissionService, 'is_master_user_of_device_group') as is_master_user_of_device_group_mock:
+            is_master_user_of_device_group_mock.return_value = False
 
             result, result_values = sensor_service_instance.get_list_of_unassigned_sensors(
                 device_group.product_key,
@@ -1659,14 +2193,12 @@ def test__change_sensor_user_group_should_change_sensors_user_group_if_user_is_i
     old_user_group = create_user_group()
     new_user_group = create_user_group()
 
-    old_user_group.users = [user]
-    new_user_group.users = [user]
-
     new_user_group.id = 5
     with patch.object(
-            UserGroupRepository,
-            'get_user_group_by_id') as get_user_group_by_id_mock:
-        get_user_group_by_id_mock.return_value = old_user_group
+            PermissionService,
+            'is_user_in_user_group'
+    ) as is_user_in_user_group_mock:
+        is_user_in_user_group_mock.return_value = True
 
         status, error_msg = sensor_service_instance._change_sensor_user_group(sensor, user, False, new_user_group)
 
@@ -1715,20 +2247,11 @@ def test__change_sensor_user_group_should_return_error_message_when_user_not_in_
 
     new_user_group = create_user_group()
 
-    if user_in_old_user_group:
-        old_user_group.users = [user]
-    else:
-        old_user_group.users = []
-
-    if user_in_new_user_group:
-        new_user_group.users = [user]
-    else:
-        new_user_group.users = []
-
     with patch.object(
-            UserGroupRepository,
-            'get_user_group_by_id') as get_user_group_by_id_mock:
-        get_user_group_by_id_mock.return_value = old_user_group
+            PermissionService,
+            'is_user_in_user_group'
+    ) as is_user_in_user_group_mock:
+        is_user_in_user_group_mock.side_effect = [user_in_old_user_group, user_in_new_user_group]
 
         status, error_msg = sensor_service_instance._change_sensor_user_group(sensor, user, False, new_user_group)
 
@@ -1807,9 +2330,6 @@ def test_modify_sensor_should_modify_sensor_when_valid_arguments_are_passed_and_
     old_user_group = create_user_group()
     new_user_group = create_user_group()
 
-    old_user_group.users = [user]
-    new_user_group.users = [user]
-
     new_user_group.id += 1
     new_user_group.name = "new user group"
 
@@ -1839,11 +2359,8 @@ def test_modify_sensor_should_modify_sensor_when_valid_arguments_are_passed_and_
     ) as get_device_group_by_product_key_mock:
         get_device_group_by_product_key_mock.return_value = device_group
 
-        with patch.object(
-                DeviceGroupRepository,
-                'get_device_group_by_user_id_and_product_key'
-        ) as get_device_group_by_user_id_and_product_key_mock:
-            get_device_group_by_user_id_and_product_key_mock.return_value = Mock()
+        with patch.object(PermissionService, 'is_master_user_of_device_group') as is_master_user_of_device_group_mock:
+            is_master_user_of_device_group_mock.return_value = True
 
             with patch.object(
                     SensorRepository,
@@ -1870,10 +2387,10 @@ def test_modify_sensor_should_modify_sensor_when_valid_arguments_are_passed_and_
                             get_sensor_by_name_and_user_group_id_mock.return_value = None
 
                             with patch.object(
-                                    UserGroupRepository,
-                                    'get_user_group_by_id'
-                            ) as get_user_group_by_id_mock:
-                                get_user_group_by_id_mock.return_value = old_user_group
+                                    PermissionService,
+                                    'is_user_in_user_group'
+                            ) as is_user_in_user_group_mock:
+                                is_user_in_user_group_mock.return_value = True
 
                                 with patch.object(
                                         SensorTypeRepository,
@@ -1887,17 +2404,22 @@ def test_modify_sensor_should_modify_sensor_when_valid_arguments_are_passed_and_
                                     ) as update_database_mock:
                                         update_database_mock.return_value = True
 
-                                        result, result_values = sensor_service_instance.modify_sensor(
-                                            "product_key",
-                                            user.id,
-                                            False,
-                                            "device_key",
-                                            new_name,
-                                            "New type name",
-                                            "New user group name"
-                                        )
+                                        with patch.object(
+                                                DeviceChangeRepository,
+                                                'add_device_change_but_do_not_commit'
+                                        ) as add_device_change_but_do_not_commit_mock:
+                                            result, result_values = sensor_service_instance.modify_sensor(
+                                                "product_key",
+                                                user.id,
+                                                False,
+                                                "device_key",
+                                                new_name,
+                                                "New type name",
+                                                "New user group name"
+                                            )
 
     assert result == Constants.RESPONSE_MESSAGE_OK
+    add_device_change_but_do_not_commit_mock.assert_called_once_with(device_group.id, sensor.device_key)
     assert sensor.name == new_name
     assert sensor.sensor_type_id == new_sensor_type.id
     assert sensor.user_group_id == new_user_group.id
@@ -1919,8 +2441,6 @@ def test_modify_sensor_should_modify_sensor_when_sensor_was_not_in_any_user_grou
 
     new_user_group = create_user_group()
 
-    new_user_group.users = [user]
-
     new_user_group.id += 1
     new_user_group.name = "new user group"
 
@@ -1953,11 +2473,8 @@ def test_modify_sensor_should_modify_sensor_when_sensor_was_not_in_any_user_grou
     ) as get_device_group_by_product_key_mock:
         get_device_group_by_product_key_mock.return_value = device_group
 
-        with patch.object(
-                DeviceGroupRepository,
-                'get_device_group_by_user_id_and_product_key'
-        ) as get_device_group_by_user_id_and_product_key_mock:
-            get_device_group_by_user_id_and_product_key_mock.return_value = Mock()
+        with patch.object(PermissionService, 'is_master_user_of_device_group') as is_master_user_of_device_group_mock:
+            is_master_user_of_device_group_mock.return_value = True
 
             with patch.object(
                     SensorRepository,
@@ -1984,10 +2501,10 @@ def test_modify_sensor_should_modify_sensor_when_sensor_was_not_in_any_user_grou
                             get_sensor_by_name_and_user_group_id_mock.return_value = None
 
                             with patch.object(
-                                    UserGroupRepository,
-                                    'get_user_group_by_id'
-                            ) as get_user_group_by_id_mock:
-                                get_user_group_by_id_mock.return_value = None
+                                    PermissionService,
+                                    'is_user_in_user_group'
+                            ) as is_user_in_user_group_mock:
+                                is_user_in_user_group_mock.return_value = True
 
                                 with patch.object(
                                         SensorTypeRepository,
@@ -2001,17 +2518,22 @@ def test_modify_sensor_should_modify_sensor_when_sensor_was_not_in_any_user_grou
                                     ) as update_database_mock:
                                         update_database_mock.return_value = True
 
-                                        result, result_values = sensor_service_instance.modify_sensor(
-                                            "product_key",
-                                            user.id,
-                                            False,
-                                            "device_key",
-                                            new_name,
-                                            "New type name",
-                                            "New user group name"
-                                        )
+                                        with patch.object(
+                                                DeviceChangeRepository,
+                                                'add_device_change_but_do_not_commit'
+                                        ) as add_device_change_but_do_not_commit_mock:
+                                            result, result_values = sensor_service_instance.modify_sensor(
+                                                "product_key",
+                                                user.id,
+                                                False,
+                                                "device_key",
+                                                new_name,
+                                                "New type name",
+                                                "New user group name"
+                                            )
 
     assert result == Constants.RESPONSE_MESSAGE_OK
+    add_device_change_but_do_not_commit_mock.assert_called_once_with(device_group.id, sensor.device_key)
     assert sensor.name == new_name
     assert sensor.sensor_type_id == new_sensor_type.id
     assert sensor.user_group_id == new_user_group.id
@@ -2062,15 +2584,26 @@ def test_delete_sensor_should_delete_sensor_when_right_parameters_are_passed(
                     ) as save_mock:
                         save_mock.return_value = True
 
-                        result = sensor_service_instance.delete_sensor(
-                            sensor.device_key,
-                            'product_key',
-                            admin_id,
-                            is_admin
-                        )
+                        with patch.object(ChangeNotifier, 'notify') as notify_mock:
+                            with patch.object(
+                                    DeviceChangeRepository,
+                                    'add_device_change_but_do_not_commit'
+                            ) as add_device_change_but_do_not_commit_mock:
+                                result = sensor_service_instance.delete_sensor(
+                                    sensor.device_key,
+                                    'product_key',
+                                    admin_id,
+                                    is_admin
+                                )
 
     assert result == Constants.RESPONSE_MESSAGE_OK
     delete_but_do_not_commit.assert_called_once_with(sensor)
+    notify_mock.assert_called_once_with('product_key')
+    add_device_change_but_do_not_commit_mock.assert_called_once_with(
+        device_group.id,
+        sensor.device_key,
+        is_deleted=True
+    )
 
 
 def test_delete_sensor_should_return_error_message_when_unsuccessful_db_deletion(
@@ -2116,12 +2649,16 @@ def test_delete_sensor_should_return_error_message_when_unsuccessful_db_deletion
                     ) as save_mock:
                         save_mock.return_value = False
 
-                        result = sensor_service_instance.delete_sensor(
-                            sensor.device_key,
-                            'product_key',
-                            admin_id,
-                            is_admin
-                        )
+                        with patch.object(
+                                DeviceChangeRepository,
+                                'add_device_change_but_do_not_commit'
+                        ):
+                            result = sensor_service_instance.delete_sensor(
+                                sensor.device_key,
+                                'product_key',
+                                admin_id,
+                                is_admin
+                            )
 
     assert result == Constants.RESPONSE_MESSAGE_ERROR
     delete_but_do_not_commit.assert_called_once_with(sensor)
@@ -0,0 +1,239 @@
+from datetime import date
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.exc import ProgrammingError
+
+from app.main import create_app
+from app.main import db
+from app.main.repository.sensor_reading_repository import SensorReadingRepository
+from app.main.repository.sensor_reading_rollup_repository import SensorReadingRollupRepository
+from app.main.service.sensor_reading_service import SensorReadingService
+from app.main.util.constants import Constants
+
+
+def test_maintain_sensor_readings_storage_should_create_missing_and_drop_expired_partitions():
+    sensor_reading_service_instance = SensorReadingService.get_instance()
+
+    with patch.object(
+            SensorReadingRepository,
+            'is_partitioned_storage_supported'
+    ) as is_partitioned_storage_supported_mock:
+        is_partitioned_storage_supported_mock.return_value = True
+        with patch.object(
+                SensorReadingRepository,
+                'get_sensor_reading_partition_names'
+        ) as get_sensor_reading_partition_names_mock:
+            get_sensor_reading_partition_names_mock.return_value = [
+                'sensor_reading_default',
+                'sensor_reading_y2025m09',
+                'sensor_reading_y2025m10',
+                'sensor_reading_y2026m10'
+            ]
+            with patch.object(
+                    SensorReadingRepository,
+                    'create_sensor_reading_partition_but_do_not_commit'
+            ) as create_sensor_reading_partition_but_do_not_commit_mock:
+                with patch.object(
+                        SensorReadingRepository,
+                        'drop_sensor_reading_partition_but_do_not_commit'
+                ) as drop_sensor_reading_partition_but_do_not_commit_mock:
+                    with patch.object(
+                            SensorReadingRepository,
+                            'delete_sensor_readings_older_than_but_do_not_commit'
+                    ) as delete_sensor_readings_older_than_but_do_not_commit_mock:
+                        with patch.object(
+                                SensorReadingRepository,
+                                'delete_partition_readings_older_than_but_do_not_commit'
+                        ) as delete_partition_readings_older_than_but_do_not_commit_mock:
+                            delete_partition_readings_older_than_but_do_not_commit_mock.return_value = 4
+
+                            with patch.object(
+                                    SensorReadingRepository,
+                                    'update_database'
+                            ) as update_database_mock:
+                                update_database_mock.return_value = True
+
+                                result, result_values = \
+                                    sensor_reading_service_instance.maintain_sensor_readings_storage(
+                                        12,
+                                        2,
+                                        date(2026, 10, 18)
+                                    )
+
+    assert result == Constants.RESPONSE_MESSAGE_OK
+    assert result_values == {
+        'createdPartitions': ['sensor_reading_y2026m11', 'sensor_reading_y2026m12'],
+        'droppedPartitions': ['sensor_reading_y2025m09'],
+        'deletedReadings': 4
+    }
+
+    create_sensor_reading_partition_but_do_not_commit_mock.assert_any_call(
+        'sensor_reading_y2026m12',
+        date(2026, 12, 1),
+        date(2027, 1, 1),
+        'sensor_reading_default'
+    )
+    drop_sensor_reading_partition_but_do_not_commit_mock.assert_called_once_with('sensor_reading_y2025m09')
+    delete_partition_readings_older_than_but_do_not_commit_mock.assert_called_once_with(
+        'sensor_reading_default',
+        date(2025, 10, 1)
+    )
+    delete_sensor_readings_older_than_but_do_not_commit_mock.assert_not_called()
+
+
+def test_maintain_sensor_readings_storage_should_rollback_and_return_error_message_when_partition_not_created():
+    sensor_reading_service_instance = SensorReadingService.get_instance()
+
+    with patch.object(
+            SensorReadingRepository,
+            'is_partitioned_storage_supported'
+    ) as is_partitioned_storage_supported_mock:
+        is_partitioned_storage_supported_mock.return_value = True
+        with patch.object(
+                SensorReadingRepository,
+                'get_sensor_reading_partition_names'
+        ) as get_sensor_reading_partition_names_mock:
+            get_sensor_reading_partition_names_mock.return_value = ['sensor_reading_y2026m10']
+            with patch.object(
+                    SensorReadingRepository,
+                    'create_sensor_reading_partition_but_do_not_commit'
+            ) as create_sensor_reading_partition_but_do_not_commit_mock:
+                create_sensor_reading_partition_but_do_not_commit_mock.side_effect = ProgrammingError(
+                    'CREATE TABLE', {}, Exception('relation "sensor_reading" is not partitioned')
+                )
+                with patch.object(SensorReadingRepository, 'rollback_session') as rollback_session_mock:
+                    with patch.object(SensorReadingRepository, 'update_database') as update_database_mock:
+                        result, result_values = sensor_reading_service_instance.maintain_sensor_readings_storage(
+                            12,
+                            1,
+                            date(2026, 10, 18)
+                        )
+
+    assert result == Constants.RESPONSE_MESSAGE_ERROR
+    assert result_values is None
+    create_sensor_reading_partition_but_do_not_commit_mock.assert_called_once_with(
+        'sensor_reading_y2026m11',
+        date(2026, 11, 1),
+        date(2026, 12, 1),
+        None
+    )
+    rollback_session_mock.assert_called_once()
+    update_database_mock.assert_not_called()
+
+
+def test_maintain_sensor_readings_storage_should_delete_expired_readings_when_partitions_not_supported():
+    sensor_reading_service_instance = SensorReadingService.get_instance()
+
+    with patch.object(
+            SensorReadingRepository,
+            'is_partitioned_storage_supported'
+    ) as is_partitioned_storage_supported_mock:
+        is_partitioned_storage_supported_mock.return_value = False
+        with patch.object(
+                SensorReadingRepository,
+                'delete_sensor_readings_older_than_but_do_not_commit'
+        ) as delete_sensor_readings_older_than_but_do_not_commit_mock:
+            delete_sensor_readings_older_than_but_do_not_commit_mock.return_value = 3
+            with patch.object(
+                    SensorReadingRepository,
+                    'update_database'
+            ) as update_database_mock:
+                update_database_mock.return_value = True
+
+                result, result_values = sensor_reading_service_instance.maintain_sensor_readings_storage(
+                    1,
+                    2,
+                    date(2026, 1, 5)
+                )
+
+    assert result == Constants.RESPONSE_MESSAGE_OK
+    assert result_values == {
+        'createdPartitions': [],
+        'droppedPartitions': [],
+        'deletedReadings': 3
+    }
+    delete_sensor_readings_older_than_but_do_not_commit_mock.assert_called_once_with(date(2025, 12, 1))
+
+
+def test_maintain_sensor_readings_storage_should_return_error_message_when_database_update_failed():
+    sensor_reading_service_instance = SensorReadingService.get_instance()
+
+    with patch.object(
+            SensorReadingRepository,
+            'is_partitioned_storage_supported'
+    ) as is_partitioned_storage_supported_mock:
+        is_partitioned_storage_supported_mock.return_value = False
+        with patch.object(
+                SensorReadingRepository,
+                'delete_sensor_readings_older_than_but_do_not_commit'
+        ):
+            with patch.object(
+                    SensorReadingRepository,
+                    'update_database'
+            ) as update_database_mock:
+                update_database_mock.return_value = False
+
+                result, result_values = sensor_reading_service_instance.maintain_sensor_readings_storage(12, 2)
+
+    assert result == Constants.RESPONSE_MESSAGE_ERROR
+    assert result_values is None
+
+
+def test_save_sensor_readings_but_do_not_commit_should_rollback_and_return_false_when_insert_failed():
+    sensor_reading_repository_instance = SensorReadingRepository.get_instance()
+
+    with patch.object(db.session, 'execute') as execute_mock:
+        execute_mock.side_effect = IntegrityError('INSERT INTO sensor_reading', {}, Exception('foreign key'))
+
+        with patch.object(SensorReadingRepository, 'rollback_session') as rollback_session_mock:
+            result = sensor_reading_repository_instance.save_sensor_readings_but_do_not_commit(
+                [{'value': 0.5, 'date': datetime(2019, 8, 5), 'sensor_id': 1}]
+            )
+
+    assert not result
+    execute_mock.assert_called_once()
+    rollback_session_mock.assert_called_once()
+
+
+def test_update_sensor_reading_rollups_but_do_not_commit_should_rollback_and_return_false_when_update_failed():
+    sensor_reading_rollup_repository_instance = SensorReadingRollupRepository.get_instance()
+
+    with create_app('test').app_context():
+        with patch.object(SensorReadingRollupRepository, '_merge_rollup_values') as _merge_rollup_values_mock:
+            _merge_rollup_values_mock.side_effect = OperationalError('SELECT', {}, Exception('timeout'))
+
+            with patch.object(SensorReadingRollupRepository, 'rollback_session') as rollback_session_mock:
+                result = sensor_reading_rollup_repository_instance.update_sensor_reading_rollups_but_do_not_commit(
+                    [{'value': 0.5, 'date': datetime(2019, 8, 5), 'sensor_id': 1}]
+                )
+
+    assert not result
+    _merge_rollup_values_mock.assert_called_once()
+    rollback_session_mock.assert_called_once()
+
+@pytest.mark.parametrize("retention_months,partitions_ahead", [
+    (None, 2),
+    (0, 2),
+    (12, None),
+    (12, -1)
+])
+def test_maintain_sensor_readings_storage_should_return_error_message_when_wrong_parameters(
+        retention_months,
+        partitions_ahead):
+    sensor_reading_service_instance = SensorReadingService.get_instance()
+
+    result, result_values = sensor_reading_service_instance.maintain_sensor_readings_storage(
+        retention_months,
+        partitions_ahead
+    )
+
+    assert result == Constants.RESPONSE_MESSAGE_BAD_REQUEST
+    assert result_values is None
+
+
+if __name__ == '__main__':
+    pytest.main(['app/unittest/{}.py'.format(__file__)])
@@ -7,6 +7,7 @@ from app.main.repository.device_group_repository import DeviceGroupRepository
 from app.main.repository.reading_enumerator_repository import ReadingEnumeratorRepository
 from app.main.repository.sensor_type_repository import SensorTypeRepository
 from app.main.repository.user_repository import UserRepository
+from app.main.service.permission_service import PermissionService
 from app.main.service.sensor_type_service import SensorTypeService
 from app.main.util.constants import Constants
 
@@ -58,39 +59,42 @@ def test_get_sensor_type_info_should_return_sensor_info_when_valid_request_and_r
         ]
     }
 
-    with patch.object(
-            DeviceGroupRepository,
-            'get_device_group_by_product_key'
-    ) as get_device_group_by_product_key_mock:
-        get_device_group_by_product_key_mock.return_value = device_group
+    with patch.object(PermissionService, 'is_user_in_device_group') as is_user_in_device_group_mock:
+        is_user_in_device_group_mock.return_value = True
 
         with patch.object(
-                UserRepository,
-                'get_user_by_id'
-        ) as get_user_by_id_mock:
-            get_user_by_id_mock.return_value = user
+                DeviceGroupRepository,
+                'get_device_group_by_product_key'
+        ) as get_device_group_by_product_key_mock:
+            get_device_group_by_product_key_mock.return_value = device_group
 
             with patch.object(
-                    SensorTypeRepository,
-                    'get_sensor_type_by_device_group_id_and_name'
-            ) as get_sensor_type_by_device_group_id_and_name_mock:
-                get_sensor_type_by_device_group_id_and_name_mock.return_value = sensor_type
+                    UserRepository,
+                    'get_user_by_id'
+            ) as get_user_by_id_mock:
+                get_user_by_id_mock.return_value = user
 
                 with patch.object(
-                        ReadingEnumeratorRepository,
-                        'get_reading_enumerators_by_sensor_type_id'
-                ) as get_reading_enumerators_by_sensor_type_id_mock:
-                    get_reading_enumerators_by_sensor_type_id_mock.return_value = [
-                        first_enumerator,
-                        second_enumerator
-                    ]
+                        SensorTypeRepository,
+                        'get_sensor_type_by_device_group_id_and_name'
+                ) as get_sensor_type_by_device_group_id_and_name_mock:
+                    get_sensor_type_by_device_group_id_and_name_mock.return_value = sensor_type
 
-                    result, result_values = sensor_type_service_instance.get_sensor_type_info(
-                        device_group.product_key,
-                        user_group.name,
-                        test_user_id,
-                        False
-                    )
+                    with patch.object(
+                            ReadingEnumeratorRepository,
+                            'get_reading_enumerators_by_sensor_type_id'
+                    ) as get_reading_enumerators_by_sensor_type_id_mock:
+                        get_reading_enumerators_by_sensor_type_id_mock.return_value = [
+                            first_enumerator,
+                            second_enumerator
+                        ]
+
+                        result, result_values = sensor_type_service_instance.get_sensor_type_info(
+                            device_group.product_key,
+                            user_group.name,
+                            test_user_id,
+                            False
+                        )
 
     assert result == Constants.RESPONSE_MESSAGE_OK
     assert result_values == expected_returned_values
@@ -135,30 +139,33 @@ def test_get_sensor_type_info_should_return_sensor_info_when_valid_request_and_r
         'rangeMax': sensor_type.range_max,
     }
 
-    with patch.object(
-            DeviceGroupRepository,
-            'get_device_group_by_product_key'
-    ) as get_device_group_by_product_key_mock:
-        get_device_group_by_product_key_mock.return_value = device_group
+    with patch.object(PermissionService, 'is_user_in_device_group') as is_user_in_device_group_mock:
+        is_user_in_device_group_mock.return_value = True
 
         with patch.object(
-                UserRepository,
-                'get_user_by_id'
-        ) as get_user_by_id_mock:
-            get_user_by_id_mock.return_value = user
+                DeviceGroupRepository,
+                'get_device_group_by_product_key'
+        ) as get_device_group_by_product_key_mock:
+            get_device_group_by_product_key_mock.return_value = device_group
 
             with patch.object(
-                    SensorTypeRepository,
-                    'get_sensor_type_by_device_group_id_and_name'
-            ) as get_sensor_type_by_device_group_id_and_name_mock:
-                get_sensor_type_by_device_group_id_and_name_mock.return_value = sensor_type
+                    UserRepository,
+                    'get_user_by_id'
+            ) as get_user_by_id_mock:
+                get_user_by_id_mock.return_value = user
 
-                result, result_values = sensor_type_service_instance.get_sensor_type_info(
-                    device_group.product_key,
-                    user_group.name,
-                    test_user_id,
-                    False
-                )
+                with patch.object(
+                        SensorTypeRepository,
+                        'get_sensor_type_by_device_group_id_and_name'
+                ) as get_sensor_type_by_device_group_id_and_name_mock:
+                    get_sensor_type_by_device_group_id_and_name_mock.return_value = sensor_type
+
+                    result, result_values = sensor_type_service_instance.get_sensor_type_info(
+                        device_group.product_key,
+                        user_group.name,
+                        test_user_id,
+                        False
+                    )
 
     assert result == Constants.RESPONSE_MESSAGE_OK
     assert result_values == expected_returned_values
@@ -181,30 +188,33 @@ def test_get_sensor_type_info_should_return_error_message_when_sensor_type_not_i
     device_group.user_groups = [user_group]
     user_group.users = [user]
 
-    with patch.object(
-            DeviceGroupRepository,
-            'get_device_group_by_product_key'
-    ) as get_device_group_by_product_key_mock:
-        get_device_group_by_product_key_mock.return_value = device_group
+    with patch.object(PermissionService, 'is_user_in_device_group') as is_user_in_device_group_mock:
+        is_user_in_device_group_mock.return_value = True
 
         with patch.object(
-                UserRepository,
-                'get_user_by_id'
-        ) as get_user_by_id_mock:
-            get_user_by_id_mock.return_value = user
+                DeviceGroupRepository,
+                'get_device_group_by_product_key'
+        ) as get_device_group_by_product_key_mock:
+            get_device_group_by_product_key_mock.return_value = device_group
 
             with patch.object(
-                    SensorTypeRepository,
-                    'get_sensor_type_by_device_group_id_and_name'
-            ) as get_sensor_type_by_device_group_id_and_name_mock:
-                get_sensor_type_by_device_group_id_and_name_mock.return_value = None
+                    UserRepository,
+                    'get_user_by_id'
+            ) as get_user_by_id_mock:
+                get_user_by_id_mock.return_value = user
 
-                result, result_values = sensor_type_service_instance.get_sensor_type_info(
-                    device_group.product_key,
-                    user_group.name,
-                    test_user_id,
-                    False
-                )
+                with patch.object(
+                        SensorTypeRepository,
+                        'get_sensor_type_by_device_group_id_and_name'
+                ) as get_sensor_type_by_device_group_id_and_name_mock:
+                    get_sensor_type_by_device_group_id_and_name_mock.return_value = None
+
+                    result, result_values = sensor_type_service_instance.get_sensor_type_info(
+                        device_group.product_key,
+                        user_group.name,
+                        test_user_id,
+                        False
+                    )
 
     assert result == Constants.RESPONSE_MESSAGE_SENSOR_TYPE_NOT_FOUND
     assert result_values is None
@@ -223,24 +233,27 @@ def test_get_sensor_type_info_should_return_error_message_when_user_not_in_any_u
     device_group.user_groups = [user_group]
     user_group.users = []
 
-    with patch.object(
-            DeviceGroupRepository,
-            'get_device_group_by_product_key'
-    ) as get_device_group_by_product_key_mock:
-        get_device_group_by_product_key_mock.return_value = device_group
+    with patch.object(PermissionService, 'is_user_in_device_group') as is_user_in_device_group_mock:
+        is_user_in_device_group_mock.return_value = False
 
         with patch.object(
-                UserRepository,
-                'get_user_by_id'
-        ) as get_user_by_id_mock:
-            get_user_by_id_mock.return_value = user
+                DeviceGroupRepository,
+                'get_device_group_by_product_key'
+        ) as get_device_group_by_product_key_mock:
+            get_device_group_by_product_key_mock.return_value = device_group
 
-            result, result_values = sensor_type_service_instance.get_sensor_type_info(
-                device_group.product_key,
-                user_group.name,
-                test_user_id,
-                False
-            )
+            with patch.object(
+                    UserRepository,
+                    'get_user_by_id'
+            ) as get_user_by_id_mock:
+                get_user_by_id_mock.return_value = user
+
+                result, result_values = sensor_type_service_instance.get_sensor_type_info(
+                    device_group.product_key,
+                    user_group.name,
+                    test_user_id,
+                    False
+                )
 
     assert result == Constants.RESPONSE_MESSAGE_USER_DOES_NOT_HAVE_PRIVILEGES
     assert result_values is None
@@ -516,16 +529,14 @@ def test_create_sensor_type_in_device_group_should_create_sensor_type_when_valid
 
             with patch.object(
                     SensorTypeRepository,
-                    'save'
-            ) as save_mock:
-                save_mock.return_value = True
-
+                    'save_but_do_not_commit'
+            ) as save_but_do_not_commit_mock:
                 with patch.object(
                         ReadingEnumeratorRepository,
                         'save_but_do_not_commit'
-                ):
+                ) as save_enumerator_but_do_not_commit_mock:
                     with patch.object(
-                            ReadingEnumeratorRepository,
+                            SensorTypeRepository,
                             'update_database'
                     ) as update_database_mock:
                         update_database_mock.return_value = True
@@ -548,6 +559,18 @@ def test_create_sensor_type_in_device_group_should_create_sensor_type_when_valid
     assert result
     assert result == Constants.RESPONSE_MESSAGE_CREATED
 
+    save_but_do_not_commit_mock.assert_called_once()
+    sensor_type = save_but_do_not_commit_mock.call_args[0][0]
+    update_database_mock.assert_called_once()
+
+    if reading_type == 'Enum':
+        assert [
+            (call[0][0].number, call[0][0].text, call[0][0].sensor_type)
+            for call in save_enumerator_but_do_not_commit_mock.call_args_list
+        ] == [(0, 'zero', sensor_type), (1, 'one', sensor_type)]
+    else:
+        save_enumerator_but_do_not_commit_mock.assert_not_called()
+
 
 def test_create_sensor_type_in_device_group_should_return_error_message_when_no_device_group():
     sensor_type_service_instance = SensorTypeService.get_instance()
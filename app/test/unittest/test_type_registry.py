@@ -0,0 +1,157 @@
+from unittest.mock import patch
+
+import pytest
+
+from app.main.repository.executive_type_repository import ExecutiveTypeRepository
+from app.main.repository.reading_enumerator_repository import ReadingEnumeratorRepository
+from app.main.repository.sensor_type_repository import SensorTypeRepository
+from app.main.repository.state_enumerator_repository import StateEnumeratorRepository
+from app.main.service.type_registry_service import TypeRegistryService
+
+
+def test_get_sensor_type_should_load_all_types_of_device_group_once(
+        create_sensor_type,
+        create_executive_type,
+        create_sensor_reading_enumerator,
+        get_executive_type_default_values):
+    type_registry_service_instance = TypeRegistryService()
+
+    sensor_type = create_sensor_type()
+    reading_enumerator = create_sensor_reading_enumerator()
+    executive_type_values = get_executive_type_default_values()
+    executive_type_values['state_type'] = 'Decimal'
+    executive_type = create_executive_type(executive_type_values)
+
+    with patch.object(
+            SensorTypeRepository,
+            'get_sensor_types_by_device_group_id'
+    ) as get_sensor_types_by_device_group_id_mock:
+        get_sensor_types_by_device_group_id_mock.return_value = [sensor_type]
+
+        with patch.object(
+                ReadingEnumeratorRepository,
+                'get_reading_enumerators_by_sensor_type_ids'
+        ) as get_reading_enumerators_by_sensor_type_ids_mock:
+            get_reading_enumerators_by_sensor_type_ids_mock.return_value = [reading_enumerator]
+
+            with patch.object(
+                    ExecutiveTypeRepository,
+                    'get_executive_types_by_device_group_id'
+            ) as get_executive_types_by_device_group_id_mock:
+                get_executive_types_by_device_group_id_mock.return_value = [executive_type]
+
+                with patch.object(
+                        StateEnumeratorRepository,
+                        'get_state_enumerators_by_executive_type_ids'
+                ) as get_state_enumerators_by_executive_type_ids_mock:
+                    first_sensor_type = type_registry_service_instance.get_sensor_type(
+                        sensor_type.device_group_id,
+                        sensor_type.id
+                    )
+                    second_sensor_type = type_registry_service_instance.get_sensor_type(
+                        sensor_type.device_group_id,
+                        sensor_type.id
+                    )
+                    result_executive_type = type_registry_service_instance.get_executive_type(
+                        executive_type.device_group_id,
+                        executive_type.id
+                    )
+
+    assert first_sensor_type is second_sensor_type
+    assert first_sensor_type.reading_type == sensor_type.reading_type
+    assert first_sensor_type.text_by_number == {reading_enumerator.number: reading_enumerator.text}
+    assert first_sensor_type.number_by_text == {reading_enumerator.text: reading_enumerator.number}
+    assert result_executive_type.name == executive_type.name
+    assert result_executive_type.text_by_number == {}
+
+    get_sensor_types_by_device_group_id_mock.assert_called_once_with(sensor_type.device_group_id)
+    get_reading_enumerators_by_sensor_type_ids_mock.assert_called_once_with([sensor_type.id])
+    get_executive_types_by_device_group_id_mock.assert_called_once_with(executive_type.device_group_id)
+    get_state_enumerators_by_executive_type_ids_mock.assert_not_called()
+
+
+def test_get_sensor_type_should_reload_device_group_when_type_is_not_found(create_sensor_type):
+    type_registry_service_instance = TypeRegistryService()
+
+    sensor_type = create_sensor_type()
+
+    with patch.object(
+            SensorTypeRepository,
+            'get_sensor_types_by_device_group_id'
+    ) as get_sensor_types_by_device_group_id_mock:
+        get_sensor_types_by_device_group_id_mock.side_effect = [[], [sensor_type]]
+
+        with patch.object(ReadingEnumeratorRepository, 'get_reading_enumerators_by_sensor_type_ids'):
+            with patch.object(
+                    ExecutiveTypeRepository,
+                    'get_executive_types_by_device_group_id'
+            ) as get_executive_types_by_device_group_id_mock:
+                get_executive_types_by_device_group_id_mock.return_value = []
+
+                result = type_registry_service_instance.get_sensor_type(sensor_type.device_group_id, sensor_type.id)
+
+    assert result.id == sensor_type.id
+    assert get_sensor_types_by_device_group_id_mock.call_count == 2
+
+
+def test_invalidate_should_bump_version_and_drop_cached_types_of_device_group(create_sensor_type):
+    type_registry_service_instance = TypeRegistryService()
+
+    sensor_type = create_sensor_type()
+    version = type_registry_service_instance.get_version(sensor_type.device_group_id)
+
+    with patch.object(
+            SensorTypeRepository,
+            'get_sensor_types_by_device_group_id'
+    ) as get_sensor_types_by_device_group_id_mock:
+        get_sensor_types_by_device_group_id_mock.return_value = [sensor_type]
+
+        with patch.object(ReadingEnumeratorRepository, 'get_reading_enumerators_by_sensor_type_ids'):
+            with patch.object(
+                    ExecutiveTypeRepository,
+                    'get_executive_types_by_device_group_id'
+            ) as get_executive_types_by_device_group_id_mock:
+                get_executive_types_by_device_group_id_mock.return_value = []
+
+                type_registry_service_instance.get_sensor_type(sensor_type.device_group_id, sensor_type.id)
+                type_registry_service_instance.invalidate(sensor_type.device_group_id)
+                device_group_types = type_registry_service_instance.get_device_group_types(
+                    sensor_type.device_group_id
+                )
+
+    assert type_registry_service_instance.get_version(sensor_type.device_group_id) == version + 1
+    assert device_group_types.version == version + 1
+    assert get_sensor_types_by_device_group_id_mock.call_count == 2
+
+
+def test_get_device_group_types_should_not_cache_types_loaded_while_device_group_was_invalidated(
+        create_sensor_type):
+    type_registry_service_instance = TypeRegistryService()
+
+    sensor_type = create_sensor_type()
+
+    def _get_sensor_types_and_invalidate(device_group_id):
+        type_registry_service_instance.invalidate(device_group_id)
+        return [sensor_type]
+
+    with patch.object(
+            SensorTypeRepository,
+            'get_sensor_types_by_device_group_id'
+    ) as get_sensor_types_by_device_group_id_mock:
+        get_sensor_types_by_device_group_id_mock.side_effect = _get_sensor_types_and_invalidate
+
+        with patch.object(ReadingEnumeratorRepository, 'get_reading_enumerators_by_sensor_type_ids'):
+            with patch.object(
+                    ExecutiveTypeRepository,
+                    'get_executive_types_by_device_group_id'
+            ) as get_executive_types_by_device_group_id_mock:
+                get_executive_types_by_device_group_id_mock.return_value = []
+
+                type_registry_service_instance.get_device_group_types(sensor_type.device_group_id)
+                type_registry_service_instance.get_device_group_types(sensor_type.device_group_id)
+
+    assert get_sensor_types_by_device_group_id_mock.call_count == 2
+
+
+if __name__ == '__main__':
+    pytest.main(['app/unittest/{}.py'.format(__file__)])
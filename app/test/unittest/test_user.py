@@ -9,6 +9,8 @@ from app.main.repository.admin_repository import AdminRepository
 from app.main.repository.device_group_repository import DeviceGroupRepository
 from app.main.repository.user_group_repository import UserGroupRepository
 from app.main.repository.user_repository import UserRepository
+from app.main.service.password_service import PasswordService
+from app.main.service.permission_service import PermissionService
 from app.main.service.user_service import UserService
 from app.main.util.constants import Constants
 
@@ -103,6 +105,50 @@ def test_create_auth_token_should_return_invalid_credentials_message_when_checki
     assert result_values is None
 
 
+def test_create_auth_token_should_rehash_password_when_rounds_have_changed(
+        create_user,
+        get_user_default_values):
+    user_service_instance = UserService.get_instance()
+
+    user_values = get_user_default_values()
+
+    user_password = user_values['password']
+    user_values['password'] = flask_bcrypt.generate_password_hash(user_password, 4).decode('utf-8')
+
+    user = create_user(user_values)
+
+    with patch.object(UserRepository, 'get_user_by_email') as get_user_by_email_mock:
+        get_user_by_email_mock.return_value = user
+
+        with patch.object(UserRepository, 'update_database') as update_database_mock:
+            update_database_mock.return_value = True
+
+            with patch.object(Constants, 'PASSWORD_HASHING_ROUNDS', 5):
+                result, result_values = user_service_instance.create_auth_token(user.email, user_password)
+
+    assert result == Constants.RESPONSE_MESSAGE_OK
+    assert user.password.startswith('$2b$05$')
+    assert flask_bcrypt.check_password_hash(user.password, user_password)
+    update_database_mock.assert_called_once()
+
+
+def test_create_auth_token_should_return_service_unavailable_message_when_password_hashing_is_busy(create_user):
+    user_service_instance = UserService.get_instance()
+
+    user = create_user()
+
+    with patch.object(UserRepository, 'get_user_by_email') as get_user_by_email_mock:
+        get_user_by_email_mock.return_value = user
+
+        with patch.object(PasswordService, 'check_password_hash') as check_password_hash_mock:
+            check_password_hash_mock.return_value = None
+
+            result, result_values = user_service_instance.create_auth_token(user.email, user.password)
+
+    assert result == Constants.RESPONSE_MESSAGE_SERVICE_UNAVAILABLE
+    assert result_values is None
+
+
 def test_create_user_should_return_success_message_when_valid_parameters():
     user_service_instance = UserService.get_instance()
 
@@ -515,10 +561,8 @@ def test_add_user_to_user_group_should_add_user_to_device_group_when_right_param
                       ) as get_device_group_by_product_key_mock:
         get_device_group_by_product_key_mock.return_value = device_group
 
-        with patch.object(DeviceGroupRepository,
-                          'get_device_group_by_user_id_and_product_key'
-                          ) as get_device_group_by_user_id_and_product_key_mock:
-            get_device_group_by_user_id_and_product_key_mock.return_value = Mock()
+        with patch.object(PermissionService, 'is_master_user_of_device_group') as is_master_user_of_device_group_mock:
+            is_master_user_of_device_group_mock.return_value = True
 
             with patch.object(UserRepository,
                               'get_user_by_id'
@@ -567,10 +611,8 @@ def test_add_user_to_user_group_should_return_error_message_when_unsuccessful_db
                       ) as get_device_group_by_product_key_mock:
         get_device_group_by_product_key_mock.return_value = device_group
 
-        with patch.object(DeviceGroupRepository,
-                          'get_device_group_by_user_id_and_product_key'
-                          ) as get_device_group_by_user_id_and_product_key_mock:
-            get_device_group_by_user_id_and_product_key_mock.return_value = Mock()
+        with patch.object(PermissionService, 'is_master_user_of_device_group') as is_master_user_of_device_group_mock:
+            is_master_user_of_device_group_mock.return_value = True
 
             with patch.object(UserRepository,
                               'get_user_by_id'
@@ -621,10 +663,8 @@ def test_add_user_to_user_group_should_add_user_to_device_group_when_user_alread
                       ) as get_device_group_by_product_key_mock:
         get_device_group_by_product_key_mock.return_value = device_group
 
-        with patch.object(DeviceGroupRepository,
-                          'get_device_group_by_user_id_and_product_key'
-                          ) as get_device_group_by_user_id_and_product_key_mock:
-            get_device_group_by_user_id_and_product_key_mock.return_value = Mock()
+        with patch.object(PermissionService, 'is_master_user_of_device_group') as is_master_user_of_device_group_mock:
+            is_master_user_of_device_group_mock.return_value = True
 
             with patch.object(UserRepository,
                               'get_user_by_id'
@@ -670,10 +710,8 @@ def test_add_user_to_user_group_should_add_user_to_device_group_when_wrong_passw
                       ) as get_device_group_by_product_key_mock:
         get_device_group_by_product_key_mock.return_value = device_group
 
-        with patch.object(DeviceGroupRepository,
-                          'get_device_group_by_user_id_and_product_key'
-                          ) as get_device_group_by_user_id_and_product_key_mock:
-            get_device_group_by_user_id_and_product_key_mock.return_value = Mock()
+        with patch.object(PermissionService, 'is_master_user_of_device_group') as is_master_user_of_device_group_mock:
+            is_master_user_of_device_group_mock.return_value = True
 
             with patch.object(UserRepository,
                               'get_user_by_id'
@@ -712,10 +750,8 @@ def test_add_user_to_user_group_should_add_user_to_device_group_when_user_group_
                       ) as get_device_group_by_product_key_mock:
         get_device_group_by_product_key_mock.return_value = device_group
 
-        with patch.object(DeviceGroupRepository,
-                          'get_device_group_by_user_id_and_product_key'
-                          ) as get_device_group_by_user_id_and_product_key_mock:
-            get_device_group_by_user_id_and_product_key_mock.return_value = Mock()
+        with patch.object(PermissionService, 'is_master_user_of_device_group') as is_master_user_of_device_group_mock:
+            is_master_user_of_device_group_mock.return_value = True
 
             with patch.object(UserRepository,
                               'get_user_by_id'
@@ -745,10 +781,8 @@ def test_add_user_to_user_group_should_add_user_to_device_group_when_user_not_fo
                       ) as get_device_group_by_product_key_mock:
         get_device_group_by_product_key_mock.return_value = device_group
 
-        with patch.object(DeviceGroupRepository,
-                          'get_device_group_by_user_id_and_product_key'
-                          ) as get_device_group_by_user_id_and_product_key_mock:
-            get_device_group_by_user_id_and_product_key_mock.return_value = Mock()
+        with patch.object(PermissionService, 'is_master_user_of_device_group') as is_master_user_of_device_group_mock:
+            is_master_user_of_device_group_mock.return_value = True
 
             with patch.object(UserRepository,
                               'get_user_by_id'
@@ -782,10 +816,8 @@ def test_add_user_to_user_group_should_add_user_to_device_group_when_user_is_adm
                       ) as get_device_group_by_product_key_mock:
         get_device_group_by_product_key_mock.return_value = device_group
 
-        with patch.object(DeviceGroupRepository,
-                          'get_device_group_by_user_id_and_product_key'
-                          ) as get_device_group_by_user_id_and_product_key_mock:
-            get_device_group_by_user_id_and_product_key_mock.return_value = Mock()
+        with patch.object(PermissionService, 'is_master_user_of_device_group') as is_master_user_of_device_group_mock:
+            is_master_user_of_device_group_mock.return_value = True
 
             with patch.object(UserRepository,
                               'get_user_by_id'
@@ -814,10 +846,8 @@ def test_add_user_to_user_group_should_add_user_to_device_group_when_user_not_in
                       ) as get_device_group_by_product_key_mock:
         get_device_group_by_product_key_mock.return_value = device_group
 
-        with patch.object(DeviceGroupRepository,
-                          'get_device_group_by_user_id_and_product_key'
-                          ) as get_device_group_by_user_id_and_product_key_mock:
-            get_device_group_by_user_id_and_product_key_mock.return_value = None
+        with patch.object(PermissionService, 'is_master_user_of_device_group') as is_master_user_of_device_group_mock:
+            is_master_user_of_device_group_mock.return_value = False
 
             with patch.object(UserRepository,
                               'get_user_by_id'
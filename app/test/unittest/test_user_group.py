@@ -11,6 +11,8 @@ from app.main.repository.sensor_repository import SensorRepository
 from app.main.repository.user_group_repository import UserGroupRepository
 from app.main.repository.user_repository import UserRepository
 from app.main.service.executive_device_service import ExecutiveDeviceService
+from app.main.service.permission_service import PermissionService
+from app.main.service.permission_service import UserAccess
 from app.main.service.sensor_service import SensorService
 from app.main.service.user_group_service import UserGroupService
 from app.main.util.constants import Constants
@@ -31,7 +33,9 @@ def test_get_list_of_user_groups_should_return_list_of_user_groups_names_when_va
     third_user_group_values = get_user_group_default_values()
 
     first_user_group_values['name'] = 'first'
+    second_user_group_values['id'] += 1
     second_user_group_values['name'] = 'second'
+    third_user_group_values['id'] += 2
     third_user_group_values['name'] = 'third'
 
     first_user_group = create_user_group(first_user_group_values)
@@ -39,7 +43,6 @@ def test_get_list_of_user_groups_should_return_list_of_user_groups_names_when_va
     third_user_group = create_user_group(third_user_group_values)
 
     device_group.user_groups = [first_user_group, second_user_group, third_user_group]
-    first_user_group.users = [user]
 
     expected_output_values = [
         {'isAssignedTo': True, 'name': 'first'},
@@ -47,32 +50,36 @@ def test_get_list_of_user_groups_should_return_list_of_user_groups_names_when_va
         {'isAssignedTo': False, 'name': 'third'},
     ]
 
-    with patch.object(
-            DeviceGroupRepository,
-            'get_device_group_by_product_key'
-    ) as get_device_group_by_product_key_mock:
-        get_device_group_by_product_key_mock.return_value = device_group
+    with patch.object(PermissionService, 'get_user_access') as get_user_access_mock:
+        get_user_access_mock.return_value = UserAccess(frozenset([device_group.id]), frozenset([device_group.id]), frozenset([first_user_group.id]))
 
-        with patch.object(UserRepository,
-                          'get_user_by_id') as get_user_by_id_mock:
-            get_user_by_id_mock.return_value = user
+        with patch.object(
+                DeviceGroupRepository,
+                'get_device_group_by_product_key'
+        ) as get_device_group_by_product_key_mock:
+            get_device_group_by_product_key_mock.return_value = device_group
 
-            with patch.object(UserGroupRepository,
-                              'get_user_groups_by_device_group_id'
-                              ) as get_user_groups_by_device_group_id_mock:
-                get_user_groups_by_device_group_id_mock.return_value = [first_user_group,
-                                                                        second_user_group,
-                                                                        third_user_group]
-                with patch.object(DeviceGroupRepository,
-                                  'get_device_group_by_user_id_and_product_key'
-                                  ) as get_device_group_by_user_id_and_product_key_mock:
-                    get_device_group_by_user_id_and_product_key_mock.return_value = device_group
+            with patch.object(UserRepository,
+                              'get_user_by_id') as get_user_by_id_mock:
+                get_user_by_id_mock.return_value = user
 
-                    result, result_values = user_group_service.get_list_of_user_groups(
-                        device_group.product_key,
-                        user.id,
-                        False
-                    )
+                with patch.object(UserGroupRepository,
+                                  'get_user_groups_by_device_group_id'
+                                  ) as get_user_groups_by_device_group_id_mock:
+                    get_user_groups_by_device_group_id_mock.return_value = [first_user_group,
+                                                                            second_user_group,
+                                                                            third_user_group]
+                    with patch.object(
+                            PermissionService,
+                            'is_master_user_of_device_group'
+                    ) as is_master_user_of_device_group_mock:
+                        is_master_user_of_device_group_mock.return_value = True
+
+                        result, result_values = user_group_service.get_list_of_user_groups(
+                            device_group.product_key,
+                            user.id,
+                            False
+                        )
     assert result == Constants.RESPONSE_MESSAGE_OK
     assert result_values['userGroups'] == expected_output_values
 
@@ -123,10 +130,11 @@ def test_get_list_of_user_groups_should_return_list_of_user_groups_names_when_va
                 get_user_groups_by_device_group_id_mock.return_value = [first_user_group,
                                                                         second_user_group,
                                                                         third_user_group]
-                with patch.object(DeviceGroupRepository,
-                                  'get_device_group_by_user_id_and_product_key'
-                                  ) as get_device_group_by_user_id_and_product_key_mock:
-                    get_device_group_by_user_id_and_product_key_mock.return_value = device_group
+                with patch.object(
+                        PermissionService,
+                        'is_master_user_of_device_group'
+                ) as is_master_user_of_device_group_mock:
+                    is_master_user_of_device_group_mock.return_value = True
 
                     result, result_values = user_group_service.get_list_of_user_groups(
                         device_group.product_key,
@@ -218,10 +226,11 @@ def test_get_list_of_user_groups_should_return_error_message_when_user_not_in_an
                           'get_user_by_id') as get_user_by_id_mock:
             get_user_by_id_mock.return_value = user
 
-            with patch.object(DeviceGroupRepository,
-                              'get_device_group_by_user_id_and_product_key'
-                              ) as get_device_group_by_user_id_and_product_key_mock:
-                get_device_group_by_user_id_and_product_key_mock.return_value = None
+            with patch.object(
+                    PermissionService,
+                    'is_master_user_of_device_group'
+            ) as is_master_user_of_device_group_mock:
+                is_master_user_of_device_group_mock.return_value = False
                 result, result_values = user_group_service.get_list_of_user_groups(
                     device_group.product_key,
                     user.id,
@@ -300,7 +309,6 @@ def test_get_list_of_executive_devices_should_return_list_of_devices_infos_when_
 
     user = create_user()
     user_group = create_user_group()
-    user_group.users = [user]
 
     expected_output_values = [
         {
@@ -321,37 +329,40 @@ def test_get_list_of_executive_devices_should_return_list_of_devices_infos_when_
         }
     ]
 
-    with patch.object(DeviceGroupRepository, 'get_device_group_by_product_key') as get_device_group_by_product_key_mock:
-        get_device_group_by_product_key_mock.return_value = device_group
-
-        with patch.object(UserGroupRepository,
-                          'get_user_group_by_name_and_device_group_id') as get_user_group_by_name_device_group_id_mock:
-            get_user_group_by_name_device_group_id_mock.return_value = user_group
+    with patch.object(PermissionService, 'is_user_in_user_group') as is_user_in_user_group_mock:
+        is_user_in_user_group_mock.return_value = True
 
-            with patch.object(UserRepository,
-                              'get_user_by_id') as get_user_by_id_mock:
-                get_user_by_id_mock.return_value = user
+        with patch.object(DeviceGroupRepository, 'get_device_group_by_product_key') as get_device_group_by_product_key_mock:
+            get_device_group_by_product_key_mock.return_value = device_group
 
-                with patch.object(
-                        ExecutiveDeviceRepository,
-                        'get_executive_devices_by_user_group_id'
-                ) as get_executive_devices_by_user_group_id_mock:
-                    get_executive_devices_by_user_group_id_mock.return_value = [
-                        first_device,
-                        second_device]
-                    with patch.object(FormulaRepository,
-                                      'get_formula_by_id') as get_formula_by_id_mock:
-                        get_formula_by_id_mock.return_value = formula
-
-                        with patch.object(ExecutiveDeviceService,
-                                          'get_executive_device_state_value') as get_executive_device_state_value_mock:
-                            get_executive_device_state_value_mock.return_value = 1
-
-                            result, result_values = user_group_service.get_list_of_executive_devices(
-                                device_group.product_key,
-                                user_group.name,
-                                user.id
-                            )
+            with patch.object(UserGroupRepository,
+                              'get_user_group_by_name_and_device_group_id') as get_user_group_by_name_device_group_id_mock:
+                get_user_group_by_name_device_group_id_mock.return_value = user_group
+
+                with patch.object(UserRepository,
+                                  'get_user_by_id') as get_user_by_id_mock:
+                    get_user_by_id_mock.return_value = user
+
+                    with patch.object(
+                            ExecutiveDeviceRepository,
+                            'get_executive_devices_by_user_group_id'
+                    ) as get_executive_devices_by_user_group_id_mock:
+                        get_executive_devices_by_user_group_id_mock.return_value = [
+                            first_device,
+                            second_device]
+                        with patch.object(FormulaRepository,
+                                          'get_formula_by_id') as get_formula_by_id_mock:
+                            get_formula_by_id_mock.return_value = formula
+
+                            with patch.object(ExecutiveDeviceService,
+                                              'get_executive_device_state_value') as get_executive_device_state_value_mock:
+                                get_executive_device_state_value_mock.return_value = 1
+
+                                result, result_values = user_group_service.get_list_of_executive_devices(
+                                    device_group.product_key,
+                                    user_group.name,
+                                    user.id
+                                )
 
     assert result == Constants.RESPONSE_MESSAGE_OK
     assert result_values == expected_output_values
@@ -382,7 +393,6 @@ def test_get_list_of_executive_devices_should_return_list_of_devices_infos_when_
 
     user = create_user()
     user_group = create_user_group()
-    user_group.users = [user]
 
     expected_output_values = [
         {
@@ -403,35 +413,38 @@ def test_get_list_of_executive_devices_should_return_list_of_devices_infos_when_
         }
     ]
 
-    with patch.object(DeviceGroupRepository, 'get_device_group_by_product_key') as get_device_group_by_product_key_mock:
-        get_device_group_by_product_key_mock.return_value = device_group
+    with patch.object(PermissionService, 'is_user_in_user_group') as is_user_in_user_group_mock:
+        is_user_in_user_group_mock.return_value = True
 
-        with patch.object(
-                UserGroupRepository,
-                'get_user_group_by_name_and_device_group_id'
-        ) as get_user_group_by_name_device_group_id_mock:
-            get_user_group_by_name_device_group_id_mock.return_value = user_group
-
-            with patch.object(UserRepository, 'get_user_by_id') as get_user_by_id_mock:
-                get_user_by_id_mock.return_value = user
+        with patch.object(DeviceGroupRepository, 'get_device_group_by_product_key') as get_device_group_by_product_key_mock:
+            get_device_group_by_product_key_mock.return_value = device_group
 
-                with patch.object(
-                        ExecutiveDeviceRepository,
-                        'get_executive_devices_by_user_group_id'
-                ) as get_executive_devices_by_user_group_id_mock:
-                    get_executive_devices_by_user_group_id_mock.return_value = [first_device, second_device]
-                    with patch.object(FormulaRepository, 'get_formula_by_id') as get_formula_by_id_mock:
-                        get_formula_by_id_mock.return_value = None
-
-                        with patch.object(ExecutiveDeviceService,
-                                          'get_executive_device_state_value') as get_executive_device_state_value_mock:
-                            get_executive_device_state_value_mock.return_value = 1
-
-                            result, result_values = user_group_service.get_list_of_executive_devices(
-                                device_group.product_key,
-                                user_group.name,
-                                user.id
-                            )
+            with patch.object(
+                    UserGroupRepository,
+                    'get_user_group_by_name_and_device_group_id'
+            ) as get_user_group_by_name_device_group_id_mock:
+                get_user_group_by_name_device_group_id_mock.return_value = user_group
+
+                with patch.object(UserRepository, 'get_user_by_id') as get_user_by_id_mock:
+                    get_user_by_id_mock.return_value = user
+
+                    with patch.object(
+                            ExecutiveDeviceRepository,
+                            'get_executive_devices_by_user_group_id'
+                    ) as get_executive_devices_by_user_group_id_mock:
+                        get_executive_devices_by_user_group_id_mock.return_value = [first_device, second_device]
+                        with patch.object(FormulaRepository, 'get_formula_by_id') as get_formula_by_id_mock:
+                            get_formula_by_id_mock.return_value = None
+
+                            with patch.object(ExecutiveDeviceService,
+                                              'get_executive_device_state_value') as get_executive_device_state_value_mock:
+                                get_executive_device_state_value_mock.return_value = 1
+
+                                result, result_values = user_group_service.get_list_of_executive_devices(
+                                    device_group.product_key,
+                                    user_group.name,
+                                    user.id
+                                )
 
     assert result == Constants.RESPONSE_MESSAGE_OK
     assert result_values == expected_output_values
@@ -447,29 +460,31 @@ def test_get_list_of_executive_devices_should_return_empty_list_of_devices_infos
 
     user = create_user()
     user_group = create_user_group()
-    user_group.users = [user]
 
-    with patch.object(DeviceGroupRepository, 'get_device_group_by_product_key') as get_device_group_by_product_key_mock:
-        get_device_group_by_product_key_mock.return_value = device_group
+    with patch.object(PermissionService, 'is_user_in_user_group') as is_user_in_user_group_mock:
+        is_user_in_user_group_mock.return_value = True
 
-        with patch.object(UserGroupRepository,
-                          'get_user_group_by_name_and_device_group_id') as get_user_group_by_name_device_group_id_mock:
-            get_user_group_by_name_device_group_id_mock.return_value = user_group
+        with patch.object(DeviceGroupRepository, 'get_device_group_by_product_key') as get_device_group_by_product_key_mock:
+            get_device_group_by_product_key_mock.return_value = device_group
 
-            with patch.object(UserRepository, 'get_user_by_id') as get_user_by_id_mock:
-                get_user_by_id_mock.return_value = user
+            with patch.object(UserGroupRepository,
+                              'get_user_group_by_name_and_device_group_id') as get_user_group_by_name_device_group_id_mock:
+                get_user_group_by_name_device_group_id_mock.return_value = user_group
 
-                with patch.object(
-                        ExecutiveDeviceRepository,
-                        'get_executive_devices_by_user_group_id'
-                ) as get_executive_devices_by_user_group_id_mock:
-                    get_executive_devices_by_user_group_id_mock.return_value = []
+                with patch.object(UserRepository, 'get_user_by_id') as get_user_by_id_mock:
+                    get_user_by_id_mock.return_value = user
 
-                    result, result_values = user_group_service.get_list_of_executive_devices(
-                        device_group.product_key,
-                        user_group.name,
-                        user.id
-                    )
+                    with patch.object(
+                            ExecutiveDeviceRepository,
+                            'get_executive_devices_by_user_group_id'
+                    ) as get_executive_devices_by_user_group_id_mock:
+                        get_executive_devices_by_user_group_id_mock.return_value = []
+
+                        result, result_values = user_group_service.get_list_of_executive_devices(
+                            device_group.product_key,
+                            user_group.name,
+                            user.id
+                        )
 
     assert result == Constants.RESPONSE_MESSAGE_OK
     assert result_values == []
@@ -485,22 +500,25 @@ def test_get_list_of_executive_devices_should_return_error_message_when_user_not
     user = create_user()
     user_group = create_user_group()
 
-    with patch.object(DeviceGroupRepository, 'get_device_group_by_product_key') as get_device_group_by_product_key_mock:
-        get_device_group_by_product_key_mock.return_value = device_group
+    with patch.object(PermissionService, 'is_user_in_user_group') as is_user_in_user_group_mock:
+        is_user_in_user_group_mock.return_value = False
 
-        with patch.object(UserGroupRepository,
-                          'get_user_group_by_name_and_device_group_id') as get_user_group_by_name_device_group_id_mock:
-            get_user_group_by_name_device_group_id_mock.return_value = user_group
+        with patch.object(DeviceGroupRepository, 'get_device_group_by_product_key') as get_device_group_by_product_key_mock:
+            get_device_group_by_product_key_mock.return_value = device_group
 
-            with patch.object(UserRepository,
-                              'get_user_by_id') as get_user_by_id_mock:
-                get_user_by_id_mock.return_value = user
+            with patch.object(UserGroupRepository,
+                              'get_user_group_by_name_and_device_group_id') as get_user_group_by_name_device_group_id_mock:
+                get_user_group_by_name_device_group_id_mock.return_value = user_group
 
-                result, result_values = user_group_service.get_list_of_executive_devices(
-                    device_group.product_key,
-                    user_group.name,
-                    user.id
-                )
+                with patch.object(UserRepository,
+                                  'get_user_by_id') as get_user_by_id_mock:
+                    get_user_by_id_mock.return_value = user
+
+                    result, result_values = user_group_service.get_list_of_executive_devices(
+                        device_group.product_key,
+                        user_group.name,
+                        user.id
+                    )
 
     assert result == Constants.RESPONSE_MESSAGE_USER_DOES_NOT_HAVE_PRIVILEGES
     assert result_values is None
@@ -597,49 +615,53 @@ def test_get_list_of_sensors_should_return_list_of_devices_infos_when_valid_requ
     first_sensor.is_active = True
     second_sensor.is_active = False
 
+    first_sensor.last_reading_value = 1
+    second_sensor.last_reading_value = None
+
+    sensor_type = create_sensor_type()
+    sensor_type.reading_type = 'Decimal'
+
     user = create_user()
     user_group = create_user_group()
-    user_group.users = [user]
 
     expected_output_values = [
         {
             "name": first_sensor.name,
             "deviceKey": first_sensor.device_key,
             "isActive": first_sensor.is_active,
-            'sensorReadingValue': 1
+            'sensorReadingValue': 1.0
 
         },
         {
             "name": second_sensor.name,
             "deviceKey": second_sensor.device_key,
             "isActive": second_sensor.is_active,
-            'sensorReadingValue': 1
+            'sensorReadingValue': None
 
         }
     ]
 
-    with patch.object(DeviceGroupRepository, 'get_device_group_by_product_key') as get_device_group_by_product_key_mock:
-        get_device_group_by_product_key_mock.return_value = device_group
+    with patch.object(PermissionService, 'is_user_in_user_group') as is_user_in_user_group_mock:
+        is_user_in_user_group_mock.return_value = True
 
-        with patch.object(UserGroupRepository,
-                          'get_user_group_by_name_and_device_group_id') as get_user_group_by_name_device_group_id_mock:
-            get_user_group_by_name_device_group_id_mock.return_value = user_group
+        with patch.object(DeviceGroupRepository, 'get_device_group_by_product_key') as get_device_group_by_product_key_mock:
+            get_device_group_by_product_key_mock.return_value = device_group
 
-            with patch.object(UserRepository,
-                              'get_user_by_id') as get_user_by_id_mock:
-                get_user_by_id_mock.return_value = user
+            with patch.object(UserGroupRepository,
+                              'get_user_group_by_name_and_device_group_id') as get_user_group_by_name_device_group_id_mock:
+                get_user_group_by_name_device_group_id_mock.return_value = user_group
 
-                with patch.object(
-                        SensorRepository,
-                        'get_sensors_by_user_group_id'
-                ) as get_sensors_by_user_group_id_mock:
-                    get_sensors_by_user_group_id_mock.return_value = [
-                        first_sensor,
-                        second_sensor]
-                    with patch.object(SensorService,
-                                      'get_senor_reading_value'
-                                      ) as get_senor_reading_value_mock:
-                        get_senor_reading_value_mock.return_value = 1
+                with patch.object(UserRepository,
+                                  'get_user_by_id') as get_user_by_id_mock:
+                    get_user_by_id_mock.return_value = user
+
+                    with patch.object(
+                            SensorRepository,
+                            'get_sensors_with_last_readings_by_user_group_id'
+                    ) as get_sensors_with_last_readings_by_user_group_id_mock:
+                        get_sensors_with_last_readings_by_user_group_id_mock.return_value = [
+                            (first_sensor, sensor_type, None),
+                            (second_sensor, sensor_type, None)]
 
                         result, result_values = user_group_service.get_list_of_sensors(
                             device_group.product_key,
@@ -661,29 +683,31 @@ def test_get_list_of_sensors_should_return_empty_list_of_sensors_infos_when_no_s
 
     user = create_user()
     user_group = create_user_group()
-    user_group.users = [user]
 
-    with patch.object(DeviceGroupRepository, 'get_device_group_by_product_key') as get_device_group_by_product_key_mock:
-        get_device_group_by_product_key_mock.return_value = device_group
+    with patch.object(PermissionService, 'is_user_in_user_group') as is_user_in_user_group_mock:
+        is_user_in_user_group_mock.return_value = True
 
-        with patch.object(UserGroupRepository,
-                          'get_user_group_by_name_and_device_group_id') as get_user_group_by_name_device_group_id_mock:
-            get_user_group_by_name_device_group_id_mock.return_value = user_group
+        with patch.object(DeviceGroupRepository, 'get_device_group_by_product_key') as get_device_group_by_product_key_mock:
+            get_device_group_by_product_key_mock.return_value = device_group
 
-            with patch.object(UserRepository, 'get_user_by_id') as get_user_by_id_mock:
-                get_user_by_id_mock.return_value = user
+            with patch.object(UserGroupRepository,
+                              'get_user_group_by_name_and_device_group_id') as get_user_group_by_name_device_group_id_mock:
+                get_user_group_by_name_device_group_id_mock.return_value = user_group
 
-                with patch.object(
-                        SensorRepository,
-                        'get_sensors_by_user_group_id'
-                ) as get_sensors_by_user_group_id_mock:
-                    get_sensors_by_user_group_id_mock.return_value = []
+                with patch.object(UserRepository, 'get_user_by_id') as get_user_by_id_mock:
+                    get_user_by_id_mock.return_value = user
 
-                    result, result_values = user_group_service.get_list_of_sensors(
-                        device_group.product_key,
-                        user_group.name,
-                        user.id
-                    )
+                    with patch.object(
+                            SensorRepository,
+                            'get_sensors_with_last_readings_by_user_group_id'
+                    ) as get_sensors_with_last_readings_by_user_group_id_mock:
+                        get_sensors_with_last_readings_by_user_group_id_mock.return_value = []
+
+                        result, result_values = user_group_service.get_list_of_sensors(
+                            device_group.product_key,
+                            user_group.name,
+                            user.id
+                        )
 
     assert result == Constants.RESPONSE_MESSAGE_OK
     assert result_values == []
@@ -699,22 +723,25 @@ def test_get_list_of_sensors_should_return_error_message_when_user_not_in_user_g
     user = create_user()
     user_group = create_user_group()
 
-    with patch.object(DeviceGroupRepository, 'get_device_group_by_product_key') as get_device_group_by_product_key_mock:
-        get_device_group_by_product_key_mock.return_value = device_group
+    with patch.object(PermissionService, 'is_user_in_user_group') as is_user_in_user_group_mock:
+        is_user_in_user_group_mock.return_value = False
 
-        with patch.object(UserGroupRepository,
-                          'get_user_group_by_name_and_device_group_id') as get_user_group_by_name_device_group_id_mock:
-            get_user_group_by_name_device_group_id_mock.return_value = user_group
+        with patch.object(DeviceGroupRepository, 'get_device_group_by_product_key') as get_device_group_by_product_key_mock:
+            get_device_group_by_product_key_mock.return_value = device_group
 
-            with patch.object(UserRepository,
-                              'get_user_by_id') as get_user_by_id_mock:
-                get_user_by_id_mock.return_value = user
+            with patch.object(UserGroupRepository,
+                              'get_user_group_by_name_and_device_group_id') as get_user_group_by_name_device_group_id_mock:
+                get_user_group_by_name_device_group_id_mock.return_value = user_group
 
-                result, result_values = user_group_service.get_list_of_sensors(
-                    device_group.product_key,
-                    user_group.name,
-                    user.id
-                )
+                with patch.object(UserRepository,
+                                  'get_user_by_id') as get_user_by_id_mock:
+                    get_user_by_id_mock.return_value = user
+
+                    result, result_values = user_group_service.get_list_of_sensors(
+                        device_group.product_key,
+                        user_group.name,
+                        user.id
+                    )
 
     assert result == Constants.RESPONSE_MESSAGE_USER_DOES_NOT_HAVE_PRIVILEGES
     assert result_values is None
@@ -1028,11 +1055,8 @@ def test_create_user_group_in_device_group_should_create_user_group_when_valid_p
 
     device_group = create_device_group()
 
-    with patch.object(
-            DeviceGroupRepository,
-            'get_device_group_by_user_id_and_product_key'
-    ) as get_device_group_by_user_id_and_product_key_mock:
-        get_device_group_by_user_id_and_product_key_mock.return_value = device_group
+    with patch.object(PermissionService, 'get_master_user_device_group') as get_master_user_device_group_mock:
+        get_master_user_device_group_mock.return_value = device_group
 
         with patch.object(
                 UserGroupRepository,
@@ -1063,11 +1087,8 @@ def test_create_user_group_in_device_group_should_return_error_message_when_save
 
     device_group = create_device_group()
 
-    with patch.object(
-            DeviceGroupRepository,
-            'get_device_group_by_user_id_and_product_key'
-    ) as get_device_group_by_user_id_and_product_key_mock:
-        get_device_group_by_user_id_and_product_key_mock.return_value = device_group
+    with patch.object(PermissionService, 'get_master_user_device_group') as get_master_user_device_group_mock:
+        get_master_user_device_group_mock.return_value = device_group
 
         with patch.object(
                 UserGroupRepository,
@@ -1095,11 +1116,8 @@ def test_create_user_group_in_device_group_should_return_error_message_when_save
 def test_create_user_group_in_device_group_should_return_product_key_not_found_when_no_device_group():
     user_group_service_instance = UserGroupService.get_instance()
 
-    with patch.object(
-            DeviceGroupRepository,
-            'get_device_group_by_user_id_and_product_key'
-    ) as get_device_group_by_user_id_and_product_key_mock:
-        get_device_group_by_user_id_and_product_key_mock.return_value = None
+    with patch.object(PermissionService, 'get_master_user_device_group') as get_master_user_device_group_mock:
+        get_master_user_device_group_mock.return_value = None
 
         result = user_group_service_instance.create_user_group_in_device_group(
             'product_key',
@@ -1120,11 +1138,8 @@ def test_create_user_group_in_device_group_should_return_user_group_already_exis
     device_group = create_device_group()
     user_group = create_user_group()
 
-    with patch.object(
-            DeviceGroupRepository,
-            'get_device_group_by_user_id_and_product_key'
-    ) as get_device_group_by_user_id_and_product_key_mock:
-        get_device_group_by_user_id_and_product_key_mock.return_value = device_group
+    with patch.object(PermissionService, 'get_master_user_device_group') as get_master_user_device_group_mock:
+        get_master_user_device_group_mock.return_value = device_group
 
         with patch.object(
                 UserGroupRepository,
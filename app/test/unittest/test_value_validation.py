@@ -0,0 +1,24 @@
+import pytest
+
+from app.main.util.value_validation import get_validity_mask
+from app.main.util.value_validation import get_value_rule
+
+
+def test_get_validity_mask_should_validate_values_against_rules_of_same_index():
+    decimal_rule = get_value_rule('Decimal', -1.0, 1.0)
+    enum_rule = get_value_rule('Enum', numbers=[1, 3])
+    boolean_rule = get_value_rule('Boolean')
+
+    values = [0.5, 3, True, 1.5, 2, 1, 'test', -1, None, 0.5]
+    rules = [decimal_rule, enum_rule, boolean_rule, decimal_rule, enum_rule, boolean_rule, decimal_rule, decimal_rule,
+             enum_rule, None]
+
+    assert get_validity_mask(values, rules) == [True, True, True, False, False, False, False, True, False, False]
+
+
+def test_get_validity_mask_should_reject_values_of_unknown_type():
+    assert get_validity_mask([1, 'test'], [get_value_rule('Text'), get_value_rule('Text')]) == [False, False]
+
+
+if __name__ == '__main__':
+    pytest.main(['app/unittest/{}.py'.format(__file__)])
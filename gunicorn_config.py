@@ -0,0 +1,48 @@
+"""
+Settings of the production server, ``gunicorn -c gunicorn_config.py wsgi:app``.
+
+In the default sync mode every worker process serves requests with a pool of threads, which suits short hub and
+user requests. The async mode serves every connection with a greenlet, so that hubs waiting for states with long
+polling or streams do not hold threads, database connections are released while they wait.
+"""
+from app.main.util.constants import Constants
+
+bind = '0.0.0.0:{}'.format(Constants.SERVER_PORT)
+
+workers = Constants.SERVER_WORKERS
+
+if Constants.SERVER_MODE == 'async':
+    worker_class = 'gevent'
+    worker_connections = Constants.SERVER_WORKER_CONNECTIONS
+else:
+    worker_class = 'gthread'
+    threads = Constants.SERVER_THREADS
+
+keepalive = Constants.SERVER_KEEP_ALIVE_SECONDS
+timeout = Constants.SERVER_TIMEOUT_SECONDS
+graceful_timeout = Constants.SERVER_GRACEFUL_TIMEOUT_SECONDS
+
+# Workers are restarted after a number of requests, the jitter keeps them from restarting all at once
+max_requests = Constants.SERVER_MAX_REQUESTS
+max_requests_jitter = Constants.SERVER_MAX_REQUESTS_JITTER
+
+# The application is loaded in every worker, so that workers do not share database connections of the master
+preload_app = False
+
+accesslog = '-'
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    if Constants.SERVER_MODE == 'async':
+        from psycogreen.gevent import patch_psycopg
+
+        patch_psycopg()
+
+
+def post_worker_init(worker):
+    from app.main.service.log_service import LogService
+    from app.main.util.pool_metrics import PoolMetrics
+
+    LogService.get_instance().start_log_flusher(worker.wsgi)
+    PoolMetrics.get_instance().start_reporter(worker.wsgi, Constants.DATABASE_POOL_METRICS_INTERVAL_SECONDS)
@@ -1,3 +1,5 @@
+import signal
+import sys
 from urllib import parse
 
 import pytest
@@ -5,25 +7,46 @@ from flask import url_for
 from flask_migrate import Migrate
 from flask_migrate import MigrateCommand
 from flask_script import Manager
+from flask_script import Server
 
 import app.main.controller
 import app.main.model
 from app import api
 from app.main import create_app
+from app.benchmark.formula_consistency_benchmark import format_benchmark_results
+from app.benchmark.formula_consistency_benchmark import run_formula_consistency_benchmark
 from app.main import db
+from app.main.service.formula_scheduler_service import FormulaSchedulerService
+from app.main.service.hub_service import HubService
+from app.main.service.log_service import LogService
+from app.main.service.sensor_reading_service import SensorReadingService
 from app.main.util.constants import Constants
 
 app = create_app(Constants.CURRENT_ENV)
 app.register_blueprint(api)
 app.app_context().push()
 
+
+class LogFlushingServer(Server):
+    """Runs the server with logs written in batches by a background thread."""
+
+    def __call__(self, app, *args, **kwargs):
+        LogService.get_instance().start_log_flusher(app)
+        # Exit normally on SIGTERM so that queued logs are written
+        signal.signal(signal.SIGTERM, lambda signal_number, frame: sys.exit(0))
+
+        super().__call__(app, *args, **kwargs)
+
+
 manager = Manager(app)
 migrate = Migrate(app, db, compare_type=True)
 manager.add_command('db', MigrateCommand)
+manager.add_command('runserver', LogFlushingServer())
 
 
 @manager.command
 def run():
+    LogService.get_instance().start_log_flusher(app)
     app.run()
 
 
@@ -53,6 +76,58 @@ def test_integration():
     return 1
 
 
+@manager.command
+def maintain_sensor_readings():
+    """Creates upcoming sensor reading partitions and removes expired readings."""
+    result, result_values = SensorReadingService.get_instance().maintain_sensor_readings_storage(
+        Constants.SENSOR_READING_RETENTION_MONTHS,
+        Constants.SENSOR_READING_PARTITIONS_AHEAD
+    )
+
+    print(result, result_values)
+
+
+@manager.command
+def compact_device_changes():
+    """Removes old device changes superseded by later changes of the same devices."""
+    result, result_values = HubService.get_instance().compact_device_changes(Constants.DEVICE_CHANGE_RETENTION_DAYS)
+
+    print(result, result_values)
+
+
+@manager.command
+def run_formula_scheduler():
+    """Sets states of executive devices when time windows of their formulas begin or end."""
+    signal.signal(signal.SIGTERM, lambda signal_number, frame: sys.exit(0))
+    FormulaSchedulerService.get_instance().run_scheduler(app)
+
+
+@manager.command
+def benchmark_formula_checks(repeats=200):
+    """Compares times of formula consistency checks for formulas with 2 to 200 literals."""
+    print(format_benchmark_results(run_formula_consistency_benchmark(repeats=int(repeats))))
+
+
+@manager.command
+def load_test_hubs(url, product_key, password, sensor_keys='', executive_device_keys='', concurrent_hubs=16,
+                   listeners=0, test_seconds=30):
+    """Sends hub requests to a running server and prints throughput and latency percentiles."""
+    # Imported here, so that other commands do not depend on the HTTP client of the load test
+    from app.benchmark.hub_load_benchmark import format_load_test_results
+    from app.benchmark.hub_load_benchmark import run_hub_load_test
+
+    print(format_load_test_results(run_hub_load_test(
+        url,
+        product_key,
+        password,
+        [sensor_key for sensor_key in sensor_keys.split(',') if sensor_key],
+        [device_key for device_key in executive_device_keys.split(',') if device_key],
+        hubs=int(concurrent_hubs),
+        listeners=int(listeners),
+        duration_seconds=float(test_seconds)
+    )))
+
+
 @manager.command
 def get_routes():
     output = []
@@ -0,0 +1,105 @@
+# pylint: skip-file
+"""empty message
+
+Revision ID: 4faad1354363
+Revises: 1862aed275ee
+Create Date: 2026-10-18 10:12:41.502113
+
+"""
+from datetime import date
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4faad1354363'
+down_revision = '1862aed275ee'
+branch_labels = None
+depends_on = None
+
+
+def _add_months(month_start, months):
+    month_index = month_start.year * 12 + month_start.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def _create_monthly_partition(month_start):
+    op.execute(
+        "CREATE TABLE sensor_reading_y{:04d}m{:02d} PARTITION OF sensor_reading "
+        "FOR VALUES FROM ('{}') TO ('{}')".format(
+            month_start.year,
+            month_start.month,
+            month_start.isoformat(),
+            _add_months(month_start, 1).isoformat()
+        )
+    )
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    if bind.dialect.name != 'postgresql':
+        op.create_index('ix_sensor_reading_sensor_id_date', 'sensor_reading', ['sensor_id', 'date'], unique=False)
+        return
+
+    op.execute('ALTER TABLE sensor_reading RENAME TO sensor_reading_unpartitioned')
+    op.execute('ALTER INDEX sensor_reading_pkey RENAME TO sensor_reading_unpartitioned_pkey')
+    op.execute(
+        "CREATE TABLE sensor_reading ("
+        "id INTEGER NOT NULL DEFAULT nextval('sensor_reading_id_seq'), "
+        "value FLOAT NOT NULL, "
+        "date TIMESTAMP WITHOUT TIME ZONE NOT NULL, "
+        "sensor_id INTEGER NOT NULL, "
+        "CONSTRAINT sensor_reading_pkey PRIMARY KEY (id, date), "
+        "CONSTRAINT sensor_reading_sensor_id_fkey FOREIGN KEY (sensor_id) "
+        "REFERENCES sensor (id) ON DELETE CASCADE"
+        ") PARTITION BY RANGE (date)"
+    )
+    op.create_index('ix_sensor_reading_sensor_id_date', 'sensor_reading', ['sensor_id', 'date'], unique=False)
+    op.execute('CREATE TABLE sensor_reading_default PARTITION OF sensor_reading DEFAULT')
+
+    first_reading_date = bind.execute('SELECT min(date) FROM sensor_reading_unpartitioned').scalar()
+    today = datetime.utcnow()
+
+    month_start = date(today.year, today.month, 1)
+    if first_reading_date is not None:
+        month_start = min(month_start, date(first_reading_date.year, first_reading_date.month, 1))
+
+    last_month_start = _add_months(date(today.year, today.month, 1), 1)
+    while month_start <= last_month_start:
+        _create_monthly_partition(month_start)
+        month_start = _add_months(month_start, 1)
+
+    op.execute(
+        'INSERT INTO sensor_reading (id, value, date, sensor_id) '
+        'SELECT id, value, date, sensor_id FROM sensor_reading_unpartitioned'
+    )
+    op.execute('ALTER SEQUENCE sensor_reading_id_seq OWNED BY sensor_reading.id')
+    op.drop_table('sensor_reading_unpartitioned')
+
+
+def downgrade():
+    bind = op.get_bind()
+
+    if bind.dialect.name != 'postgresql':
+        op.drop_index('ix_sensor_reading_sensor_id_date', table_name='sensor_reading')
+        return
+
+    op.execute('ALTER TABLE sensor_reading RENAME TO sensor_reading_partitioned')
+    op.execute('ALTER INDEX sensor_reading_pkey RENAME TO sensor_reading_partitioned_pkey')
+    op.create_table('sensor_reading',
+    sa.Column('id', sa.Integer(), server_default=sa.text("nextval('sensor_reading_id_seq')"), nullable=False),
+    sa.Column('value', sa.Float(), nullable=False),
+    sa.Column('date', sa.DateTime(), nullable=False),
+    sa.Column('sensor_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['sensor_id'], ['sensor.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute(
+        'INSERT INTO sensor_reading (id, value, date, sensor_id) '
+        'SELECT id, value, date, sensor_id FROM sensor_reading_partitioned'
+    )
+    op.execute('ALTER SEQUENCE sensor_reading_id_seq OWNED BY sensor_reading.id')
+    op.execute('DROP TABLE sensor_reading_partitioned CASCADE')
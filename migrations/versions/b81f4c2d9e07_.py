@@ -0,0 +1,54 @@
+# pylint: skip-file
+"""empty message
+
+Revision ID: b81f4c2d9e07
+Revises: 7c3e91d2a5f4
+Create Date: 2026-10-18 12:24:51.230967
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b81f4c2d9e07'
+down_revision = '7c3e91d2a5f4'
+branch_labels = None
+depends_on = None
+
+rollup_tables = (
+    ('sensor_reading_1m', 'minute'),
+    ('sensor_reading_1h', 'hour'),
+    ('sensor_reading_1d', 'day')
+)
+
+
+def upgrade():
+    for table_name, _ in rollup_tables:
+        op.create_table(table_name,
+        sa.Column('date', sa.DateTime(), nullable=False),
+        sa.Column('min_value', sa.Float(), nullable=False),
+        sa.Column('max_value', sa.Float(), nullable=False),
+        sa.Column('sum_value', sa.Float(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.Column('sensor_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['sensor_id'], ['sensor.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('date', 'sensor_id')
+        )
+
+    if op.get_bind().dialect.name == 'postgresql':
+        for table_name, precision in rollup_tables:
+            op.execute(
+                "INSERT INTO {} (date, min_value, max_value, sum_value, count, sensor_id) "
+                "SELECT date_trunc('{}', date), min(value), max(value), sum(value), count(*), sensor_id "
+                "FROM sensor_reading GROUP BY sensor_id, date_trunc('{}', date)".format(
+                    table_name,
+                    precision,
+                    precision
+                )
+            )
+
+
+def downgrade():
+    for table_name, _ in reversed(rollup_tables):
+        op.drop_table(table_name)
@@ -0,0 +1,8 @@
+import app.main.controller
+import app.main.model
+from app import api
+from app.main import create_app
+from app.main.util.constants import Constants
+
+app = create_app(Constants.CURRENT_ENV)
+app.register_blueprint(api)